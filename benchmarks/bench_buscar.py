@@ -0,0 +1,42 @@
+'''
+Mide buscar_elementos (índice FTS5 busqueda_elemento, ver la migración 3 en src/modelo/migraciones.py)
+contra recorrer el listado con LIKE
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_buscar.py [cantidad]
+
+Por defecto se usa una base de datos en memoria (CAJA_DB=sqlite://) con 100000 elementos
+'''
+
+import sys
+
+from sqlalchemy import or_, select
+
+from comun import LogicaCaja, generar_caja, medir
+from src.modelo import ListadoElemento
+
+# Textos a buscar: un nombre, un prefijo de pocos elementos, una palabra de todos los logins y una que no existe
+TEXTOS = ["elemento 0012345", "001234", "usuario", "inexistente"]
+
+def buscar_con_like(logica: LogicaCaja, texto: str, limite: int):
+    ''' Busca el texto en las mismas columnas recorriendo todas las filas del listado '''
+    listado = ListadoElemento.__table__
+    patron = "%" + texto + "%"
+    columnas = [listado.c.nombre, listado.c.nota, listado.c.usuario, listado.c.email, listado.c.url,
+                listado.c.titular, listado.c.nombre_completo]
+    return logica.session.execute(select([listado]).where(or_(*[x.like(patron) for x in columnas]))
+        .order_by(listado.c.nombre).limit(limite)).fetchall()
+
+def main(cantidad: int, repeticiones: int = 20) -> None:
+    logica = LogicaCaja(tamano_cache=0)
+    generar_caja(logica, cantidad)
+
+    print("%-20s %10s %14s %14s" % ("texto (%d)" % cantidad, "resultados", "FTS5 (ms)", "LIKE (ms)"))
+    for texto in TEXTOS:
+        (resultado, _, segundos_fts) = medir(lambda: [logica.buscar_elementos(texto) for _ in range(repeticiones)])
+        (_, _, segundos_like) = medir(lambda: [buscar_con_like(logica, texto, 20) for _ in range(repeticiones)])
+        print("%-20s %10d %14.2f %14.2f" % (texto, len(resultado[0]), segundos_fts * 1000 / repeticiones,
+                                           segundos_like * 1000 / repeticiones))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
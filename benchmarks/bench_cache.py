@@ -0,0 +1,33 @@
+'''
+Mide dar_elementos y dar_reporte_seguridad sin cache, con un acierto del cache (que retorna el resultado
+congelado tal cual) y con la copia profunda que se hacía antes en cada acierto
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_cache.py [cantidad ...]
+
+Por defecto se usa una base de datos en memoria (CAJA_DB=sqlite://)
+'''
+
+import copy
+import sys
+
+from comun import LogicaCaja, generar_caja, limpiar_caja, medir
+
+def main(cantidades, repeticiones: int = 10) -> None:
+    sin_cache = LogicaCaja(tamano_cache=0)
+    con_cache = LogicaCaja()
+    print("%10s %22s %12s %12s %12s" % ("elementos", "lectura", "sin cache", "acierto", "deepcopy"))
+    for cantidad in cantidades:
+        generar_caja(sin_cache, cantidad)
+        for metodo in ["dar_elementos", "dar_reporte_seguridad"]:
+            (resultado, _, segundos_sin_cache) = medir(lambda: [getattr(sin_cache, metodo)() for _ in range(repeticiones)])
+            getattr(con_cache, metodo)()
+            (_, consultas, segundos_acierto) = medir(lambda: [getattr(con_cache, metodo)() for _ in range(repeticiones)])
+            assert consultas == 0
+            (_, _, segundos_copia) = medir(lambda: [copy.deepcopy(resultado[0]) for _ in range(repeticiones)])
+            print("%10d %22s %10.3f ms %10.3f ms %10.3f ms" % (cantidad, metodo, segundos_sin_cache * 1000 / repeticiones,
+                segundos_acierto * 1000 / repeticiones, segundos_copia * 1000 / repeticiones))
+    limpiar_caja(sin_cache)
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,29 @@
+'''
+Mide la cantidad de consultas SQL y el tiempo de dar_elementos para cajas de distintos tamaños,
+leyendo de la tabla listado_elemento y de las tablas de la herencia
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_dar_elementos.py [cantidad ...]
+
+Por defecto se usa una base de datos en memoria (CAJA_DB=sqlite://)
+'''
+
+import sys
+
+from comun import LogicaCaja, generar_caja, limpiar_caja, medir
+
+def main(cantidades) -> None:
+    logica = LogicaCaja(tamano_cache=0)
+    print("%10s %10s %10s %10s" % ("elementos", "origen", "consultas", "segundos"))
+    for cantidad in cantidades:
+        generar_caja(logica, cantidad)
+        for usar_listado in [False, True]:
+            logica.usar_listado = usar_listado
+            logica.session.expire_all()
+            elementos, consultas, segundos = medir(logica.dar_elementos)
+            assert len(elementos) == cantidad
+            print("%10d %10s %10d %10.3f" % (cantidad, "listado" if usar_listado else "herencia", consultas, segundos))
+    limpiar_caja(logica)
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [100, 1000, 10000, 100000])
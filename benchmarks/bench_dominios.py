@@ -0,0 +1,54 @@
+'''
+Mide el relleno del dominio de los logins existentes (migraciones.rellenar_dominios) y dar_logins_por_dominio
+(índice de host_invertido) contra recorrer todos los logins normalizando su url
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_dominios.py [cantidad]
+
+Por defecto se usa una base de datos en memoria (CAJA_DB=sqlite://) con 100000 elementos, una cuarta parte logins
+con URL de 1000 dominios distintos y hasta 3 subdominios por dominio
+'''
+
+import sys
+import time
+
+from sqlalchemy import bindparam, select
+
+from comun import LogicaCaja, generar_caja, medir
+from src.modelo import Login, dominios, migraciones
+
+login = Login.__table__
+
+def url_login(i: int) -> str:
+    ''' Retorna la URL del login número i: https://[subdominio.]dominioN.com/entrar '''
+    subdominio = ["", "www.", "mail.", "cuentas."][i // 1000 % 4]
+    return "https://%sdominio%d.com/entrar" % (subdominio, i % 1000)
+
+def buscar_recorriendo(logica: LogicaCaja, url: str):
+    ''' Lee la url de todos los logins y compara su dominio registrable '''
+    dominio = dominios.dar_dominio(dominios.dar_host(url))
+    return [id_login for (id_login, url_login) in logica.session.execute(select([login.c.id, login.c.url]))
+            if dominios.normalizar(url_login)[0] == dominio]
+
+def main(cantidad: int, repeticiones: int = 100) -> None:
+    logica = LogicaCaja(tamano_cache=0)
+    generar_caja(logica, cantidad)
+
+    # generar_caja inserta sin el ORM: las URL (y su dominio) quedan como en una base de datos anterior a la migración 4
+    ids = [x for (x,) in logica.session.execute(select([login.c.id]))]
+    logica.session.execute(login.update().where(login.c.id == bindparam("id_login")).values(url=bindparam("url")),
+                           [dict(id_login=x, url=url_login(i)) for (i, x) in enumerate(ids)])
+    inicio = time.perf_counter()
+    actualizados = migraciones.rellenar_dominios(logica.session.connection())
+    logica.session.commit()
+    print("rellenar el dominio de %d logins: %.2f s" % (actualizados, time.perf_counter() - inicio))
+
+    urls = ["https://cuentas.dominio%d.com/x" % (i * 7 % 1000) for i in range(repeticiones)]
+    (resultado, consultas, segundos) = medir(lambda: [logica.dar_logins_por_dominio(x) for x in urls])
+    print("dar_logins_por_dominio: %.3f ms (%d logins, %d consultas)" % (
+        segundos * 1000 / repeticiones, len(resultado[0]), consultas // repeticiones))
+    (_, _, segundos) = medir(lambda: buscar_recorriendo(logica, urls[0]))
+    print("recorriendo todos los logins: %.3f ms" % (segundos * 1000))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,50 @@
+'''
+Exporta una caja grande con src/logica/Exportador.py en cada formato y muestra las filas por segundo
+y la memoria residente del proceso después de cada exportación; la memoria debe mantenerse plana
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_exportar.py [cantidad] [tamaño de parte]
+
+Por defecto se usa una base de datos en memoria (CAJA_DB=sqlite://) con 100000 elementos; el modo
+cifrado necesita el paquete cryptography
+'''
+
+import os
+import sys
+import tempfile
+import time
+
+from comun import LogicaCaja, generar_caja
+from bench_memoria import memoria_residente_mb
+from src.logica import Exportador
+
+MODOS = [
+    ("jsonl", "caja.jsonl", dict()),
+    ("csv", "caja.csv", dict()),
+    ("jsonl + gzip", "caja.jsonl.gz", dict(comprimir=True)),
+    ("jsonl + gzip + cifrado", "caja.jsonl.gz", dict(comprimir=True, clave="clave del benchmark")),
+]
+
+def main(cantidad: int, tamano_parte: int) -> None:
+    logica = LogicaCaja(tamano_cache=0)
+    generar_caja(logica, cantidad)
+    print("Memoria inicial: %.1f MB" % memoria_residente_mb())
+
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre, archivo, opciones in MODOS:
+            ruta = os.path.join(directorio, archivo)
+            inicio = time.perf_counter()
+            try:
+                filas = Exportador.exportar(logica, ruta, tamano_parte=tamano_parte, **opciones)
+            except ImportError as error:
+                print("%-24s omitido: %s" % (nombre, error))
+                continue
+            segundos = time.perf_counter() - inicio
+            print("%-24s %d filas en %.2f s (%.0f filas/s), %.1f MB en disco, memoria %.1f MB" % (
+                nombre, filas, segundos, filas / segundos, os.path.getsize(ruta) / 1024 / 1024,
+                memoria_residente_mb()))
+
+    logica.cerrar_sesion()
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000, int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
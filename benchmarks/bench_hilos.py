@@ -0,0 +1,47 @@
+'''
+Mide las lecturas por segundo de la lógica en modo multihilo con distinta cantidad de hilos
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_hilos.py [cantidad] [lecturas por hilo]
+
+Se usa una base de datos en un archivo temporal, porque cada hilo abre su propia conexión
+'''
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from comun import LogicaCaja, generar_caja
+from src.modelo.declarative_base import FabricaSesiones
+
+def leer(logica: LogicaCaja, nombres, lecturas: int, semilla: int) -> None:
+    ''' Lee páginas de elementos a partir de nombres al azar y valida un nombre nuevo '''
+    aleatorio = random.Random(semilla)
+    for _ in range(lecturas):
+        logica.dar_elementos_pagina(aleatorio.choice(nombres), 50)
+        logica.validar_crear_editar_clave(-1, "clave nueva", "Clave123!", "pista")
+    logica.cerrar_sesion()
+
+def main(cantidad: int, lecturas: int) -> None:
+    with tempfile.TemporaryDirectory() as directorio:
+        fabrica = FabricaSesiones("sqlite:///" + os.path.join(directorio, "benchmark.sqlite"), perfil="balanced")
+        logica = LogicaCaja(fabrica, tamano_cache=0, multihilo=True)
+        generar_caja(logica, cantidad)
+        nombres = [x["nombre_elemento"] for x in logica.dar_resumen_elementos()]
+
+        print("%6s %14s" % ("hilos", "lecturas/s"))
+        for hilos in [1, 2, 4, 8]:
+            trabajos = [threading.Thread(target=leer, args=(logica, nombres, lecturas, i)) for i in range(hilos)]
+            inicio = time.perf_counter()
+            [trabajo.start() for trabajo in trabajos]
+            [trabajo.join() for trabajo in trabajos]
+            print("%6d %14.0f" % (hilos, hilos * lecturas / (time.perf_counter() - inicio)))
+
+        logica.cerrar_sesion()
+        fabrica.cerrar()
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000, int(sys.argv[2]) if len(sys.argv) > 2 else 200)
@@ -0,0 +1,51 @@
+'''
+Genera un CSV como los que exportan los navegadores y mide el tiempo y la memoria de importarlo
+con src/logica/Importador.py
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_importar.py [cantidad] [tamaño de parte]
+
+Se usa una base de datos en un archivo temporal, como la de la aplicación
+'''
+
+import csv
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from comun import LogicaCaja
+from src.logica import Importador
+from src.modelo.declarative_base import FabricaSesiones
+
+def generar_csv(ruta: str, cantidad: int) -> None:
+    ''' Escribe un CSV con una cantidad de logins; cada clave se repite en 5 logins '''
+    with open(ruta, "w", newline="") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(["name", "url", "username", "password", "note"])
+        for i in range(cantidad):
+            escritor.writerow(["sitio%d.co" % i, "https://sitio%d.co/login" % i, "usuario%d@mail.co" % i,
+                               "Clave%d!x" % (i // 5), "nota %d" % i])
+
+def main(cantidad: int, tamano_parte: int) -> None:
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "exportacion.csv")
+        generar_csv(ruta, cantidad)
+        fabrica = FabricaSesiones("sqlite:///" + os.path.join(directorio, "benchmark.sqlite"), perfil="balanced")
+        logica = LogicaCaja(fabrica, tamano_cache=0)
+
+        inicio = time.perf_counter()
+        resultado = Importador.importar(logica, ruta, tamano_parte=tamano_parte)
+        segundos = time.perf_counter() - inicio
+
+        assert resultado["importados"] == cantidad, resultado["errores"][:5]
+        print("%d registros importados en %.2f s (%.0f registros/s), memoria máxima %.1f MB" % (
+            resultado["importados"], segundos, cantidad / segundos,
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+        logica.cerrar_sesion()
+        fabrica.cerrar()
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000, int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
@@ -0,0 +1,64 @@
+'''
+Compara el tiempo de las rutas de reporte, validación y eliminación sin y con los índices
+que crea la migración 1 (ver src/modelo/migraciones.py)
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_indices.py [cantidad]
+
+Por defecto se usa una base de datos en memoria (CAJA_DB=sqlite://) con 50000 elementos
+'''
+
+import sys
+
+from comun import LogicaCaja, generar_caja, medir
+from src.logica import ResumenReporte
+from src.modelo import ClaveFavorita, Elemento, VersionEsquema, migraciones
+from src.modelo.declarative_base import Base, engine
+
+# Índices creados por la migración 1 para las consultas de la fachada
+INDICES = [indice for tabla in Base.metadata.sorted_tables for indice in tabla.indexes
+    if indice.name.startswith("ix_") and not indice.name.startswith("ix_listado")]
+
+def quitar_indices() -> None:
+    ''' Deja la base de datos como antes de la migración 1 '''
+    with engine.begin() as conexion:
+        for indice in INDICES:
+            indice.drop(conexion)
+        conexion.execute(VersionEsquema.__table__.delete())
+
+def medir_rutas(logica: LogicaCaja, cantidad: int, repeticiones: int = 200):
+    ''' Mide las rutas de reporte, validación y eliminación sobre una caja recién generada
+    Parámetros:
+        logica (LogicaCaja): La lógica sobre la que se mide
+        cantidad (int): Cantidad de elementos de la caja
+        repeticiones (int): Cantidad de validaciones y eliminaciones a medir
+    Retorna:
+        (dict): Los segundos de cada ruta
+    '''
+    generar_caja(logica, cantidad)
+    ids_claves = [x for (x,) in logica.session.query(ClaveFavorita.id).limit(repeticiones)]
+    ids_elementos = [x for (x,) in logica.session.query(Elemento.id).limit(repeticiones)]
+
+    resultados = {}
+    resultados["reporte (verificar resumen)"] = medir(
+        lambda: ResumenReporte.verificar_resumen(logica.session, logica.caja.id, reparar=False))[2]
+    resultados["validar eliminar clave"] = medir(
+        lambda: [logica.validar_eliminar_clave_por_id(x) for x in ids_claves])[2]
+    resultados["eliminar elemento"] = medir(
+        lambda: [logica.eliminar_elemento_por_id(x) for x in ids_elementos])[2]
+    return resultados
+
+def main(cantidad: int) -> None:
+    logica = LogicaCaja(tamano_cache=0)
+
+    quitar_indices()
+    sin_indices = medir_rutas(logica, cantidad)
+    migraciones.migrar(engine)
+    con_indices = medir_rutas(logica, cantidad)
+
+    print("%30s %12s %12s" % ("ruta (%d elementos)" % cantidad, "sin índices", "con índices"))
+    for ruta in sin_indices:
+        print("%30s %12.3f %12.3f" % (ruta, sin_indices[ruta], con_indices[ruta]))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,52 @@
+'''
+Mide cuántos logins por segundo se crean con crear_login con un commit por llamada, dentro de
+logica.lote(), que confirma una sola vez al final, y con las inserciones masivas de crear_elementos_lote
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_lote.py [cantidad] [perfil]
+
+Se usa una base de datos en un archivo temporal, porque en memoria un commit no escribe a disco
+'''
+
+import os
+import sys
+import tempfile
+import time
+
+from comun import LogicaCaja, limpiar_caja
+from src.modelo.declarative_base import FabricaSesiones
+
+def crear_logins(logica: LogicaCaja, cantidad: int) -> None:
+    ''' Crea una cantidad de logins que usan la misma clave favorita '''
+    for i in range(cantidad):
+        logica.crear_login("login benchmark %d" % i, "a@b.co", "usuario", "clave benchmark", "https://b.co", "nota")
+
+def main(cantidad: int, perfil: str) -> None:
+    with tempfile.TemporaryDirectory() as directorio:
+        fabrica = FabricaSesiones("sqlite:///" + os.path.join(directorio, "benchmark.sqlite"), perfil=perfil)
+        logica = LogicaCaja(fabrica, tamano_cache=0)
+
+        print("%10s %14s %16s" % ("modo", "segundos", "escrituras/s"))
+        for modo in ["commit", "lote", "masivo"]:
+            limpiar_caja(logica)
+            logica.crear_clave("clave benchmark", "Clave123!", "pista")
+            inicio = time.perf_counter()
+            if modo == "lote":
+                with logica.lote():
+                    crear_logins(logica, cantidad)
+            elif modo == "masivo":
+                errores = logica.crear_elementos_lote([{"tipo": "Login", "nombre_elemento": "login benchmark %d" % i,
+                    "email": "a@b.co", "usuario": "usuario", "clave": "clave benchmark", "url": "https://b.co",
+                    "notas": "nota"} for i in range(cantidad)])
+                assert errores == [""] * cantidad
+            else:
+                crear_logins(logica, cantidad)
+            segundos = time.perf_counter() - inicio
+            assert len(logica.dar_resumen_elementos()) == cantidad
+            print("%10s %14.2f %16.0f" % (modo, segundos, cantidad / segundos))
+
+        logica.cerrar_sesion()
+        fabrica.cerrar()
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000, sys.argv[2] if len(sys.argv) > 2 else "durable")
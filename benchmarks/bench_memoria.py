@@ -0,0 +1,53 @@
+'''
+Recorre varias veces una caja grande y muestra la memoria residente del proceso y la cantidad
+de objetos en la sesión de la lógica después de cada recorrido; ambas deben mantenerse planas
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_memoria.py [cantidad] [recorridos]
+
+Por defecto se usa una base de datos en memoria (CAJA_DB=sqlite://) con 100000 elementos
+'''
+
+import os
+import resource
+import sys
+
+from comun import LogicaCaja, generar_caja
+
+def memoria_residente_mb() -> float:
+    ''' Retorna la memoria residente actual del proceso en MB (el máximo si no hay /proc) '''
+    try:
+        with open("/proc/self/statm") as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def recorrer(logica: LogicaCaja, tamano_pagina: int = 500) -> int:
+    ''' Recorre toda la caja por páginas y consulta cada elemento por su id
+    Retorna:
+        (int): La cantidad de elementos recorridos
+    '''
+    total = 0
+    ultimo_nombre = None
+    while True:
+        pagina = logica.dar_elementos_pagina(ultimo_nombre, tamano_pagina)
+        if not pagina:
+            return total
+        for elemento in pagina[::50]:
+            logica.dar_elemento_por_id(elemento["id"])
+        total = total + len(pagina)
+        ultimo_nombre = pagina[-1]["nombre_elemento"]
+
+def main(cantidad: int, recorridos: int) -> None:
+    # Sin listado plano ni cache, para que cada lectura cargue objetos del modelo en la sesión
+    logica = LogicaCaja(tamano_cache=0, usar_listado=False)
+    generar_caja(logica, cantidad)
+
+    print("%10s %12s %16s" % ("recorrido", "memoria MB", "objetos sesión"))
+    print("%10s %12.1f %16d" % ("inicio", memoria_residente_mb(), len(logica.session.identity_map)))
+    for i in range(recorridos):
+        assert recorrer(logica) == cantidad
+        print("%10d %12.1f %16d" % (i + 1, memoria_residente_mb(), len(logica.session.identity_map)))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000, int(sys.argv[2]) if len(sys.argv) > 2 else 5)
@@ -0,0 +1,61 @@
+'''
+Mide el rendimiento de escritura y la latencia de lectura de cada perfil de almacenamiento
+(ver src/modelo/perfiles.py) sobre una caja generada en un archivo temporal
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_perfiles.py [cantidad]
+
+Cada perfil se mide en un proceso aparte, porque el engine se crea al importar los modelos
+'''
+
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+def medir_perfil(cantidad: int) -> None:
+    ''' Mide el perfil indicado en CAJA_DB_PERFIL e imprime los resultados '''
+    from comun import LogicaCaja, generar_caja
+
+    logica = LogicaCaja(tamano_cache=0)
+    generar_caja(logica, cantidad)
+    logica.crear_clave("clave benchmark", "Clave123!", "pista")
+
+    # Escrituras: cada login creado es una transacción con su propio commit
+    escrituras = 500
+    inicio = time.perf_counter()
+    for i in range(escrituras):
+        logica.crear_login("login benchmark %d" % i, "a@b.co", "usuario", "clave benchmark", "https://b.co", "nota")
+    por_segundo = escrituras / (time.perf_counter() - inicio)
+
+    # Lecturas: un elemento al azar por su id, sin cache
+    ids = [x["id"] for x in logica.dar_resumen_elementos()]
+    latencias = []
+    for id_elemento in random.Random(1).sample(ids, min(1000, len(ids))):
+        inicio = time.perf_counter()
+        logica.dar_elemento_por_id(id_elemento)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+    print("%10s %16.0f %14.3f %14.3f" % (os.environ["CAJA_DB_PERFIL"], por_segundo,
+        statistics.median(latencias), sorted(latencias)[int(len(latencias) * 0.99)]))
+
+def main(cantidad: int) -> None:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    from src.modelo.perfiles import PERFILES
+
+    print("%10s %16s %14s %14s" % ("perfil", "escrituras/s", "lectura p50 ms", "lectura p99 ms"))
+    sys.stdout.flush()
+    for perfil in PERFILES:
+        with tempfile.TemporaryDirectory() as directorio:
+            ambiente = dict(os.environ, CAJA_DB_PERFIL=perfil,
+                CAJA_DB="sqlite:///" + os.path.join(directorio, "benchmark.sqlite"))
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--perfil", str(cantidad)], env=ambiente, check=True)
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ["--perfil"]:
+        medir_perfil(int(sys.argv[2]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,70 @@
+'''
+Compara la búsqueda de nombres parecidos con el índice de trigramas (src/logica/IndiceTrigramas.py)
+contra recorrer todos los nombres calculando el coeficiente de Jaccard
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_similares.py [cantidad]
+
+Por defecto se usan 100000 nombres de dos o tres palabras armadas con sílabas al azar del español
+'''
+
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.logica.IndiceTrigramas import IndiceTrigramas, trigramas
+
+# Sílabas de una consonante (o grupo) y una vocal, con una consonante final opcional
+SILABAS = [inicio + vocal + final for inicio in ["", "b", "c", "ch", "d", "f", "g", "j", "l", "ll", "m", "n", "p", "r",
+           "s", "t", "v", "z", "br", "cr", "pl", "tr"] for vocal in "aeiou" for final in ["", "", "", "n", "r", "s"]]
+
+def generar_nombres(cantidad: int):
+    ''' Retorna una lista de nombres al azar (siempre los mismos para una cantidad) '''
+    azar = random.Random(cantidad)
+    palabra = lambda: "".join(azar.choice(SILABAS) for _ in range(azar.randint(2, 4)))
+    return ["%s %s" % (palabra().capitalize(), " ".join(palabra() for _ in range(azar.randint(1, 2))))
+            for _ in range(cantidad)]
+
+def buscar_recorriendo(nombres, texto: str, limite: int = 10):
+    ''' Calcula los trigramas y el Jaccard de todos los nombres y retorna los más parecidos '''
+    consulta = trigramas(texto)
+    puntajes = ((len(consulta & conjunto) / len(consulta | conjunto), nombre, id)
+                for (id, nombre, conjunto) in ((id, x, trigramas(x)) for (id, x) in enumerate(nombres)))
+    return heapq.nlargest(limite, puntajes)
+
+def medir(funcion, repeticiones: int) -> float:
+    ''' Retorna los milisegundos promedio de una llamada a la función '''
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) * 1000 / repeticiones
+
+def main(cantidad: int) -> None:
+    nombres = generar_nombres(cantidad)
+    indice = IndiceTrigramas()
+    inicio = time.perf_counter()
+    indice.cargar(enumerate(nombres))
+    print("construir el índice con %d nombres: %.2f s" % (cantidad, time.perf_counter() - inicio))
+    print("editar un nombre: %.3f ms" % medir(lambda: indice.aplicar([(7, "Nombre editado"), (7, nombres[7])]), 1000))
+
+    # Nombres existentes con una letra cambiada, como los escribiría un usuario
+    azar = random.Random(1)
+    textos = []
+    for nombre in azar.sample(nombres, 20):
+        i = azar.randrange(len(nombre))
+        textos.append(nombre[:i] + azar.choice("aeiou") + nombre[i + 1:])
+
+    recorriendo = medir(lambda: buscar_recorriendo(nombres, textos[0]), 1)
+    print("recorriendo todos los nombres: %.2f ms" % recorriendo)
+    # (limite, minimo): lo que usa la fachada por defecto, el mejor resultado y los 10 mejores sin mínimo
+    for (limite, minimo) in [(10, 0.3), (1, 0.0), (10, 0.0)]:
+        con_indice = medir(lambda: [indice.buscar(x, limite, minimo) for x in textos], 5) / len(textos)
+        print("buscar con el índice (limite=%d, minimo=%.1f): %.2f ms | %.0f veces más rápido" % (
+            limite, minimo, con_indice, recorriendo / con_indice))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,53 @@
+'''
+Mide el tiempo de validar valores maliciosos (hechos para forzar el retroceso de las expresiones
+regulares) con los escáneres de src/logica/Validacion.py y con las expresiones que reemplazan
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_validadores.py [longitud]
+
+Los escáneres se miden con valores de la longitud dada (10000 por defecto); las expresiones sólo
+hasta 1600 caracteres, porque la del teléfono tarda un tiempo cúbico en la longitud
+'''
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.logica import Validacion
+
+EXPRESIONES = {
+    "email": r"^[a-zA-Z0-9+_.-]+@[a-zA-Z0-9.-]+$",
+    "fecha": r"^\d{4}-([0]\d|1[0-2])-([0-2]\d|3[01])$",
+    "url": r"^(https?:\/\/(?:www\.|(?!www))[a-zA-Z0-9][a-zA-Z0-9-]+[a-zA-Z0-9]\.[^\s]{2,}|www\.[a-zA-Z0-9][a-zA-Z0-9-]+[a-zA-Z0-9]\.[^\s]{2,}|https?:\/\/(?:www\.|(?!www))[a-zA-Z0-9]+\.[^\s]{2,}|www\.[a-zA-Z0-9]+\.[^\s]{2,})$",
+    "teléfono": r"^(\(\+?\d+\)|\+?[\d A-Z]*)[\d A-Z]*(\([\d A-Z]+\))*[\d A-Z]*$",
+}
+
+ESCANERES = {"email": Validacion.es_email, "fecha": Validacion.es_fecha, "url": Validacion.es_url,
+             "teléfono": Validacion.es_telefono}
+
+# Valores maliciosos de una longitud aproximada para cada formato
+MALICIOSOS = {
+    "email": lambda n: "a" * (n // 2) + "@" + "." * (n // 2) + " ",
+    "fecha": lambda n: "1" * n,
+    "url": lambda n: "http://" + "a-" * (n // 2) + " ",
+    "teléfono": lambda n: "1 A" * (n // 3) + "!",
+}
+
+def medir(funcion, valor: str) -> float:
+    ''' Retorna los segundos que tarda una llamada a la función con el valor '''
+    inicio = time.perf_counter()
+    funcion(valor)
+    return time.perf_counter() - inicio
+
+def main(longitud: int) -> None:
+    for (nombre, generar) in MALICIOSOS.items():
+        expresion = re.compile(EXPRESIONES[nombre])
+        tiempos = ", ".join("%d: %.4f s" % (n, medir(expresion.match, generar(n))) for n in (200, 400, 800, 1600))
+        print("%-9s escáner %d caracteres: %.4f s | expresión regular %s" % (
+            nombre, longitud, medir(ESCANERES[nombre], generar(longitud)), tiempos))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,53 @@
+'''
+Mide dar_elementos_por_vencer y dar_histograma_vencimientos (rangos de los índices de vencimiento de las
+tarjetas y las identificaciones) contra filtrar dar_elementos en Python
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_vencimientos.py [cantidad]
+
+Por defecto se usa una base de datos en memoria (CAJA_DB=sqlite://) con 100000 elementos; las tarjetas y las
+identificaciones vencen en fechas repartidas en los próximos 10 años
+'''
+
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import bindparam
+
+from comun import LogicaCaja, generar_caja, medir
+from src.modelo import Identificacion, Tarjeta
+from src.logica import ListadoElementos, ResumenReporte
+
+def repartir_vencimientos(logica: LogicaCaja, hoy: date) -> None:
+    ''' Cambia el vencimiento de cada tarjeta e identificación a una fecha entre hoy y 10 años después '''
+    for tabla in (Tarjeta.__table__, Identificacion.__table__):
+        ids = [x for (x,) in logica.session.execute(tabla.select().with_only_columns([tabla.c.id]))]
+        logica.session.execute(tabla.update().where(tabla.c.id == bindparam("b_id")).values(vencimiento=bindparam("b_vencimiento")),
+                               [dict(b_id=x, b_vencimiento=hoy + timedelta(days=x * 7 % 3650)) for x in ids])
+    ResumenReporte.reconstruir_resumen(logica.session, logica._caja_id)
+    ListadoElementos.reconstruir_listado(logica.session, logica._caja_id)
+    logica.session.commit()
+
+def filtrar_elementos(logica: LogicaCaja, desde: date, hasta: date):
+    ''' Lee todos los elementos y filtra los que vencen en el rango '''
+    return [x for x in logica.dar_elementos() if "fecha_venc" in x and desde.isoformat() <= x["fecha_venc"] < hasta.isoformat()]
+
+def main(cantidad: int, repeticiones: int = 20) -> None:
+    logica = LogicaCaja(tamano_cache=0)
+    generar_caja(logica, cantidad)
+    hoy = date.today()
+    repartir_vencimientos(logica, hoy)
+    hasta = hoy + timedelta(days=30)
+
+    (resultado, consultas, segundos) = medir(lambda: [logica.dar_elementos_por_vencer(hoy, hasta) for _ in range(repeticiones)])
+    print("dar_elementos_por_vencer (30 días): %.3f ms (%d elementos, %d consultas)" % (
+        segundos * 1000 / repeticiones, len(resultado[0]), consultas // repeticiones))
+    (resultado, _, segundos) = medir(lambda: filtrar_elementos(logica, hoy, hasta))
+    print("filtrando dar_elementos: %.3f ms (%d elementos)" % (segundos * 1000, len(resultado)))
+
+    (resultado, consultas, segundos) = medir(lambda: [logica.dar_histograma_vencimientos() for _ in range(repeticiones)])
+    print("dar_histograma_vencimientos: %.3f ms (%s, %d consultas)" % (
+        segundos * 1000 / repeticiones, resultado[0], consultas // repeticiones))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,93 @@
+'''
+Funciones comunes de los benchmarks: generación de cajas grandes y medición de consultas
+'''
+
+import os
+import sys
+import time
+from datetime import date
+
+os.environ.setdefault('CAJA_DB', 'sqlite://')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sqlalchemy import event
+
+from src.modelo.declarative_base import engine
+from src.modelo import ClaveFavorita, Elemento, Login, Tarjeta, Secreto, Identificacion, ListadoElemento
+from src.logica import ListadoElementos, ResumenReporte
+from src.logica.LogicaCaja import LogicaCaja
+
+TIPOS = ["Login", "Tarjeta", "Secreto", "Identificación"]
+
+def limpiar_caja(logica: LogicaCaja) -> None:
+    ''' Elimina todos los elementos y claves favoritas de la base de datos
+    Parámetros:
+        logica (LogicaCaja): La lógica cuya base de datos se limpia
+    '''
+    for tabla in [ListadoElemento, Login, Tarjeta, Secreto, Identificacion, Elemento, ClaveFavorita]:
+        logica.session.execute(tabla.__table__.delete())
+    logica.session.commit()
+
+def generar_caja(logica: LogicaCaja, cantidad: int) -> None:
+    ''' Inserta una cantidad de elementos (de todos los tipos) y una clave favorita por cada 10 elementos
+    Parámetros:
+        logica (LogicaCaja): La lógica en cuya caja se insertan los elementos
+        cantidad (int): Cantidad de elementos a insertar
+    '''
+    limpiar_caja(logica)
+    caja_id = logica.caja.id
+    cantidad_claves = max(1, cantidad // 10)
+
+    conexion = logica.session.connection()
+    conexion.execute(ClaveFavorita.__table__.insert(), [
+        dict(id=i + 1, nombre="clave %d" % i, clave="Clave%d!" % i, pista="pista", caja_id=caja_id)
+        for i in range(cantidad_claves)])
+    conexion.execute(Elemento.__table__.insert(), [
+        dict(id=i + 1, tipo=TIPOS[i % 4], nombre="elemento %07d" % i, nota="nota", caja_id=caja_id)
+        for i in range(cantidad)])
+
+    ids = {tipo: [i + 1 for i in range(cantidad) if TIPOS[i % 4] == tipo] for tipo in TIPOS}
+    if ids["Login"]:
+        conexion.execute(Login.__table__.insert(), [
+            dict(id=i, email="a@b.co", usuario="usuario", url="https://b.co", clave_id=i % cantidad_claves + 1)
+            for i in ids["Login"]])
+    if ids["Tarjeta"]:
+        conexion.execute(Tarjeta.__table__.insert(), [
+            dict(id=i, numero="4111", titular="titular", codigo_seguridad="123", direccion="dirección",
+                 telefono="3000000000", vencimiento=date(2030, 1, 1), clave_id=i % cantidad_claves + 1)
+            for i in ids["Tarjeta"]])
+    if ids["Secreto"]:
+        conexion.execute(Secreto.__table__.insert(), [
+            dict(id=i, secreto="secreto", clave_id=i % cantidad_claves + 1)
+            for i in ids["Secreto"]])
+    if ids["Identificación"]:
+        conexion.execute(Identificacion.__table__.insert(), [
+            dict(id=i, numero="1", nombre_completo="nombre", nacimiento=date(1990, 1, 1),
+                 expedicion=date(2010, 1, 1), vencimiento=date(2030, 1, 1))
+            for i in ids["Identificación"]])
+
+    # Las inserciones masivas no pasan por la sesión, por lo que el resumen del reporte y el listado se reconstruyen
+    ResumenReporte.reconstruir_resumen(logica.session, caja_id)
+    ListadoElementos.reconstruir_listado(logica.session, caja_id)
+    logica.session.commit()
+    logica.session.expire_all()
+
+def medir(funcion):
+    ''' Ejecuta una función contando las consultas SQL que genera
+    Parámetros:
+        funcion (callable): La función a ejecutar
+    Retorna:
+        (tuple): El resultado de la función, la cantidad de consultas y los segundos que tomó
+    '''
+    consultas = []
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        inicio = time.perf_counter()
+        resultado = funcion()
+        segundos = time.perf_counter() - inicio
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    return resultado, len(consultas), segundos
@@ -0,0 +1,157 @@
+'''
+Cache de las lecturas de la fachada.
+
+Toda escritura a la base de datos (cualquier INSERT, UPDATE, DELETE o rollback)
+incrementa la versión de esa base de datos. Un cache que encuentra una versión distinta a la de
+sus entradas las descarta antes de responder, por lo que nunca retorna datos viejos.
+
+Los resultados se guardan inmutables (ver congelar) y se retornan sin copiarlos: un acierto no
+recorre el resultado. Quien necesite modificar un resultado debe copiarlo (list(x), dict(x)).
+'''
+import threading
+import weakref
+from collections import OrderedDict
+
+from sqlalchemy import event
+
+# Versión de los datos de cada base de datos (por engine), se incrementa con cada escritura
+versiones = weakref.WeakKeyDictionary()
+cerrojo_versiones = threading.Lock()
+
+def dar_version(engine) -> int:
+    ''' Retorna la versión de los datos de una base de datos
+    Parámetros:
+        engine (Engine): El engine de la base de datos
+    '''
+    return versiones.get(engine, 0)
+
+def incrementar_version(engine) -> None:
+    ''' Invalida los caches de una base de datos al incrementar su versión
+    Parámetros:
+        engine (Engine): El engine de la base de datos
+    '''
+    with cerrojo_versiones:
+        versiones[engine] = versiones.get(engine, 0) + 1
+
+def despues_de_rollback(conn) -> None:
+    ''' Incrementa la versión porque un rollback puede deshacer cambios que ya fueron leídos '''
+    incrementar_version(conn.engine)
+
+def despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany) -> None:
+    ''' Incrementa la versión si la sentencia ejecutada modificó datos
+    Parámetros:
+        conn (Connection): La conexión que ejecutó la sentencia
+        context (ExecutionContext): El contexto de la ejecución
+    '''
+    if context is not None and (context.isinsert or context.isupdate or context.isdelete):
+        incrementar_version(conn.engine)
+
+def registrar(engine) -> None:
+    ''' Registra la invalidación del cache en todas las escrituras de un engine
+    Parámetros:
+        engine (Engine): El engine de la base de datos
+    '''
+    # Se escucha en el engine (y no en las sesiones) para incluir también las escrituras
+    # sin ORM, como las actualizaciones masivas o la reconstrucción del resumen
+    if not event.contains(engine, "after_cursor_execute", despues_de_ejecutar):
+        event.listen(engine, "after_cursor_execute", despues_de_ejecutar)
+        event.listen(engine, "rollback", despues_de_rollback)
+
+ERROR_INMUTABLE = "Los resultados del cache de lecturas no se pueden modificar; modifique una copia"
+
+def inmutable(*args, **kwargs):
+    raise TypeError(ERROR_INMUTABLE)
+
+class ListaInmutable(list):
+    ''' Lista de solo lectura; es igual a una lista con los mismos valores '''
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = inmutable
+    append = extend = insert = pop = remove = clear = sort = reverse = inmutable
+
+    def __reduce_ex__(self, protocolo):
+        # copy.copy, copy.deepcopy y pickle crean una lista normal, que sí se puede modificar
+        return (list, (list(self),))
+
+class DiccionarioInmutable(dict):
+    ''' Diccionario de solo lectura; es igual a un dict con las mismas llaves y valores '''
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = inmutable
+    pop = popitem = clear = update = setdefault = inmutable
+
+    def __reduce_ex__(self, protocolo):
+        return (dict, (dict(self),))
+
+def congelar(valor):
+    ''' Retorna el valor con sus listas, tuplas y diccionarios (también los anidados) convertidos a inmutables
+    Parámetros:
+        valor: El resultado de una lectura
+    '''
+    if isinstance(valor, dict):
+        return DiccionarioInmutable({llave: congelar(x) for (llave, x) in valor.items()})
+    if isinstance(valor, list):
+        return ListaInmutable([congelar(x) for x in valor])
+    if isinstance(valor, tuple):
+        return tuple(congelar(x) for x in valor)
+    return valor
+
+class CacheLecturas():
+    ''' Cache LRU de resultados de lecturas, válido mientras no cambie la versión de la caja '''
+
+    def __init__(self, engine, tamano: int = 256) -> None:
+        ''' Crea un cache vacío
+        Parámetros:
+            engine (Engine): El engine de la base de datos cuyas lecturas se guardan
+            tamano (int): La cantidad máxima de resultados guardados
+        '''
+        self.engine = engine
+        self.tamano = tamano
+        self.entradas = OrderedDict()
+        self.version = dar_version(engine)
+        self.aciertos = 0
+        self.fallos = 0
+        self.cerrojo = threading.Lock()
+
+    def leer(self, llave, calcular):
+        ''' Retorna el resultado guardado para una llave o lo calcula y lo guarda
+        Parámetros:
+            llave (tuple): La llave del resultado (nombre del método y sus parámetros)
+            calcular (callable): Función que calcula el resultado si no está guardado
+        Retorna:
+            El resultado congelado (ver congelar); el mismo objeto en cada acierto
+        '''
+        with self.cerrojo:
+            version = dar_version(self.engine)
+            if self.version != version:
+                self.entradas.clear()
+                self.version = version
+
+            if llave in self.entradas:
+                self.aciertos = self.aciertos + 1
+                self.entradas.move_to_end(llave)
+                return self.entradas[llave]
+            self.fallos = self.fallos + 1
+
+        # Se calcula sin el cerrojo para que otros hilos puedan leer al mismo tiempo
+        resultado = congelar(calcular())
+
+        with self.cerrojo:
+            # Si hubo una escritura mientras se calculaba (p. ej. un autoflush), el resultado no se guarda
+            if dar_version(self.engine) == version == self.version:
+                self.entradas[llave] = resultado
+                if len(self.entradas) > self.tamano:
+                    self.entradas.popitem(last=False)
+        return resultado
+
+    def invalidar(self) -> None:
+        ''' Descarta todos los resultados guardados '''
+        with self.cerrojo:
+            self.entradas.clear()
+
+    def dar_estadisticas(self) -> dict:
+        ''' Retorna las estadísticas de uso del cache
+        Retorna:
+            (dict): Los aciertos, fallos, la cantidad de resultados guardados y la versión de la caja
+        '''
+        return {"aciertos": self.aciertos, "fallos": self.fallos, "entradas": len(self.entradas), "version": self.version}
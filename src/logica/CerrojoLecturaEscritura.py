@@ -0,0 +1,78 @@
+'''
+Cerrojo de lectura y escritura para usar la lógica desde varios hilos.
+
+Varios hilos pueden leer al mismo tiempo, pero una escritura espera a que terminen las lecturas
+en curso y no deja empezar lecturas nuevas hasta terminar. Un hilo que ya tiene el cerrojo lo puede
+volver a tomar (p. ej. una escritura que lee), sin bloquearse a sí mismo.
+'''
+import threading
+from contextlib import contextmanager
+
+class CerrojoLecturaEscritura():
+    ''' Cerrojo reentrante con preferencia a las escrituras '''
+
+    def __init__(self) -> None:
+        self.condicion = threading.Condition()
+        self.lectores = 0
+        self.escritor = None
+        self.escritores_esperando = 0
+        self.local = threading.local()
+
+    def profundidad(self) -> int:
+        ''' Retorna cuántas veces el hilo actual tiene tomado el cerrojo '''
+        return getattr(self.local, "profundidad", 0)
+
+    @contextmanager
+    def lectura(self):
+        ''' Toma el cerrojo para leer mientras dura el bloque with '''
+        if self.profundidad() > 0:
+            # El hilo ya lee o escribe: no debe esperar a los escritores que esperan por él
+            self.local.profundidad += 1
+            try:
+                yield
+            finally:
+                self.local.profundidad -= 1
+            return
+
+        with self.condicion:
+            while self.escritor is not None or self.escritores_esperando > 0:
+                self.condicion.wait()
+            self.lectores += 1
+        self.local.profundidad = 1
+        try:
+            yield
+        finally:
+            self.local.profundidad = 0
+            with self.condicion:
+                self.lectores -= 1
+                if self.lectores == 0:
+                    self.condicion.notify_all()
+
+    @contextmanager
+    def escritura(self):
+        ''' Toma el cerrojo para escribir mientras dura el bloque with '''
+        hilo = threading.get_ident()
+        if self.escritor == hilo:
+            self.local.profundidad += 1
+            try:
+                yield
+            finally:
+                self.local.profundidad -= 1
+            return
+        if self.profundidad() > 0:
+            raise RuntimeError("No se puede escribir mientras el mismo hilo está leyendo")
+
+        with self.condicion:
+            self.escritores_esperando += 1
+            while self.escritor is not None or self.lectores > 0:
+                self.condicion.wait()
+            self.escritores_esperando -= 1
+            self.escritor = hilo
+        self.local.profundidad = 1
+        try:
+            yield
+        finally:
+            self.local.profundidad = 0
+            with self.condicion:
+                self.escritor = None
+                self.condicion.notify_all()
@@ -0,0 +1,202 @@
+'''
+Exportación de la caja de seguridad a JSON Lines o CSV con memoria constante.
+
+Las claves favoritas y los elementos (de la tabla listado_elemento) se leen de un cursor por partes
+con fetchmany y cada parte se escribe al archivo antes de leer la siguiente, así la memoria no
+depende del tamaño de la caja. El archivo se puede comprimir con gzip y cifrar con AES-GCM por
+bloques; el cifrado necesita el paquete opcional cryptography.
+
+Formato del archivo cifrado: CABECERA_CIFRADO, la sal (16 bytes) y las iteraciones de PBKDF2
+(4 bytes), seguidos de bloques con su longitud (4 bytes), el nonce (12 bytes) y el texto cifrado.
+Cada bloque se autentica con su número y con una marca de último bloque, así no se pueden
+reordenar, quitar ni truncar bloques sin que descifrar lo detecte.
+'''
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import struct
+from contextlib import ExitStack
+
+from sqlalchemy import select
+
+from src.modelo import ClaveFavorita, ListadoElemento
+
+# Formato de exportación según la extensión del archivo (sin .gz)
+FORMATOS = {".jsonl": "jsonl", ".csv": "csv"}
+
+# Valor de la columna registro para cada clase de fila exportada
+REGISTRO_CLAVE = "clave_favorita"
+REGISTRO_ELEMENTO = "elemento"
+
+# Columnas del CSV: las llaves de TipoClaveFavorita y de TipoElemento
+COLUMNAS_CSV = ["registro", "id", "nombre_elemento", "tipo", "notas", "clave", "email", "usuario", "url",
+                "numero", "fecha_venc", "nombre", "fecha_nacimiento", "fecha_exp", "titular", "ccv",
+                "direccion", "telefono", "secreto", "pista"]
+
+CABECERA_CIFRADO = b"CAJAEXP1"
+ITERACIONES_PBKDF2 = 200000
+TAMANO_BLOQUE_CIFRADO = 65536
+
+def cargar_aesgcm():
+    ''' Retorna la clase AESGCM del paquete opcional cryptography '''
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ImportError as error:
+        raise ImportError("Para cifrar o descifrar exportaciones se necesita el paquete cryptography") from error
+    return AESGCM
+
+def derivar_llave(clave: str, sal: bytes, iteraciones: int) -> bytes:
+    ''' Deriva la llave AES de 256 bits de una clave con PBKDF2-HMAC-SHA256 '''
+    return hashlib.pbkdf2_hmac("sha256", clave.encode("utf-8"), sal, iteraciones)
+
+def datos_asociados(numero: int, ultimo: bool) -> bytes:
+    ''' Retorna los datos autenticados de un bloque cifrado: su número y si es el último '''
+    return struct.pack(">Q?", numero, ultimo)
+
+class EscritorCifrado(io.RawIOBase):
+    ''' Flujo de escritura que cifra por bloques lo que recibe y lo escribe en otro archivo '''
+
+    def __init__(self, destino, clave: str, tamano_bloque: int = TAMANO_BLOQUE_CIFRADO) -> None:
+        super().__init__()
+        sal = os.urandom(16)
+        self.aesgcm = cargar_aesgcm()(derivar_llave(clave, sal, ITERACIONES_PBKDF2))
+        self.destino = destino
+        self.tamano_bloque = tamano_bloque
+        self.pendiente = bytearray()
+        self.numero = 0
+        self.destino.write(CABECERA_CIFRADO + sal + struct.pack(">I", ITERACIONES_PBKDF2))
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, datos) -> int:
+        self.pendiente.extend(datos)
+        # Se deja al menos un bloque pendiente: el último se escribe al cerrar con su marca
+        while len(self.pendiente) > self.tamano_bloque:
+            self.escribir_bloque(bytes(self.pendiente[:self.tamano_bloque]), False)
+            del self.pendiente[:self.tamano_bloque]
+        return len(datos)
+
+    def escribir_bloque(self, datos: bytes, ultimo: bool) -> None:
+        nonce = os.urandom(12)
+        cifrado = self.aesgcm.encrypt(nonce, datos, datos_asociados(self.numero, ultimo))
+        self.destino.write(struct.pack(">I", len(cifrado)) + nonce + cifrado)
+        self.numero += 1
+
+    def close(self) -> None:
+        if not self.closed:
+            self.escribir_bloque(bytes(self.pendiente), True)
+            self.pendiente = bytearray()
+        super().close()
+
+def leer_exacto(archivo, cantidad: int) -> bytes:
+    datos = archivo.read(cantidad)
+    if len(datos) != cantidad:
+        raise ValueError("El archivo cifrado está incompleto")
+    return datos
+
+def descifrar(entrada, salida, clave: str) -> None:
+    ''' Descifra bloque a bloque un archivo escrito por EscritorCifrado
+    Parámetros:
+        entrada (file): El archivo cifrado, abierto en modo binario
+        salida (file): El archivo donde se escriben los datos descifrados, en modo binario
+        clave (string): La clave con la que se cifró
+    '''
+    from cryptography.exceptions import InvalidTag
+
+    if leer_exacto(entrada, len(CABECERA_CIFRADO)) != CABECERA_CIFRADO:
+        raise ValueError("El archivo no es una exportación cifrada")
+    sal = leer_exacto(entrada, 16)
+    (iteraciones,) = struct.unpack(">I", leer_exacto(entrada, 4))
+    aesgcm = cargar_aesgcm()(derivar_llave(clave, sal, iteraciones))
+
+    numero = 0
+    longitud = leer_exacto(entrada, 4)
+    while True:
+        nonce = leer_exacto(entrada, 12)
+        cifrado = leer_exacto(entrada, struct.unpack(">I", longitud)[0])
+        # Un bloque es el último si no le sigue otro; si falta el verdadero último bloque la marca no coincide
+        longitud = entrada.read(4)
+        try:
+            salida.write(aesgcm.decrypt(nonce, cifrado, datos_asociados(numero, longitud == b"")))
+        except InvalidTag:
+            raise ValueError("La clave no es correcta o el archivo cifrado está dañado") from None
+        if longitud == b"":
+            return
+        if len(longitud) != 4:
+            raise ValueError("El archivo cifrado está incompleto")
+        numero += 1
+
+def leer_por_partes(session, consulta, tamano_parte: int):
+    ''' Retorna las filas de una consulta en listas de a lo sumo tamano_parte filas, leídas del cursor '''
+    resultado = session.execute(consulta)
+    try:
+        while True:
+            filas = resultado.fetchmany(tamano_parte)
+            if not filas:
+                return
+            yield filas
+    finally:
+        resultado.close()
+
+def registros(logica, tamano_parte: int):
+    ''' Retorna por partes los dict de las claves favoritas y de los elementos de la caja
+    Parámetros:
+        logica (LogicaCaja): La lógica de la caja a exportar
+        tamano_parte (int): La cantidad de filas leídas del cursor a la vez
+    '''
+    clavefavorita = ClaveFavorita.__table__
+    listado = ListadoElemento.__table__
+    caja_id = logica.caja.id
+
+    consulta = select([clavefavorita]).where(clavefavorita.c.caja_id == caja_id).order_by(clavefavorita.c.id)
+    for filas in leer_por_partes(logica.session, consulta, tamano_parte):
+        yield [dict(logica.mapear_clave_favorita(x), registro=REGISTRO_CLAVE) for x in filas]
+
+    consulta = select([listado]).where(listado.c.caja_id == caja_id).order_by(listado.c.id)
+    for filas in leer_por_partes(logica.session, consulta, tamano_parte):
+        yield [dict(logica.mapear_fila_listado(x), registro=REGISTRO_ELEMENTO) for x in filas]
+
+def exportar(logica, ruta: str, formato: str = None, comprimir: bool = False, clave: str = None,
+             tamano_parte: int = 1000) -> int:
+    ''' Exporta las claves favoritas y los elementos de la caja a un archivo
+    Parámetros:
+        logica (LogicaCaja): La lógica de la caja a exportar
+        ruta (string): La ruta del archivo a escribir
+        formato (string): jsonl o csv, o None para deducirlo de la extensión del archivo
+        comprimir (bool): Si es True el archivo se comprime con gzip
+        clave (string): La clave con la que se cifra el archivo o None para no cifrarlo
+        tamano_parte (int): La cantidad de filas leídas y escritas a la vez
+    Retorna:
+        (int): La cantidad de claves favoritas y elementos exportados
+    '''
+    raiz = ruta[:-3] if ruta.endswith(".gz") else ruta
+    formato = formato or FORMATOS.get(os.path.splitext(raiz)[1].lower())
+    if formato not in FORMATOS.values():
+        raise ValueError("Formato de exportación no soportado: %s" % formato)
+    if clave is not None:
+        cargar_aesgcm()
+
+    total = 0
+    with ExitStack() as pila, logica.lectura():
+        # Se cierran en orden inverso: texto, gzip, cifrado y archivo
+        destino = pila.enter_context(open(ruta, "wb"))
+        if clave is not None:
+            destino = pila.enter_context(io.BufferedWriter(EscritorCifrado(destino, clave), TAMANO_BLOQUE_CIFRADO))
+        if comprimir:
+            destino = pila.enter_context(gzip.GzipFile(fileobj=destino, mode="wb"))
+        texto = pila.enter_context(io.TextIOWrapper(destino, encoding="utf-8", newline=""))
+
+        if formato == "csv":
+            escritor = csv.DictWriter(texto, COLUMNAS_CSV, restval="")
+            escritor.writeheader()
+        for parte in registros(logica, tamano_parte):
+            if formato == "csv":
+                escritor.writerows(parte)
+            else:
+                texto.write("".join(json.dumps(x, ensure_ascii=False) + "\n" for x in parte))
+            total += len(parte)
+    return total
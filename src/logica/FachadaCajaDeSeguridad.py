@@ -10,6 +10,13 @@ class FachadaCajaDeSeguridad:
         '''
         raise NotImplementedError("Método no implementado")
 
+    def dar_resumen_elementos(self):
+        ''' Retorna la lista de elementos de la caja de seguridad sólo con los datos que se muestran en la lista
+        Retorna:
+            (list): La lista con los dict con el id, nombre_elemento y tipo de los elementos
+        '''
+        raise NotImplementedError("Método no implementado")
+
     def dar_elemento(self, id_elemento):
         ''' Retorna un elemento de la caja de seguridad
         Parámetros:
@@ -274,10 +281,390 @@ class FachadaCajaDeSeguridad:
         '''
         raise NotImplementedError("Método no implementado")
 
-    def dar_reporte_seguridad(self):
+    def dar_reporte_seguridad(self, dias_por_vencer=90):
         ''' Genera la información para el reporte de seguridad
+        Parámetros:
+            dias_por_vencer (int): Los elementos que vencen antes de hoy más estos días cuentan como a vencer
         Retorna:
             (dict): Un mapa con los valores numéricos para las llaves logins, ids, tarjetas,
             secretos, inseguras, avencer, masdeuna y nivel que conforman el reporte
         '''
         raise NotImplementedError("Método no implementado")
+
+    def dar_elemento_por_id(self, id_elemento):
+        ''' Retorna un elemento de la caja de seguridad
+        Parámetros:
+            id_elemento (int): El id del elemento en la base de datos
+        Retorna:
+            (dict): El elemento identificado con id_elemento
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def dar_clave_favorita_por_id(self, id_clave):
+        ''' Retorna una clave favorita
+        Parámetros:
+            id_clave (int): El id de la clave favorita en la base de datos
+        Retorna:
+            (dict): La clave favorita identificada con id_clave
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def eliminar_elemento_por_id(self, id):
+        ''' Elimina un elemento de la lista de elementos
+        Parámetros:
+            id (int): El id del elemento en la base de datos
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def validar_crear_editar_login_por_id(self, id, nombre, email, usuario, password, url, notas):
+        ''' Valida que un login se pueda crear o editar
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre (string): El nombre del elemento
+            email (string): El email del elemento
+            usuario (string): El usuario del login
+            password (string): El nombre de clave favorita del elemento
+            url (string): El URL del login
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def editar_login_por_id(self, id, nombre, email, usuario, password, url, notas):
+        ''' Edita un elemento login
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar
+            nombre (string): El nombre del elemento
+            email (string): El email del elemento
+            usuario (string): El usuario del login
+            password (string): El nombre de clave favorita del elemento
+            url (string): El URL del login
+            notas (string): Las notas del elemento
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def validar_crear_editar_id_por_id(self, id, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas):
+        ''' Valida que una identificación se pueda crear o editar
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            nombre_completo (string): El nombre completo de la persona en la identificación
+            fnacimiento (string): La fecha de nacimiento de la persona en la identificación
+            fexpedicion (string): La fecha de expedición en la identificación
+            fvencimiento (string): La feha de vencimiento en la identificación
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def editar_id_por_id(self, id, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas):
+        ''' Edita un elemento identificación
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            nombre_completo (string): El nombre completo de la persona en la identificación
+            fnacimiento (string): La fecha de nacimiento de la persona en la identificación
+            fexpedicion (string): La fecha de expedición en la identificación
+            fvencimiento (string): La feha de vencimiento en la identificación
+            notas (string): Las notas del elemento
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def validar_crear_editar_tarjeta_por_id(self, id, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas):
+        ''' Valida que una tarjeta se pueda crear o editar
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            titular (string): El nombre del titular de la tarjeta
+            fvencimiento (string): La feha de vencimiento en la tarjeta
+            ccv (string): El código de seguridad en la tarjeta
+            clave (string): El nombre de clave favorita del elemento
+            direccion (string): La dirección del titular de la tarjeta
+            telefono (string): El número de teléfono del titular de la tarjeta
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def editar_tarjeta_por_id(self, id, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas):
+        ''' Edita un elemento tarjeta
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            titular (string): El nombre del titular de la tarjeta
+            fvencimiento (string): La feha de vencimiento en la tarjeta
+            ccv (string): El código de seguridad en la tarjeta
+            clave (string): El nombre de clave favorita del elemento
+            direccion (string): La dirección del titular de la tarjeta
+            telefono (string): El número de teléfono del titular de la tarjeta
+            notas (string): Las notas del elemento
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def validar_crear_editar_secreto_por_id(self, id, nombre, secreto, clave, notas):
+        ''' Valida que se pueda crear o editar un elemento secreto
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre (string): El nombre del elemento
+            secreto (string): El secreto del elemento
+            clave (string): El nombre de clave favorita del elemento
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def editar_secreto_por_id(self, id, nombre, secreto, clave, notas):
+        ''' Edita un elemento secreto
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar
+            nombre (string): El nombre del elemento
+            secreto (string): El secreto del elemento
+            clave (string): El nombre de clave favorita del elemento
+            notas (string): Las notas del elemento
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def validar_crear_editar_clave_por_id(self, id, nombre, clave, pista):
+        ''' Valida que se pueda crear o editar una clave favorita
+        Parámetros:
+            id (int): El id en la base de datos de la clave favorita a editar o -1 en caso de crear
+            nombre (string): El nombre de la clave favorita
+            clave (string): El password o clae de la clave favorita
+            pista (string): La pista para recordar la clave favorita
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def editar_clave_por_id(self, id, nombre, clave, pista):
+        ''' Edita una clave favorita
+        Parámetros:
+            id (int): El id en la base de datos de la clave favorita a editar
+            nombre (string): El nombre de la clave favorita
+            clave (string): El password o clae de la clave favorita
+            pista (string): La pista para recordar la clave favorita
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def validar_eliminar_clave_por_id(self, id):
+        ''' Validar que se pueda eliminar una clave favorita
+        Parámetros:
+            id (int): El id en la base de datos de la clave favorita a borrar
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def eliminar_clave_por_id(self, id):
+        ''' Elimina una clave favorita
+        Parámetros:
+            id (int): El id en la base de datos de la clave favorita a borrar
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def dar_elementos_pagina(self, despues_de_nombre, limite, tipo=None):
+        ''' Retorna una página de la lista de elementos ordenada por nombre
+        Parámetros:
+            despues_de_nombre (string): El nombre del último elemento de la página anterior o None para la primera página
+            limite (int): La cantidad máxima de elementos a retornar
+            tipo (string): El tipo de los elementos a retornar o None para todos los tipos
+        Retorna:
+            (list): La lista con los dict de los elementos de la página
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def buscar_elementos(self, texto, limite=20):
+        ''' Busca los elementos por las palabras de su nombre, notas, usuario, email, URL, titular o nombre completo
+        Parámetros:
+            texto (string): Las palabras a buscar; cada una puede ser el inicio de una palabra del elemento
+            limite (int): La cantidad máxima de elementos a retornar
+        Retorna:
+            (list): La lista con los dict de los elementos, del más al menos relevante
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def dar_logins_por_dominio(self, url):
+        ''' Retorna los logins del mismo dominio registrable que una URL, incluidos los de sus subdominios
+        Parámetros:
+            url (string): La URL o el dominio a buscar
+        Retorna:
+            (list): La lista con los dict de los logins, ordenada por nombre
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def dar_elementos_por_vencer(self, desde=None, hasta=None):
+        ''' Retorna las tarjetas y las identificaciones que vencen en un rango de fechas
+        Parámetros:
+            desde (date): La primera fecha del rango; None para incluir también los elementos ya vencidos
+            hasta (date): La fecha (excluida) en la que termina el rango; None para no limitarlo
+        Retorna:
+            (list): La lista con los dict de los elementos, ordenada por fecha de vencimiento y nombre
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def dar_histograma_vencimientos(self, cortes=(30, 60, 90, 365)):
+        ''' Cuenta las tarjetas y las identificaciones que vencen antes de varios horizontes
+        Parámetros:
+            cortes (iterable): Los horizontes en días a partir de hoy
+        Retorna:
+            (dict): Por cada corte, la cantidad de elementos (vencidos o no) que vencen antes de hoy más esos días
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def dar_elementos_similares(self, texto, limite=10, minimo=0.3):
+        ''' Retorna los elementos cuyo nombre se parece más a un texto, aunque tenga errores de escritura
+        Parámetros:
+            texto (string): El nombre a buscar
+            limite (int): La cantidad máxima de elementos a retornar
+            minimo (float): La similitud mínima, entre 0 y 1
+        Retorna:
+            (list): Los dict con el id, nombre_elemento y similitud (entre 0 y 1) de los elementos, de mayor a menor similitud
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def dar_claves_similares(self, texto, limite=10, minimo=0.3):
+        ''' Retorna las claves favoritas cuyo nombre se parece más a un texto, aunque tenga errores de escritura
+        Parámetros:
+            texto (string): El nombre a buscar
+            limite (int): La cantidad máxima de claves favoritas a retornar
+            minimo (float): La similitud mínima, entre 0 y 1
+        Retorna:
+            (list): Los dict con el id, nombre y similitud (entre 0 y 1) de las claves favoritas, de mayor a menor similitud
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def dar_claves_favoritas_pagina(self, despues_de_nombre, limite):
+        ''' Retorna una página de la lista de claves favoritas ordenada por nombre
+        Parámetros:
+            despues_de_nombre (string): El nombre de la última clave favorita de la página anterior o None para la primera página
+            limite (int): La cantidad máxima de claves favoritas a retornar
+        Retorna:
+            (list): La lista con los dict de las claves favoritas de la página
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def crear_claves_lote(self, registros):
+        ''' Crea varias claves favoritas con un solo commit
+        Parámetros:
+            registros (list): Los dict de las claves favoritas a crear, con nombre, clave y pista
+        Retorna:
+            (list): Por cada registro, el mensaje de error de la validación o una cadena de caracteres
+            vacía si la clave favorita se creó
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def crear_elementos_lote(self, registros, claves_nuevas=None, fechas_opcionales=False):
+        ''' Crea varios elementos de cualquier tipo con un solo commit
+        Parámetros:
+            registros (list): Los dict de los elementos a crear, con las llaves que retorna dar_elemento
+            claves_nuevas (list): Claves favoritas (nombre, clave y pista) que los registros pueden usar sin
+                que existan todavía; sólo se crean las que usa algún elemento creado
+            fechas_opcionales (bool): Si es True las identificaciones se crean aunque no tengan fechas
+        Retorna:
+            (list): Por cada registro, el mensaje de error de la validación o una cadena de caracteres
+            vacía si el elemento se creó
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def guardar_login(self, id, nombre, email, usuario, password, url, notas):
+        ''' Valida y crea o edita un login en un solo paso
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre (string): El nombre del elemento
+            email (string): El email del elemento
+            usuario (string): El usuario del login
+            password (string): El nombre de clave favorita del elemento
+            url (string): El URL del login
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la
+            validación o una cadena de caracteres vacía si el login se guardó.
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def guardar_tarjeta(self, id, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas):
+        ''' Valida y crea o edita una tarjeta en un solo paso
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            titular (string): El nombre del titular de la tarjeta
+            fvencimiento (string): La fecha de vencimiento en la tarjeta
+            ccv (string): El código de seguridad en la tarjeta
+            clave (string): El nombre de clave favorita del elemento
+            direccion (string): La dirección del titular de la tarjeta
+            telefono (string): El número de teléfono del titular de la tarjeta
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la
+            validación o una cadena de caracteres vacía si la tarjeta se guardó.
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def guardar_id(self, id, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas):
+        ''' Valida y crea o edita una identificación en un solo paso
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            nombre_completo (string): El nombre completo de la persona en la identificación
+            fnacimiento (string): La fecha de nacimiento de la persona en la identificación
+            fexpedicion (string): La fecha de expedición en la identificación
+            fvencimiento (string): La feha de vencimiento en la identificación
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la
+            validación o una cadena de caracteres vacía si la identificación se guardó.
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def guardar_secreto(self, id, nombre, secreto, clave, notas):
+        ''' Valida y crea o edita un secreto en un solo paso
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre (string): El nombre del elemento
+            secreto (string): El secreto del elemento
+            clave (string): El nombre de clave favorita del elemento
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la
+            validación o una cadena de caracteres vacía si el secreto se guardó.
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def guardar_clave(self, id, nombre, clave, pista):
+        ''' Valida y crea o edita una clave favorita en un solo paso
+        Parámetros:
+            id (int): El id en la base de datos de la clave favorita a editar o -1 en caso de crear
+            nombre (string): El nombre de la clave favorita
+            clave (string): El password o clae de la clave favorita
+            pista (string): La pista para recordar la clave favorita
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la
+            validación o una cadena de caracteres vacía si la clave favorita se guardó.
+        '''
+        raise NotImplementedError("Método no implementado")
+
+    def validar_elementos_lote(self, registros):
+        ''' Valida varios elementos de cualquier tipo sin crearlos
+        Parámetros:
+            registros (list): Los dict de los elementos, con las llaves que retorna dar_elemento
+        Retorna:
+            (list): Por cada registro, la lista de todos los mensajes de error de la validación;
+            vacía si el elemento se puede crear
+        '''
+        raise NotImplementedError("Método no implementado")
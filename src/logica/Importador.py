@@ -0,0 +1,405 @@
+'''
+Importación de las contraseñas exportadas por otros programas.
+
+Los archivos se leen como un flujo de registros sin cargarlos completos en memoria: CSV de los
+navegadores, JSON de Bitwarden (un objeto del arreglo "items" a la vez) y XML de KeePass (con
+iterparse, sin la papelera). Los registros se importan por partes y cada parte es una transacción con
+crear_elementos_lote, que valida cada registro con las reglas de los métodos validar_crear_editar_*
+y crea las claves favoritas de las contraseñas importadas. El avance se guarda en la tabla importacion en la misma transacción de
+cada parte, así una importación interrumpida continúa después de la última parte confirmada.
+'''
+import calendar
+import csv
+import json
+import os
+import re
+from itertools import islice
+from urllib.parse import urlparse
+from xml.etree import ElementTree
+
+from .LogicaCaja import TIPOS_CON_CLAVE
+from .typing import TipoResultadoImportacion
+from src.modelo import Importacion
+
+# Formato de importación según la extensión del archivo
+FORMATOS = {".csv": "csv", ".json": "json", ".xml": "xml"}
+
+# Las notas son obligatorias, pero los programas de contraseñas no siempre las tienen
+NOTAS_POR_DEFECTO = "Importado"
+
+# Clave favorita de los elementos importados que no traen contraseña (notas seguras, tarjetas)
+CLAVE_IMPORTACION = "Importación"
+PISTA_IMPORTACION = "Clave de los elementos importados sin clave"
+PISTA_IMPORTADA = "Clave importada"
+
+# Fechas de las identificaciones, que Bitwarden no exporta: se importan vacías y se reportan como avisos
+FECHAS_IDENTIFICACION = [("fecha_nacimiento", "nacimiento"), ("fecha_exp", "expedición"), ("fecha_venc", "vencimiento")]
+
+# Nombres (en minúsculas) de las columnas de los CSV de Chrome, Firefox, Safari y Bitwarden
+COLUMNAS_CSV = {
+    "nombre": ["name", "title"],
+    "url": ["url", "login_uri"],
+    "usuario": ["username", "login_username"],
+    "password": ["password", "login_password"],
+    "notas": ["note", "notes"],
+}
+
+def registro_login(nombre: str, usuario: str, password: str, url: str, notas: str) -> dict:
+    ''' Arma el registro de un login importado
+    Parámetros:
+        nombre (string): El nombre de la entrada o una cadena vacía para usar el dominio de la URL
+        usuario (string): El usuario, que también es el email si tiene forma de email
+        password (string): La contraseña en texto plano
+        url (string): La URL del sitio
+        notas (string): Las notas de la entrada
+    Retorna:
+        (dict): El registro con las llaves de dar_elemento y la contraseña en la llave password
+    '''
+    nombre = nombre or urlparse(url).hostname or url
+    if usuario:
+        # Los navegadores guardan varias cuentas por sitio y el nombre del elemento debe ser único
+        nombre = "%s (%s)" % (nombre, usuario)
+    return dict(tipo="Login", nombre_elemento=nombre, email=usuario if "@" in usuario else "", usuario=usuario,
+                url=url, notas=notas or NOTAS_POR_DEFECTO, password=password)
+
+def fin_de_mes(anio, mes) -> str:
+    ''' Retorna el último día de un mes con el formato YYYY-MM-DD o una cadena vacía si el mes no es válido '''
+    try:
+        (anio, mes) = (int(anio), int(mes))
+        return "%04d-%02d-%02d" % (anio, mes, calendar.monthrange(anio, mes)[1])
+    except (TypeError, ValueError, calendar.IllegalMonthError):
+        return ""
+
+def aviso_registro(registro: dict) -> str:
+    ''' Retorna el aviso de los datos que le faltan a un registro importado o una cadena vacía si están completos '''
+    if registro.get("tipo") != "Identificación":
+        return ""
+    faltantes = [nombre for (llave, nombre) in FECHAS_IDENTIFICACION if not registro.get(llave)]
+    return "Identificación importada sin fecha de %s" % ", ".join(faltantes) if faltantes else ""
+
+def leer_csv(archivo):
+    ''' Retorna los registros de un CSV exportado por un navegador
+    Parámetros:
+        archivo (file): El archivo abierto en modo texto
+    '''
+    lector = csv.reader(archivo)
+    encabezado = [x.strip().lower() for x in next(lector, [])]
+    columnas = {campo: next((encabezado.index(x) for x in nombres if x in encabezado), None)
+                for (campo, nombres) in COLUMNAS_CSV.items()}
+    for fila in lector:
+        if not fila:
+            continue
+        valor = lambda campo: fila[columnas[campo]] if columnas[campo] is not None and columnas[campo] < len(fila) else ""
+        yield registro_login(valor("nombre"), valor("usuario"), valor("password"), valor("url"), valor("notas"))
+
+class LectorJSON():
+    ''' Lee un documento JSON por bloques y retorna uno a uno los valores de un arreglo '''
+
+    def __init__(self, archivo, tamano_bloque: int = 65536) -> None:
+        self.archivo = archivo
+        self.tamano_bloque = tamano_bloque
+        self.decodificador = json.JSONDecoder()
+        self.texto = ""
+        self.posicion = 0
+        self.fin = False
+
+    def leer_bloque(self) -> None:
+        bloque = self.archivo.read(self.tamano_bloque)
+        self.fin = bloque == ""
+        self.texto = self.texto[self.posicion:] + bloque
+        self.posicion = 0
+
+    def siguiente_caracter(self) -> str:
+        ''' Salta los espacios y retorna el siguiente caracter sin consumirlo, o una cadena vacía al final '''
+        while True:
+            while self.posicion < len(self.texto) and self.texto[self.posicion] in " \t\r\n":
+                self.posicion += 1
+            if self.posicion < len(self.texto) or self.fin:
+                return self.texto[self.posicion:self.posicion + 1]
+            self.leer_bloque()
+
+    def consumir(self, caracteres: str) -> str:
+        ''' Consume el siguiente caracter, que debe ser uno de los indicados '''
+        caracter = self.siguiente_caracter()
+        if caracter == "" or caracter not in caracteres:
+            raise ValueError("JSON inválido: se esperaba uno de %s en lugar de %r" % (caracteres, caracter))
+        self.posicion += 1
+        return caracter
+
+    def valor(self):
+        ''' Decodifica el siguiente valor, leyendo más bloques si el valor está incompleto '''
+        self.siguiente_caracter()
+        while True:
+            try:
+                (valor, fin_valor) = self.decodificador.raw_decode(self.texto, self.posicion)
+            except json.JSONDecodeError:
+                if self.fin:
+                    raise
+                self.leer_bloque()
+                continue
+            # Un número al final del bloque puede seguir en el siguiente
+            if isinstance(valor, (int, float)) and not self.fin and \
+                    (fin_valor == len(self.texto) or self.texto[fin_valor] in "0123456789.eE+-"):
+                self.leer_bloque()
+                continue
+            self.posicion = fin_valor
+            return valor
+
+    def arreglo(self):
+        ''' Retorna uno a uno los valores del arreglo que empieza en la posición actual '''
+        self.consumir("[")
+        if self.siguiente_caracter() == "]":
+            self.posicion += 1
+            return
+        while True:
+            yield self.valor()
+            if self.consumir(",]") == "]":
+                return
+
+    def valores(self, llave: str):
+        ''' Retorna los valores del arreglo del documento, o del arreglo en una llave del objeto principal
+        Parámetros:
+            llave (string): La llave del objeto principal cuyo arreglo se recorre
+        '''
+        if self.siguiente_caracter() == "[":
+            yield from self.arreglo()
+            return
+        self.consumir("{")
+        if self.siguiente_caracter() == "}":
+            return
+        while True:
+            nombre = self.valor()
+            self.consumir(":")
+            if nombre == llave:
+                yield from self.arreglo()
+            else:
+                self.valor()
+            if self.consumir(",}") == "}":
+                return
+
+def registro_bitwarden(item: dict) -> dict:
+    ''' Arma el registro de un item de una exportación JSON de Bitwarden
+    Parámetros:
+        item (dict): El item exportado
+    Retorna:
+        (dict): El registro con las llaves de dar_elemento y la contraseña en la llave password
+    '''
+    nombre = item.get("name") or ""
+    notas = item.get("notes") or ""
+    tipo = item.get("type")
+    if tipo == 1:
+        login = item.get("login") or {}
+        uris = login.get("uris") or [{}]
+        return registro_login(nombre, login.get("username") or "", login.get("password") or "",
+                              uris[0].get("uri") or "", notas)
+    if tipo == 2:
+        return dict(tipo="Secreto", nombre_elemento=nombre, secreto=notas, notas=NOTAS_POR_DEFECTO, password="")
+    if tipo == 3:
+        tarjeta = item.get("card") or {}
+        return dict(tipo="Tarjeta", nombre_elemento=nombre, numero=tarjeta.get("number") or "",
+                    titular=(tarjeta.get("cardholderName") or "").upper(), ccv=tarjeta.get("code") or "",
+                    fecha_venc=fin_de_mes(tarjeta.get("expYear"), tarjeta.get("expMonth")),
+                    direccion="", telefono="", notas=notas or NOTAS_POR_DEFECTO, password="")
+    if tipo == 4:
+        identidad = item.get("identity") or {}
+        partes_nombre = [identidad.get(x) for x in ["firstName", "middleName", "lastName"]]
+        # El primer documento con un número válido (sólo se guardan sus dígitos); las fechas no se exportan
+        numeros = [re.sub("[^0-9]", "", identidad.get(x) or "") for x in ["passportNumber", "licenseNumber", "ssn"]]
+        numero = next((x for x in numeros if len(x) >= 3), "")
+        return dict(tipo="Identificación", nombre_elemento=nombre, numero=numero,
+                    nombre=" ".join(x for x in partes_nombre if x), fecha_nacimiento="", fecha_exp="",
+                    fecha_venc="", notas=notas or NOTAS_POR_DEFECTO)
+    return dict(tipo=str(tipo), nombre_elemento=nombre)
+
+def leer_json(archivo):
+    ''' Retorna los registros de una exportación JSON de Bitwarden
+    Parámetros:
+        archivo (file): El archivo abierto en modo texto
+    '''
+    for item in LectorJSON(archivo).valores("items"):
+        yield registro_bitwarden(item)
+
+def registro_keepass(campos: dict) -> dict:
+    ''' Arma el registro de una entrada de KeePass: un login si tiene URL y si no un secreto
+    Parámetros:
+        campos (dict): Los valores de la entrada por llave (Title, UserName, Password, URL, Notes)
+    Retorna:
+        (dict): El registro con las llaves de dar_elemento y la contraseña en la llave password
+    '''
+    if campos.get("URL"):
+        return registro_login(campos.get("Title", ""), campos.get("UserName", ""), campos.get("Password", ""),
+                              campos["URL"], campos.get("Notes", ""))
+    return dict(tipo="Secreto", nombre_elemento=campos.get("Title", ""), secreto=campos.get("Password", ""),
+                notas=campos.get("Notes") or NOTAS_POR_DEFECTO, password="")
+
+def leer_xml(archivo):
+    ''' Retorna los registros de una exportación XML de KeePass, sin las versiones anteriores de las entradas
+    ni las entradas de la papelera (el grupo de Meta/RecycleBinUUID y sus subgrupos)
+    Parámetros:
+        archivo (file): El archivo abierto en modo binario
+    '''
+    historial = 0
+    papelera = None
+    # Etiquetas abiertas y, por cada grupo abierto, si está dentro de la papelera
+    abiertos = []
+    en_papelera = []
+    for (evento, nodo) in ElementTree.iterparse(archivo, events=("start", "end")):
+        if evento == "start":
+            abiertos.append(nodo.tag)
+            if nodo.tag == "Group":
+                en_papelera.append(bool(en_papelera) and en_papelera[-1])
+        else:
+            abiertos.pop()
+        padre = abiertos[-1] if abiertos else None
+
+        if nodo.tag == "History":
+            historial += 1 if evento == "start" else -1
+        elif evento == "start":
+            continue
+        elif nodo.tag == "RecycleBinUUID" and padre == "Meta":
+            papelera = nodo.text
+        elif nodo.tag == "UUID" and padre == "Group":
+            # El UUID es el primer hijo del grupo, antes de sus entradas
+            en_papelera[-1] = en_papelera[-1] or (papelera is not None and nodo.text == papelera)
+        elif historial == 0 and nodo.tag in ("Entry", "Group"):
+            if nodo.tag == "Entry" and not (en_papelera and en_papelera[-1]):
+                yield registro_keepass({x.findtext("Key"): x.findtext("Value") or "" for x in nodo.findall("String")})
+            if nodo.tag == "Group":
+                en_papelera.pop()
+            # Libera las entradas ya leídas
+            nodo.clear()
+
+LECTORES = {
+    "csv": (leer_csv, dict(mode="r", encoding="utf-8-sig", newline="")),
+    "json": (leer_json, dict(mode="r", encoding="utf-8-sig")),
+    "xml": (leer_xml, dict(mode="rb")),
+}
+
+def leer_registros(ruta: str, formato: str):
+    ''' Retorna uno a uno los registros de un archivo exportado
+    Parámetros:
+        ruta (string): La ruta del archivo
+        formato (string): csv, json o xml
+    '''
+    (leer, modo) = LECTORES[formato]
+    with open(ruta, **modo) as archivo:
+        yield from leer(archivo)
+
+def nombre_disponible(nombre: str, usados: set) -> str:
+    ''' Retorna un nombre de clave favorita que no esté usado, agregando un número al final si hace falta '''
+    nombre = (nombre or "Clave importada")[:240]
+    disponible = nombre
+    numero = 2
+    while disponible in usados:
+        disponible = "%s (%d)" % (nombre, numero)
+        numero += 1
+    return disponible
+
+def dar_avance(logica, origen: str) -> Importacion:
+    ''' Retorna el avance de la importación de un archivo en la caja, creándolo si no existe '''
+    avance = logica.session.query(Importacion).filter_by(caja_id=logica.caja.id, origen=origen).first()
+    if avance is None:
+        avance = Importacion(caja_id=logica.caja.id, origen=origen, procesados=0, importados=0)
+        logica.session.add(avance)
+    return avance
+
+class Importador():
+    ''' Importa registros por partes, asignando a cada contraseña una clave favorita que se crea
+    junto con el primer elemento que la usa
+    '''
+
+    def __init__(self, logica) -> None:
+        self.logica = logica
+        claves = logica.dar_claves_favoritas()
+        self.nombres_claves = {x["nombre"] for x in claves}
+        # Nombre de la clave favorita de cada contraseña; las contraseñas repetidas comparten la clave
+        self.claves_por_valor = {}
+        for clave in claves:
+            self.claves_por_valor.setdefault(clave["clave"], clave["nombre"])
+
+    def asignar_clave(self, registro: dict, nuevas: list) -> None:
+        ''' Cambia la contraseña del registro por el nombre de una clave favorita, agregando a nuevas
+        las claves favoritas que hay que crear
+        '''
+        password = registro.pop("password", "")
+        if registro.get("tipo") not in TIPOS_CON_CLAVE:
+            return
+        if not password:
+            (password, nombre, pista) = (None, CLAVE_IMPORTACION, PISTA_IMPORTACION)
+            if nombre in self.nombres_claves:
+                registro["clave"] = nombre
+                return
+        elif password in self.claves_por_valor:
+            registro["clave"] = self.claves_por_valor[password]
+            return
+        else:
+            (nombre, pista) = (nombre_disponible(registro.get("nombre_elemento"), self.nombres_claves), PISTA_IMPORTADA)
+            self.claves_por_valor[password] = nombre
+
+        nuevas.append(dict(nombre=nombre, clave=password or self.logica.generar_clave(), pista=pista))
+        self.nombres_claves.add(nombre)
+        registro["clave"] = nombre
+
+    def importar_parte(self, registros: list) -> list:
+        ''' Crea las claves favoritas y los elementos de una parte de los registros
+        Parámetros:
+            registros (list): Los registros leídos del archivo
+        Retorna:
+            (list): Por cada registro, el mensaje de error o una cadena vacía si se importó
+        '''
+        nuevas = []
+        for registro in registros:
+            self.asignar_clave(registro, nuevas)
+        errores = self.logica.crear_elementos_lote(registros, nuevas, fechas_opcionales=True)
+
+        # Las claves nuevas que ningún elemento creado usa no se crearon
+        usadas = {x.get("clave") for (x, error) in zip(registros, errores) if error == ""}
+        for clave in nuevas:
+            if clave["nombre"] not in usadas:
+                self.nombres_claves.discard(clave["nombre"])
+                if self.claves_por_valor.get(clave["clave"]) == clave["nombre"]:
+                    del self.claves_por_valor[clave["clave"]]
+        return errores
+
+def importar(logica, ruta: str, formato: str = None, tamano_parte: int = 1000, reiniciar: bool = False) -> TipoResultadoImportacion:
+    ''' Importa a la caja los elementos de un archivo exportado por otro programa de contraseñas
+    Parámetros:
+        logica (LogicaCaja): La lógica de la caja en la que se importa
+        ruta (string): La ruta del archivo
+        formato (string): csv, json o xml, o None para deducirlo de la extensión del archivo
+        tamano_parte (int): La cantidad de registros importados en cada transacción
+        reiniciar (bool): Si es True se importa desde el principio aunque el archivo ya se haya importado
+    Retorna:
+        (dict): Los registros procesados e importados en total y los errores de esta ejecución como
+        tuplas (número de registro, mensaje), y como avisos los datos que les faltan a los registros importados
+    '''
+    formato = formato or FORMATOS.get(os.path.splitext(ruta)[1].lower())
+    if formato not in LECTORES:
+        raise ValueError("Formato de importación no soportado: %s" % formato)
+    origen = os.path.abspath(ruta)
+
+    with logica.lote():
+        avance = dar_avance(logica, origen)
+        if reiniciar:
+            (avance.procesados, avance.importados) = (0, 0)
+        resultado = TipoResultadoImportacion(procesados=avance.procesados, importados=avance.importados, errores=[],
+                                             avisos=[])
+
+    # Continúa después del último registro confirmado
+    registros = islice(leer_registros(ruta, formato), resultado["procesados"], None)
+    importador = Importador(logica)
+    while True:
+        parte = list(islice(registros, tamano_parte))
+        if not parte:
+            return resultado
+        with logica.lote():
+            errores = importador.importar_parte(parte)
+            importados = errores.count("")
+            avance = dar_avance(logica, origen)
+            avance.procesados += len(parte)
+            avance.importados += importados
+        resultado["errores"].extend((resultado["procesados"] + i + 1, error) for (i, error) in enumerate(errores) if error)
+        avisos = [aviso_registro(x) if error == "" else "" for (x, error) in zip(parte, errores)]
+        resultado["avisos"].extend((resultado["procesados"] + i + 1, aviso) for (i, aviso) in enumerate(avisos) if aviso)
+        resultado["procesados"] += len(parte)
+        resultado["importados"] += importados
@@ -0,0 +1,177 @@
+'''
+Índice de trigramas en memoria para buscar nombres parecidos (con errores de escritura).
+
+Cada nombre se normaliza (minúsculas, sin tildes) y se parte en palabras; cada palabra, con dos
+espacios al inicio y uno al final como en pg_trgm, aporta sus trigramas. El índice guarda para cada
+trigrama el conjunto de ids que lo tienen, así una búsqueda sólo recorre los ids que comparten algún
+trigrama con el texto y los ordena por el coeficiente de Jaccard de los conjuntos de trigramas.
+
+LogicaCaja mantiene un índice para los elementos y otro para las claves favoritas: los construye la
+primera vez que se usan y luego aplica los cambios de cada commit de sus sesiones (ver cambios_flush).
+'''
+import heapq
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import inspect
+
+def normalizar(texto: str) -> str:
+    ''' Retorna el texto en minúsculas y sin tildes ni otras marcas diacríticas '''
+    return "".join(x for x in unicodedata.normalize("NFKD", texto.lower()) if not unicodedata.combining(x))
+
+def trigramas(texto: str) -> frozenset:
+    ''' Retorna el conjunto de trigramas de las palabras de un texto
+    Parámetros:
+        texto (string): El texto a partir
+    Retorna:
+        (frozenset): Los trigramas; vacío si el texto no tiene letras ni dígitos
+    '''
+    resultado = set()
+    for palabra in re.findall(r"\w+", normalizar(texto)):
+        palabra = "  " + palabra + " "
+        resultado.update(palabra[i:i + 3] for i in range(len(palabra) - 2))
+    return frozenset(resultado)
+
+class IndiceTrigramas():
+    ''' Índice invertido de trigramas a ids, con el nombre de cada id '''
+
+    def __init__(self) -> None:
+        self.construido = False
+        self.nombres = {}
+        self.tamanos = {}
+        self.ids_por_trigrama = {}
+        self.cerrojo = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.nombres)
+
+    def _agregar(self, id: int, nombre: str) -> None:
+        self._quitar(id)
+        conjunto = trigramas(nombre)
+        self.nombres[id] = nombre
+        self.tamanos[id] = len(conjunto)
+        for trigrama in conjunto:
+            ids = self.ids_por_trigrama.get(trigrama)
+            if ids is None:
+                ids = self.ids_por_trigrama[trigrama] = set()
+            ids.add(id)
+
+    def _quitar(self, id: int) -> None:
+        nombre = self.nombres.pop(id, None)
+        if nombre is None:
+            return
+        del self.tamanos[id]
+        for trigrama in trigramas(nombre):
+            ids = self.ids_por_trigrama[trigrama]
+            ids.discard(id)
+            if not ids:
+                del self.ids_por_trigrama[trigrama]
+
+    def cargar(self, filas: Iterable[Tuple[int, str]]) -> None:
+        ''' Reemplaza el contenido del índice y lo marca como construido
+        Parámetros:
+            filas (iterable): Tuplas (id, nombre)
+        '''
+        with self.cerrojo:
+            self.nombres = {}
+            self.tamanos = {}
+            self.ids_por_trigrama = {}
+            for (id, nombre) in filas:
+                self._agregar(id, nombre)
+            self.construido = True
+
+    def aplicar(self, cambios: Iterable[Tuple[int, str]]) -> None:
+        ''' Aplica cambios incrementales, en orden, si el índice ya está construido
+        Parámetros:
+            cambios (iterable): Tuplas (id, nombre) de los nombres creados o modificados, o (id, None) de los eliminados
+        '''
+        with self.cerrojo:
+            if not self.construido:
+                return
+            for (id, nombre) in cambios:
+                if nombre is None:
+                    self._quitar(id)
+                else:
+                    self._agregar(id, nombre)
+
+    def buscar(self, texto: str, limite: int = 10, minimo: float = 0.0) -> List[Tuple[int, str, float]]:
+        ''' Retorna los nombres más parecidos a un texto
+        Parámetros:
+            texto (string): El texto a buscar
+            limite (int): La cantidad máxima de resultados
+            minimo (float): La similitud mínima (entre 0 y 1) de los resultados
+        Retorna:
+            (list): Tuplas (id, nombre, similitud) de mayor a menor similitud y, si empatan, por nombre
+        '''
+        consulta = trigramas(texto)
+        if not consulta or limite <= 0:
+            return []
+        cantidad = len(consulta)
+        with self.cerrojo:
+            nombres = self.nombres
+            tamanos = self.tamanos
+            def similitud(id):
+                # Los trigramas compartidos son los contados más los de los conjuntos que faltan por recorrer
+                comun = comunes[id] + sum(1 for ids in conjuntos[recorridos:] if id in ids)
+                return comun / (cantidad + tamanos[id] - comun)
+            def kesima():
+                # La similitud exacta de los candidatos con más trigramas en común acota por debajo la de los resultados
+                return sorted((similitud(id) for (id, _) in comunes.most_common(2 * limite)), reverse=True)[limite - 1]
+
+            # Se cuentan los trigramas compartidos recorriendo primero los conjuntos más pequeños (trigramas raros).
+            # Un id que no está en los primeros m conjuntos comparte a lo sumo cantidad - m trigramas y su similitud
+            # no pasa de (cantidad - m) / cantidad: cuando esa cota queda por debajo del umbral (el mínimo o la
+            # similitud del candidato número limite) ya no se recorren los conjuntos de los trigramas comunes
+            conjuntos = sorted((self.ids_por_trigrama.get(x, ()) for x in consulta), key=len)
+            comunes = Counter()
+            umbral = minimo
+            recorridos = 0
+            # La cota baja de a 1 / cantidad por conjunto: el umbral se revisa desde un tercio de los conjuntos y luego cada cuarto
+            revision = max(1, cantidad // 3)
+            while recorridos < cantidad:
+                cota = (cantidad - recorridos) / cantidad
+                if recorridos >= revision and len(comunes) >= limite:
+                    umbral = max(umbral, kesima())
+                    revision = recorridos + max(1, cantidad // 4)
+                if cota < umbral:
+                    break
+                # Counter.update recorre el conjunto en C
+                comunes.update(conjuntos[recorridos])
+                recorridos += 1
+            if len(comunes) >= limite:
+                umbral = max(umbral, kesima())
+
+            # Un candidato comparte a lo sumo min(comun + conjuntos sin recorrer, tamaño) trigramas: sólo se completa
+            # el conteo (y se calcula la similitud) de los que con esa cota llegan al umbral
+            faltantes = cantidad - recorridos
+            restantes = conjuntos[recorridos:]
+            resultados = []
+            for (id, comun) in comunes.items():
+                tamano = tamanos[id]
+                tope = comun + faltantes if comun + faltantes < tamano else tamano
+                if tope < umbral * (cantidad + tamano - tope):
+                    continue
+                if faltantes:
+                    comun += sum(1 for ids in restantes if id in ids)
+                puntaje = comun / (cantidad + tamano - comun)
+                if puntaje >= umbral:
+                    resultados.append((-puntaje, nombres[id], id))
+            mejores = heapq.nsmallest(limite, resultados)
+        return [(id, nombre, -puntaje) for (puntaje, nombre, id) in mejores]
+
+def cambios_flush(session, clase) -> List[Tuple[int, str]]:
+    ''' Retorna los cambios de nombre de los objetos de una clase en un flush, para IndiceTrigramas.aplicar
+    Parámetros:
+        session (Session): La sesión, dentro del evento after_flush
+        clase (type): La clase del modelo (Elemento o ClaveFavorita)
+    Retorna:
+        (list): Tuplas (id, nombre) de los objetos nuevos o con el nombre modificado, y (id, None) de los eliminados
+    '''
+    cambios = [(x.id, None) for x in session.deleted if isinstance(x, clase)]
+    cambios.extend((x.id, x.nombre) for x in session.new if isinstance(x, clase))
+    cambios.extend((x.id, x.nombre) for x in session.dirty
+        if isinstance(x, clase) and x not in session.deleted and inspect(x).attrs.nombre.history.has_changes())
+    return cambios
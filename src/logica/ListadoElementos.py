@@ -0,0 +1,98 @@
+'''
+Listado plano de los elementos mantenido en cada flush.
+
+La tabla listado_elemento tiene una fila por elemento con las columnas de todos los subtipos
+y el nombre de su clave favorita, así las lecturas de la lista no unen las tablas de la herencia.
+Cada flush de una sesión vuelve a copiar los elementos creados o modificados, borra los
+eliminados y actualiza el nombre de las claves favoritas modificadas, dentro de la misma transacción.
+'''
+from sqlalchemy import func, select
+
+from .TablasDerivadas import escuchar, ids_modificados, objetos_guardados
+from src.modelo import ClaveFavorita, Elemento, Identificacion, Login, Secreto, Tarjeta, ListadoElemento
+
+elemento = Elemento.__table__
+login = Login.__table__
+tarjeta = Tarjeta.__table__
+secreto = Secreto.__table__
+identificacion = Identificacion.__table__
+clavefavorita = ClaveFavorita.__table__
+listado = ListadoElemento.__table__
+
+def consulta_tablas_base(condicion):
+    ''' Retorna la consulta que arma las filas del listado a partir de las tablas de la herencia
+    Parámetros:
+        condicion: Condición sobre la tabla elemento
+    Retorna:
+        (Select): La consulta con las columnas en el orden de la tabla listado_elemento
+    '''
+    clave_id = func.coalesce(login.c.clave_id, tarjeta.c.clave_id, secreto.c.clave_id)
+    return (select([elemento.c.id, elemento.c.caja_id, elemento.c.tipo, elemento.c.nombre, elemento.c.nota,
+            login.c.email, login.c.usuario, login.c.url,
+            func.coalesce(tarjeta.c.numero, identificacion.c.numero), tarjeta.c.titular,
+            tarjeta.c.codigo_seguridad, tarjeta.c.direccion, tarjeta.c.telefono,
+            func.coalesce(tarjeta.c.vencimiento, identificacion.c.vencimiento), secreto.c.secreto,
+            identificacion.c.nombre_completo, identificacion.c.nacimiento, identificacion.c.expedicion,
+            clave_id, clavefavorita.c.nombre])
+        .select_from(elemento
+            .outerjoin(login, login.c.id == elemento.c.id)
+            .outerjoin(tarjeta, tarjeta.c.id == elemento.c.id)
+            .outerjoin(secreto, secreto.c.id == elemento.c.id)
+            .outerjoin(identificacion, identificacion.c.id == elemento.c.id)
+            .outerjoin(clavefavorita, clavefavorita.c.id == clave_id))
+        .where(condicion))
+
+def copiar(session, condicion) -> None:
+    ''' Reemplaza en el listado las filas de los elementos que cumplen una condición
+    Parámetros:
+        session (Session): La sesión con la que se modifica la base de datos
+        condicion: Condición sobre la tabla elemento
+    '''
+    session.execute(listado.delete().where(listado.c.id.in_(select([elemento.c.id]).where(condicion))))
+    session.execute(listado.insert().from_select([c.name for c in listado.columns], consulta_tablas_base(condicion)))
+
+def despues_de_flush(session, flush_context):
+    ''' Copia al listado los cambios de los elementos y claves favoritas del flush '''
+    eliminados = ids_modificados(session.deleted, Elemento)
+    if eliminados:
+        session.execute(listado.delete().where(listado.c.id.in_(eliminados)))
+
+    nuevos = objetos_guardados(session)
+    ids_elementos = ids_modificados(nuevos, Elemento)
+    if ids_elementos:
+        copiar(session, elemento.c.id.in_(ids_elementos))
+
+    ids_claves = ids_modificados(nuevos, ClaveFavorita)
+    if ids_claves:
+        session.execute(listado.update().where(listado.c.clave_id.in_(ids_claves)).values(
+            clave=select([clavefavorita.c.nombre]).where(clavefavorita.c.id == listado.c.clave_id).as_scalar()))
+
+def reconstruir_listado(session, caja_id: int) -> None:
+    ''' Reemplaza el listado de una caja por el calculado a partir de las tablas base
+    Parámetros:
+        session (Session): La sesión con la que se modifica la base de datos
+        caja_id (int): El id de la caja
+    '''
+    session.flush()
+    session.execute(listado.delete().where(listado.c.caja_id == caja_id))
+    session.execute(listado.insert().from_select([c.name for c in listado.columns],
+        consulta_tablas_base(elemento.c.caja_id == caja_id)))
+
+def listado_completo(session, caja_id: int) -> bool:
+    ''' Indica si el listado de una caja tiene una fila por cada elemento
+    Parámetros:
+        session (Session): La sesión con la que se consulta la base de datos
+        caja_id (int): El id de la caja
+    Retorna:
+        (bool): True si la cantidad de filas del listado coincide con la de elementos
+    '''
+    return bool(session.execute(select([
+        select([func.count()]).where(elemento.c.caja_id == caja_id).as_scalar() ==
+        select([func.count()]).where(listado.c.caja_id == caja_id).as_scalar()])).scalar())
+
+def registrar(session_factory) -> None:
+    ''' Registra el mantenimiento del listado en todas las sesiones de una fábrica de sesiones
+    Parámetros:
+        session_factory (sessionmaker): La fábrica de sesiones
+    '''
+    escuchar(session_factory, "after_flush", despues_de_flush)
@@ -1,21 +1,134 @@
+import functools
 import random
 import re
-from datetime import datetime, timedelta
-from typing import List
+from contextlib import contextmanager, nullcontext
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List
 
-from .typing import TipoClaveFavorita, TipoElemento, TipoReporte
+from sqlalchemy import and_, column, event, func, literal_column, or_, select, table
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, scoped_session, with_polymorphic
+
+from . import CacheLecturas, IndiceTrigramas, ListadoElementos, ResumenReporte, TablasDerivadas, Validacion
+from .CerrojoLecturaEscritura import CerrojoLecturaEscritura
+from .typing import (TipoClaveFavorita, TipoClaveSimilar, TipoElemento, TipoElementoSimilar, TipoReporte,
+    TipoResumenElemento)
 from src.logica.FachadaCajaDeSeguridad import FachadaCajaDeSeguridad
 
-from src.modelo.declarative_base import engine, Base, Session
-from src.modelo import Caja, ClaveFavorita, Elemento, Tarjeta, Identificacion, Login, Secreto
+from src.modelo.declarative_base import FabricaSesiones, fabrica_por_defecto
+from src.modelo import dominios, migraciones
+from src.modelo import Caja, ClaveFavorita, Elemento, Tarjeta, Identificacion, Login, Secreto, ListadoElemento
+
+# Llave en session.info con la cantidad de lotes abiertos en la sesión
+INFO_LOTE = "lote"
+
+# Llave en session.info con los cambios de nombres para los índices de trigramas, pendientes hasta el commit
+INFO_TRIGRAMAS = "trigramas_pendientes"
+
+# Prefijos de los métodos que sólo leen y de los que escriben, para el cerrojo del modo multihilo
+PREFIJOS_LECTURA = ("buscar_", "dar_", "validar_")
+PREFIJOS_ESCRITURA = ("crear_", "editar_", "eliminar_", "guardar_", "reconstruir_", "verificar_")
+
+# Tabla de cada subtipo de elemento, para las inserciones masivas de crear_elementos_lote
+TABLAS_SUBTIPO = {"Login": Login.__table__, "Tarjeta": Tarjeta.__table__,
+                  "Identificación": Identificacion.__table__, "Secreto": Secreto.__table__}
+
+# Tipos de elemento que tienen clave favorita
+TIPOS_CON_CLAVE = ("Login", "Tarjeta", "Secreto")
+
+# Mensajes de error de las validaciones que comprueban la base de datos, también usados al traducir los errores de integridad
+ERROR_NOMBRE_REPETIDO = "Ya existe un elemento con este nombre"
+ERROR_SIN_CLAVE = "Debe tener asignado una clave favorita"
+ERROR_ELEMENTO_INEXISTENTE = "No existe un elemento de este tipo con este id"
+ERROR_CLAVE_INEXISTENTE = "No existe una clave favorita con este id"
+
+# Restricciones unique (tabla, columnas) cuya violación es un nombre repetido y no un error de programación
+RESTRICCIONES_NOMBRE = {(x.table.name, (x.name,)) for x in (Elemento.__table__.c.nombre, ClaveFavorita.__table__.c.nombre)}
+
+# Inicio del mensaje de SQLite al violar una restricción unique, seguido de las columnas como tabla.columna
+PREFIJO_UNIQUE = "UNIQUE constraint failed: "
+
+# Tabla de texto completo sobre el listado de elementos, creada por la migración 3 (no es un modelo)
+busqueda_elemento = table("busqueda_elemento", column("rowid"))
+
+# Pesos de BM25 de las columnas del índice (ver migraciones.COLUMNAS_BUSQUEDA): el nombre pesa más que las notas
+PESOS_BUSQUEDA = (10.0, 1.0, 3.0, 3.0, 3.0, 3.0, 3.0)
+
+def expresion_busqueda(texto: str) -> str:
+    ''' Convierte el texto que escribe el usuario en una expresión MATCH de FTS5
+    Cada palabra se busca como prefijo y deben aparecer todas; los operadores y comillas del texto se ignoran
+    Parámetros:
+        texto (string): El texto a buscar
+    Retorna:
+        (string): La expresión, o una cadena de caracteres vacía si el texto no tiene palabras
+    '''
+    return " ".join('"%s"*' % palabra for palabra in re.findall(r"\w+", texto))
+
+def restriccion_unique(error: IntegrityError):
+    ''' Retorna la restricción unique que violó una escritura, según las columnas que reporta SQLite
+    Parámetros:
+        error (IntegrityError): El error de integridad lanzado al escribir
+    Retorna:
+        (tuple): La tabla y la tupla de sus columnas, o None si el error no es de una restricción unique
+    '''
+    mensaje = str(error.orig)
+    if not mensaje.startswith(PREFIJO_UNIQUE):
+        return None
+    columnas = [x.strip().partition(".") for x in mensaje[len(PREFIJO_UNIQUE):].split(",")]
+    tablas = {tabla for (tabla, _, _) in columnas}
+    if len(tablas) != 1 or not all(columna for (_, _, columna) in columnas):
+        return None
+    return (tablas.pop(), tuple(columna for (_, _, columna) in columnas))
+
+def valor_texto(registro: dict, llave: str) -> str:
+    ''' Retorna el valor de una llave de un registro como texto, o una cadena vacía si no está '''
+    valor = registro.get(llave)
+    return "" if valor is None else str(valor)
+
+def texto_fecha(fecha) -> str:
+    ''' Retorna una fecha con el formato YYYY-MM-DD, o una cadena vacía si no se conoce (identificaciones importadas) '''
+    return "" if fecha is None else fecha.isoformat()
+
+def con_cerrojo(cerrojo, metodo):
+    ''' Retorna una función que llama un método mientras tiene tomado un cerrojo
+    Parámetros:
+        cerrojo (callable): El context manager del cerrojo (lectura o escritura)
+        metodo (callable): El método a llamar
+    '''
+    @functools.wraps(metodo)
+    def llamar(*args, **kwargs):
+        with cerrojo():
+            return metodo(*args, **kwargs)
+    return llamar
 
 class LogicaCaja(FachadaCajaDeSeguridad):
 
-    def __init__(self)->None:
+    def __init__(self, fabrica: FabricaSesiones = None, tamano_cache: int = 256, usar_listado: bool = True,
+                 limite_sesion: int = 1000, multihilo: bool = False)->None:
+        ''' Abre la caja de seguridad guardada en una base de datos
+        Parámetros:
+            fabrica (FabricaSesiones): La fábrica de sesiones de la base de datos de la caja, por defecto
+                la configurada con las variables de ambiente CAJA_DB y CAJA_DB_PERFIL
+            tamano_cache (int): La cantidad máxima de lecturas guardadas en el cache
+            usar_listado (bool): Si es True las listas de elementos se leen de la tabla listado_elemento
+            limite_sesion (int): La cantidad de objetos del modelo en la sesión a partir de la cual se liberan
+            multihilo (bool): Si es True cada hilo usa su propia sesión y los métodos de la fachada toman un
+                cerrojo de lectura (dar_*, validar_*) o de escritura (crear_*, editar_*, eliminar_*, ...)
+        '''
         super().__init__()
 
-        Base.metadata.create_all(engine)
-        self.session=Session()
+        self.fabrica = fabrica or fabrica_por_defecto()
+        migraciones.migrar(self.fabrica.engine)
+        ResumenReporte.registrar(self.fabrica.Session)
+        ListadoElementos.registrar(self.fabrica.Session)
+        CacheLecturas.registrar(self.fabrica.engine)
+        self._sesiones = scoped_session(self._crear_sesion) if multihilo else None
+        self._session = None if multihilo else self._crear_sesion()
+        self.cache = CacheLecturas.CacheLecturas(self.fabrica.engine, tamano_cache)
+        self.usar_listado = usar_listado
+        self.limite_sesion = limite_sesion
+        self.indice_elementos = IndiceTrigramas.IndiceTrigramas()
+        self.indice_claves = IndiceTrigramas.IndiceTrigramas()
 
         # Si no existe ninguna caja en la base de datos, crea una nueva caja
         caja = self.session.query(Caja).first()
@@ -25,7 +138,174 @@ class LogicaCaja(FachadaCajaDeSeguridad):
             self.session.add(caja)
             self.session.commit()
 
-        self.caja = caja
+        self._caja = caja
+        self._caja_id = caja.id
+
+        # Bases de datos creadas antes del resumen del reporte lo construyen una sola vez
+        if not ResumenReporte.existe_resumen(self.session, caja.id):
+            ResumenReporte.reconstruir_resumen(self.session, caja.id)
+            self.session.commit()
+
+        # Igual para el listado de elementos, o si le faltan filas
+        if not ListadoElementos.listado_completo(self.session, caja.id):
+            ListadoElementos.reconstruir_listado(self.session, caja.id)
+            self.session.commit()
+
+        if multihilo:
+            self.cerrojo = CerrojoLecturaEscritura()
+            self._usar_cerrojo()
+
+    @property
+    def session(self):
+        ''' La sesión de la base de datos (la del hilo actual en modo multihilo) '''
+        if self._sesiones is not None:
+            return self._sesiones()
+        return self._session
+
+    @property
+    def caja(self) -> Caja:
+        ''' La caja de seguridad, asociada a la sesión del hilo actual en modo multihilo '''
+        if self._sesiones is not None:
+            return self.session.query(Caja).get(self._caja_id)
+        return self._caja
+
+    def cerrar_sesion(self) -> None:
+        ''' Cierra la sesión de la base de datos del hilo actual; en modo multihilo cada hilo debe
+        llamarlo antes de terminar para devolver su conexión
+        '''
+        if self._sesiones is not None:
+            self._sesiones.remove()
+        else:
+            self._session.close()
+
+    @contextmanager
+    def lote(self):
+        ''' Agrupa las escrituras hechas dentro del bloque with en una sola transacción: los métodos
+        crear_*, editar_* y eliminar_* no hacen commit, se hace uno solo al terminar el bloque y,
+        si el bloque termina con una excepción, se deshacen todos los cambios
+        '''
+        # En modo multihilo el lote toma el cerrojo de escritura hasta terminar
+        cerrojo = self.cerrojo.escritura() if self._sesiones is not None else nullcontext()
+        with cerrojo:
+            sesion = self.session
+            sesion.info[INFO_LOTE] = sesion.info.get(INFO_LOTE, 0) + 1
+            try:
+                yield self
+            except BaseException:
+                sesion.info[INFO_LOTE] -= 1
+                if sesion.info[INFO_LOTE] == 0:
+                    sesion.rollback()
+                raise
+            sesion.info[INFO_LOTE] -= 1
+            if sesion.info[INFO_LOTE] == 0:
+                sesion.commit()
+
+    @contextmanager
+    def lectura(self):
+        ''' Agrupa varias lecturas hechas dentro del bloque with; en modo multihilo toma el cerrojo de
+        lectura hasta terminar, así ninguna escritura cambia la caja mientras tanto
+        '''
+        cerrojo = self.cerrojo.lectura() if self._sesiones is not None else nullcontext()
+        with cerrojo:
+            yield self
+
+    def _confirmar(self) -> None:
+        ''' Hace commit de los cambios de la sesión o, dentro de un lote, sólo los envía a la base de datos
+        '''
+        if self.session.info.get(INFO_LOTE, 0) > 0:
+            self.session.flush()
+        else:
+            self.session.commit()
+
+    def _confirmar_nombre_unico(self) -> str:
+        ''' Confirma los cambios como _confirmar y traduce la violación de la restricción unique del nombre
+        (de elemento o de clavefavorita) al mensaje de la validación. Dentro de un lote el error se lanza
+        como ValueError con ese mensaje, así lote() deshace todo el lote
+        Retorna:
+            (string): ERROR_NOMBRE_REPETIDO si ya existía el nombre o una cadena de caracteres vacía
+        '''
+        try:
+            self._confirmar()
+        except IntegrityError as error:
+            en_lote = self.session.info.get(INFO_LOTE, 0) > 0
+            if not en_lote:
+                self.session.rollback()
+            if restriccion_unique(error) not in RESTRICCIONES_NOMBRE:
+                raise
+            if en_lote:
+                raise ValueError(ERROR_NOMBRE_REPETIDO) from error
+            return ERROR_NOMBRE_REPETIDO
+        return ""
+
+    def _crear_sesion(self):
+        ''' Crea una sesión de la base de datos que controla su tamaño después de cada commit
+        Retorna:
+            (Session): La sesión nueva
+        '''
+        sesion = self.fabrica()
+        event.listen(sesion, "after_commit", self._controlar_sesion)
+        event.listen(sesion, "after_flush", self._registrar_cambios_trigramas)
+        event.listen(sesion, "after_commit", self._aplicar_cambios_trigramas)
+        event.listen(sesion, "after_rollback", lambda sesion: sesion.info.pop(INFO_TRIGRAMAS, None))
+        return sesion
+
+    def _cambios_trigramas(self, sesion=None) -> list:
+        ''' Retorna la lista de cambios pendientes para los índices de trigramas de una sesión
+        Parámetros:
+            sesion (Session): La sesión, por defecto la sesión actual
+        Retorna:
+            (list): Tuplas (índice, id, nombre) que se aplican en el próximo commit
+        '''
+        sesion = sesion if sesion is not None else self.session
+        return sesion.info.setdefault(INFO_TRIGRAMAS, [])
+
+    def _registrar_cambios_trigramas(self, sesion, flush_context) -> None:
+        ''' Guarda los cambios de nombres de elementos y claves favoritas de un flush hasta el commit '''
+        cambios = self._cambios_trigramas(sesion)
+        cambios.extend((self.indice_elementos, id, nombre) for (id, nombre) in IndiceTrigramas.cambios_flush(sesion, Elemento))
+        cambios.extend((self.indice_claves, id, nombre) for (id, nombre) in IndiceTrigramas.cambios_flush(sesion, ClaveFavorita))
+
+    def _aplicar_cambios_trigramas(self, sesion) -> None:
+        ''' Aplica a los índices de trigramas los cambios confirmados por un commit '''
+        cambios = sesion.info.pop(INFO_TRIGRAMAS, [])
+        for indice in (self.indice_elementos, self.indice_claves):
+            indice.aplicar([(id, nombre) for (cambiado, id, nombre) in cambios if cambiado is indice])
+
+    def _usar_cerrojo(self) -> None:
+        ''' Reemplaza los métodos públicos de la fachada por versiones que toman el cerrojo de lectura o escritura
+        '''
+        for nombre in dir(type(self)):
+            if nombre.startswith(PREFIJOS_LECTURA):
+                cerrojo = self.cerrojo.lectura
+            elif nombre.startswith(PREFIJOS_ESCRITURA):
+                cerrojo = self.cerrojo.escritura
+            else:
+                continue
+            setattr(self, nombre, con_cerrojo(cerrojo, getattr(self, nombre)))
+
+    def _controlar_sesion(self, sesion=None) -> None:
+        ''' Libera los objetos del modelo cargados en la sesión cuando superan limite_sesion
+        Parámetros:
+            sesion (Session): La sesión a controlar, por defecto la sesión actual
+        '''
+        # Sólo se libera si no hay cambios pendientes; la caja se vuelve a asociar a la sesión
+        sesion = sesion if sesion is not None else self.session
+        if len(sesion.identity_map) > self.limite_sesion and not (sesion.new or sesion.dirty or sesion.deleted):
+            sesion.expunge_all()
+            if self._sesiones is None:
+                sesion.add(self._caja)
+
+    def _leer(self, llave, calcular):
+        ''' Lee un resultado a través del cache y luego controla el tamaño de la sesión
+        Parámetros:
+            llave (tuple): La llave del resultado (nombre del método y sus parámetros)
+            calcular (callable): Función que calcula el resultado si no está en el cache
+        Retorna:
+            El resultado de la lectura, inmutable (ver CacheLecturas.congelar)
+        '''
+        resultado = self.cache.leer(llave, calcular)
+        self._controlar_sesion()
+        return resultado
 
     def dar_claveMaestra(self) -> str:
         ''' Retorna la clave maestra de la caja de seguridad
@@ -42,23 +322,26 @@ class LogicaCaja(FachadaCajaDeSeguridad):
             (dict): Diccionario con los datos para la interfaz gráfica
         '''
         if elemento.tipo == "Identificación":
-            return TipoElemento(nombre_elemento=elemento.nombre, 
+            return TipoElemento(id=elemento.id,
+                                nombre_elemento=elemento.nombre, 
                                 notas=elemento.nota, 
                                 tipo=elemento.tipo,
                                 numero=elemento.numero,
                                 nombre=elemento.nombre_completo,
-                                fecha_venc=elemento.vencimiento.isoformat(),
-                                fecha_nacimiento=elemento.nacimiento.isoformat(),
-                                fecha_exp=elemento.expedicion.isoformat())
+                                fecha_venc=texto_fecha(elemento.vencimiento),
+                                fecha_nacimiento=texto_fecha(elemento.nacimiento),
+                                fecha_exp=texto_fecha(elemento.expedicion))
         if elemento.tipo == "Secreto":
-            return TipoElemento(nombre_elemento=elemento.nombre, 
+            return TipoElemento(id=elemento.id,
+                                nombre_elemento=elemento.nombre, 
                                 notas=elemento.nota, 
                                 tipo=elemento.tipo,
                                 clave=elemento.clave.nombre, 
                                 secreto=elemento.secreto,
                                 ) 
         if elemento.tipo == "Login":
-            return TipoElemento(nombre_elemento=elemento.nombre, 
+            return TipoElemento(id=elemento.id,
+                                nombre_elemento=elemento.nombre, 
                                 notas=elemento.nota, 
                                 tipo=elemento.tipo,
                                 clave=elemento.clave.nombre, 
@@ -67,7 +350,8 @@ class LogicaCaja(FachadaCajaDeSeguridad):
                                 url=elemento.url, 
                                 )    
         if elemento.tipo == "Tarjeta":
-            return TipoElemento(nombre_elemento=elemento.nombre, 
+            return TipoElemento(id=elemento.id,
+                                nombre_elemento=elemento.nombre, 
                                 notas=elemento.nota, 
                                 tipo=elemento.tipo,
                                 clave=elemento.clave.nombre, 
@@ -76,15 +360,175 @@ class LogicaCaja(FachadaCajaDeSeguridad):
                                 ccv=elemento.codigo_seguridad,
                                 direccion=elemento.direccion,
                                 telefono=elemento.telefono, 
-                                fecha_venc=elemento.vencimiento.isoformat(),
+                                fecha_venc=texto_fecha(elemento.vencimiento),
                                 )   
           
+    def mapear_fila_listado(self, fila) -> TipoElemento:
+        ''' Mapea una fila de la tabla listado_elemento a un diccionario para la interfaz gráfica
+        Parámetros:
+            fila (RowProxy): Fila del listado a mapear
+        Retorna:
+            (dict): Diccionario con los mismos datos que retorna mapear_elemento
+        '''
+        elemento = TipoElemento(id=fila.id, nombre_elemento=fila.nombre, notas=fila.nota, tipo=fila.tipo)
+        if fila.tipo == "Identificación":
+            elemento.update(numero=fila.numero,
+                            nombre=fila.nombre_completo,
+                            fecha_venc=texto_fecha(fila.vencimiento),
+                            fecha_nacimiento=texto_fecha(fila.nacimiento),
+                            fecha_exp=texto_fecha(fila.expedicion))
+        elif fila.tipo == "Secreto":
+            elemento.update(clave=fila.clave, secreto=fila.secreto)
+        elif fila.tipo == "Login":
+            elemento.update(clave=fila.clave, email=fila.email, usuario=fila.usuario, url=fila.url)
+        elif fila.tipo == "Tarjeta":
+            elemento.update(clave=fila.clave,
+                            numero=fila.numero,
+                            titular=fila.titular,
+                            ccv=fila.codigo_seguridad,
+                            direccion=fila.direccion,
+                            telefono=fila.telefono,
+                            fecha_venc=texto_fecha(fila.vencimiento))
+        return elemento
+
+    def _consulta_listado(self):
+        ''' Retorna la consulta (sin ORM) sobre las filas de la tabla listado_elemento de la caja
+        Retorna:
+            (Select): La consulta sobre el listado de la caja
+        '''
+        return select([ListadoElemento.__table__]).where(ListadoElemento.caja_id == self.caja.id)
+
+    def reconstruir_listado(self) -> None:
+        ''' Vuelve a copiar todos los elementos de la caja a la tabla listado_elemento
+        '''
+        ListadoElementos.reconstruir_listado(self.session, self.caja.id)
+        self._confirmar()
+
+    def _consulta_elementos(self):
+        ''' Retorna una consulta sobre los elementos de la caja que carga las columnas de todos los subtipos
+        y las claves favoritas asignadas en una sola consulta, sin cargas perezosas por cada elemento
+        Retorna:
+            (Query): La consulta sobre los elementos de la caja
+        '''
+        elemento = with_polymorphic(Elemento, [Login, Tarjeta, Secreto, Identificacion])
+        return (self.session.query(elemento)
+            .filter(elemento.caja_id == self.caja.id)
+            .options(joinedload(elemento.Login.clave), joinedload(elemento.Tarjeta.clave), joinedload(elemento.Secreto.clave)))
+
     def dar_elementos(self) -> List[TipoElemento]:
         ''' Retorna la lista de elementos de la caja de seguridad
         Retorna:
             (list): La lista con los dict o los objetos de los elementos
         '''
-        return [self.mapear_elemento(elemento) for elemento in self.caja.elementos.order_by(Elemento.nombre)]
+        if self.usar_listado:
+            return self._leer(("dar_elementos",),
+                lambda: [self.mapear_fila_listado(fila) for fila in self.session.execute(
+                    self._consulta_listado().order_by(ListadoElemento.nombre))])
+        return self._leer(("dar_elementos",),
+            lambda: [self.mapear_elemento(elemento) for elemento in self._consulta_elementos().order_by(Elemento.nombre)])
+
+    def dar_resumen_elementos(self) -> List[TipoResumenElemento]:
+        ''' Retorna la lista de elementos de la caja de seguridad sólo con los datos que se muestran en la lista
+        Retorna:
+            (list): La lista con los dict con el id, nombre_elemento y tipo de los elementos
+        '''
+        # Sólo se consultan las columnas de la tabla elemento, sin cargar los subtipos ni crear objetos del modelo
+        return self._leer(("dar_resumen_elementos",),
+            lambda: [TipoResumenElemento(id=id_elemento, nombre_elemento=nombre, tipo=tipo)
+                for (id_elemento, nombre, tipo) in self.session.query(Elemento.id, Elemento.nombre, Elemento.tipo)
+                    .filter(Elemento.caja_id == self.caja.id).order_by(Elemento.nombre)])
+
+    def dar_elementos_pagina(self, despues_de_nombre: str, limite: int, tipo: str = None) -> List[TipoElemento]:
+        ''' Retorna una página de la lista de elementos ordenada por nombre
+        Parámetros:
+            despues_de_nombre (string): El nombre del último elemento de la página anterior o None para la primera página
+            limite (int): La cantidad máxima de elementos a retornar
+            tipo (string): El tipo de los elementos a retornar o None para todos los tipos
+        Retorna:
+            (list): La lista con los dict de los elementos de la página
+        '''
+        # Se continúa desde el último nombre (keyset) en vez de usar OFFSET, así cada página cuesta lo mismo
+        consulta = self._consulta_elementos()
+        if despues_de_nombre is not None:
+            consulta = consulta.filter(Elemento.nombre > despues_de_nombre)
+        if tipo is not None:
+            consulta = consulta.filter(Elemento.tipo == tipo)
+        pagina = [self.mapear_elemento(elemento) for elemento in consulta.order_by(Elemento.nombre).limit(limite)]
+        self._controlar_sesion()
+        return pagina
+
+    def iter_elementos(self, tamano_lote: int = 500, crudo: bool = False) -> Iterator[TipoElemento]:
+        ''' Recorre los elementos de la caja de seguridad ordenados por nombre sin cargarlos todos en memoria
+        Parámetros:
+            tamano_lote (int): La cantidad de elementos que se leen de la base de datos en cada consulta
+            crudo (bool): Si es True retorna tuplas con las columnas de la base de datos en vez de dict
+        Retorna:
+            (iterator): Los dict de los elementos (como en dar_elementos) o las tuplas con los campos
+            id, tipo, nombre, nota, email, usuario, url, numero, titular, codigo_seguridad, direccion,
+            telefono, vencimiento, secreto, nombre_completo, nacimiento, expedicion y clave
+        '''
+        # Cada lote continúa después del último nombre del lote anterior, así no se mantiene
+        # un cursor abierto mientras quien consume el iterador usa la misma sesión
+        ultimo_nombre = None
+        while True:
+            if crudo:
+                consulta = self._consulta_elementos_crudos()
+                if ultimo_nombre is not None:
+                    consulta = consulta.where(ListadoElemento.nombre > ultimo_nombre)
+                lote = self.session.execute(consulta.order_by(ListadoElemento.nombre).limit(tamano_lote)).fetchall()
+                for fila in lote:
+                    yield tuple(fila)
+                if lote:
+                    ultimo_nombre = lote[-1].nombre
+            else:
+                consulta = self._consulta_elementos()
+                if ultimo_nombre is not None:
+                    consulta = consulta.filter(Elemento.nombre > ultimo_nombre)
+                lote = consulta.order_by(Elemento.nombre).limit(tamano_lote).all()
+                for elemento in lote:
+                    yield self.mapear_elemento(elemento)
+                if lote:
+                    ultimo_nombre = lote[-1].nombre
+                # Los objetos ya retornados se quitan de la sesión para que la memoria no crezca,
+                # salvo los que quien consume el iterador modificó o eliminó y aún no se guardan
+                pendientes = set(self.session.dirty) | set(self.session.deleted)
+                for elemento in lote:
+                    if elemento not in pendientes:
+                        self.session.expunge(elemento)
+                self._controlar_sesion()
+            if len(lote) < tamano_lote:
+                return
+
+    def _consulta_elementos_crudos(self):
+        ''' Retorna la consulta (sin ORM) con todas las columnas de los elementos de la caja y el nombre de su clave favorita
+        Retorna:
+            (Select): La consulta con las columnas que retorna iter_elementos(crudo=True)
+        '''
+        listado = ListadoElemento.__table__
+        return (select([listado.c.id, listado.c.tipo, listado.c.nombre, listado.c.nota,
+                listado.c.email, listado.c.usuario, listado.c.url, listado.c.numero, listado.c.titular,
+                listado.c.codigo_seguridad, listado.c.direccion, listado.c.telefono, listado.c.vencimiento,
+                listado.c.secreto, listado.c.nombre_completo, listado.c.nacimiento,
+                listado.c.expedicion, listado.c.clave])
+            .where(listado.c.caja_id == self.caja.id))
+
+    def _elemento_por_posicion(self, posicion: int) -> Elemento:
+        ''' Retorna el elemento (del modelo) que ocupa una posición en la lista que retorna dar_elementos
+        Parámetros:
+            posicion (int): El index del elemento en la lista ordenada por nombre
+        Retorna:
+            (Elemento): El elemento en la posición indicada
+        '''
+        return self._consulta_elementos().order_by(Elemento.nombre).offset(posicion).first()
+
+    def _elemento_por_id(self, id_elemento: int) -> Elemento:
+        ''' Retorna el elemento (del modelo) identificado con su id en la base de datos
+        Parámetros:
+            id_elemento (int): El id del elemento en la base de datos
+        Retorna:
+            (Elemento): El elemento identificado con id_elemento
+        '''
+        return self._consulta_elementos().filter(Elemento.id == id_elemento).first()
 
     def dar_elemento(self, id_elemento: int) -> TipoElemento:
         ''' Retorna un elemento de la caja de seguridad
@@ -93,20 +537,139 @@ class LogicaCaja(FachadaCajaDeSeguridad):
         Retorna:
             (dict): El elemento identificado con id_elemento
         '''
-        # Nota: id_clave no es el id de un elemento en la base de datos sino el index en la lista que retorna dar_elementos
-        #       por eso aquí no es posible filtrar por id
-        return self.mapear_elemento(self.caja.elementos.order_by(Elemento.nombre).offset(id_elemento).first())
-    
+        # Nota: id_elemento no es el id de un elemento en la base de datos sino el index en la lista que retorna dar_elementos
+        #       para filtrar por id se debe usar dar_elemento_por_id
+        if self.usar_listado:
+            return self._leer(("dar_elemento", id_elemento),
+                lambda: self.mapear_fila_listado(self.session.execute(
+                    self._consulta_listado().order_by(ListadoElemento.nombre).offset(id_elemento).limit(1)).first()))
+        return self._leer(("dar_elemento", id_elemento),
+            lambda: self.mapear_elemento(self._elemento_por_posicion(id_elemento)))
+
+    def dar_elemento_por_id(self, id_elemento: int) -> TipoElemento:
+        ''' Retorna un elemento de la caja de seguridad
+        Parámetros:
+            id_elemento (int): El id del elemento en la base de datos
+        Retorna:
+            (dict): El elemento identificado con id_elemento
+        '''
+        if self.usar_listado:
+            return self._leer(("dar_elemento_por_id", id_elemento),
+                lambda: self.mapear_fila_listado(self.session.execute(
+                    self._consulta_listado().where(ListadoElemento.id == id_elemento)).first()))
+        return self._leer(("dar_elemento_por_id", id_elemento),
+            lambda: self.mapear_elemento(self._elemento_por_id(id_elemento)))
+
+    def buscar_elementos(self, texto: str, limite: int = 20) -> List[TipoElemento]:
+        ''' Busca los elementos cuyo nombre, notas, usuario, email, URL, titular o nombre completo contienen
+        palabras que empiezan por las del texto, con el índice de texto completo del listado
+        Parámetros:
+            texto (string): Las palabras a buscar (sin distinguir mayúsculas ni tildes)
+            limite (int): La cantidad máxima de elementos a retornar
+        Retorna:
+            (list): La lista con los dict de los elementos, del más al menos relevante (BM25)
+        '''
+        expresion = expresion_busqueda(texto)
+        if expresion == "":
+            return []
+        listado = ListadoElemento.__table__
+        consulta = (select([listado])
+            .select_from(listado.join(busqueda_elemento, busqueda_elemento.c.rowid == listado.c.id))
+            .where(literal_column("busqueda_elemento").op("MATCH")(expresion))
+            .where(listado.c.caja_id == self._caja_id)
+            .order_by(func.bm25(literal_column("busqueda_elemento"), *PESOS_BUSQUEDA))
+            .limit(limite))
+        return self._leer(("buscar_elementos", expresion, limite),
+            lambda: [self.mapear_fila_listado(fila) for fila in self.session.execute(consulta)])
+
+    def dar_logins_por_dominio(self, url: str) -> List[TipoElemento]:
+        ''' Retorna los logins del mismo dominio registrable que una URL, incluidos los de sus subdominios; por
+        ejemplo, para https://accounts.google.com/login los de google.com, mail.google.com y accounts.google.com.
+        Los sitios bajo un sufijo público (victima.github.io para github.io) son de otro dominio
+        Parámetros:
+            url (string): La URL o el dominio a buscar
+        Retorna:
+            (list): La lista con los dict de los logins, ordenada por nombre; vacía si la URL es un sufijo público
+        '''
+        rango = dominios.rango_dominio(url)
+        if rango is None:
+            return []
+        (dominio, igual, desde, hasta) = rango
+        listado = ListadoElemento.__table__
+        login = Login.__table__
+        # El dominio y sus subdominios son dos rangos del índice de host_invertido: el valor igual y los que empiezan por "igual.";
+        # de esos, los que están bajo un sufijo público más largo (sitio.s3.amazonaws.com) tienen otro dominio.
+        consulta = (select([listado])
+            .select_from(listado.join(login, login.c.id == listado.c.id))
+            .where(or_(login.c.host_invertido == igual, and_(login.c.host_invertido > desde, login.c.host_invertido < hasta)))
+            .where(login.c.dominio == dominio)
+            .where(listado.c.caja_id == self._caja_id)
+            .order_by(listado.c.nombre))
+        return self._leer(("dar_logins_por_dominio", igual),
+            lambda: [self.mapear_fila_listado(fila) for fila in self.session.execute(consulta)])
+
+    def _indice_trigramas(self, indice: IndiceTrigramas.IndiceTrigramas, tabla) -> IndiceTrigramas.IndiceTrigramas:
+        ''' Retorna un índice de trigramas, construyéndolo con los nombres de la caja si es la primera vez que se usa
+        Parámetros:
+            indice (IndiceTrigramas): self.indice_elementos o self.indice_claves
+            tabla (Table): La tabla de los nombres del índice (elemento o clavefavorita)
+        '''
+        if not indice.construido:
+            indice.cargar(self.session.execute(select([tabla.c.id, tabla.c.nombre]).where(tabla.c.caja_id == self._caja_id)))
+        return indice
+
+    def reconstruir_indices_trigramas(self) -> None:
+        ''' Vuelve a construir los índices de trigramas con los nombres guardados en la base de datos, por ejemplo
+        después de escrituras hechas sin esta lógica (otro proceso u otra LogicaCaja)
+        '''
+        self.indice_elementos.construido = False
+        self.indice_claves.construido = False
+        self._indice_trigramas(self.indice_elementos, Elemento.__table__)
+        self._indice_trigramas(self.indice_claves, ClaveFavorita.__table__)
+
+    def dar_elementos_similares(self, texto: str, limite: int = 10, minimo: float = 0.3) -> List[TipoElementoSimilar]:
+        ''' Retorna los elementos cuyo nombre se parece más a un texto, aunque tenga errores de escritura
+        Parámetros:
+            texto (string): El nombre a buscar
+            limite (int): La cantidad máxima de elementos a retornar
+            minimo (float): La similitud mínima (coeficiente de Jaccard de los trigramas, entre 0 y 1)
+        Retorna:
+            (list): Los dict con el id, nombre_elemento y similitud (entre 0 y 1) de los elementos, de mayor a menor similitud
+        '''
+        indice = self._indice_trigramas(self.indice_elementos, Elemento.__table__)
+        return [TipoElementoSimilar(id=id, nombre_elemento=nombre, similitud=similitud)
+            for (id, nombre, similitud) in indice.buscar(texto, limite, minimo)]
+
+    def dar_claves_similares(self, texto: str, limite: int = 10, minimo: float = 0.3) -> List[TipoClaveSimilar]:
+        ''' Retorna las claves favoritas cuyo nombre se parece más a un texto, aunque tenga errores de escritura
+        Parámetros:
+            texto (string): El nombre a buscar
+            limite (int): La cantidad máxima de claves favoritas a retornar
+            minimo (float): La similitud mínima (coeficiente de Jaccard de los trigramas, entre 0 y 1)
+        Retorna:
+            (list): Los dict con el id, nombre y similitud (entre 0 y 1) de las claves favoritas, de mayor a menor similitud
+        '''
+        indice = self._indice_trigramas(self.indice_claves, ClaveFavorita.__table__)
+        return [TipoClaveSimilar(id=id, nombre=nombre, similitud=similitud)
+            for (id, nombre, similitud) in indice.buscar(texto, limite, minimo)]
+
     def eliminar_elemento(self, id):
         ''' Elimina un elemento de la lista de elementos
         Parámetros:
             id (int): El id del elemento a eliminar_clave
         '''
         # Nota: id no es el id de un elemento en la base de datos sino el index en la lista que retorna dar_elementos
-        #       por eso aquí no es posible filtrar por id
-        elemento = self.caja.elementos.order_by(Elemento.nombre).offset(id).first()
-        self.session.delete(elemento)
-        self.session.commit()
+        #       para filtrar por id se debe usar eliminar_elemento_por_id
+        self.session.delete(self._elemento_por_posicion(id))
+        self._confirmar()
+
+    def eliminar_elemento_por_id(self, id: int):
+        ''' Elimina un elemento de la lista de elementos
+        Parámetros:
+            id (int): El id del elemento en la base de datos
+        '''
+        self.session.delete(self._elemento_por_id(id))
+        self._confirmar()
 
     def mapear_clave_favorita(self, clave: ClaveFavorita) -> TipoClaveFavorita:
         ''' Mapea una clave favorita (del modelo) a un diccionario para la interfaz gráfica
@@ -115,14 +678,48 @@ class LogicaCaja(FachadaCajaDeSeguridad):
         Retorna:
             (dict): Diccionario con los datos para la interfaz gráfica
         '''
-        return TipoClaveFavorita(nombre=clave.nombre, clave=clave.clave, pista=clave.pista)
+        return TipoClaveFavorita(id=clave.id, nombre=clave.nombre, clave=clave.clave, pista=clave.pista)
 
     def dar_claves_favoritas(self) -> List[TipoClaveFavorita]:
         ''' Retorna la lita de claves favoritas
         Retorna:
             (list): La lista con los dict o los objetos de las claves favoritas
         '''
-        return [self.mapear_clave_favorita(x) for x in self.caja.claves.order_by(ClaveFavorita.nombre)]
+        return self._leer(("dar_claves_favoritas",),
+            lambda: [self.mapear_clave_favorita(x) for x in self.caja.claves.order_by(ClaveFavorita.nombre)])
+
+    def dar_claves_favoritas_pagina(self, despues_de_nombre: str, limite: int) -> List[TipoClaveFavorita]:
+        ''' Retorna una página de la lista de claves favoritas ordenada por nombre
+        Parámetros:
+            despues_de_nombre (string): El nombre de la última clave favorita de la página anterior o None para la primera página
+            limite (int): La cantidad máxima de claves favoritas a retornar
+        Retorna:
+            (list): La lista con los dict de las claves favoritas de la página
+        '''
+        consulta = self.caja.claves
+        if despues_de_nombre is not None:
+            consulta = consulta.filter(ClaveFavorita.nombre > despues_de_nombre)
+        pagina = [self.mapear_clave_favorita(x) for x in consulta.order_by(ClaveFavorita.nombre).limit(limite)]
+        self._controlar_sesion()
+        return pagina
+
+    def _clave_por_posicion(self, posicion: int) -> ClaveFavorita:
+        ''' Retorna la clave favorita (del modelo) que ocupa una posición en la lista que retorna dar_claves_favoritas
+        Parámetros:
+            posicion (int): El index de la clave favorita en la lista ordenada por nombre
+        Retorna:
+            (ClaveFavorita): La clave favorita en la posición indicada
+        '''
+        return self.caja.claves.order_by(ClaveFavorita.nombre).offset(posicion).first()
+
+    def _clave_por_id(self, id_clave: int) -> ClaveFavorita:
+        ''' Retorna la clave favorita (del modelo) identificada con su id en la base de datos
+        Parámetros:
+            id_clave (int): El id de la clave favorita en la base de datos
+        Retorna:
+            (ClaveFavorita): La clave favorita identificada con id_clave
+        '''
+        return self.caja.claves.filter(ClaveFavorita.id == id_clave).first()
 
     def dar_clave_favorita(self, id_clave: int) -> TipoClaveFavorita:
         ''' Retorna una clave favoritas
@@ -132,8 +729,19 @@ class LogicaCaja(FachadaCajaDeSeguridad):
             (dict): La clave favorita identificada con id_clave
         '''
         # Nota: id_clave no es el id de una clave favorita en la base de datos sino el index en la lista que retorna dar_claves_favoritas
-        #       por eso aquí no es posible filtrar por id
-        return self.mapear_clave_favorita(self.caja.claves.order_by(ClaveFavorita.nombre).offset(id_clave).first())
+        #       para filtrar por id se debe usar dar_clave_favorita_por_id
+        return self._leer(("dar_clave_favorita", id_clave),
+            lambda: self.mapear_clave_favorita(self._clave_por_posicion(id_clave)))
+
+    def dar_clave_favorita_por_id(self, id_clave: int) -> TipoClaveFavorita:
+        ''' Retorna una clave favorita
+        Parámetros:
+            id_clave (int): El id de la clave favorita en la base de datos
+        Retorna:
+            (dict): La clave favorita identificada con id_clave
+        '''
+        return self._leer(("dar_clave_favorita_por_id", id_clave),
+            lambda: self.mapear_clave_favorita(self._clave_por_id(id_clave)))
 
     def eliminar_clave(self, id: int):
         ''' Elimina una clave favorita
@@ -141,30 +749,56 @@ class LogicaCaja(FachadaCajaDeSeguridad):
             id (int): El id de la clave favorita a borrar
         '''
         # Nota: id no es el id de una clave favorita en la base de datos sino el index en la lista que retorna dar_claves_favoritas
-        #       por eso aquí no es posible filtrar por id
-        clave = self.caja.claves.order_by(ClaveFavorita.nombre).offset(id).first()
-        self.session.delete(clave)
-        self.session.commit()
+        #       para filtrar por id se debe usar eliminar_clave_por_id
+        self.session.delete(self._clave_por_posicion(id))
+        self._confirmar()
 
-    def validar_eliminar_clave(self, id):
+    def eliminar_clave_por_id(self, id: int):
+        ''' Elimina una clave favorita
+        Parámetros:
+            id (int): El id de la clave favorita en la base de datos
+        '''
+        self.session.delete(self._clave_por_id(id))
+        self._confirmar()
+
+    def _validar_eliminar_clave(self, clave: ClaveFavorita) -> str:
         ''' Validar que se pueda eliminar una clave favorita
         Parámetros:
-            id (int): El id de la clave favorita a borrar
+            clave (ClaveFavorita): La clave favorita a borrar
         Retorna:
             (string): El mensaje de error generado al presentarse errores en la 
             validación o una cadena de caracteres vacía si no hay errores.
         '''
-        clave = self.caja.claves.order_by(ClaveFavorita.nombre).offset(id).first()
-        total_elementos = (
-            self.caja.elementos.join(Login).filter(Login.clave == clave).count() +
-            self.caja.elementos.join(Tarjeta).filter(Tarjeta.clave == clave).count() +
-            self.caja.elementos.join(Secreto).filter(Secreto.clave == clave).count()
+        # Se cuenta directamente en las tablas de los subtipos, usando el índice de clave_id
+        total_elementos = sum(
+            self.session.query(func.count()).select_from(tabla).filter(tabla.c.clave_id == clave.id).scalar()
+            for tabla in [Login.__table__, Tarjeta.__table__, Secreto.__table__]
         )
         if total_elementos > 0:
             return "No se puede eliminar una clave utilizada"
 
         return ""
 
+    def validar_eliminar_clave(self, id):
+        ''' Validar que se pueda eliminar una clave favorita
+        Parámetros:
+            id (int): El id de la clave favorita a borrar
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        return self._validar_eliminar_clave(self._clave_por_posicion(id))
+
+    def validar_eliminar_clave_por_id(self, id: int) -> str:
+        ''' Validar que se pueda eliminar una clave favorita
+        Parámetros:
+            id (int): El id de la clave favorita en la base de datos
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        return self._validar_eliminar_clave(self._clave_por_id(id))
+
     def dar_clave(self, nombre_clave: str) -> str:
         ''' Retorna la clave asignada a una clave favorita
         Parámetros:
@@ -172,41 +806,62 @@ class LogicaCaja(FachadaCajaDeSeguridad):
         Retorna:
             (string): La clave asignada a la clave favorita del parámetro
         '''
-        return self.caja.claves.filter(ClaveFavorita.nombre==nombre_clave).first().clave
+        return self._leer(("dar_clave", nombre_clave),
+            lambda: self.caja.claves.filter(ClaveFavorita.nombre==nombre_clave).first().clave)
 
-    def validar_crear_editar_clave(self, id: int, nombre: str, clave: str, pista: str) -> str:
+    def _validar_crear_editar_clave(self, nombre_actual: str, nombre: str, clave: str, pista: str, nombres: set = None) -> str:
         
         ''' Valida que se pueda crear o editar una clave favorita
         Parámetros:
-            id (int): El identificador de la clave a editar o -1 en case de crear una nueva clave
+            nombre_actual (string): El nombre actual de la clave favorita a editar o None en caso de crear
             nombre (string): El nombre de la clave favorita
             clave (string): El password o clae de la clave favorita
             pista (string): La pista para recordar la clave favorita
+            nombres (set): Los nombres de las claves favoritas existentes o None para consultarlos en la base de datos
         Retorna:
             (string): El mensaje de error generado al presentarse errores en la
             validación o una cadena de caracteres vacía si no hay errores.
         '''
-        if len(nombre) < 1:
-            return "El nombre no debe tener menos de 1 caracteres"
-        if len (nombre) > 255:
-            return "El nombre no debe tener más de 255 caracteres"
-        if len(clave) < 3:
-            return "La clave no debe tener menos de 3 caracteres"
-        if len (clave) > 255:
-            return "La clave no debe tener más de 255 caracteres"
-        if len(pista) < 3:
-            return "La pista no debe tener menos de 3 caracteres"
-        if len (pista) > 255:
-            return "La pista no debe tener más de 255 caracteres"
+        error = Validacion.validar(Validacion.CLAVE_FAVORITA, dict(nombre=nombre, clave=clave, pista=pista))
+        if error:
+            return error
 
         # Si estamos creando o si estamos editanto y el nombre de la clave ha cambiado, tenemos que comprabar que una clave con este nombre aun no existe
-        comprabar_nombre = (id == -1) or (nombre != self.dar_clave_favorita(id)["nombre"])
+        comprabar_nombre = (nombre_actual is None) or (nombre != nombre_actual)
 
-        if comprabar_nombre and (self.caja.claves.filter(ClaveFavorita.nombre==nombre).count() > 0):
-            return "Ya existe un elemento con este nombre"
+        if comprabar_nombre and self._existe_clave(nombre, nombres):
+            return ERROR_NOMBRE_REPETIDO
 
         return ""
 
+    def validar_crear_editar_clave(self, id: int, nombre: str, clave: str, pista: str) -> str:
+        ''' Valida que se pueda crear o editar una clave favorita
+        Parámetros:
+            id (int): El identificador de la clave a editar o -1 en case de crear una nueva clave
+            nombre (string): El nombre de la clave favorita
+            clave (string): El password o clae de la clave favorita
+            pista (string): La pista para recordar la clave favorita
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        nombre_actual = None if id == -1 else self._clave_por_posicion(id).nombre
+        return self._validar_crear_editar_clave(nombre_actual, nombre, clave, pista)
+
+    def validar_crear_editar_clave_por_id(self, id: int, nombre: str, clave: str, pista: str) -> str:
+        ''' Valida que se pueda crear o editar una clave favorita
+        Parámetros:
+            id (int): El id en la base de datos de la clave favorita a editar o -1 en caso de crear
+            nombre (string): El nombre de la clave favorita
+            clave (string): El password o clae de la clave favorita
+            pista (string): La pista para recordar la clave favorita
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        nombre_actual = None if id == -1 else self._clave_por_id(id).nombre
+        return self._validar_crear_editar_clave(nombre_actual, nombre, clave, pista)
+
     def crear_clave(self, nombre: str, clave: str, pista: str) -> None:
         ''' Crea una clave favorita
         Parámetros:
@@ -220,7 +875,20 @@ class LogicaCaja(FachadaCajaDeSeguridad):
         clave1.pista = pista
 
         self.caja.claves.append(clave1)
-        self.session.commit()
+        self._confirmar()
+
+    def _editar_clave(self, clave_favorita: ClaveFavorita, nombre: str, clave: str, pista: str) -> None:
+        ''' Edita una clave favorita
+        Parámetros:
+            clave_favorita (ClaveFavorita): La clave favorita a editar
+            nombre (string): El nombre de la clave favorita
+            clave (string): El password o clae de la clave favorita
+            pista (string): La pista para recordar la clave favorita
+        '''
+        clave_favorita.nombre = nombre
+        clave_favorita.clave = clave
+        clave_favorita.pista = pista
+        self._confirmar()
 
     def editar_clave(self, id: int, nombre: str, clave: str, pista: str) -> None:
         ''' Edita una clave favorita
@@ -230,13 +898,17 @@ class LogicaCaja(FachadaCajaDeSeguridad):
             clave (string): El password o clae de la clave favorita
             pista (string): La pista para recordar la clave favorita
         '''
-        # Nota: id no es el id de una clave favorita en la base de datos sino el index en la lista que retorna dar_claves_favoritas
-        #       por eso aquí no es posible filtrar por id
-        c = self.caja.claves.order_by(ClaveFavorita.nombre).offset(id).first()
-        c.nombre = nombre
-        c.clave = clave
-        c.pista = pista
-        self.session.commit()
+        self._editar_clave(self._clave_por_posicion(id), nombre, clave, pista)
+
+    def editar_clave_por_id(self, id: int, nombre: str, clave: str, pista: str) -> None:
+        ''' Edita una clave favorita
+        Parámetros:
+            id (int): El id en la base de datos de la clave favorita a editar
+            nombre (string): El nombre de la clave favorita
+            clave (string): El password o clae de la clave favorita
+            pista (string): La pista para recordar la clave favorita
+        '''
+        self._editar_clave(self._clave_por_id(id), nombre, clave, pista)
 
     def generar_clave(self) -> str:
         ''' Genera una clave para una clave favorita
@@ -258,50 +930,91 @@ class LogicaCaja(FachadaCajaDeSeguridad):
 
         return ''.join(clave)
 
-    def validar_crear_editar_login(self, id: int, nombre: str, email: str, usuario: str, password: str, url: str, notas: str) -> str:
+    def _existe_elemento(self, nombre: str, nombres: set = None) -> bool:
+        ''' Indica si la caja ya tiene un elemento con un nombre
+        Parámetros:
+            nombre (string): El nombre del elemento
+            nombres (set): Los nombres de los elementos existentes o None para consultarlos en la base de datos
+        '''
+        if nombres is not None:
+            return nombre in nombres
+        return self.caja.elementos.filter(Elemento.nombre==nombre).count() > 0
+
+    def _existe_clave(self, nombre: str, claves: set = None) -> bool:
+        ''' Indica si la caja tiene una clave favorita con un nombre
+        Parámetros:
+            nombre (string): El nombre de la clave favorita
+            claves (set): Los nombres de las claves favoritas existentes o None para consultarlos en la base de datos
+        '''
+        if claves is not None:
+            return nombre in claves
+        return self.caja.claves.filter(ClaveFavorita.nombre==nombre).count() > 0
+
+    def _validar_crear_editar_login(self, nombre_actual: str, nombre: str, email: str, usuario: str, password: str, url: str, notas: str, nombres: set = None, claves: set = None) -> str:
         ''' Valida que un login se pueda crear o editar
         Parámetros:
-            id (int): El identificador del elemento a editar o -1 en case de crear un nuevo elemento
+            nombre_actual (string): El nombre actual del elemento a editar o None en caso de crear
             nombre (string): El nombre del elemento
             email (string): El email del elemento
             usuario (string): El usuario del login
             password (string): El nombre de clave favorita del elemento
             url (string): El URL del login
             notas (string): Las notas del elemento
+            nombres (set): Los nombres de los elementos existentes o None para consultarlos en la base de datos
+            claves (set): Los nombres de las claves favoritas existentes o None para consultarlos en la base de datos
         Retorna:
             (string): El mensaje de error generado al presentarse errores en la 
             validación o una cadena de caracteres vacía si no hay errores.
         '''
-        if len(nombre) < 1:
-            return "El nombre no debe tener menos de 1 caracteres"
-        if len(nombre) > 255:
-            return "El nombre no debe tener más de 255 caracteres"
-        if len(usuario) < 1:
-            return "El usuario no debe tener menos de 1 caracteres"
-        if len(usuario) > 255:
-            return "El usuario no debe tener más de 255 caracteres"
-        if len(notas) < 3:
-            return "Las notas no deben tener menos de 3 caracteres"
-        if len(notas) > 512:
-            return "Las notas no deben tener más de 512 caracteres"
-        if not re.match("^[a-zA-Z0-9+_.-]+@[a-zA-Z0-9.-]+$", email):
-            return "El email no tiene el formato correcto"
-        if len(url) > 512:
-            return "La URL no debe tener más de 512 caracteres"
-        if not re.match("^(https?:\/\/(?:www\.|(?!www))[a-zA-Z0-9][a-zA-Z0-9-]+[a-zA-Z0-9]\.[^\s]{2,}|www\.[a-zA-Z0-9][a-zA-Z0-9-]+[a-zA-Z0-9]\.[^\s]{2,}|https?:\/\/(?:www\.|(?!www))[a-zA-Z0-9]+\.[^\s]{2,}|www\.[a-zA-Z0-9]+\.[^\s]{2,})$", url):
-            return "El url no tiene el formato correcto"
+        error = Validacion.validar(Validacion.LOGIN, dict(nombre_elemento=nombre, email=email, usuario=usuario, url=url, notas=notas))
+        if error:
+            return error
         
         # Si estamos creando o si estamos editanto y el nombre de la clave ha cambiado, tenemos que comprabar que una clave con este nombre aun no existe
-        comprabar_nombre = (id == -1) or (nombre != self.dar_elemento(id)["nombre_elemento"])
+        comprabar_nombre = (nombre_actual is None) or (nombre != nombre_actual)
 
-        if comprabar_nombre and (self.caja.elementos.filter(Elemento.nombre==nombre).count() > 0):
-            return "Ya existe un elemento con este nombre"
+        if comprabar_nombre and self._existe_elemento(nombre, nombres):
+            return ERROR_NOMBRE_REPETIDO
         
-        if self.caja.claves.filter(ClaveFavorita.nombre==password).count() < 1:
-            return "Debe tener asignado una clave favorita"
+        if not self._existe_clave(password, claves):
+            return ERROR_SIN_CLAVE
         
         return ""
 
+    def validar_crear_editar_login(self, id: int, nombre: str, email: str, usuario: str, password: str, url: str, notas: str) -> str:
+        ''' Valida que un login se pueda crear o editar
+        Parámetros:
+            id (int): El identificador del elemento a editar o -1 en case de crear un nuevo elemento
+            nombre (string): El nombre del elemento
+            email (string): El email del elemento
+            usuario (string): El usuario del login
+            password (string): El nombre de clave favorita del elemento
+            url (string): El URL del login
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        nombre_actual = None if id == -1 else self._elemento_por_posicion(id).nombre
+        return self._validar_crear_editar_login(nombre_actual, nombre, email, usuario, password, url, notas)
+
+    def validar_crear_editar_login_por_id(self, id: int, nombre: str, email: str, usuario: str, password: str, url: str, notas: str) -> str:
+        ''' Valida que un login se pueda crear o editar
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre (string): El nombre del elemento
+            email (string): El email del elemento
+            usuario (string): El usuario del login
+            password (string): El nombre de clave favorita del elemento
+            url (string): El URL del login
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        nombre_actual = None if id == -1 else self._elemento_por_id(id).nombre
+        return self._validar_crear_editar_login(nombre_actual, nombre, email, usuario, password, url, notas)
+
     def crear_login(self, nombre: str, email: str, usuario: str, password: str, url: str, notas: str) -> None:
         ''' Crea un elemento login
         Parámetros:
@@ -321,11 +1034,12 @@ class LogicaCaja(FachadaCajaDeSeguridad):
         l.nota = notas
 
         self.caja.elementos.append(l)
-        self.session.commit()
+        self._confirmar()
 
-    def editar_login(self, id: int, nombre: str, email: str, usuario: str, password: str, url: str, notas: str):
+    def _editar_login(self, elemento: Login, nombre: str, email: str, usuario: str, password: str, url: str, notas: str):
         ''' Edita un elemento login
         Parámetros:
+            elemento (Login): El elemento a editar
             nombre (string): El nombre del elemento
             email (string): El email del elemento
             usuario (string): El usuario del login
@@ -333,93 +1047,105 @@ class LogicaCaja(FachadaCajaDeSeguridad):
             url (string): El URL del login
             notas (string): Las notas del elemento
         '''
-        l = self.caja.elementos.order_by(Elemento.nombre).offset(id).first()
-        l.nombre = nombre
-        l.email = email
-        l.usuario = usuario
-        l.clave = self.caja.claves.filter(ClaveFavorita.nombre==password).first()
-        l.url=url
-        l.nota = notas
+        elemento.nombre = nombre
+        elemento.email = email
+        elemento.usuario = usuario
+        elemento.clave = self.caja.claves.filter(ClaveFavorita.nombre==password).first()
+        elemento.url=url
+        elemento.nota = notas
 
-        self.session.commit()
-    
-    def dar_reporte_seguridad(self) -> TipoReporte:
-        ''' Genera la información para el reporte de seguridad
-        Retorna:
-            (dict): Un mapa con los valores numéricos para las llaves logins, ids, tarjetas,
-            secretos, inseguras, avencer, masdeuna y nivel que conforman el reporte
-        '''
-        hoy_mas_3_meses=datetime.today().date()+timedelta(days=3*30)
-        tarjetas_avencer=self.caja.elementos.join(Tarjeta).filter(Tarjeta.vencimiento<hoy_mas_3_meses).count()
-        id_avencer=self.caja.elementos.join(Identificacion).filter(Identificacion.vencimiento<hoy_mas_3_meses).count()
-        numero_ids=self.caja.elementos.filter(Elemento.tipo == "Identificación").count()
-        numero_tarjetas=self.caja.elementos.filter(Elemento.tipo == "Tarjeta").count()
-        elementos_que_puede_vencer=numero_ids+numero_tarjetas
-        elementos_avencer=tarjetas_avencer+id_avencer
-        if elementos_que_puede_vencer== 0:
-            v=1.0
-        else:
-            v=(elementos_que_puede_vencer-elementos_avencer)/(elementos_que_puede_vencer)
-
-        repetida=0
-        max_elementos=0
-        seguras=0
-
-        for x in self.caja.claves:
-            total_elementos = (self.caja.elementos.join(Login).filter(Login.clave==x).count()+
-                self.caja.elementos.join(Tarjeta).filter(Tarjeta.clave==x).count()+
-                self.caja.elementos.join(Secreto).filter(Secreto.clave==x).count())
-                        
-            if total_elementos > 1:
-               repetida=repetida+1
-
-            if total_elementos>max_elementos:
-                max_elementos=total_elementos
-            
-        if max_elementos > 3:
-            r=0.0
-        elif max_elementos > 1:
-            r=0.5
-        else:
-            r=1.0
+        self._confirmar()
 
-        for x in self.caja.claves:
-            if len(x.clave) < 8:
-                continue
-            if not re.search("[0-9]", x.clave):
-                continue
-            if not re.search("[A-ZÑÉÓÚÍÜ]", x.clave):
-                continue
-            if not re.search("[a-zñéóúíü]", x.clave):
-                continue
-            if not re.search("[?\-*!@#$/(){}=.,;:]", x.clave):
-                continue
-            if " " in x.clave:
-                continue
-            seguras=seguras+1
+    def editar_login(self, id: int, nombre: str, email: str, usuario: str, password: str, url: str, notas: str):
+        ''' Edita un elemento login
+        Parámetros:
+            nombre (string): El nombre del elemento
+            email (string): El email del elemento
+            usuario (string): El usuario del login
+            password (string): El nombre de clave favorita del elemento
+            url (string): El URL del login
+            notas (string): Las notas del elemento
+        '''
+        self._editar_login(self._elemento_por_posicion(id), nombre, email, usuario, password, url, notas)
 
-        total_claves=self.caja.claves.count()
+    def editar_login_por_id(self, id: int, nombre: str, email: str, usuario: str, password: str, url: str, notas: str):
+        ''' Edita un elemento login
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar
+            nombre (string): El nombre del elemento
+            email (string): El email del elemento
+            usuario (string): El usuario del login
+            password (string): El nombre de clave favorita del elemento
+            url (string): El URL del login
+            notas (string): Las notas del elemento
+        '''
+        self._editar_login(self._elemento_por_id(id), nombre, email, usuario, password, url, notas)
 
-        if total_claves== 0:
-            sc=1.0
-        else:
-            sc= seguras/total_claves
-        
-        return TipoReporte(
-            logins=self.caja.elementos.filter(Elemento.tipo == "Login").count() ,
-            ids=numero_ids,
-            tarjetas=numero_tarjetas,
-            secretos=self.caja.elementos.filter(Elemento.tipo == "Secreto").count(),
-            inseguras=total_claves-seguras,
-            avencer=elementos_avencer,
-            masdeuna=repetida,
-            nivel=0.5*sc+0.2*v+0.3*r
-        ) 
-        
-    def validar_crear_editar_tarjeta(self, id: int, nombre_elemento: str, numero: str, titular: str, fvencimiento: str, ccv: str, clave: str, direccion: str, telefono: str, notas: str):
+    def dar_reporte_seguridad(self, dias_por_vencer: int = ResumenReporte.DIAS_POR_VENCER) -> TipoReporte:
+        ''' Genera la información para el reporte de seguridad
+        Parámetros:
+            dias_por_vencer (int): Los elementos que vencen antes de hoy más estos días cuentan como a vencer
+        Retorna:
+            (dict): Un mapa con los valores numéricos para las llaves logins, ids, tarjetas,
+            secretos, inseguras, avencer, masdeuna y nivel que conforman el reporte
+        '''
+        # El reporte se lee del resumen que se actualiza en cada flush (ver ResumenReporte)
+        limite_vencimiento = datetime.today().date() + timedelta(days=dias_por_vencer)
+        return self._leer(("dar_reporte_seguridad", limite_vencimiento),
+            lambda: ResumenReporte.dar_reporte(self.session, self._caja_id, limite_vencimiento))
+
+    def dar_elementos_por_vencer(self, desde: date = None, hasta: date = None) -> List[TipoElemento]:
+        ''' Retorna las tarjetas y las identificaciones que vencen en un rango de fechas
+        Parámetros:
+            desde (date): La primera fecha del rango; None para incluir también los elementos ya vencidos
+            hasta (date): La fecha (excluida) en la que termina el rango; None para no limitarlo
+        Retorna:
+            (list): La lista con los dict de los elementos, ordenada por fecha de vencimiento y nombre
+        '''
+        listado = ListadoElemento.__table__
+        union = ResumenReporte.vencimientos(desde, hasta)
+        consulta = (select([listado])
+            .select_from(union.join(listado, listado.c.id == union.c.id))
+            .where(listado.c.caja_id == self._caja_id)
+            .order_by(union.c.vencimiento, listado.c.nombre))
+        return self._leer(("dar_elementos_por_vencer", desde, hasta),
+            lambda: [self.mapear_fila_listado(fila) for fila in self.session.execute(consulta)])
+
+    def dar_histograma_vencimientos(self, cortes: Iterable[int] = ResumenReporte.CORTES_VENCIMIENTO) -> Dict[int, int]:
+        ''' Cuenta las tarjetas y las identificaciones que vencen antes de varios horizontes
+        Parámetros:
+            cortes (iterable): Los horizontes en días a partir de hoy, por ejemplo (30, 60, 90, 365)
+        Retorna:
+            (dict): Por cada corte, la cantidad de elementos (vencidos o no) que vencen antes de hoy más esos días;
+            el corte de dar_reporte_seguridad tiene el mismo valor que avencer
+        '''
+        cortes = tuple(sorted(set(cortes)))
+        hoy = datetime.today().date()
+        return self._leer(("dar_histograma_vencimientos", hoy, cortes),
+            lambda: ResumenReporte.dar_histograma_vencimientos(self.session, self._caja_id, hoy, cortes))
+
+    def dar_estadisticas_cache(self) -> dict:
+        ''' Retorna las estadísticas del cache de lecturas
+        Retorna:
+            (dict): Los aciertos, fallos, la cantidad de resultados guardados y la versión de la caja
+        '''
+        return self.cache.dar_estadisticas()
+
+    def verificar_resumen_reporte(self, reparar: bool = True) -> bool:
+        ''' Compara el resumen del reporte de seguridad con las tablas base
+        Parámetros:
+            reparar (bool): Si es True y el resumen no es consistente, se reconstruye a partir de las tablas base
+        Retorna:
+            (bool): True si el resumen era consistente
+        '''
+        consistente = ResumenReporte.verificar_resumen(self.session, self.caja.id, reparar)
+        self._confirmar()
+        return consistente
+
+    def _validar_crear_editar_tarjeta(self, nombre_actual: str, nombre_elemento: str, numero: str, titular: str, fvencimiento: str, ccv: str, clave: str, direccion: str, telefono: str, notas: str, nombres: set = None, claves: set = None):
         ''' Valida que una tarjeta se pueda crear o editar
         Parámetros:
-            id (int): El identificador del elemento a editar o -1 en case de crear un nuevo elemento
+            nombre_actual (string): El nombre actual del elemento a editar o None en caso de crear
             nombre_elemento (string): El nombre del elemento
             numero (string): El número del elemento
             titular (string): El nombre del titular de la tarjeta
@@ -429,59 +1155,67 @@ class LogicaCaja(FachadaCajaDeSeguridad):
             direccion (string): La dirección del titular de la tarjeta
             telefono (string): El número de teléfono del titular de la tarjeta
             notas (string): Las notas del elemento
+            nombres (set): Los nombres de los elementos existentes o None para consultarlos en la base de datos
+            claves (set): Los nombres de las claves favoritas existentes o None para consultarlos en la base de datos
         Retorna:
             (string): El mensaje de error generado al presentarse errores en la 
             validación o una cadena de caracteres vacía si no hay errores.
         '''
-        if len(nombre_elemento) < 1:
-            return "El nombre no debe tener menos de 1 caracter"
-        if len(nombre_elemento) > 255:
-            return "El nombre no debe tener más de 255 caracteres"
-        if len(titular) < 3:
-            return "El titular no debe tener menos de 3 caracteres"
-        if len(titular) > 255:
-            return "El titular no debe tener más de 255 caracteres"
-        if not re.match("^[A-ZÑÁÉÓÚÍÜ ]+$", titular):
-            return "El titular debe contener solo mayúsculas y espacios"
-        if len(notas) < 3:
-            return "Las notas no deben tener menos de 3 caracteres"
-        if len(notas) > 512:
-            return "Las notas no deben tener más de 512 caracteres"
-        if not re.match("^[0-9]+$", numero):
-            return "El número sólo debe contener dígitos"
-        if len(numero) < 3:
-            return "El número no debe tener menos de 3 dígitos"
-        if len(numero) > 255:
-            return "El número no debe tener más de 255 dígitos"
-        if not re.match("^[0-9]+$", ccv):
-            return "El CCV sólo debe contener dígitos"
-        if len(ccv) < 3:
-            return "El CCV no debe tener menos de 3 dígitos"
-        if len(ccv) > 4:
-            return "El CCV no debe tener más de 4 dígitos"
-        if not re.match("^\d{4}-([0]\d|1[0-2])-([0-2]\d|3[01])$", fvencimiento):
-            return "La fecha de vencimiento debe tener el formato YYYY-MM-DD, por ejemplo 2023-01-28"
-        if len(telefono) < 3:
-            return "El teléfono no debe tener menos de 3 caracteres"
-        if len(telefono) > 255:
-            return "El teléfono no debe tener más de 255 caracteres"
-        if not re.match("^(\(\+?\d+\)|\+?[\d A-Z]*)[\d A-Z]*(\([\d A-Z]+\))*[\d A-Z]*$", telefono):
-            return "El teléfono deber contener un número de teléfono, por ejemplo +57 (606) 7422736"
-        if len(direccion) < 3:
-            return "La dirección no debe tener menos de 3 caracteres"
-        if len(direccion) > 255:
-            return "La dirección no debe tener más de 255 caracteres"
-        if self.caja.claves.filter(ClaveFavorita.nombre==clave).count() < 1:
-            return "Debe tener asignado una clave favorita"
+        error = Validacion.validar(Validacion.TARJETA, dict(nombre_elemento=nombre_elemento, numero=numero, titular=titular,
+            fecha_venc=fvencimiento, ccv=ccv, direccion=direccion, telefono=telefono, notas=notas))
+        if error:
+            return error
+        if not self._existe_clave(clave, claves):
+            return ERROR_SIN_CLAVE
         
         # Si estamos creando o si estamos editanto y el nombre de la tarjeta ha cambiado, tenemos que comprabar que un elemento con este nombre aun no existe
-        comprabar_nombre = (id == -1) or (nombre_elemento != self.dar_elemento(id)["nombre_elemento"])
+        comprabar_nombre = (nombre_actual is None) or (nombre_elemento != nombre_actual)
 
-        if comprabar_nombre and (self.caja.elementos.filter(Elemento.nombre==nombre_elemento).count() > 0):
-            return "Ya existe un elemento con este nombre"
+        if comprabar_nombre and self._existe_elemento(nombre_elemento, nombres):
+            return ERROR_NOMBRE_REPETIDO
 
         return ""
 
+    def validar_crear_editar_tarjeta(self, id: int, nombre_elemento: str, numero: str, titular: str, fvencimiento: str, ccv: str, clave: str, direccion: str, telefono: str, notas: str):
+        ''' Valida que una tarjeta se pueda crear o editar
+        Parámetros:
+            id (int): El identificador del elemento a editar o -1 en case de crear un nuevo elemento
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            titular (string): El nombre del titular de la tarjeta
+            fvencimiento (string): La fecha de vencimiento en la tarjeta
+            ccv (string): El código de seguridad en la tarjeta
+            clave (string): El nombre de clave favorita del elemento
+            direccion (string): La dirección del titular de la tarjeta
+            telefono (string): El número de teléfono del titular de la tarjeta
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        nombre_actual = None if id == -1 else self._elemento_por_posicion(id).nombre
+        return self._validar_crear_editar_tarjeta(nombre_actual, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas)
+
+    def validar_crear_editar_tarjeta_por_id(self, id: int, nombre_elemento: str, numero: str, titular: str, fvencimiento: str, ccv: str, clave: str, direccion: str, telefono: str, notas: str):
+        ''' Valida que una tarjeta se pueda crear o editar
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            titular (string): El nombre del titular de la tarjeta
+            fvencimiento (string): La fecha de vencimiento en la tarjeta
+            ccv (string): El código de seguridad en la tarjeta
+            clave (string): El nombre de clave favorita del elemento
+            direccion (string): La dirección del titular de la tarjeta
+            telefono (string): El número de teléfono del titular de la tarjeta
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        nombre_actual = None if id == -1 else self._elemento_por_id(id).nombre
+        return self._validar_crear_editar_tarjeta(nombre_actual, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas)
+
     def crear_tarjeta(self, nombre_elemento: str, numero: str, titular: str, fvencimiento: str, ccv: str, clave: str, direccion: str, telefono: str, notas: str):
         ''' Crea un elemento tarjeta
         Parámetros:
@@ -507,7 +1241,33 @@ class LogicaCaja(FachadaCajaDeSeguridad):
         t.nota = notas
 
         self.caja.elementos.append(t)
-        self.session.commit()
+        self._confirmar()
+
+    def _editar_tarjeta(self, elemento: Tarjeta, nombre_elemento: str, numero: str, titular: str, fvencimiento: str, ccv: str, clave: str, direccion: str, telefono: str, notas: str):
+        ''' Edita un elemento tarjeta
+        Parámetros:
+            elemento (Tarjeta): El elemento a editar
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            titular (string): El nombre del titular de la tarjeta
+            fvencimiento (string): La feha de vencimiento en la tarjeta
+            ccv (string): El código de seguridad en la tarjeta
+            clave (string): El nombre de clave favorita del elemento
+            direccion (string): La dirección del titular de la tarjeta
+            telefono (string): El número de teléfono del titular de la tarjeta
+            notas (string): Las notas del elemento
+        '''
+        elemento.nombre = nombre_elemento
+        elemento.numero = numero
+        elemento.titular = titular
+        elemento.vencimiento = datetime.strptime(fvencimiento, "%Y-%m-%d").date()
+        elemento.codigo_seguridad = ccv
+        elemento.clave = self.caja.claves.filter(ClaveFavorita.nombre==clave).first()
+        elemento.direccion = direccion
+        elemento.telefono = telefono
+        elemento.nota = notas
+
+        self._confirmar()
 
     def editar_tarjeta(self, id: int, nombre_elemento: str, numero: str, titular: str, fvencimiento: str, ccv: str, clave: str, direccion: str, telefono: str, notas: str):
         ''' Edita un elemento tarjeta
@@ -523,23 +1283,28 @@ class LogicaCaja(FachadaCajaDeSeguridad):
             telefono (string): El número de teléfono del titular de la tarjeta
             notas (string): Las notas del elemento
         '''
-        t = self.caja.elementos.order_by(Elemento.nombre).offset(id).first()
-        t.nombre = nombre_elemento
-        t.numero = numero
-        t.titular = titular
-        t.vencimiento = datetime.strptime(fvencimiento, "%Y-%m-%d").date()
-        t.codigo_seguridad = ccv
-        t.clave = self.caja.claves.filter(ClaveFavorita.nombre==clave).first()
-        t.direccion = direccion
-        t.telefono = telefono
-        t.nota = notas
+        self._editar_tarjeta(self._elemento_por_posicion(id), nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas)
 
-        self.session.commit()
+    def editar_tarjeta_por_id(self, id: int, nombre_elemento: str, numero: str, titular: str, fvencimiento: str, ccv: str, clave: str, direccion: str, telefono: str, notas: str):
+        ''' Edita un elemento tarjeta
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            titular (string): El nombre del titular de la tarjeta
+            fvencimiento (string): La feha de vencimiento en la tarjeta
+            ccv (string): El código de seguridad en la tarjeta
+            clave (string): El nombre de clave favorita del elemento
+            direccion (string): La dirección del titular de la tarjeta
+            telefono (string): El número de teléfono del titular de la tarjeta
+            notas (string): Las notas del elemento
+        '''
+        self._editar_tarjeta(self._elemento_por_id(id), nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas)
 
-    def validar_crear_editar_id(self, id: int, nombre_elemento: str, numero: str, nombre_completo: str, fnacimiento: str, fexpedicion: str, fvencimiento: str, notas: str):
+    def _validar_crear_editar_id(self, nombre_actual: str, nombre_elemento: str, numero: str, nombre_completo: str, fnacimiento: str, fexpedicion: str, fvencimiento: str, notas: str, nombres: set = None, especificacion: list = Validacion.IDENTIFICACION):
         ''' Valida que una identificación se pueda crear o editar
         Parámetros:
-            id (int): El identificador del elemento a editar o -1 en case de crear un nuevo elemento
+            nombre_actual (string): El nombre actual del elemento a editar o None en caso de crear
             nombre_elemento (string): El nombre del elemento
             numero (string): El número del elemento
             nombre_completo (string): El nombre completo de la persona en la identificación
@@ -547,42 +1312,60 @@ class LogicaCaja(FachadaCajaDeSeguridad):
             fexpedicion (string): La fecha de expedición en la identificación
             fvencimiento (string): La feha de vencimiento en la identificación
             notas (string): Las notas del elemento
+            nombres (set): Los nombres de los elementos existentes o None para consultarlos en la base de datos
+            especificacion (list): Las reglas de los campos; IDENTIFICACION_IMPORTADA acepta fechas vacías
         Retorna:
             (string): El mensaje de error generado al presentarse errores en la 
             validación o una cadena de caracteres vacía si no hay errores.
         '''
-        if len(nombre_elemento) < 1:
-            return "El nombre no debe tener menos de 1 caracter"
-        if len(nombre_elemento) > 255:
-            return "El nombre no debe tener más de 255 caracteres"
-        if len(notas) < 3:
-            return "Las notas no deben tener menos de 3 caracteres"
-        if len(notas) > 512:
-            return "Las notas no deben tener más de 512 caracteres"
-        if len(nombre_completo) < 3:
-            return "El nombre completo no debe tener menos de 3 caracteres"
-        if len(nombre_completo) > 255:
-            return "El nombre completo no debe tener más de 255 caracteres"
-        if not re.match("^[0-9]+$", numero):
-            return "El número sólo debe contener dígitos"
-        if len(numero) < 3:
-            return "El número no debe tener menos de 3 dígitos"
-        if len(numero) > 20:
-            return "El número no debe tener más de 20 dígitos"
-        if not re.match("^\d{4}-([0]\d|1[0-2])-([0-2]\d|3[01])$", fvencimiento):
-            return "La fecha de vencimiento debe tener el formato YYYY-MM-DD, por ejemplo 2023-01-28"
-        if not re.match("^\d{4}-([0]\d|1[0-2])-([0-2]\d|3[01])$", fexpedicion):
-            return "La fecha de expedición debe tener el formato YYYY-MM-DD, por ejemplo 2023-01-28"
-        if not re.match("^\d{4}-([0]\d|1[0-2])-([0-2]\d|3[01])$", fnacimiento):
-            return "La fecha de nacimiento debe tener el formato YYYY-MM-DD, por ejemplo 2023-01-28"
+        error = Validacion.validar(especificacion, dict(nombre_elemento=nombre_elemento, numero=numero, nombre=nombre_completo,
+            fecha_nacimiento=fnacimiento, fecha_exp=fexpedicion, fecha_venc=fvencimiento, notas=notas))
+        if error:
+            return error
         
         # Si estamos creando o si estamos editanto y el nombre de la clave ha cambiado, tenemos que comprabar que una clave con este nombre aun no existe
-        comprabar_nombre = (id == -1) or (nombre_elemento != self.dar_elemento(id)["nombre_elemento"])
+        comprabar_nombre = (nombre_actual is None) or (nombre_elemento != nombre_actual)
 
-        if comprabar_nombre and (self.caja.elementos.filter(Elemento.nombre==nombre_elemento).count() > 0):
-            return "Ya existe un elemento con este nombre"
+        if comprabar_nombre and self._existe_elemento(nombre_elemento, nombres):
+            return ERROR_NOMBRE_REPETIDO
         return ""
 
+    def validar_crear_editar_id(self, id: int, nombre_elemento: str, numero: str, nombre_completo: str, fnacimiento: str, fexpedicion: str, fvencimiento: str, notas: str):
+        ''' Valida que una identificación se pueda crear o editar
+        Parámetros:
+            id (int): El identificador del elemento a editar o -1 en case de crear un nuevo elemento
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            nombre_completo (string): El nombre completo de la persona en la identificación
+            fnacimiento (string): La fecha de nacimiento de la persona en la identificación
+            fexpedicion (string): La fecha de expedición en la identificación
+            fvencimiento (string): La feha de vencimiento en la identificación
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        nombre_actual = None if id == -1 else self._elemento_por_posicion(id).nombre
+        return self._validar_crear_editar_id(nombre_actual, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas)
+
+    def validar_crear_editar_id_por_id(self, id: int, nombre_elemento: str, numero: str, nombre_completo: str, fnacimiento: str, fexpedicion: str, fvencimiento: str, notas: str):
+        ''' Valida que una identificación se pueda crear o editar
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            nombre_completo (string): El nombre completo de la persona en la identificación
+            fnacimiento (string): La fecha de nacimiento de la persona en la identificación
+            fexpedicion (string): La fecha de expedición en la identificación
+            fvencimiento (string): La feha de vencimiento en la identificación
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        nombre_actual = None if id == -1 else self._elemento_por_id(id).nombre
+        return self._validar_crear_editar_id(nombre_actual, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas)
+
     def crear_id(self, nombre_elemento: str , numero: str, nombre_completo: str, fnacimiento: str, fexpedicion: str, fvencimiento: str, notas: str):
         ''' Crea un elemento identificación
         Parámetros:
@@ -603,11 +1386,12 @@ class LogicaCaja(FachadaCajaDeSeguridad):
         i.expedicion = datetime.strptime(fexpedicion, "%Y-%m-%d").date()
         i.vencimiento = datetime.strptime(fvencimiento, "%Y-%m-%d").date()
         self.caja.elementos.append(i)
-        self.session.commit()
+        self._confirmar()
 
-    def editar_id(self, id: int, nombre_elemento: str, numero: str, nombre_completo: str, fnacimiento: str, fexpedicion: str, fvencimiento: str, notas: str):
+    def _editar_id(self, elemento: Identificacion, nombre_elemento: str, numero: str, nombre_completo: str, fnacimiento: str, fexpedicion: str, fvencimiento: str, notas: str):
         ''' Edita un elemento identificación
         Parámetros:
+            elemento (Identificacion): El elemento a editar
             nombre_elemento (string): El nombre del elemento
             numero (string): El número del elemento
             nombre_completo (string): El nombre completo de la persona en la identificación
@@ -616,51 +1400,100 @@ class LogicaCaja(FachadaCajaDeSeguridad):
             fvencimiento (string): La feha de vencimiento en la identificación
             notas (string): Las notas del elemento
         '''
-        i = self.caja.elementos.order_by(Elemento.nombre).offset(id).first()
-        i.nombre = nombre_elemento
-        i.nota = notas
-        i.numero = numero
-        i.nombre_completo = nombre_completo
-        i.nacimiento = datetime.strptime(fnacimiento, "%Y-%m-%d").date()
-        i.expedicion = datetime.strptime(fexpedicion, "%Y-%m-%d").date()
-        i.vencimiento = datetime.strptime(fvencimiento, "%Y-%m-%d").date()
+        elemento.nombre = nombre_elemento
+        elemento.nota = notas
+        elemento.numero = numero
+        elemento.nombre_completo = nombre_completo
+        elemento.nacimiento = datetime.strptime(fnacimiento, "%Y-%m-%d").date()
+        elemento.expedicion = datetime.strptime(fexpedicion, "%Y-%m-%d").date()
+        elemento.vencimiento = datetime.strptime(fvencimiento, "%Y-%m-%d").date()
         
-        self.session.commit()
+        self._confirmar()
 
-    def validar_crear_editar_secreto(self, id: int, nombre: str, secreto: str, clave: str, notas: str):
+    def editar_id(self, id: int, nombre_elemento: str, numero: str, nombre_completo: str, fnacimiento: str, fexpedicion: str, fvencimiento: str, notas: str):
+        ''' Edita un elemento identificación
+        Parámetros:
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            nombre_completo (string): El nombre completo de la persona en la identificación
+            fnacimiento (string): La fecha de nacimiento de la persona en la identificación
+            fexpedicion (string): La fecha de expedición en la identificación
+            fvencimiento (string): La feha de vencimiento en la identificación
+            notas (string): Las notas del elemento
+        '''
+        self._editar_id(self._elemento_por_posicion(id), nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas)
+
+    def editar_id_por_id(self, id: int, nombre_elemento: str, numero: str, nombre_completo: str, fnacimiento: str, fexpedicion: str, fvencimiento: str, notas: str):
+        ''' Edita un elemento identificación
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            nombre_completo (string): El nombre completo de la persona en la identificación
+            fnacimiento (string): La fecha de nacimiento de la persona en la identificación
+            fexpedicion (string): La fecha de expedición en la identificación
+            fvencimiento (string): La feha de vencimiento en la identificación
+            notas (string): Las notas del elemento
+        '''
+        self._editar_id(self._elemento_por_id(id), nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas)
+
+    def _validar_crear_editar_secreto(self, nombre_actual: str, nombre: str, secreto: str, clave: str, notas: str, nombres: set = None, claves: set = None):
         ''' Valida que se pueda crear o editar un elemento secreto
         Parámetros:
-            id (int): El identificador del elemento a editar o -1 en case de crear un nuevo elemento
+            nombre_actual (string): El nombre actual del elemento a editar o None en caso de crear
             nombre (string): El nombre del elemento
             secreto (string): El secreto del elemento
             clave (string): El nombre de clave favorita del elemento
             notas (string): Las notas del elemento
+            nombres (set): Los nombres de los elementos existentes o None para consultarlos en la base de datos
+            claves (set): Los nombres de las claves favoritas existentes o None para consultarlos en la base de datos
         Retorna:
             (string): El mensaje de error generado al presentarse errores en la 
             validación o una cadena de caracteres vacía si no hay errores.
         '''
-        if len(nombre) < 1:
-            return "El nombre no debe tener menos de 1 caracter"
-        if len(nombre) > 255:
-            return "El nombre no debe tener más de 255 caracteres"
-        if len(notas) < 3:
-            return "Las notas no deben tener menos de 3 caracteres"
-        if len(notas) > 512:
-            return "Las notas no deben tener más de 512 caracteres"
-        if len(secreto) < 3:
-            return "El secreto no debe tener menos de 3 caracteres"
-        if len(secreto) > 255:
-            return "El secreto no debe tener más de 255 caracteres"
-        if self.caja.claves.filter(ClaveFavorita.nombre==clave).count() < 1:
-            return "Debe tener asignado una clave favorita"
+        error = Validacion.validar(Validacion.SECRETO, dict(nombre_elemento=nombre, secreto=secreto, notas=notas))
+        if error:
+            return error
+        if not self._existe_clave(clave, claves):
+            return ERROR_SIN_CLAVE
 
         # Si estamos creando o si estamos editanto y el nombre de la clave ha cambiado, tenemos que comprabar que una clave con este nombre aun no existe
-        comprabar_nombre = (id == -1) or (nombre != self.dar_elemento(id)["nombre_elemento"])
+        comprabar_nombre = (nombre_actual is None) or (nombre != nombre_actual)
 
-        if comprabar_nombre and (self.caja.elementos.filter(Elemento.nombre==nombre).count() > 0):
-            return "Ya existe un elemento con este nombre"
+        if comprabar_nombre and self._existe_elemento(nombre, nombres):
+            return ERROR_NOMBRE_REPETIDO
         return ""
 
+    def validar_crear_editar_secreto(self, id: int, nombre: str, secreto: str, clave: str, notas: str):
+        ''' Valida que se pueda crear o editar un elemento secreto
+        Parámetros:
+            id (int): El identificador del elemento a editar o -1 en case de crear un nuevo elemento
+            nombre (string): El nombre del elemento
+            secreto (string): El secreto del elemento
+            clave (string): El nombre de clave favorita del elemento
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        nombre_actual = None if id == -1 else self._elemento_por_posicion(id).nombre
+        return self._validar_crear_editar_secreto(nombre_actual, nombre, secreto, clave, notas)
+
+    def validar_crear_editar_secreto_por_id(self, id: int, nombre: str, secreto: str, clave: str, notas: str):
+        ''' Valida que se pueda crear o editar un elemento secreto
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre (string): El nombre del elemento
+            secreto (string): El secreto del elemento
+            clave (string): El nombre de clave favorita del elemento
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        nombre_actual = None if id == -1 else self._elemento_por_id(id).nombre
+        return self._validar_crear_editar_secreto(nombre_actual, nombre, secreto, clave, notas)
+
     def crear_secreto(self, nombre: str, secreto: str, clave: str, notas: str):
         ''' Crea un elemento secreto
         Parámetros:
@@ -675,7 +1508,22 @@ class LogicaCaja(FachadaCajaDeSeguridad):
         s.secreto = secreto
         s.clave = self.caja.claves.filter(ClaveFavorita.nombre==clave).first()
         self.caja.elementos.append(s)
-        self.session.commit()
+        self._confirmar()
+
+    def _editar_secreto(self, elemento: Secreto, nombre: str, secreto: str, clave: str, notas: str):
+        ''' Edita un elemento secreto
+        Parámetros:
+            elemento (Secreto): El elemento a editar
+            nombre (string): El nombre del elemento
+            secreto (string): El secreto del elemento
+            clave (string): El nombre de clave favorita del elemento
+            notas (string): Las notas del elemento
+        '''
+        elemento.nombre = nombre
+        elemento.nota = notas
+        elemento.secreto = secreto
+        elemento.clave = self.caja.claves.filter(ClaveFavorita.nombre==clave).first()
+        self._confirmar()
 
     def editar_secreto(self, id: int, nombre: str, secreto: str, clave: str, notas: str):
         ''' Edita un elemento secreto
@@ -686,9 +1534,390 @@ class LogicaCaja(FachadaCajaDeSeguridad):
             clave (string): El nombre de clave favorita del elemento
             notas (string): Las notas del elemento
         '''
-        s = self.caja.elementos.order_by(Elemento.nombre).offset(id).first()
-        s.nombre = nombre
-        s.nota = notas
-        s.secreto = secreto
-        s.clave = self.caja.claves.filter(ClaveFavorita.nombre==clave).first()
-        self.session.commit()
+        self._editar_secreto(self._elemento_por_posicion(id), nombre, secreto, clave, notas)
+
+    def editar_secreto_por_id(self, id: int, nombre: str, secreto: str, clave: str, notas: str):
+        ''' Edita un elemento secreto
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar
+            nombre (string): El nombre del elemento
+            secreto (string): El secreto del elemento
+            clave (string): El nombre de clave favorita del elemento
+            notas (string): Las notas del elemento
+        '''
+        self._editar_secreto(self._elemento_por_id(id), nombre, secreto, clave, notas)
+
+    def _guardar_elemento(self, id: int, clase, nombre_clave: str, valores: dict) -> str:
+        ''' Crea o edita un elemento ya validado, sin consultar antes si su nombre existe: la restricción
+        unique de elemento.nombre lo comprueba al escribir
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            clase (type): La clase del modelo del elemento (Login, Tarjeta, Identificacion o Secreto)
+            nombre_clave (string): El nombre de la clave favorita del elemento o None si no tiene
+            valores (dict): Los valores de los atributos del modelo a asignar
+        Retorna:
+            (string): El mensaje de error o una cadena de caracteres vacía si el elemento se guardó
+        '''
+        # La clave y el elemento se leen antes de asignar los valores, así el autoflush no escribe a medias.
+        # Se filtra por _caja_id para no recargar la caja, que expira con cada commit
+        if nombre_clave is not None:
+            clave_id = self.session.query(ClaveFavorita.id).filter(
+                ClaveFavorita.caja_id == self._caja_id, ClaveFavorita.nombre == nombre_clave).scalar()
+            if clave_id is None:
+                return ERROR_SIN_CLAVE
+            valores = dict(valores, clave_id=clave_id)
+
+        if id == -1:
+            elemento = clase(caja_id=self._caja_id)
+            self.session.add(elemento)
+        else:
+            # La consulta de la clase une la tabla del subtipo: un id de otro tipo de elemento tampoco existe
+            elemento = self.session.query(clase).filter(clase.id == id, clase.caja_id == self._caja_id).first()
+            if elemento is None:
+                return ERROR_ELEMENTO_INEXISTENTE
+        for (atributo, valor) in valores.items():
+            setattr(elemento, atributo, valor)
+        return self._confirmar_nombre_unico()
+
+    def guardar_login(self, id: int, nombre: str, email: str, usuario: str, password: str, url: str, notas: str) -> str:
+        ''' Valida y crea o edita un login; el nombre repetido y la clave favorita se comprueban al escribir
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre (string): El nombre del elemento
+            email (string): El email del elemento
+            usuario (string): El usuario del login
+            password (string): El nombre de clave favorita del elemento
+            url (string): El URL del login
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la
+            validación o una cadena de caracteres vacía si el login se guardó.
+        '''
+        # Con conjuntos en lugar de consultas la validación sólo revisa los campos
+        error = self._validar_crear_editar_login(None, nombre, email, usuario, password, url, notas, set(), {password})
+        if error:
+            return error
+        return self._guardar_elemento(id, Login, password, dict(nombre=nombre, email=email, usuario=usuario, url=url, nota=notas))
+
+    def guardar_tarjeta(self, id: int, nombre_elemento: str, numero: str, titular: str, fvencimiento: str, ccv: str, clave: str, direccion: str, telefono: str, notas: str) -> str:
+        ''' Valida y crea o edita una tarjeta; el nombre repetido y la clave favorita se comprueban al escribir
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            titular (string): El nombre del titular de la tarjeta
+            fvencimiento (string): La fecha de vencimiento en la tarjeta
+            ccv (string): El código de seguridad en la tarjeta
+            clave (string): El nombre de clave favorita del elemento
+            direccion (string): La dirección del titular de la tarjeta
+            telefono (string): El número de teléfono del titular de la tarjeta
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la
+            validación o una cadena de caracteres vacía si la tarjeta se guardó.
+        '''
+        error = self._validar_crear_editar_tarjeta(None, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas, set(), {clave})
+        if error:
+            return error
+        return self._guardar_elemento(id, Tarjeta, clave, dict(nombre=nombre_elemento, numero=numero, titular=titular,
+            vencimiento=datetime.strptime(fvencimiento, "%Y-%m-%d").date(), codigo_seguridad=ccv, direccion=direccion,
+            telefono=telefono, nota=notas))
+
+    def guardar_id(self, id: int, nombre_elemento: str, numero: str, nombre_completo: str, fnacimiento: str, fexpedicion: str, fvencimiento: str, notas: str) -> str:
+        ''' Valida y crea o edita una identificación; el nombre repetido se comprueba al escribir
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre_elemento (string): El nombre del elemento
+            numero (string): El número del elemento
+            nombre_completo (string): El nombre completo de la persona en la identificación
+            fnacimiento (string): La fecha de nacimiento de la persona en la identificación
+            fexpedicion (string): La fecha de expedición en la identificación
+            fvencimiento (string): La feha de vencimiento en la identificación
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la
+            validación o una cadena de caracteres vacía si la identificación se guardó.
+        '''
+        error = self._validar_crear_editar_id(None, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas, set())
+        if error:
+            return error
+        return self._guardar_elemento(id, Identificacion, None, dict(nombre=nombre_elemento, nota=notas, numero=numero,
+            nombre_completo=nombre_completo, nacimiento=datetime.strptime(fnacimiento, "%Y-%m-%d").date(),
+            expedicion=datetime.strptime(fexpedicion, "%Y-%m-%d").date(),
+            vencimiento=datetime.strptime(fvencimiento, "%Y-%m-%d").date()))
+
+    def guardar_secreto(self, id: int, nombre: str, secreto: str, clave: str, notas: str) -> str:
+        ''' Valida y crea o edita un secreto; el nombre repetido y la clave favorita se comprueban al escribir
+        Parámetros:
+            id (int): El id en la base de datos del elemento a editar o -1 en caso de crear
+            nombre (string): El nombre del elemento
+            secreto (string): El secreto del elemento
+            clave (string): El nombre de clave favorita del elemento
+            notas (string): Las notas del elemento
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la
+            validación o una cadena de caracteres vacía si el secreto se guardó.
+        '''
+        error = self._validar_crear_editar_secreto(None, nombre, secreto, clave, notas, set(), {clave})
+        if error:
+            return error
+        return self._guardar_elemento(id, Secreto, clave, dict(nombre=nombre, nota=notas, secreto=secreto))
+
+    def guardar_clave(self, id: int, nombre: str, clave: str, pista: str) -> str:
+        ''' Valida y crea o edita una clave favorita; el nombre repetido se comprueba al escribir
+        Parámetros:
+            id (int): El id en la base de datos de la clave favorita a editar o -1 en caso de crear
+            nombre (string): El nombre de la clave favorita
+            clave (string): El password o clae de la clave favorita
+            pista (string): La pista para recordar la clave favorita
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la
+            validación o una cadena de caracteres vacía si la clave favorita se guardó.
+        '''
+        error = self._validar_crear_editar_clave(None, nombre, clave, pista, set())
+        if error:
+            return error
+
+        if id == -1:
+            clave_favorita = ClaveFavorita(caja_id=self._caja_id)
+            self.session.add(clave_favorita)
+        else:
+            clave_favorita = self.session.query(ClaveFavorita).filter(
+                ClaveFavorita.id == id, ClaveFavorita.caja_id == self._caja_id).first()
+            if clave_favorita is None:
+                return ERROR_CLAVE_INEXISTENTE
+        clave_favorita.nombre = nombre
+        clave_favorita.clave = clave
+        clave_favorita.pista = pista
+        return self._confirmar_nombre_unico()
+
+    def _validar_registro(self, registro: TipoElemento, nombres: set, claves: set, fechas_opcionales: bool = False) -> str:
+        ''' Valida un elemento a crear en lote con las mismas reglas de los métodos validar_crear_editar_*
+        Parámetros:
+            registro (dict): El elemento a crear, con las llaves que retorna dar_elemento
+            nombres (set): Los nombres de los elementos existentes
+            claves (set): Los nombres de las claves favoritas existentes
+            fechas_opcionales (bool): Si es True las fechas de las identificaciones pueden quedar vacías
+        Retorna:
+            (string): El mensaje de error generado al presentarse errores en la 
+            validación o una cadena de caracteres vacía si no hay errores.
+        '''
+        campo = lambda llave: valor_texto(registro, llave)
+        tipo = registro.get("tipo")
+        if tipo == "Login":
+            return self._validar_crear_editar_login(None, campo("nombre_elemento"), campo("email"), campo("usuario"),
+                campo("clave"), campo("url"), campo("notas"), nombres, claves)
+        if tipo == "Tarjeta":
+            return self._validar_crear_editar_tarjeta(None, campo("nombre_elemento"), campo("numero"), campo("titular"),
+                campo("fecha_venc"), campo("ccv"), campo("clave"), campo("direccion"), campo("telefono"), campo("notas"), nombres, claves)
+        if tipo == "Identificación":
+            return self._validar_crear_editar_id(None, campo("nombre_elemento"), campo("numero"), campo("nombre"),
+                campo("fecha_nacimiento"), campo("fecha_exp"), campo("fecha_venc"), campo("notas"), nombres,
+                Validacion.IDENTIFICACION_IMPORTADA if fechas_opcionales else Validacion.IDENTIFICACION)
+        if tipo == "Secreto":
+            return self._validar_crear_editar_secreto(None, campo("nombre_elemento"), campo("secreto"), campo("clave"),
+                campo("notas"), nombres, claves)
+        return Validacion.ERROR_TIPO
+
+    def _filas_registro(self, registro: TipoElemento):
+        ''' Arma las filas de la tabla elemento y de la tabla del subtipo de un elemento a crear en lote
+        Parámetros:
+            registro (dict): El elemento a crear, ya validado; las fechas vacías quedan en NULL
+        Retorna:
+            (tuple): La fila de la tabla elemento (sin id) y la fila de la tabla del subtipo, con id en None
+            y clave_id en None para los subtipos con clave favorita
+        '''
+        campo = lambda llave: valor_texto(registro, llave)
+        fecha = lambda llave: datetime.strptime(campo(llave), "%Y-%m-%d").date() if campo(llave) else None
+        tipo = registro["tipo"]
+        fila = dict(tipo=tipo, nombre=campo("nombre_elemento"), nota=campo("notas"), caja_id=self.caja.id)
+        if tipo == "Login":
+            (dominio, host_invertido) = dominios.normalizar(campo("url"))
+            subtipo = dict(email=campo("email"), usuario=campo("usuario"), url=campo("url"), dominio=dominio,
+                           host_invertido=host_invertido, clave_id=None)
+        elif tipo == "Tarjeta":
+            subtipo = dict(numero=campo("numero"), titular=campo("titular"), vencimiento=fecha("fecha_venc"),
+                codigo_seguridad=campo("ccv"), direccion=campo("direccion"), telefono=campo("telefono"), clave_id=None)
+        elif tipo == "Identificación":
+            subtipo = dict(numero=campo("numero"), nombre_completo=campo("nombre"), nacimiento=fecha("fecha_nacimiento"),
+                expedicion=fecha("fecha_exp"), vencimiento=fecha("fecha_venc"))
+        else:
+            subtipo = dict(secreto=campo("secreto"), clave_id=None)
+        subtipo["id"] = None
+        return (fila, subtipo)
+
+    def _nombres_existentes(self, tabla, nombres: List[str]) -> set:
+        ''' Consulta cuáles de unos nombres ya existen en la caja, por partes para no pasar el límite de parámetros
+        Parámetros:
+            tabla (Table): La tabla elemento o clavefavorita
+            nombres (list): Los nombres a buscar
+        Retorna:
+            (set): Los nombres que ya existen en la tabla para la caja
+        '''
+        return TablasDerivadas.existentes(self.session, tabla.c.nombre, set(nombres), tabla.c.caja_id == self._caja_id)
+
+    def _filas_claves(self, registros: List[TipoClaveFavorita]):
+        ''' Valida las claves favoritas a crear en lote y arma sus filas
+        Parámetros:
+            registros (list): Los dict de las claves favoritas a crear, con nombre, clave y pista
+        Retorna:
+            (tuple): Los mensajes de error de cada registro y las filas (sin id) de los registros válidos
+        '''
+        nombres = self._nombres_existentes(ClaveFavorita.__table__, [valor_texto(x, "nombre") for x in registros])
+        errores = []
+        filas = []
+        for registro in registros:
+            (nombre, clave, pista) = (valor_texto(registro, "nombre"), valor_texto(registro, "clave"), valor_texto(registro, "pista"))
+            error = self._validar_crear_editar_clave(None, nombre, clave, pista, nombres)
+            if error == "":
+                filas.append(dict(nombre=nombre, clave=clave, pista=pista, caja_id=self.caja.id))
+                nombres.add(nombre)
+            errores.append(error)
+        return (errores, filas)
+
+    def _insertar_filas(self, tabla, filas: List[dict]) -> List[int]:
+        ''' Inserta filas de la tabla elemento o clavefavorita con una inserción masiva y les asigna el id con el
+        que SQLite las creó, buscándolas por su nombre, que es único
+        Parámetros:
+            tabla (Table): La tabla elemento o clavefavorita
+            filas (list): Las filas a insertar, sin id
+        Retorna:
+            (list): Los ids de las filas insertadas
+        '''
+        self.session.connection().execute(tabla.insert(), filas)
+        ids = dict(TablasDerivadas.filas_con_valores(self.session, [tabla.c.nombre, tabla.c.id], tabla.c.nombre,
+            [x["nombre"] for x in filas], tabla.c.caja_id == self._caja_id))
+        for fila in filas:
+            fila["id"] = ids[fila["nombre"]]
+        return [x["id"] for x in filas]
+
+    def _insertar_claves(self, filas: List[dict]) -> None:
+        ''' Inserta filas de la tabla clavefavorita y actualiza el resumen del reporte
+        Parámetros:
+            filas (list): Las filas a insertar; se les asigna el id
+        '''
+        if not filas:
+            return
+        clavefavorita = ClaveFavorita.__table__
+        ids = self._insertar_filas(clavefavorita, filas)
+        self._cambios_trigramas().extend((self.indice_claves, x["id"], x["nombre"]) for x in filas)
+        for parte in TablasDerivadas.partes(ids):
+            ResumenReporte.aplicar_cambios(self.session,
+                ResumenReporte.contribucion_claves(self.session, clavefavorita.c.id.in_(parte)))
+
+    def crear_claves_lote(self, registros: List[TipoClaveFavorita]) -> List[str]:
+        ''' Crea varias claves favoritas con una inserción masiva y un solo commit
+        Parámetros:
+            registros (list): Los dict de las claves favoritas a crear, con nombre, clave y pista
+        Retorna:
+            (list): Por cada registro, el mensaje de error de la validación o una cadena de caracteres
+            vacía si la clave favorita se creó
+        '''
+        self.session.flush()
+        (errores, filas) = self._filas_claves(registros)
+        self._insertar_claves(filas)
+        self._confirmar()
+        return errores
+
+    def validar_elementos_lote(self, registros: List[TipoElemento]) -> List[List[str]]:
+        ''' Valida varios elementos de cualquier tipo y retorna todos sus errores, sin crearlos. Los campos
+        se validan en memoria con Validacion y sólo al final se consulta la base de datos: una vez (por
+        partes) para los nombres repetidos y otra para las claves favoritas
+        Parámetros:
+            registros (list): Los dict de los elementos, con las llaves que retorna dar_elemento
+        Retorna:
+            (list): Por cada registro, la lista de mensajes de error (el primero de cada campo inválido,
+            luego el nombre repetido y la clave favorita inexistente); vacía si crear_elementos_lote lo crearía
+        '''
+        errores = Validacion.validar_lote(registros)
+        nombres = self._nombres_existentes(Elemento.__table__, [valor_texto(x, "nombre_elemento") for x in registros])
+        claves = self._nombres_existentes(ClaveFavorita.__table__,
+            [valor_texto(x, "clave") for x in registros if x.get("tipo") in TIPOS_CON_CLAVE])
+
+        for (registro, errores_registro) in zip(registros, errores):
+            if registro.get("tipo") not in Validacion.ESPECIFICACIONES:
+                continue
+            nombre = valor_texto(registro, "nombre_elemento")
+            if nombre in nombres:
+                errores_registro.append(ERROR_NOMBRE_REPETIDO)
+            if registro["tipo"] in TIPOS_CON_CLAVE and valor_texto(registro, "clave") not in claves:
+                errores_registro.append(ERROR_SIN_CLAVE)
+            # Como en crear_elementos_lote, un nombre sólo se repite si ya lo tiene un registro válido anterior
+            if not errores_registro:
+                nombres.add(nombre)
+        return errores
+
+    def crear_elementos_lote(self, registros: List[TipoElemento], claves_nuevas: List[TipoClaveFavorita] = None,
+                             fechas_opcionales: bool = False) -> List[str]:
+        ''' Crea varios elementos de cualquier tipo con inserciones masivas y un solo commit
+        Parámetros:
+            registros (list): Los dict de los elementos a crear, con las llaves que retorna dar_elemento
+            claves_nuevas (list): Claves favoritas (nombre, clave y pista) que los registros pueden usar sin
+                que existan todavía; sólo se crean las que usa algún elemento creado
+            fechas_opcionales (bool): Si es True las identificaciones se crean aunque no tengan fechas, como
+                las importadas de programas que no las guardan
+        Retorna:
+            (list): Por cada registro, el mensaje de error de la validación o una cadena de caracteres
+            vacía si el elemento se creó
+        '''
+        elemento = Elemento.__table__
+        self.session.flush()
+
+        # Una consulta para las claves favoritas y otra (por partes) para los nombres a crear
+        claves = dict(self.session.execute(select([ClaveFavorita.__table__.c.nombre, ClaveFavorita.__table__.c.id])
+            .where(ClaveFavorita.__table__.c.caja_id == self.caja.id)).fetchall())
+        nombres = self._nombres_existentes(elemento, [valor_texto(x, "nombre_elemento") for x in registros])
+
+        (errores_claves, filas_claves) = self._filas_claves(claves_nuevas or [])
+        claves_invalidas = {valor_texto(x, "nombre"): error for (x, error) in zip(claves_nuevas or [], errores_claves) if error}
+        filas_claves = {x["nombre"]: x for x in filas_claves}
+        nombres_claves = claves.keys() | filas_claves.keys()
+
+        errores = []
+        filas = []
+        filas_subtipos = []
+        for registro in registros:
+            if valor_texto(registro, "clave") in claves_invalidas and registro.get("tipo") in TIPOS_CON_CLAVE:
+                error = "La clave favorita no es válida: " + claves_invalidas[valor_texto(registro, "clave")]
+            else:
+                error = self._validar_registro(registro, nombres, nombres_claves, fechas_opcionales)
+            if error == "":
+                try:
+                    (fila, subtipo) = self._filas_registro(registro)
+                except ValueError:
+                    error = "Las fechas deben ser fechas válidas con el formato YYYY-MM-DD"
+            if error == "":
+                filas.append(fila)
+                filas_subtipos.append((subtipo, valor_texto(registro, "clave")))
+                nombres.add(fila["nombre"])
+            errores.append(error)
+
+        if filas:
+            # Sólo se crean las claves nuevas que usa algún elemento, en el orden en que se usan
+            usadas = [filas_claves.pop(nombre) for (subtipo, nombre) in filas_subtipos
+                      if "clave_id" in subtipo and nombre in filas_claves]
+            self._insertar_claves(usadas)
+            claves.update((x["nombre"], x["id"]) for x in usadas)
+
+            for (subtipo, nombre) in filas_subtipos:
+                if "clave_id" in subtipo:
+                    subtipo["clave_id"] = claves[nombre]
+
+            ids = self._insertar_filas(elemento, filas)
+            for ((subtipo, _), id_elemento) in zip(filas_subtipos, ids):
+                subtipo["id"] = id_elemento
+            self._cambios_trigramas().extend((self.indice_elementos, x["id"], x["nombre"]) for x in filas)
+            conexion = self.session.connection()
+            for (tipo, tabla) in TABLAS_SUBTIPO.items():
+                filas_tabla = [subtipo for ((subtipo, _), fila) in zip(filas_subtipos, filas) if fila["tipo"] == tipo]
+                if filas_tabla:
+                    conexion.execute(tabla.insert(), filas_tabla)
+
+            # Las inserciones masivas no pasan por el flush: el resumen y el listado se actualizan aquí
+            for parte in TablasDerivadas.partes(ids):
+                condicion = elemento.c.id.in_(parte)
+                ResumenReporte.aplicar_cambios(self.session, ResumenReporte.contribucion_elementos(self.session, condicion))
+                ListadoElementos.copiar(self.session, condicion)
+
+        self._confirmar()
+        return errores
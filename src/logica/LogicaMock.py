@@ -1,7 +1,12 @@
 '''
 Esta clase es tan sólo un mock con datos para probar la interfaz
 '''
+from datetime import date, timedelta
+from difflib import SequenceMatcher
+
+from src.logica import Validacion
 from src.logica.FachadaCajaDeSeguridad import FachadaCajaDeSeguridad
+from src.modelo import dominios
 
 
 class LogicaMock(FachadaCajaDeSeguridad):
@@ -10,24 +15,40 @@ class LogicaMock(FachadaCajaDeSeguridad):
     def __init__(self):
         #Este constructor contiene los datos falsos para probar la interfaz
         self.clave_maestra = 'clave'
-        self.elementos = [{'nombre_elemento': 'Correo uniandes', 'tipo': 'Login', 'email': 'jperez@uniandes.edu.co', 'usuario': 'jperez', \
+        self.elementos = [{'id': 1, 'nombre_elemento': 'Correo uniandes', 'tipo': 'Login', 'email': 'jperez@uniandes.edu.co', 'usuario': 'jperez', \
                         'clave':'La de siempre', 'url': 'correo.uniandes.edu.co', 'notas':'Se debe renovar cada 3 meses'},
-                          {'nombre_elemento': 'Pasaporte', 'tipo': 'Identificación', 'numero': 'AC2028498','nombre': 'Ricardo José Rodríguez Marín', \
+                          {'id': 2, 'nombre_elemento': 'Pasaporte', 'tipo': 'Identificación', 'numero': 'AC2028498','nombre': 'Ricardo José Rodríguez Marín', \
                            'fecha_nacimiento': '1995-01-18', 'fecha_exp': '2018-04-16', 'fecha_venc': '2028-04-16','notas': 'Expedido en Bogotá'},
-                          {'nombre_elemento': 'Pasaporte', 'tipo': 'Identificación', 'numero': 'AC2028498','nombre': 'Ricardo José Rodríguez Marín', \
+                          {'id': 3, 'nombre_elemento': 'Pasaporte', 'tipo': 'Identificación', 'numero': 'AC2028498','nombre': 'Ricardo José Rodríguez Marín', \
                            'fecha_nacimiento': '1995-01-18', 'fecha_exp': '2018-04-16', 'fecha_venc': '2028-04-16','notas': 'Expedido en Bogotá'},
-                          {'nombre_elemento': 'Tarjeta Visa Banco U', 'tipo': 'Tarjeta', 'numero': '0054768934567654','titular': 'Ricardo Rodríguez', \
+                          {'id': 4, 'nombre_elemento': 'Tarjeta Visa Banco U', 'tipo': 'Tarjeta', 'numero': '0054768934567654','titular': 'Ricardo Rodríguez', \
                            'fecha_venc': '2025-12-07', 'ccv': 234, 'clave': 'Con fechas','direccion': 'Cra 53 45-39','telefono': '+573124353456', 'notas': ''},
-                          {'nombre_elemento': 'Números de polizas', 'tipo': 'Secreto', 'secreto': 'poliza de vida Colpatria: 67846838',\
+                          {'id': 5, 'nombre_elemento': 'Números de polizas', 'tipo': 'Secreto', 'secreto': 'poliza de vida Colpatria: 67846838',\
                            'clave': 'Muy segura', 'notas': 'La póliza es valida si muero antes de los 75 años'}]
 
-        self.claves_favoritas = [{'nombre':"La de siempre", 'clave':"miclavedesiempre", 'pista':'mi clave de siempre todo seguido'}, \
-                                 {'nombre':"Con fechas", 'clave':"20180519", 'pista':'fecha expedicion de cedula'},\
-                                 {'nombre':"Muy segura", 'clave':"Un153gur4!", 'pista':'Una segura con números!'}]
+        self.claves_favoritas = [{'id': 1, 'nombre':"La de siempre", 'clave':"miclavedesiempre", 'pista':'mi clave de siempre todo seguido'}, \
+                                 {'id': 2, 'nombre':"Con fechas", 'clave':"20180519", 'pista':'fecha expedicion de cedula'},\
+                                 {'id': 3, 'nombre':"Muy segura", 'clave':"Un153gur4!", 'pista':'Una segura con números!'}]
+
+        # Siguiente id a asignar, simula las llaves primarias de la base de datos
+        self.siguiente_id = 6
+
+    def dar_siguiente_id(self):
+        self.siguiente_id = self.siguiente_id + 1
+        return self.siguiente_id - 1
+
+    def dar_indice_elemento(self, id_elemento):
+        return [x['id'] for x in self.elementos].index(id_elemento)
+
+    def dar_indice_clave(self, id_clave):
+        return [x['id'] for x in self.claves_favoritas].index(id_clave)
 
     def dar_elementos(self):
         return self.elementos.copy()
 
+    def dar_resumen_elementos(self):
+        return [{'id': x['id'], 'nombre_elemento': x['nombre_elemento'], 'tipo': x['tipo']} for x in self.elementos]
+
     def dar_elemento(self, id_elemento):
         return self.elementos[id_elemento].copy()
 
@@ -54,7 +75,7 @@ class LogicaMock(FachadaCajaDeSeguridad):
         return self.clave_maestra
 
     def crear_login(self, nombre, email, usuario, password, url, notas):
-        self.elementos.append({'nombre_elemento': nombre, 'tipo': 'login', 'email': email, 'usuario': usuario, \
+        self.elementos.append({'id': self.dar_siguiente_id(), 'nombre_elemento': nombre, 'tipo': 'login', 'email': email, 'usuario': usuario, \
                         'clave':password, 'url': url, 'notas': notas})
 
     def validar_crear_editar_login(self, id, nombre, email, usuario, password, url, notas):
@@ -71,7 +92,7 @@ class LogicaMock(FachadaCajaDeSeguridad):
 
 
     def crear_id(self, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas):
-        self.elementos.append({'nombre_elemento': nombre_elemento, 'tipo': 'Identificación', 'numero': numero,'nombre':nombre_completo , \
+        self.elementos.append({'id': self.dar_siguiente_id(), 'nombre_elemento': nombre_elemento, 'tipo': 'Identificación', 'numero': numero,'nombre':nombre_completo , \
                            'fecha_nacimiento': fnacimiento, 'fecha_exp': fexpedicion, 'fecha_venc': fvencimiento, 'notas': notas})
 
     def validar_crear_editar_id(self, id, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas):
@@ -88,7 +109,7 @@ class LogicaMock(FachadaCajaDeSeguridad):
         self.elementos[id]['notas'] = notas
 
     def crear_tarjeta(self, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas):
-        self.elementos.append({'nombre_elemento': nombre_elemento, 'tipo': 'tarjeta', 'numero': numero, 'titular': titular, \
+        self.elementos.append({'id': self.dar_siguiente_id(), 'nombre_elemento': nombre_elemento, 'tipo': 'tarjeta', 'numero': numero, 'titular': titular, \
              'fecha_venc': fvencimiento, 'ccv': ccv, 'clave': clave, 'direccion': direccion, 'telefono': telefono,'notas': notas})
 
     def validar_crear_editar_tarjeta(self, id, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas):
@@ -107,7 +128,7 @@ class LogicaMock(FachadaCajaDeSeguridad):
         self.elementos[id]['notas'] = notas
 
     def crear_secreto(self, nombre, secreto, clave, notas):
-        self.elementos.append({'nombre_elemento': nombre, 'tipo': 'secreto', 'secreto': secreto, \
+        self.elementos.append({'id': self.dar_siguiente_id(), 'nombre_elemento': nombre, 'tipo': 'secreto', 'secreto': secreto, \
                                'clave': clave, 'notas': notas})
 
     def validar_crear_editar_secreto(self, id, nombre, secreto, clave, notas):
@@ -121,7 +142,7 @@ class LogicaMock(FachadaCajaDeSeguridad):
         self.elementos[id]['notas'] = notas
 
     def crear_clave(self, nombre, clave, pista):
-        self.claves_favoritas.append({'nombre': nombre, 'clave': clave, 'pista': pista})
+        self.claves_favoritas.append({'id': self.dar_siguiente_id(), 'nombre': nombre, 'clave': clave, 'pista': pista})
 
     def validar_crear_editar_clave(self, id, nombre, clave, pista):
         return ""
@@ -141,6 +162,172 @@ class LogicaMock(FachadaCajaDeSeguridad):
         del self.claves_favoritas[id]
 
 
-    def dar_reporte_seguridad(self):
+    def dar_reporte_seguridad(self, dias_por_vencer=90):
         return {'logins':10, 'ids':10, 'tarjetas': 5, 'secretos':2, 'inseguras':3, 'avencer': 1, 'masdeuna': 1, 'nivel': 0.6}
 
+    def dar_elemento_por_id(self, id_elemento):
+        return self.dar_elemento(self.dar_indice_elemento(id_elemento))
+
+    def dar_clave_favorita_por_id(self, id_clave):
+        return self.dar_clave_favorita(self.dar_indice_clave(id_clave))
+
+    def eliminar_elemento_por_id(self, id):
+        self.eliminar_elemento(self.dar_indice_elemento(id))
+
+    def validar_crear_editar_login_por_id(self, id, nombre, email, usuario, password, url, notas):
+        return ""
+
+    def editar_login_por_id(self, id, nombre, email, usuario, password, url, notas):
+        self.editar_login(self.dar_indice_elemento(id), nombre, email, usuario, password, url, notas)
+
+    def validar_crear_editar_id_por_id(self, id, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas):
+        return ""
+
+    def editar_id_por_id(self, id, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas):
+        self.editar_id(self.dar_indice_elemento(id), nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas)
+
+    def validar_crear_editar_tarjeta_por_id(self, id, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas):
+        return ""
+
+    def editar_tarjeta_por_id(self, id, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas):
+        self.editar_tarjeta(self.dar_indice_elemento(id), nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas)
+
+    def validar_crear_editar_secreto_por_id(self, id, nombre, secreto, clave, notas):
+        return ""
+
+    def editar_secreto_por_id(self, id, nombre, secreto, clave, notas):
+        self.editar_secreto(self.dar_indice_elemento(id), nombre, secreto, clave, notas)
+
+    def validar_crear_editar_clave_por_id(self, id, nombre, clave, pista):
+        return ""
+
+    def editar_clave_por_id(self, id, nombre, clave, pista):
+        self.editar_clave(self.dar_indice_clave(id), nombre, clave, pista)
+
+    def validar_eliminar_clave_por_id(self, id):
+        return ""
+
+    def eliminar_clave_por_id(self, id):
+        self.eliminar_clave(self.dar_indice_clave(id))
+
+    def dar_elementos_pagina(self, despues_de_nombre, limite, tipo=None):
+        elementos = sorted(self.elementos, key=lambda x: x['nombre_elemento'])
+        elementos = [x for x in elementos if despues_de_nombre is None or x['nombre_elemento'] > despues_de_nombre]
+        elementos = [x for x in elementos if tipo is None or x['tipo'] == tipo]
+        return [x.copy() for x in elementos[:limite]]
+
+    def buscar_elementos(self, texto, limite=20):
+        palabras = texto.lower().split()
+        campos = ['nombre_elemento', 'notas', 'usuario', 'email', 'url', 'titular', 'nombre']
+        elementos = [x for x in self.elementos if palabras and
+            all(any(palabra in str(x.get(campo, '')).lower() for campo in campos) for palabra in palabras)]
+        return [x.copy() for x in elementos[:limite]]
+
+    def dar_logins_por_dominio(self, url):
+        rango = dominios.rango_dominio(url)
+        hosts = [(x, dominios.normalizar(x['url'])) for x in self.elementos if x['tipo'] == 'Login']
+        logins = [x for (x, (dominio, host)) in hosts if rango is not None and host is not None and
+            dominio == rango[0] and (host == rango[1] or rango[2] < host < rango[3])]
+        return [x.copy() for x in sorted(logins, key=lambda x: x['nombre_elemento'])]
+
+    def dar_elementos_por_vencer(self, desde=None, hasta=None):
+        vencimientos = [(date.fromisoformat(x['fecha_venc']), x) for x in self.elementos
+            if x['tipo'] in ('Tarjeta', 'Identificación') and x['fecha_venc']]
+        por_vencer = [(fecha, x) for (fecha, x) in vencimientos if (desde is None or fecha >= desde) and (hasta is None or fecha < hasta)]
+        return [x.copy() for (_, x) in sorted(por_vencer, key=lambda x: (x[0], x[1]['nombre_elemento']))]
+
+    def dar_histograma_vencimientos(self, cortes=(30, 60, 90, 365)):
+        return {x: len(self.dar_elementos_por_vencer(hasta=date.today() + timedelta(days=x))) for x in sorted(set(cortes))}
+
+    def dar_elementos_similares(self, texto, limite=10, minimo=0.3):
+        similares = [{'id': x['id'], 'nombre_elemento': x['nombre_elemento'],
+                      'similitud': SequenceMatcher(None, texto.lower(), x['nombre_elemento'].lower()).ratio()} for x in self.elementos]
+        return sorted([x for x in similares if x['similitud'] >= minimo], key=lambda x: -x['similitud'])[:limite]
+
+    def dar_claves_similares(self, texto, limite=10, minimo=0.3):
+        similares = [{'id': x['id'], 'nombre': x['nombre'],
+                      'similitud': SequenceMatcher(None, texto.lower(), x['nombre'].lower()).ratio()} for x in self.claves_favoritas]
+        return sorted([x for x in similares if x['similitud'] >= minimo], key=lambda x: -x['similitud'])[:limite]
+
+    def dar_claves_favoritas_pagina(self, despues_de_nombre, limite):
+        claves = sorted(self.claves_favoritas, key=lambda x: x['nombre'])
+        claves = [x for x in claves if despues_de_nombre is None or x['nombre'] > despues_de_nombre]
+        return [x.copy() for x in claves[:limite]]
+
+    def crear_claves_lote(self, registros):
+        errores = [self.validar_clave_lote(x) for x in registros]
+        for (registro, error) in zip(registros, errores):
+            if error == "":
+                self.claves_favoritas.append(dict(registro, id=self.dar_siguiente_id()))
+        return errores
+
+    def validar_clave_lote(self, registro):
+        error = Validacion.validar(Validacion.CLAVE_FAVORITA, registro)
+        if error == "" and registro['nombre'] in [x['nombre'] for x in self.claves_favoritas]:
+            error = "Ya existe un elemento con este nombre"
+        return error
+
+    def crear_elementos_lote(self, registros, claves_nuevas=None, fechas_opcionales=False):
+        nuevas = {x['nombre']: x for x in claves_nuevas or [] if self.validar_clave_lote(x) == ""}
+        errores = []
+        for registro in registros:
+            error = self.validar_elemento_lote(registro, nuevas.keys(), fechas_opcionales)
+            if error == "":
+                # Sólo se crean las claves nuevas que usa algún elemento
+                if registro['tipo'] != 'Identificación' and registro['clave'] in nuevas:
+                    self.claves_favoritas.append(dict(nuevas.pop(registro['clave']), id=self.dar_siguiente_id()))
+                self.elementos.append(dict(registro, id=self.dar_siguiente_id()))
+            errores.append(error)
+        return errores
+
+    def validar_elemento_lote(self, registro, claves_nuevas=(), fechas_opcionales=False):
+        tipo = registro.get('tipo')
+        if tipo not in Validacion.ESPECIFICACIONES:
+            return Validacion.ERROR_TIPO
+        especificacion = Validacion.IDENTIFICACION_IMPORTADA if fechas_opcionales and tipo == 'Identificación' \
+            else Validacion.ESPECIFICACIONES[tipo]
+        error = Validacion.validar(especificacion, registro)
+        if error == "" and registro['nombre_elemento'] in [x['nombre_elemento'] for x in self.elementos]:
+            error = "Ya existe un elemento con este nombre"
+        if error == "" and tipo != 'Identificación' and \
+                registro.get('clave') not in [x['nombre'] for x in self.claves_favoritas] + list(claves_nuevas):
+            error = "Debe tener asignado una clave favorita"
+        return error
+
+    def guardar_login(self, id, nombre, email, usuario, password, url, notas):
+        if id == -1:
+            self.crear_login(nombre, email, usuario, password, url, notas)
+        else:
+            self.editar_login_por_id(id, nombre, email, usuario, password, url, notas)
+        return ""
+
+    def guardar_tarjeta(self, id, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas):
+        if id == -1:
+            self.crear_tarjeta(nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas)
+        else:
+            self.editar_tarjeta_por_id(id, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas)
+        return ""
+
+    def guardar_id(self, id, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas):
+        if id == -1:
+            self.crear_id(nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas)
+        else:
+            self.editar_id_por_id(id, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas)
+        return ""
+
+    def guardar_secreto(self, id, nombre, secreto, clave, notas):
+        if id == -1:
+            self.crear_secreto(nombre, secreto, clave, notas)
+        else:
+            self.editar_secreto_por_id(id, nombre, secreto, clave, notas)
+        return ""
+
+    def guardar_clave(self, id, nombre, clave, pista):
+        if id == -1:
+            self.crear_clave(nombre, clave, pista)
+        else:
+            self.editar_clave_por_id(id, nombre, clave, pista)
+        return ""
+
+    def validar_elementos_lote(self, registros):
+        return [[error] if error else [] for error in map(self.validar_elemento_lote, registros)]
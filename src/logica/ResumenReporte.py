@@ -0,0 +1,367 @@
+'''
+Resumen del reporte de seguridad mantenido de forma incremental.
+
+Cada flush de una sesión calcula la contribución de los elementos y claves favoritas
+modificados antes y después del flush y aplica la diferencia a las tablas de resumen
+dentro de la misma transacción. Así el reporte se lee sin recorrer las tablas base.
+'''
+import re
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Iterable
+
+from sqlalchemy import and_, bindparam, case, func, select, union_all
+
+from .TablasDerivadas import escuchar, existentes, ids_modificados, objetos_guardados
+from .typing import TipoReporte
+from src.modelo import (ClaveFavorita, Elemento, Identificacion, Login, Secreto, Tarjeta,
+    ResumenConteo, ResumenUsoClave, ResumenVencimiento)
+
+# Nombres de los contadores en la tabla resumen_conteo
+CONTEO_TIPOS = ["Login", "Identificación", "Tarjeta", "Secreto"]
+CONTEO_CLAVES = "claves"
+CONTEO_INSEGURAS = "inseguras"
+
+# Llave en session.info donde se guardan las contribuciones previas al flush
+INFO_ANTERIOR = "resumen_anterior"
+
+# Días a partir de hoy en los que un elemento cuenta como a vencer en el reporte
+DIAS_POR_VENCER = 90
+
+# Horizontes (en días a partir de hoy) del histograma de vencimientos
+CORTES_VENCIMIENTO = (30, 60, 90, 365)
+
+
+elemento = Elemento.__table__
+login = Login.__table__
+tarjeta = Tarjeta.__table__
+secreto = Secreto.__table__
+identificacion = Identificacion.__table__
+clavefavorita = ClaveFavorita.__table__
+resumen_conteo = ResumenConteo.__table__
+resumen_uso_clave = ResumenUsoClave.__table__
+resumen_vencimiento = ResumenVencimiento.__table__
+
+def es_clave_segura(clave: str) -> bool:
+    ''' Indica si una clave cumple con las reglas de seguridad del reporte
+    Parámetros:
+        clave (string): La clave a revisar
+    Retorna:
+        (bool): True si la clave tiene al menos 8 caracteres, números, mayúsculas,
+        minúsculas y caracteres especiales y no contiene espacios
+    '''
+    if len(clave) < 8:
+        return False
+    if not re.search("[0-9]", clave):
+        return False
+    if not re.search("[A-ZÑÉÓÚÍÜ]", clave):
+        return False
+    if not re.search("[a-zñéóúíü]", clave):
+        return False
+    if not re.search("[?\-*!@#$/(){}=.,;:]", clave):
+        return False
+    if " " in clave:
+        return False
+    return True
+
+def contribucion_elementos(session, condicion) -> Counter:
+    ''' Calcula la contribución al resumen de los elementos que cumplen una condición
+    Parámetros:
+        session (Session): La sesión con la que se consulta la base de datos
+        condicion: Condición sobre la tabla elemento
+    Retorna:
+        (Counter): Los contadores por tipo, uso de clave y fecha de vencimiento
+    '''
+    clave_id = func.coalesce(login.c.clave_id, tarjeta.c.clave_id, secreto.c.clave_id)
+    vencimiento = func.coalesce(tarjeta.c.vencimiento, identificacion.c.vencimiento)
+    consulta = (select([elemento.c.caja_id, elemento.c.tipo, clave_id, vencimiento, func.count()])
+        .select_from(elemento
+            .outerjoin(login, login.c.id == elemento.c.id)
+            .outerjoin(tarjeta, tarjeta.c.id == elemento.c.id)
+            .outerjoin(secreto, secreto.c.id == elemento.c.id)
+            .outerjoin(identificacion, identificacion.c.id == elemento.c.id))
+        .where(condicion)
+        .group_by(elemento.c.caja_id, elemento.c.tipo, clave_id, vencimiento))
+
+    contribucion = Counter()
+    for (caja_id, tipo, id_clave, fecha, cantidad) in session.execute(consulta):
+        if caja_id is None:
+            continue
+        contribucion[("conteo", caja_id, tipo)] += cantidad
+        if id_clave is not None:
+            contribucion[("uso", caja_id, id_clave)] += cantidad
+        if fecha is not None:
+            contribucion[("vencimiento", caja_id, fecha)] += cantidad
+    return contribucion
+
+def contribucion_claves(session, condicion) -> Counter:
+    ''' Calcula la contribución al resumen de las claves favoritas que cumplen una condición
+    Parámetros:
+        session (Session): La sesión con la que se consulta la base de datos
+        condicion: Condición sobre la tabla clavefavorita
+    Retorna:
+        (Counter): Los contadores de claves y claves inseguras
+    '''
+    contribucion = Counter()
+    for (caja_id, clave) in session.execute(select([clavefavorita.c.caja_id, clavefavorita.c.clave]).where(condicion)):
+        if caja_id is None:
+            continue
+        contribucion[("conteo", caja_id, CONTEO_CLAVES)] += 1
+        if not es_clave_segura(clave or ""):
+            contribucion[("conteo", caja_id, CONTEO_INSEGURAS)] += 1
+    return contribucion
+
+def contribucion(session, ids_elementos, ids_claves) -> Counter:
+    ''' Calcula la contribución al resumen de un conjunto de elementos y claves favoritas '''
+    resultado = Counter()
+    if ids_elementos:
+        resultado.update(contribucion_elementos(session, elemento.c.id.in_(ids_elementos)))
+    if ids_claves:
+        resultado.update(contribucion_claves(session, clavefavorita.c.id.in_(ids_claves)))
+    return resultado
+
+def antes_de_flush(session, flush_context, instances):
+    ''' Guarda la contribución de los elementos y claves que se van a modificar o eliminar '''
+    modificados = list(session.dirty) + list(session.deleted)
+    ids_claves = ids_modificados(modificados, ClaveFavorita)
+    session.info[INFO_ANTERIOR] = (
+        contribucion(session, ids_modificados(modificados, Elemento), ids_claves),
+        ids_modificados(session.deleted, ClaveFavorita)
+    )
+
+def despues_de_flush(session, flush_context):
+    ''' Aplica al resumen la diferencia entre la contribución anterior y la nueva '''
+    (anterior, claves_eliminadas) = session.info.pop(INFO_ANTERIOR, (Counter(), []))
+    nuevos = objetos_guardados(session)
+
+    cambios = contribucion(session, ids_modificados(nuevos, Elemento), ids_modificados(nuevos, ClaveFavorita))
+    cambios.subtract(anterior)
+    aplicar_cambios(session, cambios)
+
+    if claves_eliminadas:
+        session.execute(resumen_uso_clave.delete().where(resumen_uso_clave.c.clave_id.in_(claves_eliminadas)))
+
+def aplicar_cambios(session, cambios: Counter):
+    ''' Suma los cambios a las tablas de resumen
+    Parámetros:
+        session (Session): La sesión con la que se modifica la base de datos
+        cambios (Counter): Los cambios a aplicar a cada contador
+    '''
+    usos = {}
+    vencimientos = {}
+    for ((tipo, caja_id, llave), delta) in cambios.items():
+        if delta == 0:
+            continue
+        if tipo == "conteo":
+            condicion = and_(resumen_conteo.c.caja_id == caja_id, resumen_conteo.c.nombre == llave)
+            actualizados = session.execute(resumen_conteo.update().where(condicion)
+                .values(valor=resumen_conteo.c.valor + delta)).rowcount
+            if actualizados == 0:
+                session.execute(resumen_conteo.insert().values(caja_id=caja_id, nombre=llave, valor=delta))
+        elif tipo == "uso":
+            usos[llave] = (caja_id, delta)
+        else:
+            vencimientos.setdefault(caja_id, {})[llave] = delta
+
+    # Los usos de clave y los vencimientos pueden ser muchos (p. ej. al crear elementos en lote):
+    # se actualizan los existentes y se insertan los nuevos con una sola sentencia para cada caso
+    if usos:
+        con_fila = existentes(session, resumen_uso_clave.c.clave_id, usos)
+        actualizar = [dict(b_clave_id=x, b_delta=delta) for (x, (_, delta)) in usos.items() if x in con_fila]
+        if actualizar:
+            session.execute(resumen_uso_clave.update()
+                .where(resumen_uso_clave.c.clave_id == bindparam("b_clave_id"))
+                .values(usos=resumen_uso_clave.c.usos + bindparam("b_delta")), actualizar)
+        insertar = [dict(clave_id=x, caja_id=caja_id, usos=delta) for (x, (caja_id, delta)) in usos.items()
+                    if x not in con_fila and delta > 0]
+        if insertar:
+            session.execute(resumen_uso_clave.insert(), insertar)
+
+    for (caja_id, fechas) in vencimientos.items():
+        con_fila = existentes(session, resumen_vencimiento.c.fecha, fechas,
+                              resumen_vencimiento.c.caja_id == caja_id)
+        actualizar = [dict(b_fecha=x, b_delta=delta) for (x, delta) in fechas.items() if x in con_fila]
+        if actualizar:
+            session.execute(resumen_vencimiento.update()
+                .where(and_(resumen_vencimiento.c.caja_id == caja_id, resumen_vencimiento.c.fecha == bindparam("b_fecha")))
+                .values(cantidad=resumen_vencimiento.c.cantidad + bindparam("b_delta")), actualizar)
+        insertar = [dict(caja_id=caja_id, fecha=x, cantidad=delta) for (x, delta) in fechas.items()
+                    if x not in con_fila and delta > 0]
+        if insertar:
+            session.execute(resumen_vencimiento.insert(), insertar)
+
+    if any(delta < 0 for fechas in vencimientos.values() for delta in fechas.values()):
+        session.execute(resumen_vencimiento.delete().where(resumen_vencimiento.c.cantidad <= 0))
+
+def calcular_resumen(session, caja_id: int) -> Counter:
+    ''' Calcula el resumen de una caja a partir de las tablas base
+    Parámetros:
+        session (Session): La sesión con la que se consulta la base de datos
+        caja_id (int): El id de la caja
+    Retorna:
+        (Counter): Los contadores del resumen
+    '''
+    resumen = contribucion_elementos(session, elemento.c.caja_id == caja_id)
+    resumen.update(contribucion_claves(session, clavefavorita.c.caja_id == caja_id))
+    return resumen
+
+def leer_resumen(session, caja_id: int) -> Counter:
+    ''' Lee el resumen guardado de una caja
+    Parámetros:
+        session (Session): La sesión con la que se consulta la base de datos
+        caja_id (int): El id de la caja
+    Retorna:
+        (Counter): Los contadores del resumen
+    '''
+    resumen = Counter()
+    for (nombre, valor) in session.execute(select([resumen_conteo.c.nombre, resumen_conteo.c.valor]).where(resumen_conteo.c.caja_id == caja_id)):
+        resumen[("conteo", caja_id, nombre)] = valor
+    for (clave_id, usos) in session.execute(select([resumen_uso_clave.c.clave_id, resumen_uso_clave.c.usos]).where(resumen_uso_clave.c.caja_id == caja_id)):
+        resumen[("uso", caja_id, clave_id)] = usos
+    for (fecha, cantidad) in session.execute(select([resumen_vencimiento.c.fecha, resumen_vencimiento.c.cantidad]).where(resumen_vencimiento.c.caja_id == caja_id)):
+        resumen[("vencimiento", caja_id, fecha)] = cantidad
+    return resumen
+
+def reconstruir_resumen(session, caja_id: int) -> None:
+    ''' Reemplaza el resumen guardado de una caja por el calculado a partir de las tablas base
+    Parámetros:
+        session (Session): La sesión con la que se modifica la base de datos
+        caja_id (int): El id de la caja
+    '''
+    session.flush()
+    resumen = calcular_resumen(session, caja_id)
+
+    session.execute(resumen_conteo.delete().where(resumen_conteo.c.caja_id == caja_id))
+    session.execute(resumen_uso_clave.delete().where(resumen_uso_clave.c.caja_id == caja_id))
+    session.execute(resumen_vencimiento.delete().where(resumen_vencimiento.c.caja_id == caja_id))
+
+    aplicar_cambios(session, resumen)
+
+    # Los contadores de conteo se guardan siempre, también en cero, para marcar que el resumen existe
+    for nombre in CONTEO_TIPOS + [CONTEO_CLAVES, CONTEO_INSEGURAS]:
+        if resumen[("conteo", caja_id, nombre)] == 0:
+            session.execute(resumen_conteo.insert().values(caja_id=caja_id, nombre=nombre, valor=0))
+
+def existe_resumen(session, caja_id: int) -> bool:
+    ''' Indica si ya existe un resumen guardado para una caja '''
+    return session.execute(select([func.count()]).where(resumen_conteo.c.caja_id == caja_id)).scalar() > 0
+
+def verificar_resumen(session, caja_id: int, reparar: bool = True) -> bool:
+    ''' Compara el resumen guardado de una caja con el calculado a partir de las tablas base
+    Parámetros:
+        session (Session): La sesión con la que se consulta la base de datos
+        caja_id (int): El id de la caja
+        reparar (bool): Si es True y el resumen no es consistente, se reconstruye
+    Retorna:
+        (bool): True si el resumen guardado era consistente
+    '''
+    session.flush()
+    calculado = +calcular_resumen(session, caja_id)
+    guardado = +leer_resumen(session, caja_id)
+    consistente = calculado == guardado
+    if not consistente and reparar:
+        reconstruir_resumen(session, caja_id)
+    return consistente
+
+def dar_reporte(session, caja_id: int, limite_vencimiento: date) -> TipoReporte:
+    ''' Genera el reporte de seguridad a partir del resumen guardado
+    Parámetros:
+        session (Session): La sesión con la que se consulta la base de datos
+        caja_id (int): El id de la caja
+        limite_vencimiento (date): Los elementos que vencen antes de esta fecha cuentan como a vencer
+    Retorna:
+        (dict): El reporte de seguridad
+    '''
+    conteos = dict(session.execute(select([resumen_conteo.c.nombre, resumen_conteo.c.valor])
+        .where(resumen_conteo.c.caja_id == caja_id)).fetchall())
+
+    usos_caja = resumen_uso_clave.c.caja_id == caja_id
+    (repetida, max_elementos, elementos_avencer) = session.execute(select([
+        select([func.count()]).where(and_(usos_caja, resumen_uso_clave.c.usos > 1)).as_scalar(),
+        select([func.max(resumen_uso_clave.c.usos)]).where(usos_caja).as_scalar(),
+        select([func.sum(resumen_vencimiento.c.cantidad)]).where(and_(
+            resumen_vencimiento.c.caja_id == caja_id, resumen_vencimiento.c.fecha < limite_vencimiento)).as_scalar(),
+    ])).first()
+    max_elementos = max_elementos or 0
+    elementos_avencer = elementos_avencer or 0
+
+    numero_ids = conteos.get("Identificación", 0)
+    numero_tarjetas = conteos.get("Tarjeta", 0)
+    elementos_que_puede_vencer = numero_ids + numero_tarjetas
+    if elementos_que_puede_vencer == 0:
+        v = 1.0
+    else:
+        v = (elementos_que_puede_vencer - elementos_avencer) / elementos_que_puede_vencer
+
+    if max_elementos > 3:
+        r = 0.0
+    elif max_elementos > 1:
+        r = 0.5
+    else:
+        r = 1.0
+
+    total_claves = conteos.get(CONTEO_CLAVES, 0)
+    inseguras = conteos.get(CONTEO_INSEGURAS, 0)
+    if total_claves == 0:
+        sc = 1.0
+    else:
+        sc = (total_claves - inseguras) / total_claves
+
+    return TipoReporte(
+        logins=conteos.get("Login", 0),
+        ids=numero_ids,
+        tarjetas=numero_tarjetas,
+        secretos=conteos.get("Secreto", 0),
+        inseguras=inseguras,
+        avencer=elementos_avencer,
+        masdeuna=repetida,
+        nivel=0.5*sc+0.2*v+0.3*r
+    )
+
+def vencimientos(desde: date = None, hasta: date = None):
+    ''' Retorna la consulta de los ids y fechas de vencimiento de las tarjetas y las identificaciones en un rango
+    Cada parte de la unión recorre sólo el rango del índice de vencimiento de su tabla
+    Parámetros:
+        desde (date): La primera fecha del rango; None para no limitarlo
+        hasta (date): La fecha (excluida) en la que termina el rango; None para no limitarlo
+    Retorna:
+        (Alias): La unión con las columnas id y vencimiento
+    '''
+    partes = []
+    for tabla in (tarjeta, identificacion):
+        condiciones = [tabla.c.vencimiento.isnot(None)]
+        if desde is not None:
+            condiciones.append(tabla.c.vencimiento >= desde)
+        if hasta is not None:
+            condiciones.append(tabla.c.vencimiento < hasta)
+        partes.append(select([tabla.c.id, tabla.c.vencimiento]).where(and_(*condiciones)))
+    return union_all(*partes).alias("vencimiento")
+
+def dar_histograma_vencimientos(session, caja_id: int, hoy: date, cortes: Iterable[int]) -> Dict[int, int]:
+    ''' Cuenta en una consulta los elementos que vencen antes de cada horizonte
+    Parámetros:
+        session (Session): La sesión con la que se consulta la base de datos
+        caja_id (int): El id de la caja
+        hoy (date): La fecha desde la que se cuentan los días de los cortes
+        cortes (iterable): Los horizontes en días
+    Retorna:
+        (dict): La cantidad de tarjetas e identificaciones (vencidas o no) que vencen antes de hoy más los días
+        de cada corte, igual que el valor avencer del reporte con ese horizonte
+    '''
+    cortes = sorted(set(cortes))
+    if not cortes:
+        return {}
+    limites = [hoy + timedelta(days=x) for x in cortes]
+    union = vencimientos(hasta=limites[-1])
+    fila = session.execute(select([func.sum(case([(union.c.vencimiento < x, 1)], else_=0)) for x in limites])
+        .select_from(union.join(elemento, elemento.c.id == union.c.id))
+        .where(elemento.c.caja_id == caja_id)).first()
+    return {corte: cantidad or 0 for (corte, cantidad) in zip(cortes, fila)}
+
+def registrar(session_factory) -> None:
+    ''' Registra el mantenimiento del resumen en todas las sesiones de una fábrica de sesiones
+    Parámetros:
+        session_factory (sessionmaker): La fábrica de sesiones
+    '''
+    escuchar(session_factory, "before_flush", antes_de_flush)
+    escuchar(session_factory, "after_flush", despues_de_flush)
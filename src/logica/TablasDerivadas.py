@@ -0,0 +1,65 @@
+'''
+Funciones comunes de las tablas derivadas que se mantienen en cada flush de una sesión.
+
+El resumen del reporte (ResumenReporte) y el listado de elementos (ListadoElementos) escuchan
+los eventos de flush de la fábrica de sesiones y actualizan sus tablas con los ids de los
+objetos que el flush crea, modifica o elimina, dentro de la misma transacción. Las tablas derivadas
+y las inserciones en lote de LogicaCaja consultan por partes (TAMANO_PARTE_IN) los valores que ya existen.
+'''
+import weakref
+from typing import Iterator
+
+from sqlalchemy import bindparam, event, select
+
+# Cantidad máxima de valores en una condición IN (SQLite acepta 999 parámetros por consulta)
+TAMANO_PARTE_IN = 500
+
+# Eventos ya registrados en cada fábrica de sesiones. No se usa event.contains porque identifica la fábrica
+# por su id(), que Python reutiliza después de liberarla: una fábrica nueva podía quedar sin registrar
+registrados = weakref.WeakKeyDictionary()
+
+def escuchar(session_factory, evento: str, funcion) -> None:
+    ''' Registra una vez una función en un evento de todas las sesiones de una fábrica de sesiones
+    Parámetros:
+        session_factory (sessionmaker): La fábrica de sesiones
+        evento (string): El nombre del evento de la sesión, por ejemplo after_flush
+        funcion (callable): La función que escucha el evento
+    '''
+    eventos = registrados.setdefault(session_factory, set())
+    if (evento, funcion) not in eventos:
+        eventos.add((evento, funcion))
+        event.listen(session_factory, evento, funcion)
+
+def ids_modificados(objetos, clase) -> list:
+    ''' Retorna los ids de los objetos persistentes de una clase '''
+    return [x.id for x in objetos if isinstance(x, clase) and x.id is not None]
+
+def objetos_guardados(session) -> list:
+    ''' Retorna los objetos que un flush creó o modificó, sin los que eliminó '''
+    return [x for x in list(session.new) + list(session.dirty) if x not in session.deleted]
+
+def partes(valores) -> Iterator[list]:
+    ''' Retorna los valores en listas de hasta TAMANO_PARTE_IN valores, para las condiciones IN '''
+    valores = list(valores)
+    for inicio in range(0, len(valores), TAMANO_PARTE_IN):
+        yield valores[inicio:inicio + TAMANO_PARTE_IN]
+
+def filas_con_valores(session, columnas: list, columna, valores, condicion=None) -> list:
+    ''' Retorna las filas cuya columna tiene alguno de unos valores, consultando por partes (ver partes)
+    Parámetros:
+        session (Session): La sesión con la que se consulta la base de datos
+        columnas (list): Las columnas a retornar
+        columna (Column): La columna en la que se buscan los valores
+        valores (iterable): Los valores a buscar
+        condicion: Condición adicional sobre la tabla, por ejemplo su caja, o None
+    Retorna:
+        (list): Las filas con las columnas pedidas
+    '''
+    consulta = select(columnas).where(columna.in_(bindparam("valores", expanding=True)))
+    if condicion is not None:
+        consulta = consulta.where(condicion)
+    return [fila for parte in partes(valores) for fila in session.execute(consulta, {"valores": parte})]
+
+def existentes(session, columna, valores, condicion=None) -> set:
+    ''' Retorna cuáles de unos valores ya están en una columna (ver filas_con_valores) '''
+    return {x for (x,) in filas_con_valores(session, [columna], columna, valores, condicion)}
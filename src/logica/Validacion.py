@@ -0,0 +1,241 @@
+'''
+Especificaciones declarativas de los campos de cada tipo de elemento y de las claves favoritas.
+
+Cada especificación es una lista ordenada de reglas (campo, condición, mensaje); las expresiones
+regulares se compilan una sola vez al importar el módulo y las reglas comunes (nombre, notas,
+fechas, números) se comparten entre los tipos. Las reglas sólo revisan los campos, sin consultar
+la base de datos: que el nombre no exista y que la clave favorita exista lo comprueba LogicaCaja.
+
+Los registros son los dict que retorna dar_elemento (o dar_claves_favoritas para las claves); las
+llaves que faltan o en None se validan como cadenas vacías.
+'''
+import re
+from typing import Callable, List
+
+from .typing import TipoElemento
+
+ERROR_TIPO = "El tipo del elemento no es válido"
+
+FORMATO_FECHA = "La fecha de %s debe tener el formato YYYY-MM-DD, por ejemplo 2023-01-28"
+
+class Regla():
+    ''' Condición sobre el valor (como texto) de un campo y el mensaje de error si no se cumple '''
+
+    __slots__ = ("llave", "cumple", "mensaje")
+
+    def __init__(self, llave: str, cumple: Callable[[str], bool], mensaje: str) -> None:
+        self.llave = llave
+        self.cumple = cumple
+        self.mensaje = mensaje
+
+def minimo(llave: str, cantidad: int, mensaje: str) -> Regla:
+    ''' Regla de longitud mínima de un campo '''
+    return Regla(llave, lambda valor: len(valor) >= cantidad, mensaje)
+
+def maximo(llave: str, cantidad: int, mensaje: str) -> Regla:
+    ''' Regla de longitud máxima de un campo '''
+    return Regla(llave, lambda valor: len(valor) <= cantidad, mensaje)
+
+def patron(llave: str, expresion: str, mensaje: str) -> Regla:
+    ''' Regla de un campo que debe coincidir (con re.match) con una expresión regular, compilada aquí '''
+    compilada = re.compile(expresion)
+    return Regla(llave, lambda valor: compilada.match(valor) is not None, mensaje)
+
+def formato(llave: str, es_valido: Callable[[str], bool], mensaje: str) -> Regla:
+    ''' Regla de un campo que debe cumplir un formato revisado por una función (ver es_url, es_telefono, ...)
+    Acepta también el valor con un salto de línea al final, como el $ de las expresiones regulares que reemplazan
+    '''
+    return Regla(llave, lambda valor: es_valido(valor) or (valor[-1:] == "\n" and es_valido(valor[:-1])), mensaje)
+
+# Escáneres de formatos en tiempo lineal. Reemplazan expresiones regulares con cuantificadores anidados que,
+# con datos importados, pueden tardar un tiempo polinomial de grado alto (retroceso catastrófico); aceptan
+# exactamente los mismos valores que esas expresiones (\d y \s con el significado Unicode de re).
+
+ALFANUMERICOS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+CARACTERES_HOST = ALFANUMERICOS | {"-"}
+CARACTERES_EMAIL = ALFANUMERICOS | set("+_.-")
+CARACTERES_DOMINIO_EMAIL = ALFANUMERICOS | set(".-")
+
+def es_caracter_telefono(caracter: str) -> bool:
+    return caracter.isdecimal() or caracter == " " or "A" <= caracter <= "Z"
+
+def es_email(valor: str) -> bool:
+    ''' Equivale a ^[a-zA-Z0-9+_.-]+@[a-zA-Z0-9.-]+$ '''
+    (usuario, arroba, dominio) = valor.partition("@")
+    return arroba == "@" and usuario != "" and dominio != "" \
+        and CARACTERES_EMAIL.issuperset(usuario) and CARACTERES_DOMINIO_EMAIL.issuperset(dominio)
+
+def es_fecha(valor: str) -> bool:
+    ''' Equivale a ^\d{4}-([0]\d|1[0-2])-([0-2]\d|3[01])$ (sólo el formato, no que la fecha exista) '''
+    if len(valor) != 10 or valor[4] != "-" or valor[7] != "-" or not valor[:4].isdecimal():
+        return False
+    (mes, dia) = (valor[5:7], valor[8:10])
+    return ((mes[0] == "0" and mes[1].isdecimal()) or (mes[0] == "1" and mes[1] in "012")) \
+        and ((dia[0] in "012" and dia[1].isdecimal()) or (dia[0] == "3" and dia[1] in "01"))
+
+def es_url(valor: str) -> bool:
+    ''' Equivale a la alternativa de cuatro expresiones que aceptan http(s)://[www.]host.resto o www.host.resto,
+    donde host es [a-zA-Z0-9]+ o [a-zA-Z0-9][a-zA-Z0-9-]+[a-zA-Z0-9] y resto tiene al menos 2 caracteres sin espacios
+    '''
+    if valor.startswith(("http://", "https://")):
+        resto = valor[valor.index("//") + 2:]
+        if resto.startswith("www."):
+            resto = resto[4:]
+        elif resto.startswith("www"):
+            return False
+    elif valor.startswith("www."):
+        resto = valor[4:]
+    else:
+        return False
+
+    # El host no puede tener puntos: termina en el primer punto
+    (host, punto, final) = resto.partition(".")
+    if punto == "" or len(final) < 2 or any(x.isspace() for x in final) or not CARACTERES_HOST.issuperset(host):
+        return False
+    if ALFANUMERICOS.issuperset(host):
+        return host != ""
+    return len(host) >= 3 and host[0] != "-" and host[-1] != "-"
+
+def es_telefono(valor: str) -> bool:
+    ''' Equivale a ^(\(\+?\d+\)|\+?[\d A-Z]*)[\d A-Z]*(\([\d A-Z]+\))*[\d A-Z]*$: un prefijo opcional (+código) o +,
+    seguido de dígitos, espacios y mayúsculas con grupos entre paréntesis consecutivos
+    '''
+    def resto_valido(inicio: int) -> bool:
+        # [\d A-Z]*, luego grupos consecutivos (...) y al final [\d A-Z]*
+        i = inicio
+        while i < len(valor) and es_caracter_telefono(valor[i]):
+            i += 1
+        while i < len(valor) and valor[i] == "(":
+            fin = i + 1
+            while fin < len(valor) and es_caracter_telefono(valor[fin]):
+                fin += 1
+            if fin == i + 1 or fin == len(valor) or valor[fin] != ")":
+                return False
+            i = fin + 1
+        while i < len(valor) and es_caracter_telefono(valor[i]):
+            i += 1
+        return i == len(valor)
+
+    # Primera alternativa: (+dígitos) o (dígitos)
+    if valor.startswith("("):
+        i = 2 if valor.startswith("(+") else 1
+        fin = i
+        while fin < len(valor) and valor[fin].isdecimal():
+            fin += 1
+        if fin > i and valor[fin:fin + 1] == ")" and resto_valido(fin + 1):
+            return True
+    # Segunda alternativa: + opcional
+    return resto_valido(1 if valor.startswith("+") else 0)
+
+def longitud(llave: str, minima: int, maxima: int, sujeto: str, unidad: str = "caracteres", unidad_minima: str = None) -> List[Regla]:
+    ''' Reglas de longitud mínima y máxima, con mensajes como "El nombre no debe tener menos de 1 caracter"
+    Parámetros:
+        llave (string): La llave del campo en el registro
+        minima (int): La longitud mínima
+        maxima (int): La longitud máxima
+        sujeto (string): El inicio del mensaje, por ejemplo "Las notas no deben tener"
+        unidad (string): La unidad de la longitud en los mensajes
+        unidad_minima (string): La unidad en el mensaje de la longitud mínima, si es distinta
+    '''
+    return [minimo(llave, minima, "%s menos de %d %s" % (sujeto, minima, unidad_minima or unidad)),
+            maximo(llave, maxima, "%s más de %d %s" % (sujeto, maxima, unidad))]
+
+def digitos(llave: str, minima: int, maxima: int, sujeto: str) -> List[Regla]:
+    ''' Reglas de un campo que sólo tiene dígitos, con longitud en dígitos '''
+    return [patron(llave, r"^[0-9]+$", "%s sólo debe contener dígitos" % sujeto)] + \
+        longitud(llave, minima, maxima, "%s no debe tener" % sujeto, "dígitos")
+
+def fecha(llave: str, nombre: str) -> Regla:
+    ''' Regla de una fecha con el formato YYYY-MM-DD '''
+    return formato(llave, es_fecha, FORMATO_FECHA % nombre)
+
+def fecha_opcional(llave: str, nombre: str) -> Regla:
+    ''' Regla de una fecha con el formato YYYY-MM-DD que puede quedar vacía si no se conoce '''
+    return formato(llave, lambda valor: valor == "" or es_fecha(valor), FORMATO_FECHA % nombre)
+
+# Reglas comunes a varios tipos de elemento
+NOMBRE = longitud("nombre_elemento", 1, 255, "El nombre no debe tener", unidad_minima="caracter")
+NOTAS = longitud("notas", 3, 512, "Las notas no deben tener")
+
+LOGIN = longitud("nombre_elemento", 1, 255, "El nombre no debe tener") \
+    + longitud("usuario", 1, 255, "El usuario no debe tener") \
+    + NOTAS \
+    + [formato("email", es_email, "El email no tiene el formato correcto"),
+       maximo("url", 512, "La URL no debe tener más de 512 caracteres"),
+       formato("url", es_url, "El url no tiene el formato correcto")]
+
+TARJETA = NOMBRE \
+    + longitud("titular", 3, 255, "El titular no debe tener") \
+    + [patron("titular", r"^[A-ZÑÁÉÓÚÍÜ ]+$", "El titular debe contener solo mayúsculas y espacios")] \
+    + NOTAS \
+    + digitos("numero", 3, 255, "El número") \
+    + digitos("ccv", 3, 4, "El CCV") \
+    + [fecha("fecha_venc", "vencimiento")] \
+    + longitud("telefono", 3, 255, "El teléfono no debe tener") \
+    + [formato("telefono", es_telefono, "El teléfono deber contener un número de teléfono, por ejemplo +57 (606) 7422736")] \
+    + longitud("direccion", 3, 255, "La dirección no debe tener")
+
+DATOS_IDENTIFICACION = NOMBRE \
+    + NOTAS \
+    + longitud("nombre", 3, 255, "El nombre completo no debe tener") \
+    + digitos("numero", 3, 20, "El número")
+
+IDENTIFICACION = DATOS_IDENTIFICACION \
+    + [fecha("fecha_venc", "vencimiento"), fecha("fecha_exp", "expedición"), fecha("fecha_nacimiento", "nacimiento")]
+
+# Las identificaciones importadas pueden no tener fechas: otros programas (Bitwarden) no las guardan
+IDENTIFICACION_IMPORTADA = DATOS_IDENTIFICACION \
+    + [fecha_opcional("fecha_venc", "vencimiento"), fecha_opcional("fecha_exp", "expedición"),
+       fecha_opcional("fecha_nacimiento", "nacimiento")]
+
+SECRETO = NOMBRE \
+    + NOTAS \
+    + longitud("secreto", 3, 255, "El secreto no debe tener")
+
+CLAVE_FAVORITA = longitud("nombre", 1, 255, "El nombre no debe tener") \
+    + longitud("clave", 3, 255, "La clave no debe tener") \
+    + longitud("pista", 3, 255, "La pista no debe tener")
+
+# Especificación de cada tipo de elemento, según la llave tipo del registro
+ESPECIFICACIONES = {"Login": LOGIN, "Tarjeta": TARJETA, "Identificación": IDENTIFICACION, "Secreto": SECRETO}
+
+def errores(especificacion: List[Regla], registro: dict, todos: bool = True) -> List[str]:
+    ''' Valida los campos de un registro
+    Parámetros:
+        especificacion (list): Las reglas a revisar, en orden
+        registro (dict): Los valores de los campos
+        todos (bool): Si es True se retorna el primer error de cada campo; si es False sólo el primer error
+    Retorna:
+        (list): Los mensajes de error, en el orden de las reglas; vacía si no hay errores
+    '''
+    valores = {}
+    fallidos = set()
+    resultado = []
+    for regla in especificacion:
+        if regla.llave in fallidos:
+            continue
+        valor = valores.get(regla.llave)
+        if valor is None:
+            valor = registro.get(regla.llave)
+            valor = valores[regla.llave] = "" if valor is None else str(valor)
+        if not regla.cumple(valor):
+            resultado.append(regla.mensaje)
+            if not todos:
+                break
+            fallidos.add(regla.llave)
+    return resultado
+
+def validar(especificacion: List[Regla], registro: dict) -> str:
+    ''' Retorna el primer error de un registro o una cadena de caracteres vacía si no hay errores '''
+    resultado = errores(especificacion, registro, todos=False)
+    return resultado[0] if resultado else ""
+
+def validar_lote(registros: List[TipoElemento]) -> List[List[str]]:
+    ''' Valida en una pasada los campos de varios elementos de cualquier tipo
+    Parámetros:
+        registros (list): Los dict de los elementos, con las llaves que retorna dar_elemento
+    Retorna:
+        (list): Por cada registro, la lista con el primer error de cada campo inválido
+    '''
+    return [errores(ESPECIFICACIONES[x.get("tipo")], x) if x.get("tipo") in ESPECIFICACIONES else [ERROR_TIPO]
+            for x in registros]
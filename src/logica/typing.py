@@ -11,8 +11,9 @@ else:
         return dict
 
 TipoClaveFavorita = TypedDict(
-    'ClaveFavorita', {'nombre': str, 'clave': str, 'pista': str})
+    'ClaveFavorita', {'id': int, 'nombre': str, 'clave': str, 'pista': str}, total=False)
 TipoElemento = TypedDict('Elemento', {
+    'id': int,  # id del elemento en la base de datos
     'nombre_elemento': str, 'tipo': str, 'notas': str, # Login, Identificación, Tarjeta
     'clave': str,  # Login, Tarjeta, Secreto
     'email': str, 'usuario': str, 'url': str,  # Login
@@ -21,6 +22,12 @@ TipoElemento = TypedDict('Elemento', {
     'titular': str, 'ccv': int, 'direccion': str, 'telefono': str,  # Tarjeta
     'secreto': str,  # Secreto
 }, total=False)
+TipoResumenElemento = TypedDict(
+    'ResumenElemento', {'id': int, 'nombre_elemento': str, 'tipo': str})
+TipoElementoSimilar = TypedDict(
+    'ElementoSimilar', {'id': int, 'nombre_elemento': str, 'similitud': float})
+TipoClaveSimilar = TypedDict(
+    'ClaveSimilar', {'id': int, 'nombre': str, 'similitud': float})
 
 TipoReporte = TypedDict('Reporte', {
     'logins': int,
@@ -32,3 +39,10 @@ TipoReporte = TypedDict('Reporte', {
     'masdeuna': int,
     'nivel': float,
 })
+
+TipoResultadoImportacion = TypedDict('ResultadoImportacion', {
+    'procesados': int,  # registros del archivo leídos hasta el último commit
+    'importados': int,
+    'errores': list,  # tuplas (número de registro, mensaje)
+    'avisos': list,  # tuplas (número de registro, mensaje) de los registros importados con datos faltantes
+})
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, String, Integer
+from sqlalchemy import Column, ForeignKey, String, Integer, Index
 from .declarative_base import Base
 
 class ClaveFavorita(Base):
@@ -8,3 +8,8 @@ class ClaveFavorita(Base):
     clave = Column(String)
     pista = Column(String)
     caja_id = Column(Integer, ForeignKey("caja.id"))
+
+    # Sirve tanto para filtrar por caja como para recorrerla ordenada por nombre (paginación por llave)
+    __table_args__ = (
+        Index("ix_clavefavorita_caja_nombre", "caja_id", "nombre"),
+    )
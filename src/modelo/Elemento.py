@@ -1,14 +1,19 @@
-from sqlalchemy import Column, ForeignKey, String, Integer
+from sqlalchemy import Column, ForeignKey, String, Integer, Index
 from .declarative_base import Base
 
 class Elemento(Base):
     __tablename__ = "elemento"
     id = Column(Integer, primary_key=True)
-    tipo = Column(String)
+    tipo = Column(String, index=True)
     nombre = Column(String, unique=True)
     nota = Column(String)
     caja_id = Column(Integer, ForeignKey("caja.id"))
 
+    # Sirve tanto para filtrar por caja como para recorrerla ordenada por nombre (paginación por llave)
+    __table_args__ = (
+        Index("ix_elemento_caja_nombre", "caja_id", "nombre"),
+    )
+
     __mapper_args__ = {
         "polymorphic_identity": "Elemento",
         "polymorphic_on": tipo,
@@ -8,7 +8,7 @@ class Identificacion(Elemento):
     nombre_completo = Column(String)
     nacimiento = Column(Date)
     expedicion = Column(Date)
-    vencimiento = Column(Date)
+    vencimiento = Column(Date, index=True)
 
     __mapper_args__= {
         "polymorphic_identity": "Identificación",
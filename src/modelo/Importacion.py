@@ -0,0 +1,15 @@
+from sqlalchemy import Column, ForeignKey, String, Integer, UniqueConstraint
+from .declarative_base import Base
+
+class Importacion(Base):
+    # Avance de la importación de un archivo: se actualiza en la misma transacción de cada parte importada
+    __tablename__ = "importacion"
+    id = Column(Integer, primary_key=True)
+    caja_id = Column(Integer, ForeignKey("caja.id"))
+    origen = Column(String, nullable=False)  # ruta absoluta del archivo importado
+    procesados = Column(Integer, nullable=False, default=0)  # registros leídos hasta el último commit
+    importados = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("caja_id", "origen"),
+    )
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, ForeignKey, String, Integer, Date, Index
+from .declarative_base import Base
+
+class ListadoElemento(Base):
+    # Copia plana de cada elemento (con el nombre de su clave favorita) para listar sin uniones
+    __tablename__ = "listado_elemento"
+    id = Column(Integer, primary_key=True)  # id del elemento
+    caja_id = Column(Integer, ForeignKey("caja.id"))
+    tipo = Column(String)
+    nombre = Column(String)
+    nota = Column(String)
+    email = Column(String)
+    usuario = Column(String)
+    url = Column(String)
+    numero = Column(String)
+    titular = Column(String)
+    codigo_seguridad = Column(String)
+    direccion = Column(String)
+    telefono = Column(String)
+    vencimiento = Column(Date)
+    secreto = Column(String)
+    nombre_completo = Column(String)
+    nacimiento = Column(Date)
+    expedicion = Column(Date)
+    clave_id = Column(Integer)
+    clave = Column(String)
+
+    __table_args__ = (
+        Index("ix_listado_elemento_caja_nombre", "caja_id", "nombre"),
+        Index("ix_listado_elemento_clave", "clave_id"),
+    )
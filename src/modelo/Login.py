@@ -1,6 +1,7 @@
 from sqlalchemy import Column, ForeignKey, String, Integer
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from .Elemento import Elemento
+from . import dominios
 
 # Importar para asegurar de que se conocen antes de hacer referencia a ellos
 from .ClaveFavorita import ClaveFavorita
@@ -11,9 +12,17 @@ class Login(Elemento):
     email = Column(String)
     usuario = Column(String)
     url = Column(String)
-    clave_id = Column(Integer, ForeignKey("clavefavorita.id"))
+    # Derivados de url al asignarla (ver dominios.normalizar); el índice permite buscar por dominio y subdominios
+    dominio = Column(String)
+    host_invertido = Column(String, index=True)
+    clave_id = Column(Integer, ForeignKey("clavefavorita.id"), index=True)
     clave = relationship("ClaveFavorita")
 
     __mapper_args__ = {
         "polymorphic_identity": "Login",
     }
+
+    @validates("url")
+    def normalizar_url(self, llave, url):
+        (self.dominio, self.host_invertido) = dominios.normalizar(url)
+        return url
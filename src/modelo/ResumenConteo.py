@@ -0,0 +1,13 @@
+from sqlalchemy import Column, ForeignKey, String, Integer, UniqueConstraint
+from .declarative_base import Base
+
+class ResumenConteo(Base):
+    __tablename__ = "resumen_conteo"
+    id = Column(Integer, primary_key=True)
+    caja_id = Column(Integer, ForeignKey("caja.id"))
+    nombre = Column(String)
+    valor = Column(Integer, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("caja_id", "nombre"),
+    )
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, ForeignKey, Integer, Index
+from .declarative_base import Base
+
+class ResumenUsoClave(Base):
+    __tablename__ = "resumen_uso_clave"
+    clave_id = Column(Integer, ForeignKey("clavefavorita.id"), primary_key=True)
+    caja_id = Column(Integer, ForeignKey("caja.id"))
+    usos = Column(Integer, default=0)
+
+    __table_args__ = (
+        Index("ix_resumen_uso_clave_caja_usos", "caja_id", "usos"),
+    )
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, ForeignKey, Integer, Date, UniqueConstraint
+from .declarative_base import Base
+
+class ResumenVencimiento(Base):
+    __tablename__ = "resumen_vencimiento"
+    id = Column(Integer, primary_key=True)
+    caja_id = Column(Integer, ForeignKey("caja.id"))
+    fecha = Column(Date)
+    cantidad = Column(Integer, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("caja_id", "fecha"),
+    )
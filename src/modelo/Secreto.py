@@ -9,7 +9,7 @@ class Secreto(Elemento):
     __tablename__ = "secreto"
     id = Column(Integer, ForeignKey("elemento.id"), primary_key=True)
     secreto = Column(String)
-    clave_id = Column(Integer, ForeignKey("clavefavorita.id"))
+    clave_id = Column(Integer, ForeignKey("clavefavorita.id"), index=True)
     clave = relationship("ClaveFavorita")
 
     __mapper_args__ = {
@@ -13,8 +13,8 @@ class Tarjeta(Elemento):
     codigo_seguridad = Column(String)
     direccion = Column(String)
     telefono = Column(String)
-    vencimiento = Column(Date)
-    clave_id = Column(Integer, ForeignKey("clavefavorita.id"))
+    vencimiento = Column(Date, index=True)
+    clave_id = Column(Integer, ForeignKey("clavefavorita.id"), index=True)
     clave = relationship("ClaveFavorita")
 
     __mapper_args__ = {
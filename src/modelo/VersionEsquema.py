@@ -0,0 +1,8 @@
+from sqlalchemy import Column, Integer
+from .declarative_base import Base
+
+class VersionEsquema(Base):
+    # Una sola fila con la última migración aplicada a la base de datos (ver migraciones.py)
+    __tablename__ = "version_esquema"
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
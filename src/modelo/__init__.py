@@ -5,3 +5,9 @@ from .Identificacion import Identificacion
 from .Login import Login
 from .Secreto import Secreto
 from .Tarjeta import Tarjeta
+from .ResumenConteo import ResumenConteo
+from .ResumenUsoClave import ResumenUsoClave
+from .ResumenVencimiento import ResumenVencimiento
+from .ListadoElemento import ListadoElemento
+from .VersionEsquema import VersionEsquema
+from .Importacion import Importacion
@@ -1,8 +1,105 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-engine = create_engine(os.environ.get('CAJA_DB', 'sqlite:///aplicacion.sqlite'), echo='CAJA_DB_DEBUG' in os.environ)
-Session = sessionmaker(bind=engine)
+from .perfiles import PERFIL_POR_DEFECTO, PERFILES, aplicar_perfil
+
 Base = declarative_base()
+
+class FabricaSesiones():
+    ''' Crea, la primera vez que se necesitan, el engine y las sesiones de una base de datos '''
+
+    def __init__(self, url: str = None, perfil: str = None, **opciones_engine) -> None:
+        ''' Configura la fábrica sin conectarse a la base de datos
+        Parámetros:
+            url (string): La URL de la base de datos, por defecto la variable de ambiente CAJA_DB
+                o sqlite:///aplicacion.sqlite
+            perfil (string): El perfil de almacenamiento de SQLite (ver perfiles.py), por defecto
+                la variable de ambiente CAJA_DB_PERFIL o rollback
+            opciones_engine: Opciones adicionales para create_engine (p. ej. poolclass o pool_size)
+        '''
+        self.url = url or os.environ.get('CAJA_DB', 'sqlite:///aplicacion.sqlite')
+        self.perfil = perfil or os.environ.get('CAJA_DB_PERFIL', PERFIL_POR_DEFECTO)
+        self.opciones_engine = opciones_engine
+        self.opciones_engine.setdefault("echo", 'CAJA_DB_DEBUG' in os.environ)
+        self._engine = None
+        self._session = None
+
+    @property
+    def engine(self):
+        ''' El engine de la base de datos, se crea en el primer uso '''
+        if self._engine is None:
+            self._engine = create_engine(self.url, **self.opciones_engine)
+            event.listen(self._engine, "connect", self.configurar_conexion)
+        return self._engine
+
+    @property
+    def Session(self):
+        ''' La fábrica de sesiones (sessionmaker) ligada al engine, se crea en el primer uso '''
+        if self._session is None:
+            self._session = sessionmaker(bind=self.engine)
+        return self._session
+
+    def __call__(self):
+        ''' Retorna una sesión nueva de la base de datos '''
+        return self.Session()
+
+    def configurar_conexion(self, conexion_dbapi, registro_conexion) -> None:
+        ''' Aplica el perfil de almacenamiento a cada conexión nueva '''
+        if self._engine.dialect.name == "sqlite":
+            aplicar_perfil(conexion_dbapi, self.perfil)
+
+    def usar_perfil(self, nombre: str) -> None:
+        ''' Cambia el perfil de almacenamiento de las conexiones a la base de datos
+        Parámetros:
+            nombre (string): El nombre del perfil (rollback, durable, balanced o fast)
+        '''
+        if nombre not in PERFILES:
+            raise ValueError("Perfil de almacenamiento desconocido: %s" % nombre)
+        self.perfil = nombre
+        if self._engine is None or self._engine.dialect.name != "sqlite":
+            return
+        if self._engine.url.database in (None, "", ":memory:"):
+            # La base de datos en memoria sólo existe en su conexión, que no se puede descartar: se reconfigura
+            with self._engine.connect() as conexion:
+                aplicar_perfil(conexion.connection, nombre)
+            return
+        # Las conexiones del pool conservan los PRAGMA del perfil anterior: se descartan y las nuevas aplican el
+        # perfil al conectarse. journal_mode sólo puede dejar WAL sin otras conexiones abiertas, por eso se cambia
+        # en una conexión nueva después de descartar las demás (las sesiones deben haber terminado su transacción)
+        self._engine.dispose()
+        with self._engine.connect():
+            pass
+
+    def cerrar(self) -> None:
+        ''' Cierra las conexiones del engine, si ya se creó '''
+        if self._engine is not None:
+            self._engine.dispose()
+
+_fabrica_por_defecto = None
+
+def fabrica_por_defecto() -> FabricaSesiones:
+    ''' Retorna la fábrica configurada con las variables de ambiente, compartida por todo el proceso
+    Retorna:
+        (FabricaSesiones): La fábrica de sesiones por defecto
+    '''
+    global _fabrica_por_defecto
+    if _fabrica_por_defecto is None:
+        _fabrica_por_defecto = FabricaSesiones()
+    return _fabrica_por_defecto
+
+def usar_perfil(nombre: str) -> None:
+    ''' Cambia el perfil de almacenamiento de la fábrica por defecto
+    Parámetros:
+        nombre (string): El nombre del perfil (rollback, durable, balanced o fast)
+    '''
+    fabrica_por_defecto().usar_perfil(nombre)
+
+def __getattr__(nombre):
+    # engine y Session se mantienen como atributos del módulo, pero sólo se crean al usarlos
+    if nombre == "engine":
+        return fabrica_por_defecto().engine
+    if nombre == "Session":
+        return fabrica_por_defecto().Session
+    raise AttributeError("module %r has no attribute %r" % (__name__, nombre))
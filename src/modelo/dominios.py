@@ -0,0 +1,130 @@
+'''
+Normalización de las URL de los logins a su host y dominio registrable.
+
+Login guarda, además de la url, el dominio registrable (p. ej. google.com) y el host con las etiquetas
+en orden inverso (p. ej. com.google.mail), que tiene un índice: los logins de un dominio y de todos sus
+subdominios son un rango contiguo de ese índice (ver rango_dominio).
+
+El dominio registrable es la etiqueta anterior al sufijo público del host más ese sufijo, según la lista
+de sufijos públicos (https://publicsuffix.org) que se incluye en public_suffix_list.dat; la lista tiene
+también los sufijos privados como github.io o blogspot.com, bajo los que cada sitio es de otro dueño.
+Para actualizarla basta con reemplazar el archivo y recalcular el dominio de los logins existentes con
+una migración (ver migraciones.recalcular_dominios).
+'''
+import os
+from functools import lru_cache
+from typing import FrozenSet, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Copia de la lista de sufijos públicos (versión 2026-10-07)
+ARCHIVO_SUFIJOS = os.path.join(os.path.dirname(__file__), "public_suffix_list.dat")
+
+@lru_cache(maxsize=None)
+def dar_reglas() -> Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str]]:
+    ''' Lee una vez la lista de sufijos públicos; cada regla se guarda en Unicode y en punycode
+    Retorna:
+        (tuple): (sufijos, comodines, excepciones): los sufijos de las reglas normales, los sufijos bajo
+        los que cualquier etiqueta es un sufijo (reglas *.ck) y los sufijos que no lo son (reglas !www.ck)
+    '''
+    reglas = {"": set(), "*.": set(), "!": set()}
+    with open(ARCHIVO_SUFIJOS, encoding="utf-8") as archivo:
+        for linea in archivo:
+            linea = linea.strip()
+            if not linea or linea.startswith("//"):
+                continue
+            prefijo = "*." if linea.startswith("*.") else "!" if linea.startswith("!") else ""
+            sufijo = linea[len(prefijo):].lower()
+            reglas[prefijo].update((sufijo, sufijo.encode("idna").decode("ascii")))
+    return (frozenset(reglas[""]), frozenset(reglas["*."]), frozenset(reglas["!"]))
+
+def sufijo_publico(host: str) -> Tuple[str, bool]:
+    ''' Retorna el sufijo público de un host con las reglas de la lista de sufijos públicos
+    Parámetros:
+        host (string): El host, normalizado con dar_host
+    Retorna:
+        (tuple): (sufijo, listado): el sufijo y si alguna regla de la lista lo define; si ninguna regla
+        aplica el sufijo es la última etiqueta y listado es False
+    '''
+    (sufijos, comodines, excepciones) = dar_reglas()
+    etiquetas = host.split(".")
+    # Del sufijo candidato más largo al más corto: la primera regla que aplica es la más larga
+    for inicio in range(len(etiquetas)):
+        candidato = ".".join(etiquetas[inicio:])
+        if candidato in excepciones:
+            return (".".join(etiquetas[inicio + 1:]), True)
+        if candidato in sufijos or ".".join(etiquetas[inicio + 1:]) in comodines:
+            return (candidato, True)
+    return (etiquetas[-1], False)
+
+def dar_host(url: str) -> Optional[str]:
+    ''' Retorna el host de una URL, en minúsculas y sin puerto ni usuario; acepta URL sin esquema (www.mail.co)
+    Parámetros:
+        url (string): La URL
+    Retorna:
+        (string): El host, o None si la URL no tiene host
+    '''
+    if not url:
+        return None
+    url = url.strip()
+    if "://" not in url:
+        url = "http://" + url
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return None
+    host = host.strip(".") if host else ""
+    return host or None
+
+def dar_dominio(host: str) -> Optional[str]:
+    ''' Retorna el dominio registrable de un host
+    Parámetros:
+        host (string): El host, normalizado con dar_host
+    Retorna:
+        (string): El dominio registrable; el mismo host si es una dirección IP o tiene una sola etiqueta que
+        no es un sufijo público (localhost), o None si el host es un sufijo público (co.uk, github.io)
+    '''
+    if ":" in host or host.replace(".", "").isdigit():
+        return host
+    (sufijo, listado) = sufijo_publico(host)
+    if host == sufijo:
+        return None if listado else host
+    return host[:-len(sufijo) - 1].rsplit(".", 1)[-1] + "." + sufijo
+
+def invertir(host: str) -> str:
+    ''' Retorna el host con las etiquetas en orden inverso: mail.google.com -> com.google.mail '''
+    return ".".join(reversed(host.split(".")))
+
+def normalizar(url: str) -> Tuple[Optional[str], Optional[str]]:
+    ''' Retorna el dominio registrable y el host invertido de una URL, los valores que se guardan en Login
+    Parámetros:
+        url (string): La URL
+    Retorna:
+        (tuple): (dominio, host invertido), o (None, None) si la URL no tiene host; el dominio es None si
+        el host es un sufijo público
+    '''
+    host = dar_host(url)
+    if host is None:
+        return (None, None)
+    return (dar_dominio(host), invertir(host))
+
+def rango_dominio(url: str) -> Optional[Tuple[str, str, str, str]]:
+    ''' Retorna el dominio registrable de una URL y los valores del host invertido de sus logins y los de sus subdominios
+    Parámetros:
+        url (string): La URL (o el dominio) a buscar
+    Retorna:
+        (tuple): (dominio, igual, desde, hasta): el dominio, el host invertido del dominio y el rango (desde, hasta)
+        exclusivo de los subdominios, que empiezan por el dominio invertido seguido de un punto (vacío si el
+        dominio tiene una sola etiqueta); None si la URL no tiene host o si su host es un sufijo público. Los
+        subdominios bajo un sufijo público más largo (sitio.s3.amazonaws.com para amazonaws.com) están en el
+        rango pero tienen otro dominio
+    '''
+    host = dar_host(url)
+    dominio = dar_dominio(host) if host is not None else None
+    if dominio is None:
+        return None
+    igual = invertir(dominio)
+    if "." not in dominio:
+        # Un host de una sola etiqueta (localhost) no incluye subdominios
+        return (dominio, igual, igual, igual)
+    # "/" es el caracter que sigue a "." en ASCII
+    return (dominio, igual, igual + ".", igual + "/")
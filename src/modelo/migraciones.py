@@ -0,0 +1,201 @@
+'''
+Migraciones del esquema de la base de datos.
+
+Base.metadata.create_all sólo crea las tablas que no existen, así que los cambios a tablas
+existentes (p. ej. índices nuevos) se aplican aquí. Cada migración tiene un número de versión;
+migrar aplica, en orden y cada una en su propia transacción, las migraciones con versión mayor
+a la guardada en la tabla version_esquema. Las migraciones deben poder repetirse sin error.
+'''
+from sqlalchemy import and_, bindparam, inspect, select
+
+from . import dominios
+from .declarative_base import Base
+from .Login import Login
+from .VersionEsquema import VersionEsquema
+
+version_esquema = VersionEsquema.__table__
+login = Login.__table__
+
+# Índices de la migración 1, escritos explícitamente para que no dependan de los modelos de la versión
+# del código que la ejecute: toda base de datos en la versión 1 tiene estos índices
+INDICES_VERSION_1 = [
+    ("ix_elemento_tipo", "elemento", "tipo"),
+    ("ix_elemento_caja_nombre", "elemento", "caja_id, nombre"),
+    ("ix_clavefavorita_caja_nombre", "clavefavorita", "caja_id, nombre"),
+    ("ix_login_clave_id", "login", "clave_id"),
+    ("ix_tarjeta_clave_id", "tarjeta", "clave_id"),
+    ("ix_secreto_clave_id", "secreto", "clave_id"),
+    ("ix_tarjeta_vencimiento", "tarjeta", "vencimiento"),
+    ("ix_identificacion_vencimiento", "identificacion", "vencimiento"),
+    ("ix_listado_elemento_caja_nombre", "listado_elemento", "caja_id, nombre"),
+    ("ix_listado_elemento_clave", "listado_elemento", "clave_id"),
+    ("ix_resumen_uso_clave_caja_usos", "resumen_uso_clave", "caja_id, usos"),
+]
+
+def crear_indices(conexion, indices) -> None:
+    ''' Crea los índices que no existan en la base de datos
+    Parámetros:
+        conexion (Connection): La conexión con la que se modifica la base de datos
+        indices (list): Tuplas (nombre, tabla, columnas separadas por comas)
+    '''
+    for (nombre, tabla, columnas) in indices:
+        conexion.execute("CREATE INDEX IF NOT EXISTS %s ON %s (%s)" % (nombre, tabla, columnas))
+
+def crear_indices_version_1(conexion) -> None:
+    ''' Crea los índices de las consultas de la fachada (INDICES_VERSION_1)
+    Parámetros:
+        conexion (Connection): La conexión con la que se modifica la base de datos
+    '''
+    crear_indices(conexion, INDICES_VERSION_1)
+
+def reemplazar_indices_caja(conexion) -> None:
+    ''' Reemplaza los índices de caja_id de elemento y clavefavorita por índices de caja_id y nombre
+    Parámetros:
+        conexion (Connection): La conexión con la que se modifica la base de datos
+    '''
+    # Con el índice sólo por caja_id SQLite lo prefiere al de nombre y ordena toda la caja en cada página
+    conexion.execute("DROP INDEX IF EXISTS ix_elemento_caja_id")
+    conexion.execute("DROP INDEX IF EXISTS ix_clavefavorita_caja_id")
+    crear_indices(conexion, [("ix_elemento_caja_nombre", "elemento", "caja_id, nombre"),
+                             ("ix_clavefavorita_caja_nombre", "clavefavorita", "caja_id, nombre")])
+
+# Columnas del listado que indexa la tabla de texto completo busqueda_elemento
+COLUMNAS_BUSQUEDA = ["nombre", "nota", "usuario", "email", "url", "titular", "nombre_completo"]
+
+def crear_indice_busqueda(conexion) -> None:
+    ''' Crea la tabla FTS5 busqueda_elemento sobre el listado, los triggers que la mantienen y la llena
+    Parámetros:
+        conexion (Connection): La conexión con la que se modifica la base de datos
+    '''
+    if conexion.dialect.name != "sqlite":
+        return
+    # Tabla de contenido externo: sólo guarda el índice, los textos se leen de listado_elemento por su id
+    columnas = ", ".join(COLUMNAS_BUSQUEDA)
+    nuevas = ", ".join("new." + x for x in COLUMNAS_BUSQUEDA)
+    anteriores = ", ".join("old." + x for x in COLUMNAS_BUSQUEDA)
+    conexion.execute("CREATE VIRTUAL TABLE IF NOT EXISTS busqueda_elemento USING fts5(%s, "
+        "content='listado_elemento', content_rowid='id', tokenize='unicode61 remove_diacritics 2')" % columnas)
+    conexion.execute("CREATE TRIGGER IF NOT EXISTS listado_elemento_busqueda_insertar AFTER INSERT ON listado_elemento BEGIN "
+        "INSERT INTO busqueda_elemento(rowid, %s) VALUES (new.id, %s); END" % (columnas, nuevas))
+    conexion.execute("CREATE TRIGGER IF NOT EXISTS listado_elemento_busqueda_borrar AFTER DELETE ON listado_elemento BEGIN "
+        "INSERT INTO busqueda_elemento(busqueda_elemento, rowid, %s) VALUES ('delete', old.id, %s); END" % (columnas, anteriores))
+    # Sólo los cambios de las columnas indexadas; renombrar una clave favorita actualiza la columna clave y no el índice
+    conexion.execute("CREATE TRIGGER IF NOT EXISTS listado_elemento_busqueda_actualizar AFTER UPDATE OF %s ON listado_elemento BEGIN "
+        "INSERT INTO busqueda_elemento(busqueda_elemento, rowid, %s) VALUES ('delete', old.id, %s); "
+        "INSERT INTO busqueda_elemento(rowid, %s) VALUES (new.id, %s); END" % (columnas, columnas, anteriores, columnas, nuevas))
+    conexion.execute("INSERT INTO busqueda_elemento(busqueda_elemento) VALUES ('rebuild')")
+
+def rellenar_dominios(conexion, tamano_parte: int = 1000, todos: bool = False) -> int:
+    ''' Calcula el dominio y el host invertido de los logins que tienen url pero no host invertido. Recorre
+    la tabla por partes ordenadas por id, así puede volver a ejecutarse y continúa con las filas que falten
+    Parámetros:
+        conexion (Connection): La conexión con la que se modifica la base de datos
+        tamano_parte (int): La cantidad de filas que se leen y actualizan en cada consulta
+        todos (bool): Si es True se recalculan todos los logins con url, aunque ya tengan host invertido
+    Retorna:
+        (int): La cantidad de logins actualizados
+    '''
+    actualizacion = login.update().where(login.c.id == bindparam("id_login")).values(
+        dominio=bindparam("dominio"), host_invertido=bindparam("host_invertido"))
+    actualizados = 0
+    ultimo = 0
+    condicion = login.c.url.isnot(None) if todos else and_(login.c.url.isnot(None), login.c.host_invertido.is_(None))
+    while True:
+        filas = conexion.execute(select([login.c.id, login.c.url])
+            .where(and_(login.c.id > ultimo, condicion))
+            .order_by(login.c.id).limit(tamano_parte)).fetchall()
+        if not filas:
+            return actualizados
+        ultimo = filas[-1].id
+        valores = [dict(zip(("dominio", "host_invertido"), dominios.normalizar(x.url)), id_login=x.id) for x in filas]
+        valores = [x for x in valores if x["host_invertido"] is not None]
+        if valores:
+            conexion.execute(actualizacion, valores)
+        actualizados += len(valores)
+
+def agregar_dominios_login(conexion) -> None:
+    ''' Agrega a login las columnas dominio y host_invertido, con su índice, y las llena para los logins existentes
+    Parámetros:
+        conexion (Connection): La conexión con la que se modifica la base de datos
+    '''
+    columnas = {x["name"] for x in inspect(conexion).get_columns("login")}
+    for columna in ("dominio", "host_invertido"):
+        if columna not in columnas:
+            conexion.execute("ALTER TABLE login ADD COLUMN %s VARCHAR" % columna)
+    crear_indices(conexion, [("ix_login_host_invertido", "login", "host_invertido")])
+    rellenar_dominios(conexion)
+
+def recalcular_dominios(conexion) -> None:
+    ''' Recalcula el dominio de todos los logins con la lista de sufijos públicos de dominios.py
+    Parámetros:
+        conexion (Connection): La conexión con la que se modifica la base de datos
+    '''
+    rellenar_dominios(conexion, todos=True)
+
+# Índices que empiezan por caja_id seguido del nombre, único en la caja
+INDICES_CAJA_NOMBRE = [
+    ("elemento", "ix_elemento_caja_nombre"),
+    ("clavefavorita", "ix_clavefavorita_caja_nombre"),
+    ("listado_elemento", "ix_listado_elemento_caja_nombre"),
+]
+
+def crear_estadisticas(conexion) -> None:
+    ''' Guarda en sqlite_stat1 las estadísticas del planificador de consultas de SQLite. Sin estadísticas SQLite
+    supone que caja_id = ? selecciona pocas filas y prefiere recorrer toda la caja por el índice de caja_id y
+    nombre antes que un índice más selectivo (host_invertido, vencimiento). ANALYZE calcula las estadísticas de
+    las tablas con filas; a los índices de caja_id que quedan sin estadísticas (una base de datos nueva) se les
+    asigna las de una sola caja con muchos elementos de nombre único
+    Parámetros:
+        conexion (Connection): La conexión con la que se modifica la base de datos
+    '''
+    if conexion.dialect.name != "sqlite":
+        return
+    conexion.execute("ANALYZE")
+    existentes = {x for (x,) in conexion.execute("SELECT idx FROM sqlite_stat1 WHERE idx IS NOT NULL")}
+    for (tabla, indice) in INDICES_CAJA_NOMBRE:
+        if indice not in existentes:
+            conexion.execute("INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (?, ?, ?)", (tabla, indice, "1000000 1000000 1"))
+    # Las conexiones leen sqlite_stat1 al abrirse; esta la vuelve a leer
+    conexion.execute("ANALYZE sqlite_master")
+
+# Lista ordenada de migraciones: (versión, descripción, función que recibe la conexión)
+MIGRACIONES = [
+    (1, "Índices para las consultas de la fachada", crear_indices_version_1),
+    (2, "Índices por caja y nombre para la paginación", reemplazar_indices_caja),
+    (3, "Índice de texto completo de los elementos", crear_indice_busqueda),
+    (4, "Dominio y host invertido de los logins", agregar_dominios_login),
+    (5, "Dominio de los logins con la lista de sufijos públicos", recalcular_dominios),
+    (6, "Estadísticas del planificador de consultas", crear_estadisticas),
+]
+
+def dar_version(conexion) -> int:
+    ''' Retorna la versión del esquema de la base de datos
+    Parámetros:
+        conexion (Connection): La conexión con la que se consulta la base de datos
+    Retorna:
+        (int): La versión de la última migración aplicada o 0 si no se ha aplicado ninguna
+    '''
+    version = conexion.execute(select([version_esquema.c.version])).scalar()
+    return 0 if version is None else version
+
+def migrar(engine) -> int:
+    ''' Crea las tablas que no existen y aplica las migraciones pendientes
+    Parámetros:
+        engine (Engine): El engine de la base de datos a migrar
+    Retorna:
+        (int): La versión del esquema después de migrar
+    '''
+    Base.metadata.create_all(engine)
+
+    version = dar_version(engine)
+    for (numero, descripcion, funcion) in MIGRACIONES:
+        if numero <= version:
+            continue
+        with engine.begin() as conexion:
+            funcion(conexion)
+            if version == 0:
+                conexion.execute(version_esquema.insert().values(id=1, version=numero))
+            else:
+                conexion.execute(version_esquema.update().values(version=numero))
+        version = numero
+    return version
@@ -0,0 +1,61 @@
+'''
+Perfiles de almacenamiento de SQLite.
+
+Cada perfil es un conjunto de PRAGMA que se aplican a cada conexión nueva de la base de datos.
+El perfil se elige con la variable de ambiente CAJA_DB_PERFIL o con declarative_base.usar_perfil;
+por defecto se usa rollback, que deja la base de datos como la configura SQLite.
+'''
+
+# Perfil usado si no se indica ninguno. Los perfiles con WAL cambian de forma permanente el modo del diario
+# del archivo (y agregan los archivos -wal y -shm), por eso sólo se usan si se eligen explícitamente
+PERFIL_POR_DEFECTO = "rollback"
+
+PERFILES = {
+    # Como SQLite sin configurar: diario de reversión que se borra en cada commit, sin archivos adicionales
+    "rollback": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        # Igual al tiempo de espera que usa el módulo sqlite3 si no se indica otro
+        "busy_timeout": 5000,
+    },
+    # Cada commit queda en disco aunque se caiga el sistema operativo
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+    # Un commit puede perderse si se cae el sistema operativo, pero la base de datos no se corrompe
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # Sin esperar al disco: sólo para importaciones o pruebas que se pueden repetir
+    "fast": {
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+def aplicar_perfil(conexion_dbapi, nombre: str) -> None:
+    ''' Aplica los PRAGMA de un perfil a una conexión de sqlite3
+    Parámetros:
+        conexion_dbapi (sqlite3.Connection): La conexión a configurar
+        nombre (string): El nombre del perfil
+    '''
+    if nombre not in PERFILES:
+        raise ValueError("Perfil de almacenamiento desconocido: %s" % nombre)
+    cursor = conexion_dbapi.cursor()
+    for (pragma, valor) in PERFILES[nombre].items():
+        cursor.execute("PRAGMA %s = %s" % (pragma, valor))
+    cursor.close()
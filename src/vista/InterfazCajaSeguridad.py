@@ -38,7 +38,7 @@ class App_CajaDeSeguridad(QApplication):
         Esta función inicializa la ventana de la lista de elementos
         """
         self.vista_lista_elementos = VistaListaElementos(self)
-        self.vista_lista_elementos.mostrar_elementos(self.logica.dar_elementos())
+        self.vista_lista_elementos.mostrar_elementos(self.logica.dar_resumen_elementos())
 
     def crear_elemento(self, ventana):
         """
@@ -66,7 +66,7 @@ class App_CajaDeSeguridad(QApplication):
         self.elemento_actual = id_elemento
 
         if id_elemento != -1:
-            tipo = self.logica.dar_elementos()[id_elemento]['tipo']
+            tipo = self.logica.dar_elemento_por_id(id_elemento)['tipo']
             if tipo == "Login":
                 self.mostrar_login(id_elemento)
             elif tipo == "Identificación":
@@ -85,7 +85,7 @@ class App_CajaDeSeguridad(QApplication):
         self.elemento_actual = id_elemento
         if id_elemento != -1:
                 self.vista_login = VistaLogin(self, self.logica.dar_claves_favoritas())
-                self.vista_login.mostrar_login(self.logica.dar_elemento(self.elemento_actual))
+                self.vista_login.mostrar_login(self.logica.dar_elemento_por_id(self.elemento_actual))
         else:
             self.vista_login = VistaLogin(self,self.logica.dar_claves_favoritas())
             self.vista_login.mostrar_login(None)
@@ -95,13 +95,13 @@ class App_CajaDeSeguridad(QApplication):
         """
         Esta función guarda un nuevo login o los cambios sobre una existente
         """
-        validacion = self.logica.validar_crear_editar_login(self.elemento_actual, nombre, email, usuario, password, url, notas)
+        validacion = self.logica.validar_crear_editar_login_por_id(self.elemento_actual, nombre, email, usuario, password, url, notas)
         if validacion == "":
             if self.elemento_actual == -1:
                 self.logica.crear_login(nombre, email, usuario, password, url, notas)
             else:
-                self.logica.editar_login(self.elemento_actual, nombre, email, usuario, password, url, notas)
-            self.vista_lista_elementos.mostrar_elementos(self.logica.dar_elementos())
+                self.logica.editar_login_por_id(self.elemento_actual, nombre, email, usuario, password, url, notas)
+            self.vista_lista_elementos.mostrar_elementos(self.logica.dar_resumen_elementos())
         return validacion
 
     def mostrar_id(self, id_elemento=-1):
@@ -111,7 +111,7 @@ class App_CajaDeSeguridad(QApplication):
         self.elemento_actual = id_elemento
         if id_elemento != -1:
             self.vista_id = VistaId(self)
-            self.vista_id.mostrar_id(self.logica.dar_elemento(self.elemento_actual))
+            self.vista_id.mostrar_id(self.logica.dar_elemento_por_id(self.elemento_actual))
         else:
             self.vista_id = VistaId(self)
             self.vista_id.mostrar_id(None)
@@ -120,13 +120,13 @@ class App_CajaDeSeguridad(QApplication):
         """
         Esta función guarda un nuevo elemento de indentificación o los cambios sobre uno existente
         """
-        validacion = self.logica.validar_crear_editar_id(self.elemento_actual, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas)
+        validacion = self.logica.validar_crear_editar_id_por_id(self.elemento_actual, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas)
         if validacion == "":
             if self.elemento_actual == -1:
                 self.logica.crear_id(nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas)
             else:
-                self.logica.editar_id(self.elemento_actual, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas)
-            self.vista_lista_elementos.mostrar_elementos(self.logica.dar_elementos())
+                self.logica.editar_id_por_id(self.elemento_actual, nombre_elemento, numero, nombre_completo, fnacimiento, fexpedicion, fvencimiento, notas)
+            self.vista_lista_elementos.mostrar_elementos(self.logica.dar_resumen_elementos())
         return validacion
 
     def mostrar_tarjeta(self, id_elemento=-1):
@@ -136,7 +136,7 @@ class App_CajaDeSeguridad(QApplication):
         self.elemento_actual = id_elemento
         if id_elemento != -1:
             self.vista_tarjeta = VistaTarjeta(self, self.logica.dar_claves_favoritas())
-            self.vista_tarjeta.mostrar_tarjeta(self.logica.dar_elemento(self.elemento_actual))
+            self.vista_tarjeta.mostrar_tarjeta(self.logica.dar_elemento_por_id(self.elemento_actual))
         else:
             self.vista_tarjeta = VistaTarjeta(self,self.logica.dar_claves_favoritas())
             self.vista_tarjeta.mostrar_tarjeta(None)
@@ -145,13 +145,13 @@ class App_CajaDeSeguridad(QApplication):
         """
         Esta función guarda un nuevo elemento de tipo tarjeta o los cambios sobre uno existente
         """
-        validacion = self.logica.validar_crear_editar_tarjeta(self.elemento_actual, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas)
+        validacion = self.logica.validar_crear_editar_tarjeta_por_id(self.elemento_actual, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas)
         if validacion == "":
             if self.elemento_actual == -1:
                 self.logica.crear_tarjeta(nombre_elemento, numero, titular ,fvencimiento, ccv, clave, direccion, telefono, notas)
             else:
-                self.logica.editar_tarjeta(self.elemento_actual, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas)
-            self.vista_lista_elementos.mostrar_elementos(self.logica.dar_elementos())
+                self.logica.editar_tarjeta_por_id(self.elemento_actual, nombre_elemento, numero, titular, fvencimiento, ccv, clave, direccion, telefono, notas)
+            self.vista_lista_elementos.mostrar_elementos(self.logica.dar_resumen_elementos())
         return validacion
 
     def mostrar_secreto(self, id_elemento=-1):
@@ -161,7 +161,7 @@ class App_CajaDeSeguridad(QApplication):
         self.elemento_actual = id_elemento
         if id_elemento != -1:
                 self.vista_secreto = VistaSecreto(self, self.logica.dar_claves_favoritas())
-                self.vista_secreto.mostrar_secreto(self.logica.dar_elemento(self.elemento_actual))
+                self.vista_secreto.mostrar_secreto(self.logica.dar_elemento_por_id(self.elemento_actual))
         else:
             self.vista_secreto = VistaSecreto(self, self.logica.dar_claves_favoritas())
             self.vista_secreto.mostrar_secreto(None)
@@ -170,28 +170,28 @@ class App_CajaDeSeguridad(QApplication):
         """
         Esta función guarda un nuevo secreto o los cambios sobre una existente
         """
-        validacion = self.logica.validar_crear_editar_secreto(self.elemento_actual, nombre, secreto, clave, notas)
+        validacion = self.logica.validar_crear_editar_secreto_por_id(self.elemento_actual, nombre, secreto, clave, notas)
         if validacion == "":
             if self.elemento_actual == -1:
                 self.logica.crear_secreto(nombre, secreto, clave, notas)
             else:
-                self.logica.editar_secreto(self.elemento_actual, nombre, secreto, clave, notas)
-            self.vista_lista_elementos.mostrar_elementos(self.logica.dar_elementos())
+                self.logica.editar_secreto_por_id(self.elemento_actual, nombre, secreto, clave, notas)
+            self.vista_lista_elementos.mostrar_elementos(self.logica.dar_resumen_elementos())
         return validacion
 
-    def eliminar_elemento(self, indice):
+    def eliminar_elemento(self, id_elemento):
         """
         Esta función elimina un elemento
         """
-        self.logica.eliminar_elemento(indice)
-        self.vista_lista_elementos.mostrar_elementos(self.logica.dar_elementos())
+        self.logica.eliminar_elemento_por_id(id_elemento)
+        self.vista_lista_elementos.mostrar_elementos(self.logica.dar_resumen_elementos())
 
     def mostrar_clave(self, ventana, id_elemento):
         """
         Esta función muestra la clave del elemento
         """
         self.elemento_actual = id_elemento
-        clave_elemento = self.logica.dar_elemento(id_elemento)['clave']
+        clave_elemento = self.logica.dar_elemento_por_id(id_elemento)['clave']
         clave = self.logica.dar_clave(clave_elemento)
         QMessageBox.information(ventana, 'Clave elemento',
                                 "Nombre clave favorita: " + clave_elemento + "\nClave: " + clave, QMessageBox.Ok)
@@ -234,9 +234,9 @@ class App_CajaDeSeguridad(QApplication):
         """
         Esta función permite editar una clave
         """
-        validacion = self.logica.validar_crear_editar_clave(id, nombre, clave, pista)
+        validacion = self.logica.validar_crear_editar_clave_por_id(id, nombre, clave, pista)
         if validacion == "":
-            self.logica.editar_clave(id, nombre, clave, pista)
+            self.logica.editar_clave_por_id(id, nombre, clave, pista)
         else:
             self.vista_lista_claves.error_clave(validacion)
         self.vista_lista_claves.mostrar_claves(self.logica.dar_claves_favoritas())
@@ -247,13 +247,13 @@ class App_CajaDeSeguridad(QApplication):
         """
         return self.logica.generar_clave()
 
-    def eliminar_clave(self, indice):
+    def eliminar_clave(self, id_clave):
         """
         Esta función elimina una clave
         """
-        validacion = self.logica.validar_eliminar_clave(indice)
+        validacion = self.logica.validar_eliminar_clave_por_id(id_clave)
         if validacion == "":
-            self.logica.eliminar_clave(indice)
+            self.logica.eliminar_clave_por_id(id_clave)
         else:
             self.vista_lista_claves.error_clave(validacion)
         self.vista_lista_claves.mostrar_claves(self.logica.dar_claves_favoritas())
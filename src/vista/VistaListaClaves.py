@@ -141,7 +141,7 @@ class VistaListaClaves(QWidget):
         dialogo=VistaCrearClave(self.claves[id_clave], self.interfaz)
         dialogo.exec_()
         if dialogo.resultado==1:            
-            self.interfaz.editar_clave(id_clave, dialogo.texto_nombre.text(), dialogo.texto_clave.text(),dialogo.texto_pista.text())
+            self.interfaz.editar_clave(self.claves[id_clave]['id'], dialogo.texto_nombre.text(), dialogo.texto_clave.text(),dialogo.texto_pista.text())
             self.hide()
             self.interfaz.mostrar_claves_favoritas()
 
@@ -157,7 +157,7 @@ class VistaListaClaves(QWidget):
         mensaje_confirmacion.setStandardButtons(QMessageBox.Yes | QMessageBox.No ) 
         respuesta=mensaje_confirmacion.exec_()
         if respuesta == QMessageBox.Yes:
-            self.interfaz.eliminar_clave(indice_clave)
+            self.interfaz.eliminar_clave(self.claves[indice_clave]['id'])
             self.hide()
             self.interfaz.mostrar_claves_favoritas()
 
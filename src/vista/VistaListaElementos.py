@@ -153,14 +153,14 @@ class VistaListaElementos(QWidget):
                     btn_ver_clave.setToolTip("Ver clave")
                     btn_ver_clave.setFixedSize(40,40)
                     btn_ver_clave.setIcon(QIcon("src/recursos/002-eye-variant-with-enlarged-pupil.png"))
-                    btn_ver_clave.clicked.connect(partial(self.mostrar_clave,numero_fila -1 ) )
+                    btn_ver_clave.clicked.connect(partial(self.mostrar_clave,dic_elemento['id']) )
                     self.distribuidor_tabla_elementos.addWidget(btn_ver_clave,numero_fila,2,Qt.AlignCenter)
 
                 btn_editar_elemento=QPushButton("",self)
                 btn_editar_elemento.setToolTip("Editar elemento")
                 btn_editar_elemento.setFixedSize(40,40)
                 btn_editar_elemento.setIcon(QIcon("src/recursos/004-edit-button.png"))
-                btn_editar_elemento.clicked.connect(partial(self.mostrar_elemento,numero_fila-1) )
+                btn_editar_elemento.clicked.connect(partial(self.mostrar_elemento,dic_elemento['id']) )
                 self.distribuidor_tabla_elementos.addWidget(btn_editar_elemento,numero_fila,3,Qt.AlignCenter)
 
 
@@ -168,7 +168,7 @@ class VistaListaElementos(QWidget):
                 btn_eliminar.setToolTip("Borrar")
                 btn_eliminar.setFixedSize(40,40)
                 btn_eliminar.setIcon(QIcon("src/recursos/005-delete.png"))
-                btn_eliminar.clicked.connect(partial(self.eliminar_elemento,numero_fila -1) )
+                btn_eliminar.clicked.connect(partial(self.eliminar_elemento,dic_elemento['id']) )
                 self.distribuidor_tabla_elementos.addWidget(btn_eliminar,numero_fila,4,Qt.AlignCenter)
 
         else:
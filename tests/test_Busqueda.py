@@ -0,0 +1,91 @@
+#
+# Pruebas unitarias para la búsqueda de elementos con el índice de texto completo
+#
+
+import unittest
+import os
+
+# Usa base de datos en memoria para las pruebas
+os.environ['CAJA_DB'] = 'sqlite://' # noqa
+
+
+from src.modelo.declarative_base import FabricaSesiones
+from src.modelo import ListadoElemento, migraciones
+from src.logica.LogicaCaja import LogicaCaja
+
+class BusquedaTestCase(unittest.TestCase):
+    def setUp(self):
+        self.fabrica = FabricaSesiones("sqlite://")
+        self.logica = LogicaCaja(self.fabrica)
+
+        self.logica.crear_clave("Correo", "Clave123!", "La de siempre")
+        self.logica.crear_login("Correo Gmail", "ana@gmail.com", "ana", "Correo", "https://mail.google.com", "cuenta principal")
+        self.logica.crear_secreto("Alarma", "1234", "Correo", "código de la casa, no es de gmail")
+        self.logica.crear_tarjeta("Visa", "4111111111111111", "ANA PÉREZ", "2030-01-31", "123", "Correo", "Calle 1",
+                                  "+57 (606) 7422736", "tarjeta de crédito")
+        self.logica.crear_id("Cédula", "1010", "Ana María Pérez", "1990-01-01", "2010-01-01", "2030-01-01", "original")
+
+    def tearDown(self):
+        self.logica.cerrar_sesion()
+        self.fabrica.cerrar()
+
+    def buscar(self, texto, limite=20):
+        return [x["nombre_elemento"] for x in self.logica.buscar_elementos(texto, limite)]
+
+    # Prueba para verificar que se busca por prefijos en todas las columnas indexadas, sin tildes ni mayúsculas
+    def test_buscar_columnas(self):
+        self.assertEqual(["Correo Gmail"], self.buscar("google"))
+        self.assertCountEqual(["Visa", "Cédula"], self.buscar("perez"))
+        self.assertEqual(["Cédula"], self.buscar("MARÍA pér"))
+        self.assertEqual(["Visa"], self.buscar("credito"))
+        self.assertEqual([], self.buscar("1234"))
+
+    # Prueba para verificar que los resultados se ordenan por relevancia y respetan el límite
+    def test_buscar_ranking(self):
+        self.assertEqual(["Correo Gmail", "Alarma"], self.buscar("gmail"))
+        self.assertEqual(["Correo Gmail"], self.buscar("gmail", 1))
+        self.assertEqual(self.logica.dar_elemento_por_id(self.logica.dar_elementos()[1]["id"]),
+                         self.logica.buscar_elementos("gmail")[0])
+
+    # Prueba para verificar que el texto del usuario no se interpreta como sintaxis de FTS5
+    def test_buscar_texto_especial(self):
+        self.assertEqual([], self.buscar(""))
+        self.assertEqual([], self.buscar("  \"* ()"))
+        self.assertEqual(["Correo Gmail"], self.buscar("ana@gmail.com"))
+        self.assertEqual(["Correo Gmail"], self.buscar("\"correo\" (gmail)*"))
+
+    # Prueba para verificar que el índice se actualiza al editar y eliminar elementos
+    def test_buscar_despues_de_editar_y_eliminar(self):
+        id_secreto = [x for x in self.logica.dar_elementos() if x["tipo"] == "Secreto"][0]["id"]
+        self.logica.editar_secreto_por_id(id_secreto, "Alarma", "1234", "Correo", "código de la oficina")
+        self.assertEqual(["Correo Gmail"], self.buscar("gmail"))
+        self.assertEqual(["Alarma"], self.buscar("oficina"))
+
+        self.logica.editar_clave_por_id(self.logica.dar_claves_favoritas()[0]["id"], "Otra", "Clave123!", "pista")
+        self.assertEqual(["Alarma"], self.buscar("oficina"))
+
+        self.logica.eliminar_elemento_por_id(id_secreto)
+        self.assertEqual([], self.buscar("oficina"))
+
+    # Prueba para verificar que se encuentran los elementos creados en lote y los del listado reconstruido
+    def test_buscar_lote_y_reconstruccion(self):
+        self.assertEqual([""], self.logica.crear_elementos_lote([{"tipo": "Secreto", "nombre_elemento": "Wifi",
+            "secreto": "clave wifi", "clave": "Correo", "notas": "router del estudio"}]))
+        self.assertEqual(["Wifi"], self.buscar("router"))
+
+        self.logica.session.query(ListadoElemento).delete()
+        self.logica.session.commit()
+        self.assertEqual([], self.buscar("router"))
+        self.logica.reconstruir_listado()
+        self.assertEqual(["Wifi"], self.buscar("router"))
+
+    # Prueba para verificar que la migración indexa las filas que ya estaban en el listado
+    def test_migracion_indexa_listado(self):
+        with self.fabrica.engine.begin() as conexion:
+            conexion.execute("DROP TABLE busqueda_elemento")
+            migraciones.crear_indice_busqueda(conexion)
+            migraciones.crear_indice_busqueda(conexion)
+        self.assertCountEqual(["Visa", "Cédula"], self.buscar("perez"))
+
+if __name__ == '__main__':
+    unittest.main()
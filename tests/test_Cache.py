@@ -0,0 +1,89 @@
+#
+# Pruebas unitarias para el cache de lecturas de la lógica
+#
+
+import unittest
+import copy
+import os
+from faker import Faker
+
+# Usa base de datos en memoria para las pruebas
+os.environ['CAJA_DB'] = 'sqlite://' # noqa
+
+
+from src.modelo.declarative_base import Session
+from src.modelo import Elemento, ClaveFavorita
+from src.logica.LogicaCaja import LogicaCaja
+from test_ClaveFavorita import gen_clave
+from test_Caja import contar_consultas
+
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.logica = LogicaCaja(tamano_cache=2)
+        self.session = Session()
+        self.fake = Faker(["es-CO"])
+        Faker.seed(1000)
+
+        self.claves = [gen_clave(self.fake)[0] for _ in range(3)]
+        for clave in self.claves:
+            self.session.add(clave)
+        self.session.commit()
+
+    def tearDown(self):
+        [self.session.delete(x) for x in self.session.query(Elemento).all()]
+        [self.session.delete(x) for x in self.session.query(ClaveFavorita).all()]
+        self.session.commit()
+        self.session.close()
+
+    # Prueba para verificar que una lectura repetida no consulta la base de datos
+    def test_lectura_repetida(self):
+        esperado = self.logica.dar_claves_favoritas()
+        self.assertEqual(0, contar_consultas(self.logica.dar_claves_favoritas))
+        self.assertEqual(esperado, self.logica.dar_claves_favoritas())
+
+        estadisticas = self.logica.dar_estadisticas_cache()
+        self.assertEqual(1, estadisticas["fallos"])
+        self.assertEqual(2, estadisticas["aciertos"])
+
+    # Prueba para verificar que el resultado retornado no se puede modificar y que sus copias sí
+    def test_resultado_inmutable(self):
+        claves = self.logica.dar_claves_favoritas()
+        with self.assertRaises(TypeError):
+            claves[0]["nombre"] = "modificado"
+        with self.assertRaises(TypeError):
+            claves.pop()
+        self.assertIs(claves, self.logica.dar_claves_favoritas())
+
+        copia = copy.deepcopy(claves)
+        copia[0]["nombre"] = "modificado"
+        copia.pop()
+        self.assertEqual(claves[1:2], copia[1:])
+        self.assertNotIn("modificado", [x["nombre"] for x in self.logica.dar_claves_favoritas()])
+
+    # Prueba para verificar que una escritura de la lógica invalida el cache
+    def test_invalidar_con_logica(self):
+        self.logica.dar_claves_favoritas()
+        self.logica.crear_clave("nueva clave", "Clave123!", "pista")
+        self.assertEqual(4, len(self.logica.dar_claves_favoritas()))
+
+    # Prueba para verificar que una escritura de otra sesión invalida el cache
+    def test_invalidar_con_otra_sesion(self):
+        self.logica.dar_claves_favoritas()
+        self.session.add(gen_clave(self.fake)[0])
+        self.session.commit()
+        self.assertEqual(4, len(self.logica.dar_claves_favoritas()))
+
+        self.session.delete(self.claves[0])
+        self.session.commit()
+        self.assertEqual(3, len(self.logica.dar_claves_favoritas()))
+
+    # Prueba para verificar que el cache descarta el resultado usado hace más tiempo al superar su tamaño
+    def test_lru(self):
+        self.logica.dar_clave_favorita(0)
+        self.logica.dar_clave_favorita(1)
+        self.logica.dar_clave_favorita(0)
+        self.logica.dar_clave_favorita(2)
+
+        self.assertEqual(0, contar_consultas(lambda: self.logica.dar_clave_favorita(0)))
+        self.assertNotEqual(0, contar_consultas(lambda: self.logica.dar_clave_favorita(1)))
+        self.assertEqual(2, self.logica.dar_estadisticas_cache()["entradas"])
@@ -3,14 +3,34 @@
 #
 
 import unittest
+import gc
 import os
+import tempfile
+import threading
+from faker import Faker
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
 
 # Usa base de datos en memoria para las pruebas
 os.environ['CAJA_DB'] = 'sqlite://'  # noqa
 
-from src.modelo.declarative_base import Session
-from src.modelo import Caja
+from src.modelo.declarative_base import FabricaSesiones, Session, engine
+from src.modelo import Caja, Elemento, ClaveFavorita, ListadoElemento, ResumenConteo
 from src.logica.LogicaCaja import LogicaCaja
+from src.logica import ListadoElementos
+
+# Ejecuta una función y retorna la cantidad de consultas SQL que ejecutó
+def contar_consultas(funcion):
+    consultas = []
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        funcion()
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    return len(consultas)
 
 class CajaTestCase(unittest.TestCase):
 
@@ -19,6 +39,8 @@ class CajaTestCase(unittest.TestCase):
         self.session = Session()
 
     def tearDown(self):
+        [self.session.delete(x) for x in self.session.query(Elemento).all()]
+        [self.session.delete(x) for x in self.session.query(ClaveFavorita).all()]
         self.session.query(Caja).delete()
         self.session.commit()
         self.session.close()
@@ -29,4 +51,264 @@ class CajaTestCase(unittest.TestCase):
 
         self.assertEqual(clave,self.logica.dar_claveMaestra())
 
+    # Agrega claves favoritas con elementos de cada tipo al base de datos
+    def agregar_datos(self, fake, cantidad):
+        from test_ClaveFavorita import gen_clave
+        from test_Login import gen_login
+        from test_Identificacion import gen_id
+        from test_Tarjeta import gen_tarjeta
+        from test_Secreto import gen_secreto
+
+        for _ in range(cantidad):
+            (clave, _) = gen_clave(fake)
+            self.session.add(clave)
+            self.session.add(gen_login(fake, clave)[0])
+            self.session.add(gen_tarjeta(fake, clave)[0])
+            self.session.add(gen_secreto(fake, clave)[0])
+            self.session.add(gen_id(fake)[0])
+        self.session.commit()
+
+    # Prueba para verificar que listar los elementos no genera consultas adicionales por cada elemento
+    def test_consultas_dar_elementos_constante(self):
+        fake = Faker(["es-CO"])
+        Faker.seed(1000)
+
+        self.agregar_datos(fake, 1)
+        self.logica.session.expire_all()
+        consultas_caja_pequena = contar_consultas(self.logica.dar_elementos)
+
+        self.agregar_datos(fake, 20)
+        self.logica.session.expire_all()
+        consultas_caja_grande = contar_consultas(self.logica.dar_elementos)
+
+        self.assertEqual(consultas_caja_pequena, consultas_caja_grande)
+        self.assertEqual(84, len(self.logica.dar_elementos()))
+
+    # Prueba para verificar que el resumen de los elementos tiene el id, nombre y tipo de todos los elementos
+    def test_resumen_elementos(self):
+        fake = Faker(["es-CO"])
+        Faker.seed(1000)
+        self.agregar_datos(fake, 2)
+
+        esperado = [{"id": x["id"], "nombre_elemento": x["nombre_elemento"], "tipo": x["tipo"]}
+            for x in self.logica.dar_elementos()]
+        self.assertEqual(esperado, self.logica.dar_resumen_elementos())
+
+    # Prueba para verificar que el listado plano retorna los mismos elementos que las tablas de la herencia
+    def test_listado_igual_a_herencia(self):
+        fake = Faker(["es-CO"])
+        Faker.seed(1000)
+        self.agregar_datos(fake, 2)
+
+        sin_listado = LogicaCaja(usar_listado=False)
+        self.assertEqual(sin_listado.dar_elementos(), self.logica.dar_elementos())
+        self.assertEqual(sin_listado.dar_elemento(3), self.logica.dar_elemento(3))
+
+    # Prueba para verificar que el listado se mantiene al modificar claves favoritas y eliminar elementos
+    def test_listado_actualizado(self):
+        fake = Faker(["es-CO"])
+        Faker.seed(1000)
+        self.agregar_datos(fake, 2)
+
+        clave = self.session.query(ClaveFavorita).first()
+        clave.nombre = "clave renombrada"
+        self.session.delete(self.session.query(Elemento).first())
+        self.session.commit()
+
+        sin_listado = LogicaCaja(usar_listado=False)
+        self.assertEqual(7, len(self.logica.dar_elementos()))
+        self.assertIn("clave renombrada", [x.get("clave") for x in self.logica.dar_elementos()])
+        self.assertEqual(sin_listado.dar_elementos(), self.logica.dar_elementos())
+
+    # Prueba para verificar que el listado se reconstruye a partir de las tablas base
+    def test_listado_reconstruido(self):
+        fake = Faker(["es-CO"])
+        Faker.seed(1000)
+        self.agregar_datos(fake, 2)
+        esperado = self.logica.dar_elementos()
+
+        self.session.query(ListadoElemento).delete()
+        self.session.commit()
+        self.assertEqual([], self.logica.dar_elementos())
+
+        self.logica.reconstruir_listado()
+        self.assertEqual(esperado, self.logica.dar_elementos())
+
+    # Prueba para verificar que cada fábrica de sesiones nueva mantiene el listado, aunque reutilice el id()
+    # de una fábrica ya liberada
+    def test_listado_fabricas_nuevas(self):
+        for _ in range(100):
+            fabrica = FabricaSesiones("sqlite://")
+            ListadoElementos.registrar(fabrica.Session)
+            sesion = fabrica()
+            self.assertIn(ListadoElementos.despues_de_flush, list(sesion.dispatch.after_flush))
+            sesion.close()
+            del (fabrica, sesion)
+            gc.collect()
+
+    # Prueba para verificar que sólo la restricción unique de los nombres se traduce al error de nombre repetido
+    def test_nombre_repetido_por_restriccion(self):
+        fabrica = FabricaSesiones("sqlite://")
+        logica = LogicaCaja(fabrica)
+        self.assertEqual("", logica.guardar_clave(-1, "clave", "Clave123!", "pista"))
+        self.assertEqual("Ya existe un elemento con este nombre", logica.guardar_clave(-1, "clave", "Otra456?", "pista"))
+
+        # resumen_conteo.nombre también se llama nombre, pero su restricción unique es (caja_id, nombre)
+        conteo = logica.session.query(ResumenConteo).first()
+        logica.session.add(ResumenConteo(caja_id=conteo.caja_id, nombre=conteo.nombre, valor=1))
+        with self.assertRaises(IntegrityError):
+            logica.guardar_clave(-1, "otra", "Otra456?", "pista")
+        logica.cerrar_sesion()
+        fabrica.cerrar()
+
+    # Prueba para verificar que un proceso puede abrir varias cajas en bases de datos distintas
+    def test_cajas_independientes(self):
+        fabrica1 = FabricaSesiones("sqlite://")
+        fabrica2 = FabricaSesiones("sqlite://")
+        logica1 = LogicaCaja(fabrica1)
+        logica2 = LogicaCaja(fabrica2)
+
+        logica1.crear_clave("clave caja 1", "Clave123!", "pista")
+        self.assertEqual(["clave caja 1"], [x["nombre"] for x in logica1.dar_claves_favoritas()])
+        self.assertEqual([], logica2.dar_claves_favoritas())
+        self.assertEqual([], self.logica.dar_claves_favoritas())
+
+        logica1.session.close()
+        logica2.session.close()
+        fabrica1.cerrar()
+        fabrica2.cerrar()
+
+    # Prueba para verificar que crear elementos en lote guarda los mismos datos que crearlos uno por uno
+    def test_crear_elementos_lote(self):
+        fake = Faker(["es-CO"])
+        Faker.seed(1000)
+        self.agregar_datos(fake, 2)
+        registros = [dict(x, nombre_elemento="lote " + x["nombre_elemento"]) for x in self.logica.dar_elementos()]
+        [x.pop("id") for x in registros]
+
+        self.assertEqual([""] * 8, self.logica.crear_elementos_lote(registros))
+
+        creados = [dict(x) for x in self.logica.dar_elementos() if x["nombre_elemento"].startswith("lote ")]
+        [x.pop("id") for x in creados]
+        self.assertEqual(sorted(registros, key=lambda x: x["nombre_elemento"]), creados)
+        self.assertEqual(LogicaCaja(usar_listado=False).dar_elementos(), self.logica.dar_elementos())
+        self.assertTrue(self.logica.verificar_resumen_reporte(reparar=False))
+
+    # Prueba para verificar que crear elementos en lote retorna el error de cada registro inválido y crea los demás
+    def test_crear_elementos_lote_errores(self):
+        self.logica.crear_clave("clave", "Clave123!", "pista")
+        secreto = {"tipo": "Secreto", "nombre_elemento": "secreto", "secreto": "secreto", "clave": "clave", "notas": "notas"}
+        registros = [
+            secreto,
+            secreto,
+            dict(secreto, nombre_elemento="sin clave", clave="no existe"),
+            dict(secreto, tipo="Otro"),
+            {"tipo": "Identificación", "nombre_elemento": "id", "numero": "1234", "nombre": "Nombre",
+             "fecha_nacimiento": "2000-02-30", "fecha_exp": "2020-01-01", "fecha_venc": "2030-01-01", "notas": "notas"},
+        ]
+
+        errores = self.logica.crear_elementos_lote(registros)
+
+        self.assertEqual("", errores[0])
+        self.assertEqual("Ya existe un elemento con este nombre", errores[1])
+        self.assertEqual("Debe tener asignado una clave favorita", errores[2])
+        self.assertEqual("El tipo del elemento no es válido", errores[3])
+        self.assertNotEqual("", errores[4])
+        self.assertEqual(["secreto"], [x["nombre_elemento"] for x in self.logica.dar_elementos()])
+
+    # Prueba para verificar que la cantidad de consultas de crear elementos en lote no depende de la cantidad de registros
+    def test_consultas_crear_elementos_lote_constante(self):
+        self.logica.crear_clave("clave", "Clave123!", "pista")
+        def registros(prefijo, cantidad):
+            return [{"tipo": "Login", "nombre_elemento": "%s %d" % (prefijo, i), "email": "a@b.co", "usuario": "usuario",
+                     "clave": "clave", "url": "https://b.co", "notas": "notas"} for i in range(cantidad)]
+
+        # El primer lote crea los contadores del resumen, los siguientes sólo los actualizan
+        self.logica.crear_elementos_lote(registros("primero", 1))
+        consultas_pocos = contar_consultas(lambda: self.logica.crear_elementos_lote(registros("pocos", 2)))
+        consultas_muchos = contar_consultas(lambda: self.logica.crear_elementos_lote(registros("muchos", 200)))
+
+        self.assertEqual(consultas_pocos, consultas_muchos)
+        self.assertEqual(203, len(self.logica.dar_elementos()))
+
+    # Prueba para verificar que la validación en lote retorna todos los errores y coincide con crear_elementos_lote
+    def test_validar_elementos_lote(self):
+        self.logica.crear_clave("clave", "Clave123!", "pista")
+        self.logica.crear_secreto("existente", "secreto", "clave", "notas")
+        registros = [
+            {"tipo": "Login", "nombre_elemento": "nuevo", "email": "a@b.co", "usuario": "u", "clave": "clave", "url": "https://b.co", "notas": "notas"},
+            {"tipo": "Login", "nombre_elemento": "nuevo", "email": "a@b.co", "usuario": "u", "clave": "clave", "url": "https://b.co", "notas": "notas"},
+            {"tipo": "Secreto", "nombre_elemento": "existente", "secreto": "s", "clave": "otra", "notas": "notas"},
+            {"tipo": "Otro"},
+        ]
+
+        consultas = contar_consultas(lambda: self.assertEqual([
+            [], ["Ya existe un elemento con este nombre"],
+            ["El secreto no debe tener menos de 3 caracteres", "Ya existe un elemento con este nombre", "Debe tener asignado una clave favorita"],
+            ["El tipo del elemento no es válido"]], self.logica.validar_elementos_lote(registros)))
+        self.assertEqual(2, consultas)
+        self.assertEqual(["", "Ya existe un elemento con este nombre", "El secreto no debe tener menos de 3 caracteres",
+                          "El tipo del elemento no es válido"], self.logica.crear_elementos_lote(registros))
+
+    # Prueba para verificar que guardar un login hace menos consultas que validarlo y luego crearlo o editarlo
+    def test_consultas_guardar_login(self):
+        self.logica.crear_clave("clave", "Clave123!", "pista")
+        self.logica.crear_login("primero", "a@b.co", "usuario", "clave", "https://b.co", "notas")
+        id_login = self.logica.dar_elementos()[0]["id"]
+
+        def validar_y_crear():
+            self.assertEqual("", self.logica.validar_crear_editar_login_por_id(-1, "validado", "a@b.co", "usuario", "clave", "https://b.co", "notas"))
+            self.logica.crear_login("validado", "a@b.co", "usuario", "clave", "https://b.co", "notas")
+        def validar_y_editar():
+            self.assertEqual("", self.logica.validar_crear_editar_login_por_id(id_login, "editado", "a@b.co", "usuario", "clave", "https://b.co", "notas"))
+            self.logica.editar_login_por_id(id_login, "editado", "a@b.co", "usuario", "clave", "https://b.co", "notas")
+        guardar = lambda id, nombre: self.assertEqual("", self.logica.guardar_login(id, nombre, "a@b.co", "usuario", "clave", "https://b.co", "notas"))
+
+        self.assertLess(contar_consultas(lambda: guardar(-1, "guardado")), contar_consultas(validar_y_crear))
+        self.assertLess(contar_consultas(lambda: guardar(id_login, "guardado y editado")), contar_consultas(validar_y_editar))
+        self.assertEqual("Ya existe un elemento con este nombre",
+            self.logica.guardar_login(id_login, "validado", "a@b.co", "usuario", "clave", "https://b.co", "notas"))
+
+    # Prueba para verificar que dos lotes que escriben a la vez en la misma base de datos no toman los mismos ids
+    def test_crear_elementos_lote_concurrentes(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            url = "sqlite:///" + os.path.join(directorio, "caja.sqlite")
+            (fabrica1, fabrica2) = (FabricaSesiones(url), FabricaSesiones(url))
+            logica1 = LogicaCaja(fabrica1)
+            logica1.crear_clave("clave", "Clave123!", "pista")
+            def registros(prefijo):
+                return [{"tipo": "Secreto", "nombre_elemento": "%s %d" % (prefijo, i), "secreto": "secreto",
+                         "clave": "clave", "notas": "notas"} for i in range(3)]
+
+            # El segundo lote corre completo en otro hilo (y otra conexión) después de que el primero valida sus
+            # registros y antes de que inserte sus elementos
+            resultados = {}
+            terminado = threading.Event()
+            def segundo():
+                try:
+                    logica2 = LogicaCaja(fabrica2)
+                    resultados["segundo"] = logica2.crear_elementos_lote(registros("segundo"))
+                    logica2.cerrar_sesion()
+                except Exception as error:
+                    resultados["segundo"] = error
+                finally:
+                    terminado.set()
+            hilo = threading.Thread(target=segundo)
+            def intercalar(conn, cursor, statement, parameters, context, executemany):
+                if statement.startswith("INSERT INTO elemento") and not hilo.is_alive() and not terminado.is_set():
+                    hilo.start()
+                    terminado.wait()
+            event.listen(fabrica1.engine, "before_cursor_execute", intercalar)
+            try:
+                resultados["primero"] = logica1.crear_elementos_lote(registros("primero"))
+            except Exception as error:
+                resultados["primero"] = error
+            event.remove(fabrica1.engine, "before_cursor_execute", intercalar)
+            hilo.join()
 
+            self.assertEqual({"primero": [""] * 3, "segundo": [""] * 3}, resultados)
+            self.assertEqual(6, len(logica1.dar_elementos()))
+            self.assertEqual(LogicaCaja(fabrica1, usar_listado=False).dar_elementos(), logica1.dar_elementos())
+            logica1.cerrar_sesion()
+            fabrica1.cerrar()
+            fabrica2.cerrar()
@@ -11,6 +11,7 @@ from typing import Tuple
 # Usa base de datos en memoria para las pruebas
 os.environ['CAJA_DB'] = 'sqlite://'  # noqa
 
+from sqlalchemy import event
 from src.modelo.declarative_base import Session
 from src.modelo import ClaveFavorita
 from src.logica.LogicaCaja import LogicaCaja
@@ -94,6 +95,11 @@ class ClaveFavoritaTestCase(unittest.TestCase):
         self.session.commit()
         self.session.close()
 
+    # Agrega a los datos esperados el id asignado por la base de datos
+    def asignar_ids(self):
+        for (c, e) in zip(*self.test_data):
+            e["id"] = c.id
+
     # Prueba para verificar que se genera un error al crear una clave con nombre vacio
     def test_nombre_vacio(self):
         self.test_data[0][0].nombre = ""
@@ -146,6 +152,44 @@ class ClaveFavoritaTestCase(unittest.TestCase):
         self.assertEqual(self.test_data[0][0].clave, claves[0].clave)
         self.assertEqual(self.test_data[0][0].pista, claves[0].pista)
 
+    # Prueba para verificar que las claves creadas dentro de un lote se guardan con un solo commit
+    def test_agregar_claves_en_lote(self):
+        commits = []
+        event.listen(self.logica.session, "after_commit", commits.append)
+        with self.logica.lote():
+            for (clave, _) in zip(*self.test_data):
+                self.logica.crear_clave(clave.nombre, clave.clave, clave.pista)
+            self.assertEqual([], commits)
+            # Las validaciones dentro del lote ven las claves creadas antes
+            self.assertNotEqual("", self.logica.validar_crear_editar_clave(-1, self.test_data[0][0].nombre, "Clave123!", "pista"))
+
+        self.assertEqual(1, len(commits))
+        self.assertEqual(3, self.session.query(ClaveFavorita).count())
+
+    # Prueba para verificar que un error dentro de un lote deshace todas las escrituras del lote
+    def test_lote_con_error(self):
+        reporte = self.logica.dar_reporte_seguridad()
+        with self.assertRaises(ValueError):
+            with self.logica.lote():
+                for (clave, _) in zip(*self.test_data):
+                    self.logica.crear_clave(clave.nombre, clave.clave, clave.pista)
+                raise ValueError()
+
+        self.assertEqual(0, self.session.query(ClaveFavorita).count())
+        self.assertEqual([], self.logica.dar_claves_favoritas())
+        self.assertEqual(reporte, self.logica.dar_reporte_seguridad())
+
+    # Prueba para verificar que las claves creadas con crear_claves_lote se guardan y las inválidas se reportan
+    def test_agregar_claves_lote(self):
+        registros = [dict(x) for x in self.test_data[1]]
+        registros.append(dict(registros[0]))
+        registros.append(dict(nombre="corta", clave="ab", pista="pista"))
+
+        errores = self.logica.crear_claves_lote(registros)
+
+        self.assertEqual(["", "", "", "Ya existe un elemento con este nombre", "La clave no debe tener menos de 3 caracteres"], errores)
+        self.assertEqual(self.test_data[1], [{k: v for (k, v) in x.items() if k != "id"} for x in self.logica.dar_claves_favoritas()])
+
     # Prueba para verificar que no es posible generar dos claves con el mismo nombre
     def test_agregar_clave_duplicada(self):
         self.session.add(self.test_data[0][0])
@@ -154,6 +198,21 @@ class ClaveFavoritaTestCase(unittest.TestCase):
         error = self.logica.validar_crear_editar_clave(-1, self.test_data[0][0].nombre, self.test_data[0][0].clave, self.test_data[0][0].pista)
         self.assertNotEqual("", error)
 
+
+    # Prueba para verificar que guardar_clave crea y edita claves y detecta el nombre repetido al escribir
+    def test_guardar_clave_duplicada(self):
+        (clave, otra) = self.test_data[0][:2]
+        self.assertEqual("", self.logica.guardar_clave(-1, clave.nombre, clave.clave, clave.pista))
+        self.assertEqual("", self.logica.guardar_clave(-1, otra.nombre, otra.clave, otra.pista))
+        self.assertEqual("Ya existe un elemento con este nombre", self.logica.guardar_clave(-1, clave.nombre, "otra", "otra"))
+
+        id_otra = self.session.query(ClaveFavorita).filter(ClaveFavorita.nombre == otra.nombre).one().id
+        self.assertEqual("Ya existe un elemento con este nombre", self.logica.guardar_clave(id_otra, clave.nombre, "otra", "otra"))
+        self.assertEqual("", self.logica.guardar_clave(id_otra, otra.nombre, "nueva", "nueva"))
+        self.assertEqual("No existe una clave favorita con este id", self.logica.guardar_clave(id_otra + 1, "tercera", "nueva", "nueva"))
+
+        self.assertEqual([clave.clave, "nueva"], [x["clave"] for x in self.logica.dar_claves_favoritas()])
+
     # Prueba para verificar que no hay error al cambiar la clave sin cambiar el nombre
     def test_editar_clave_sin_cambiar_nombre(self):
         self.session.add(self.test_data[0][0])
@@ -226,6 +285,7 @@ class ClaveFavoritaTestCase(unittest.TestCase):
     def test_listar_clave_favorita(self):
         self.session.add(self.test_data[0][0])
         self.session.commit()
+        self.asignar_ids()
 
         claves = self.logica.dar_claves_favoritas()
         self.assertEqual([self.test_data[1][0]], claves)
@@ -236,10 +296,23 @@ class ClaveFavoritaTestCase(unittest.TestCase):
         for idx in self.order:
             self.session.add(self.test_data[0][idx])
         self.session.commit()
+        self.asignar_ids()
 
         # Esperamos que retorna la lista ordenada
         self.assertEqual(self.test_data[1], self.logica.dar_claves_favoritas())
 
+    # Prueba para verificar que las páginas de claves favoritas continúan después del último nombre de la página anterior
+    def test_lista_claves_paginada(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+        self.asignar_ids()
+
+        pagina1 = self.logica.dar_claves_favoritas_pagina(None, 2)
+        pagina2 = self.logica.dar_claves_favoritas_pagina(pagina1[-1]["nombre"], 2)
+        self.assertEqual(self.test_data[1][:2], pagina1)
+        self.assertEqual(self.test_data[1][2:], pagina2)
+
     # Prueba para verificar que se puede buscar una clave por su nombre
     def test_clave_por_nombre(self):
         # Agregar claves al base de datos en orden predefinido
@@ -256,6 +329,7 @@ class ClaveFavoritaTestCase(unittest.TestCase):
         for idx in self.order:
             self.session.add(self.test_data[0][idx])
         self.session.commit()
+        self.asignar_ids()
 
         for (idx, esperado) in enumerate(self.test_data[1]):
             self.assertEqual(self.logica.dar_clave_favorita(idx), esperado)
@@ -300,3 +374,50 @@ class ClaveFavoritaTestCase(unittest.TestCase):
 
         error = self.logica.validar_eliminar_clave(0)
         self.assertNotEqual("", error)
+
+    # Prueba para verificar que se puede buscar una clave por su id en la base de datos
+    def test_clave_por_id_db(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+        self.asignar_ids()
+
+        for (clave, esperado) in zip(*self.test_data):
+            self.assertEqual(esperado, self.logica.dar_clave_favorita_por_id(clave.id))
+
+    # Prueba para verificar que al editar una clave por su id en la base de datos el cambio se refleja en el base de datos
+    def test_editar_clave_por_id_db(self):
+        self.session.add(self.test_data[0][0])
+        self.session.commit()
+
+        error = self.logica.validar_crear_editar_clave_por_id(self.test_data[0][0].id, self.test_data[0][0].nombre, self.test_data[0][1].clave, self.test_data[0][1].pista)
+        self.assertEqual("", error)
+
+        self.logica.editar_clave_por_id(self.test_data[0][0].id, self.test_data[0][1].nombre, self.test_data[0][1].clave, self.test_data[0][1].pista)
+
+        # Descarta los datos cargados en la sesión de la prueba para leer los cambios de la lógica
+        self.session.expire_all()
+        claves = self.session.query(ClaveFavorita).all()
+        self.assertEqual(1, len(claves))
+        self.assertEqual(self.test_data[0][1].nombre, claves[0].nombre)
+        self.assertEqual(self.test_data[0][1].clave, claves[0].clave)
+        self.assertEqual(self.test_data[0][1].pista, claves[0].pista)
+
+    # Prueba para verificar que al borrar una clave favorita por su id en la base de datos se ha borrado en el base de datos también
+    def test_borrar_clave_por_id(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+
+        id_borrar = self.fake.random.randrange(len(self.order))
+
+        self.assertEqual("", self.logica.validar_eliminar_clave_por_id(self.test_data[0][id_borrar].id))
+        self.logica.eliminar_clave_por_id(self.test_data[0][id_borrar].id)
+
+        piezas = list(range(len(self.order)))
+        piezas.remove(id_borrar)
+
+        claves = sorted(self.session.query(ClaveFavorita).all(), key=lambda x:x.nombre)
+        self.assertEqual(len(piezas), len(claves))
+        for i, j in enumerate(piezas):
+            self.assertEqual(self.test_data[1][j]["nombre"], claves[i].nombre)
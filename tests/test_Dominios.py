@@ -0,0 +1,103 @@
+#
+# Pruebas unitarias para la búsqueda de logins por dominio
+#
+
+import unittest
+import os
+
+# Usa base de datos en memoria para las pruebas
+os.environ['CAJA_DB'] = 'sqlite://' # noqa
+
+
+from src.modelo.declarative_base import FabricaSesiones
+from src.modelo import Login, dominios
+from src.logica.LogicaCaja import LogicaCaja
+
+class DominiosTestCase(unittest.TestCase):
+
+    # Prueba para verificar el host y el dominio registrable de distintas URL
+    def test_normalizar(self):
+        self.assertEqual(("google.com", "com.google.mail"), dominios.normalizar("https://Mail.Google.com:8080/x?y=1"))
+        self.assertEqual(("uniandes.edu.co", "co.edu.uniandes.www"), dominios.normalizar("www.uniandes.edu.co"))
+        self.assertEqual(("bbc.co.uk", "uk.co.bbc"), dominios.normalizar("http://user@bbc.co.uk."))
+        self.assertEqual(("mail.co", "co.mail"), dominios.normalizar("https://mail.co"))
+        self.assertEqual(("192.168.0.1", "1.0.168.192"), dominios.normalizar("http://192.168.0.1/admin"))
+        self.assertEqual(("localhost", "localhost"), dominios.normalizar("http://localhost:8000"))
+        self.assertEqual((None, None), dominios.normalizar(""))
+        self.assertEqual((None, None), dominios.normalizar("http://"))
+        self.assertEqual(None, dominios.rango_dominio(None))
+
+    # Prueba para verificar que el dominio registrable sigue la lista de sufijos públicos, incluidos los privados
+    def test_sufijos_publicos(self):
+        self.assertEqual(("victima.github.io", "io.github.victima"), dominios.normalizar("https://victima.github.io/repo"))
+        self.assertEqual(("otro.blogspot.com", "com.blogspot.otro.www"), dominios.normalizar("www.otro.blogspot.com"))
+        self.assertEqual(("bbc.co.uk", "uk.co.bbc.www"), dominios.normalizar("www.bbc.co.uk"))
+        self.assertEqual((None, "uk.co"), dominios.normalizar("co.uk"))
+        self.assertEqual((None, "io.github"), dominios.normalizar("github.io"))
+        self.assertEqual(None, dominios.rango_dominio("https://co.uk"))
+        self.assertEqual(None, dominios.rango_dominio("com"))
+        # Reglas con comodín (*.ck) y excepciones (!www.ck)
+        self.assertEqual("sitio.algo.ck", dominios.dar_dominio("a.sitio.algo.ck"))
+        self.assertEqual("www.ck", dominios.dar_dominio("a.www.ck"))
+
+class LoginsPorDominioTestCase(unittest.TestCase):
+    def setUp(self):
+        self.fabrica = FabricaSesiones("sqlite://")
+        self.logica = LogicaCaja(self.fabrica)
+        self.logica.crear_clave("clave", "Clave123!", "pista")
+        for (nombre, url) in [("Gmail", "https://mail.google.com"), ("Google", "https://google.com/cuenta"),
+                              ("Otro", "https://notgoogle.com"), ("Guion", "https://google-com.co"),
+                              ("Uniandes", "https://uniandes.edu.co"), ("Sicua", "https://sicuaplus.uniandes.edu.co:8080/a"),
+                              ("Victima", "https://victima.github.io"), ("BBC", "https://www.bbc.co.uk"),
+                              ("Blog", "https://blog.blogspot.com"), ("Bucket", "https://bucket.s3.amazonaws.com"),
+                              ("Amazon", "https://amazonaws.com")]:
+            self.logica.crear_login(nombre, "a@b.co", "usuario", "clave", url, "notas")
+
+    def tearDown(self):
+        self.logica.cerrar_sesion()
+        self.fabrica.cerrar()
+
+    def logins(self, url):
+        return [x["nombre_elemento"] for x in self.logica.dar_logins_por_dominio(url)]
+
+    # Prueba para verificar que se retornan los logins del dominio registrable y de sus subdominios
+    def test_logins_por_dominio(self):
+        self.assertEqual(["Gmail", "Google"], self.logins("https://accounts.google.com/login"))
+        self.assertEqual(["Gmail", "Google"], self.logins("google.com"))
+        self.assertEqual(["Sicua", "Uniandes"], self.logins("www.uniandes.edu.co"))
+        self.assertEqual(["Guion"], self.logins("google-com.co"))
+        self.assertEqual([], self.logins("com"))
+        self.assertEqual([], self.logins(""))
+        self.assertEqual(["Gmail"], [x["nombre_elemento"] for x in self.logica.dar_elementos() if x["url"] == "https://mail.google.com"])
+
+    # Prueba para verificar que un sitio bajo un sufijo público no ve los logins de otros sitios del mismo sufijo
+    def test_logins_por_dominio_sufijos_publicos(self):
+        self.assertEqual([], self.logins("https://atacante.github.io"))
+        self.assertEqual(["Victima"], self.logins("https://victima.github.io/login"))
+        self.assertEqual([], self.logins("github.io"))
+        self.assertEqual([], self.logins("co.uk"))
+        self.assertEqual(["BBC"], self.logins("bbc.co.uk"))
+        self.assertEqual([], self.logins("otro.blogspot.com"))
+        self.assertEqual(["Amazon"], self.logins("https://console.amazonaws.com"))
+        self.assertEqual(["Bucket"], self.logins("bucket.s3.amazonaws.com"))
+
+    # Prueba para verificar que el dominio se actualiza al editar, guardar y crear en lote
+    def test_logins_por_dominio_despues_de_escribir(self):
+        id_gmail = [x for x in self.logica.dar_elementos() if x["nombre_elemento"] == "Gmail"][0]["id"]
+        self.logica.editar_login_por_id(id_gmail, "Gmail", "a@b.co", "usuario", "clave", "https://mail.uniandes.edu.co", "notas")
+        self.assertEqual(["Google"], self.logins("google.com"))
+        self.assertEqual(["Gmail", "Sicua", "Uniandes"], self.logins("uniandes.edu.co"))
+
+        self.assertEqual("", self.logica.guardar_login(id_gmail, "Gmail", "a@b.co", "usuario", "clave", "https://drive.google.com", "notas"))
+        self.assertEqual("", self.logica.guardar_login(-1, "Docs", "a@b.co", "usuario", "clave", "https://docs.google.com", "notas"))
+        self.assertEqual([""], self.logica.crear_elementos_lote([{"tipo": "Login", "nombre_elemento": "Youtube", "email": "a@b.co",
+            "usuario": "usuario", "clave": "clave", "url": "https://www.youtube.com", "notas": "notas"}]))
+        self.assertEqual(["Docs", "Gmail", "Google"], self.logins("google.com"))
+        self.assertEqual(["Youtube"], self.logins("youtube.com"))
+        self.assertEqual("com.youtube.www", self.logica.session.query(Login.host_invertido).filter(Login.nombre == "Youtube").scalar())
+
+        self.logica.eliminar_elemento_por_id(id_gmail)
+        self.assertEqual(["Docs", "Google"], self.logins("google.com"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#
+# Pruebas unitarias para la exportación de la caja a JSON Lines y CSV
+#
+
+import unittest
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+
+# Usa base de datos en memoria para las pruebas
+os.environ['CAJA_DB'] = 'sqlite://' # noqa
+
+
+from src.modelo.declarative_base import FabricaSesiones
+from src.logica.LogicaCaja import LogicaCaja
+from src.logica import Exportador
+
+try:
+    import cryptography
+except ImportError:
+    cryptography = None
+
+class ExportadorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.fabrica = FabricaSesiones("sqlite://")
+        self.logica = LogicaCaja(self.fabrica)
+
+        self.logica.crear_clave("Correo", "Clave123!", "La de siempre")
+        self.logica.crear_login("Mail, ñandú", "ana@mail.co", "ana", "Correo", "https://mail.co", "cuenta \"principal\"")
+        self.logica.crear_secreto("Alarma", "1234\n5678", "Correo", "códigos")
+        self.logica.crear_id("Cédula", "1010", "Ana Pérez", "1990-01-01", "2010-01-01", "2030-01-01", "")
+
+    def tearDown(self):
+        self.logica.cerrar_sesion()
+        self.fabrica.cerrar()
+        self.directorio.cleanup()
+
+    def ruta(self, nombre):
+        return os.path.join(self.directorio.name, nombre)
+
+    def esperados(self):
+        claves = [dict(x, registro=Exportador.REGISTRO_CLAVE) for x in self.logica.dar_claves_favoritas()]
+        elementos = [dict(x, registro=Exportador.REGISTRO_ELEMENTO)
+                     for x in sorted(self.logica.dar_elementos(), key=lambda x: x["id"])]
+        return claves + elementos
+
+    def leer_jsonl(self, archivo):
+        return [json.loads(x) for x in archivo.read().decode("utf-8").splitlines()]
+
+    # Prueba para verificar que se exportan las claves y luego los elementos a JSON Lines
+    def test_exportar_jsonl(self):
+        self.assertEqual(4, Exportador.exportar(self.logica, self.ruta("caja.jsonl"), tamano_parte=1))
+        with open(self.ruta("caja.jsonl"), "rb") as archivo:
+            self.assertEqual(self.esperados(), self.leer_jsonl(archivo))
+
+    # Prueba para verificar que el CSV tiene todas las columnas y conserva comillas, comas y saltos de línea
+    def test_exportar_csv(self):
+        self.assertEqual(4, Exportador.exportar(self.logica, self.ruta("caja.csv")))
+        with open(self.ruta("caja.csv"), encoding="utf-8", newline="") as archivo:
+            filas = list(csv.DictReader(archivo))
+
+        esperados = [{x: str(y) for x, y in fila.items()} for fila in self.esperados()]
+        self.assertEqual(esperados, [{x: fila[x] for x in esperado} for fila, esperado in zip(filas, esperados)])
+        self.assertEqual(Exportador.COLUMNAS_CSV, list(filas[0].keys()))
+
+    # Prueba para verificar que el archivo comprimido se puede leer con gzip
+    def test_exportar_comprimido(self):
+        Exportador.exportar(self.logica, self.ruta("caja.jsonl.gz"), comprimir=True)
+        with gzip.open(self.ruta("caja.jsonl.gz"), "rb") as archivo:
+            self.assertEqual(self.esperados(), self.leer_jsonl(archivo))
+
+    # Prueba para verificar que un formato desconocido genera un error
+    def test_formato_no_soportado(self):
+        with self.assertRaises(ValueError):
+            Exportador.exportar(self.logica, self.ruta("caja.txt"))
+
+    @unittest.skipUnless(cryptography, "requiere el paquete cryptography")
+    # Prueba para verificar que el archivo cifrado y comprimido se recupera con la clave correcta
+    def test_exportar_cifrado(self):
+        for i in range(300):
+            self.logica.crear_secreto("Secreto %d" % i, os.urandom(100).hex(), "Correo", "")
+        Exportador.exportar(self.logica, self.ruta("caja.jsonl.gz"), comprimir=True, clave="mi clave")
+
+        with open(self.ruta("caja.jsonl.gz"), "rb") as archivo:
+            self.assertTrue(archivo.read().startswith(Exportador.CABECERA_CIFRADO))
+            archivo.seek(0)
+            salida = io.BytesIO()
+            Exportador.descifrar(archivo, salida, "mi clave")
+        self.assertEqual(self.esperados(), self.leer_jsonl(gzip.GzipFile(fileobj=io.BytesIO(salida.getvalue()))))
+
+    @unittest.skipUnless(cryptography, "requiere el paquete cryptography")
+    # Prueba para verificar que una clave incorrecta o un archivo truncado generan un error
+    def test_descifrar_errores(self):
+        for i in range(300):
+            self.logica.crear_secreto("Secreto %d" % i, os.urandom(100).hex(), "Correo", "")
+        Exportador.exportar(self.logica, self.ruta("caja.jsonl"), clave="mi clave")
+        with open(self.ruta("caja.jsonl"), "rb") as archivo:
+            datos = archivo.read()
+
+        with self.assertRaises(ValueError):
+            Exportador.descifrar(io.BytesIO(datos), io.BytesIO(), "otra clave")
+
+        # Se quita el último bloque: los bloques restantes están completos pero ninguno es el último
+        posicion = len(Exportador.CABECERA_CIFRADO) + 20
+        bloques = []
+        while posicion < len(datos):
+            bloques.append(posicion)
+            posicion += 16 + int.from_bytes(datos[posicion:posicion + 4], "big")
+        self.assertGreater(len(bloques), 1)
+        for truncado in (datos[:bloques[-1]], datos[:-1]):
+            with self.assertRaises(ValueError):
+                Exportador.descifrar(io.BytesIO(truncado), io.BytesIO(), "mi clave")
@@ -68,10 +68,16 @@ class IdentificacionTestCase(unittest.TestCase):
         self.session.commit()
         self.session.close()
 
+    # Agrega a los datos esperados el id asignado por la base de datos
+    def asignar_ids(self):
+        for (c, e) in zip(*self.test_data):
+            e["id"] = c.id
+
     # Prueba para verificar que la logica retorna los elementos de identificación del base de datos
     def test_listar_id(self):
         self.session.add(self.test_data[0][0])
         self.session.commit()
+        self.asignar_ids()
 
         elementos = self.logica.dar_elementos()
         self.assertEqual([self.test_data[1][0]], elementos)
@@ -81,6 +87,7 @@ class IdentificacionTestCase(unittest.TestCase):
         for idx in self.order:
             self.session.add(self.test_data[0][idx])
         self.session.commit()
+        self.asignar_ids()
 
         self.assertEqual(self.test_data[1], self.logica.dar_elementos())
 
@@ -89,6 +96,7 @@ class IdentificacionTestCase(unittest.TestCase):
         for idx in self.order:
             self.session.add(self.test_data[0][idx])
         self.session.commit()
+        self.asignar_ids()
 
         for (idx, esperado) in enumerate(self.test_data[1]):
             self.assertEqual(esperado, self.logica.dar_elemento(idx))
@@ -216,6 +224,21 @@ class IdentificacionTestCase(unittest.TestCase):
         self.assertEqual(1, len(elementos))
         self.assertEsperado(self.test_data[1][0], elementos[0])
 
+
+    # Prueba para verificar que guardar_id crea identificaciones y detecta el nombre repetido al escribir
+    def test_guardar_id_db(self):
+        id = self.test_data[0][0]
+        guardar = lambda: self.logica.guardar_id(
+            -1, id.nombre, id.numero, id.nombre_completo, id.nacimiento.isoformat(),
+            id.expedicion.isoformat(), id.vencimiento.isoformat(), id.nota)
+
+        self.assertEqual("", guardar())
+        self.assertEqual("Ya existe un elemento con este nombre", guardar())
+
+        elementos = self.session.query(Elemento).all()
+        self.assertEqual(1, len(elementos))
+        self.assertEsperado(self.test_data[1][0], elementos[0])
+
     # Prueba para verificar que no hay error al cambiar una ID sin cambiar el nombre
     def test_editar_id_sin_cambiar_nombre(self):
         self.session.add(self.test_data[0][0])
@@ -266,3 +289,60 @@ class IdentificacionTestCase(unittest.TestCase):
         self.assertEqual(len(piezas), len(elementos))
         for i, j in enumerate(piezas):
             self.assertEsperado(self.test_data[1][j], elementos[i])
+
+    # Prueba para verificar que se puede buscar un elemento por su id en la base de datos
+    def test_buscar_por_id_db(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+        self.asignar_ids()
+
+        for (elemento, esperado) in zip(*self.test_data):
+            self.assertEqual(esperado, self.logica.dar_elemento_por_id(elemento.id))
+
+    # Prueba para verificar que no hay error al cambiar una ID por su id en la base de datos sin cambiar el nombre
+    def test_editar_id_por_id_sin_cambiar_nombre(self):
+        self.session.add(self.test_data[0][0])
+        self.session.commit()
+
+        id = self.test_data[0][1]
+        error = self.logica.validar_crear_editar_id_por_id(self.test_data[0][0].id,
+            self.test_data[0][0].nombre, id.numero, id.nombre_completo,
+            id.nacimiento.isoformat(), id.expedicion.isoformat(), id.vencimiento.isoformat(),
+            id.nota)
+        self.assertEqual("", error)
+
+    # Prueba para verificar que al editar una ID por su id en la base de datos el cambio se refleja en el base de datos
+    def test_editar_id_por_id_db(self):
+        self.session.add(self.test_data[0][0])
+        self.session.commit()
+
+        id = self.test_data[0][1]
+        self.logica.editar_id_por_id(self.test_data[0][0].id,
+            id.nombre, id.numero, id.nombre_completo,
+            id.nacimiento.isoformat(), id.expedicion.isoformat(), id.vencimiento.isoformat(),
+            id.nota)
+
+        # Descarta los datos cargados en la sesión de la prueba para leer los cambios de la lógica
+        self.session.expire_all()
+        elementos = self.session.query(Elemento).all()
+        self.assertEqual(1, len(elementos))
+        self.assertEsperado(self.test_data[1][1], elementos[0])
+
+    # Prueba para verificar que al borrar un ID por su id en la base de datos se ha borrado en el base de datos también
+    def test_borrar_id_por_id_db(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+
+        id_borrar = self.fake.random.randrange(len(self.order))
+
+        self.logica.eliminar_elemento_por_id(self.test_data[0][id_borrar].id)
+
+        piezas = list(range(len(self.order)))
+        piezas.remove(id_borrar)
+
+        elementos = sorted(self.session.query(Elemento).all(), key=lambda x:x.nombre)
+        self.assertEqual(len(piezas), len(elementos))
+        for i, j in enumerate(piezas):
+            self.assertEsperado(self.test_data[1][j], elementos[i])
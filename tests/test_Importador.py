@@ -0,0 +1,181 @@
+#
+# Pruebas unitarias para la importación de contraseñas exportadas por otros programas
+#
+
+import unittest
+import io
+import json
+import os
+import tempfile
+
+# Usa base de datos en memoria para las pruebas
+os.environ['CAJA_DB'] = 'sqlite://' # noqa
+
+
+from src.modelo.declarative_base import FabricaSesiones
+from src.logica.LogicaCaja import LogicaCaja
+from src.logica import Importador
+
+CSV_CHROME = """name,url,username,password,note
+mail.co,https://mail.co/login,ana@mail.co,Clave123!,cuenta principal
+banco.co,https://banco.co,ana@mail.co,Clave123!,
+foro.co,https://foro.co,ana,Otra456?,
+"""
+
+JSON_BITWARDEN = {
+    "encrypted": False,
+    "folders": [{"id": "1", "name": "items"}],
+    "items": [
+        {"type": 1, "name": "Correo", "notes": None,
+         "login": {"username": "ana@mail.co", "password": "Clave123!", "uris": [{"uri": "https://mail.co"}]}},
+        {"type": 2, "name": "Nota", "notes": "el código de la alarma"},
+        {"type": 3, "name": "Visa", "notes": None,
+         "card": {"cardholderName": "Ana Pérez", "number": "4111111111111111", "expMonth": "2", "expYear": "2030", "code": "123"}},
+        {"type": 4, "name": "Pasaporte", "notes": None,
+         "identity": {"firstName": "Ana", "middleName": None, "lastName": "Pérez", "passportNumber": "AB1",
+                      "licenseNumber": "C-12345", "ssn": None, "email": "ana@mail.co"}},
+    ],
+}
+
+XML_KEEPASS = """<?xml version="1.0" encoding="utf-8"?>
+<KeePassFile><Meta><RecycleBinEnabled>True</RecycleBinEnabled><RecycleBinUUID>cGFwZWxlcmE=</RecycleBinUUID></Meta>
+<Root><Group><UUID>Z2VuZXJhbA==</UUID><Name>General</Name>
+<Entry>
+  <String><Key>Title</Key><Value>Correo</Value></String>
+  <String><Key>UserName</Key><Value>ana@mail.co</Value></String>
+  <String><Key>Password</Key><Value>Clave123!</Value></String>
+  <String><Key>URL</Key><Value>https://mail.co</Value></String>
+  <History><Entry>
+    <String><Key>Title</Key><Value>Correo viejo</Value></String>
+    <String><Key>URL</Key><Value>https://mail.co</Value></String>
+  </Entry></History>
+</Entry>
+<Group><UUID>b3Ryb3M=</UUID><Name>Otros</Name>
+<Entry>
+  <UUID>cGFwZWxlcmE=</UUID>
+  <String><Key>Title</Key><Value>Wifi</Value></String>
+  <String><Key>Password</Key><Value>clave del wifi</Value></String>
+</Entry>
+</Group>
+<Group><UUID>cGFwZWxlcmE=</UUID><Name>Papelera</Name>
+<Entry>
+  <String><Key>Title</Key><Value>Cuenta borrada</Value></String>
+  <String><Key>Password</Key><Value>clave borrada</Value></String>
+</Entry>
+<Group><UUID>dmllam8=</UUID><Name>Grupo borrado</Name>
+<Entry>
+  <String><Key>Title</Key><Value>Otra cuenta borrada</Value></String>
+  <String><Key>Password</Key><Value>otra clave borrada</Value></String>
+</Entry>
+</Group>
+</Group>
+</Group></Root></KeePassFile>
+"""
+
+class ImportadorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.fabrica = FabricaSesiones("sqlite://")
+        self.logica = LogicaCaja(self.fabrica)
+
+    def tearDown(self):
+        self.logica.cerrar_sesion()
+        self.fabrica.cerrar()
+        self.directorio.cleanup()
+
+    def escribir(self, nombre, contenido):
+        ruta = os.path.join(self.directorio.name, nombre)
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write(contenido)
+        return ruta
+
+    def dar_nombres(self):
+        return [x["nombre_elemento"] for x in self.logica.dar_elementos()]
+
+    # Prueba para verificar que se importan los logins de un CSV de navegador y se reportan los inválidos
+    def test_importar_csv(self):
+        resultado = Importador.importar(self.logica, self.escribir("chrome.csv", CSV_CHROME))
+
+        self.assertEqual(3, resultado["procesados"])
+        self.assertEqual(2, resultado["importados"])
+        self.assertEqual([(3, "El email no tiene el formato correcto")], resultado["errores"])
+        self.assertEqual(["banco.co (ana@mail.co)", "mail.co (ana@mail.co)"], self.dar_nombres())
+
+        # Las contraseñas repetidas comparten una clave favorita
+        claves = self.logica.dar_claves_favoritas()
+        self.assertEqual(["Clave123!"], [x["clave"] for x in claves])
+        self.assertEqual({claves[0]["nombre"]}, {x["clave"] for x in self.logica.dar_elementos()})
+        self.assertTrue(self.logica.verificar_resumen_reporte(reparar=False))
+
+    # Prueba para verificar que se importan los items de un JSON de Bitwarden según su tipo
+    def test_importar_json(self):
+        resultado = Importador.importar(self.logica, self.escribir("bitwarden.json", json.dumps(JSON_BITWARDEN)))
+
+        self.assertEqual(3, resultado["importados"])
+        self.assertEqual([3], [x[0] for x in resultado["errores"]])
+        elementos = {x["nombre_elemento"]: x for x in self.logica.dar_elementos()}
+        self.assertEqual("Login", elementos["Correo (ana@mail.co)"]["tipo"])
+        self.assertEqual("el código de la alarma", elementos["Nota"]["secreto"])
+        self.assertEqual(Importador.CLAVE_IMPORTACION, elementos["Nota"]["clave"])
+
+        # Las identificaciones se importan sin las fechas, que Bitwarden no exporta, y se reporta lo que falta
+        identificacion = elementos["Pasaporte"]
+        self.assertEqual(("Ana Pérez", "12345"), (identificacion["nombre"], identificacion["numero"]))
+        self.assertEqual(("", "", ""), (identificacion["fecha_nacimiento"], identificacion["fecha_exp"], identificacion["fecha_venc"]))
+        self.assertEqual([(4, "Identificación importada sin fecha de nacimiento, expedición, vencimiento")], resultado["avisos"])
+        self.assertEqual([], self.logica.dar_elementos_por_vencer())
+        self.assertTrue(self.logica.verificar_resumen_reporte(reparar=False))
+
+        # Fuera de la importación las fechas siguen siendo obligatorias
+        registro = dict(Importador.registro_bitwarden(JSON_BITWARDEN["items"][3]), nombre_elemento="Otro pasaporte")
+        self.assertNotEqual("", self.logica.crear_elementos_lote([registro])[0])
+
+    # Prueba para verificar que se importan las entradas de un XML de KeePass sin su historial ni la papelera
+    def test_importar_xml(self):
+        resultado = Importador.importar(self.logica, self.escribir("keepass.xml", XML_KEEPASS))
+
+        self.assertEqual(2, resultado["importados"])
+        elementos = {x["nombre_elemento"]: x for x in self.logica.dar_elementos()}
+        self.assertEqual(["Correo (ana@mail.co)", "Wifi"], sorted(elementos))
+        self.assertEqual("clave del wifi", elementos["Wifi"]["secreto"])
+
+    # Prueba para verificar que una importación interrumpida continúa después de la última parte confirmada
+    def test_reanudar_importacion(self):
+        filas = ["sitio%d.co,https://sitio%d.co,ana%d@mail.co,Clave%d!x," % (i, i, i, i) for i in range(5)]
+        ruta = self.escribir("chrome.csv", "name,url,username,password,note\n" + "\n".join(filas))
+
+        crear_elementos_lote = self.logica.crear_elementos_lote
+        llamadas = []
+        def fallar_en_la_segunda_parte(registros, claves_nuevas=None, **opciones):
+            llamadas.append(registros)
+            if len(llamadas) == 2:
+                raise RuntimeError("interrupción")
+            return crear_elementos_lote(registros, claves_nuevas, **opciones)
+        self.logica.crear_elementos_lote = fallar_en_la_segunda_parte
+
+        with self.assertRaises(RuntimeError):
+            Importador.importar(self.logica, ruta, tamano_parte=2)
+        self.assertEqual(2, len(self.dar_nombres()))
+        self.assertEqual(2, len(self.logica.dar_claves_favoritas()))
+
+        resultado = Importador.importar(self.logica, ruta, tamano_parte=2)
+        self.assertEqual(5, resultado["procesados"])
+        self.assertEqual(5, resultado["importados"])
+        self.assertEqual(5, len(self.dar_nombres()))
+        self.assertEqual(5, len(self.logica.dar_claves_favoritas()))
+
+        # Un archivo ya importado no se vuelve a importar
+        self.assertEqual(5, Importador.importar(self.logica, ruta)["procesados"])
+        self.assertEqual(5, len(self.dar_nombres()))
+
+    # Prueba para verificar que el lector de JSON retorna los items aunque queden partidos entre bloques
+    def test_lector_json_por_bloques(self):
+        texto = json.dumps(JSON_BITWARDEN, indent=2)
+        items = list(Importador.LectorJSON(io.StringIO(texto), tamano_bloque=7).valores("items"))
+        self.assertEqual(JSON_BITWARDEN["items"], items)
+        self.assertEqual([1, 2.5], list(Importador.LectorJSON(io.StringIO("[1, 2.5]"), tamano_bloque=1).valores("items")))
+
+    # Prueba para verificar que un formato desconocido genera un error
+    def test_formato_no_soportado(self):
+        with self.assertRaises(ValueError):
+            Importador.importar(self.logica, self.escribir("exportacion.txt", ""))
@@ -71,10 +71,16 @@ class LoginTestCase(unittest.TestCase):
         self.session.commit()
         self.session.close()
 
+    # Agrega a los datos esperados el id asignado por la base de datos
+    def asignar_ids(self):
+        for (c, e) in zip(*self.test_data):
+            e["id"] = c.id
+
     # Prueba para verificar que la logica retorna los elementos de login del base de datos
     def test_listar_login(self):
         self.session.add(self.test_data[0][0])
         self.session.commit()
+        self.asignar_ids()
 
         elementos = self.logica.dar_elementos()
         self.assertEqual([self.test_data[1][0]], elementos)
@@ -84,14 +90,82 @@ class LoginTestCase(unittest.TestCase):
         for idx in self.order:
             self.session.add(self.test_data[0][idx])
         self.session.commit()
+        self.asignar_ids()
 
         self.assertEqual(self.test_data[1], self.logica.dar_elementos())
 
+    # Prueba para verificar que las páginas de elementos continúan después del último nombre de la página anterior
+    def test_listar_paginado(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+        self.asignar_ids()
+
+        pagina1 = self.logica.dar_elementos_pagina(None, 2)
+        pagina2 = self.logica.dar_elementos_pagina(pagina1[-1]["nombre_elemento"], 2)
+        self.assertEqual(self.test_data[1][:2], pagina1)
+        self.assertEqual(self.test_data[1][2:], pagina2)
+        self.assertEqual([], self.logica.dar_elementos_pagina(pagina2[-1]["nombre_elemento"], 2))
+
+    # Prueba para verificar que el iterador retorna los mismos elementos que la lista, leyendo por lotes
+    def test_iterar_elementos(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+        self.asignar_ids()
+
+        elemento = self.logica._elemento_por_id(self.test_data[0][0].id)
+        self.assertEqual(self.test_data[1], list(self.logica.iter_elementos(tamano_lote=2)))
+        # Los objetos ya retornados se quitan de la sesión aunque quien los usa conserve una referencia
+        self.assertNotIn(elemento, self.logica.session)
+
+    # Prueba para verificar que el iterador en modo crudo retorna tuplas con las columnas de los elementos
+    def test_iterar_elementos_crudo(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+
+        filas = list(self.logica.iter_elementos(tamano_lote=2, crudo=True))
+        esperado = [(c.id, "Login", c.nombre, c.nota, c.email, c.usuario, c.url) for c in self.test_data[0]]
+        self.assertEqual(esperado, [fila[:7] for fila in filas])
+        self.assertEqual([self.clave.nombre] * 3, [fila[-1] for fila in filas])
+
+    # Prueba para verificar que la lógica libera los objetos de su sesión al superar el límite
+    def test_limite_sesion(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+        self.asignar_ids()
+
+        logica = LogicaCaja(limite_sesion=1)
+        elemento = logica._elemento_por_id(self.test_data[0][0].id)
+        self.assertIn(elemento, logica.session)
+
+        self.assertEqual(self.test_data[1], logica.dar_elementos())
+        self.assertNotIn(elemento, logica.session)
+        self.assertEqual(1, len(logica.session.identity_map))
+
+        logica.editar_login_por_id(self.test_data[0][0].id, "login editado", "a@b.co", "usuario", self.clave.nombre, "https://b.co", "nota")
+        self.assertEqual(1, len(logica.session.identity_map))
+        self.assertEqual("login editado", logica.dar_elemento_por_id(self.test_data[0][0].id)["nombre_elemento"])
+        logica.session.close()
+
+    # Prueba para verificar que las páginas de elementos se pueden filtrar por tipo
+    def test_listar_paginado_por_tipo(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+        self.asignar_ids()
+
+        self.assertEqual(self.test_data[1], self.logica.dar_elementos_pagina(None, 10, "Login"))
+        self.assertEqual([], self.logica.dar_elementos_pagina(None, 10, "Tarjeta"))
+
     # Prueba para verificar que se puede buscar un elemento por su id
     def test_buscar_por_id(self):
         for idx in self.order:
             self.session.add(self.test_data[0][idx])
         self.session.commit()
+        self.asignar_ids()
 
         for (idx, esperado) in enumerate(self.test_data[1]):
             self.assertEqual(esperado, self.logica.dar_elemento(idx))
@@ -208,6 +282,43 @@ class LoginTestCase(unittest.TestCase):
         self.assertEqual(1, len(elementos))
         self.assertEsperado(self.test_data[1][0], elementos[0])
 
+
+    # Prueba para verificar que guardar_login crea y edita logins y traduce el nombre repetido al mensaje de la validación
+    def test_guardar_login_db(self):
+        (login, otro) = self.test_data[0][:2]
+        guardar = lambda id, l: self.logica.guardar_login(id, l.nombre, l.email, l.usuario, self.clave.nombre, l.url, l.nota)
+
+        self.assertEqual("", guardar(-1, login))
+        self.assertEqual("", guardar(-1, otro))
+        self.assertEqual("Ya existe un elemento con este nombre", guardar(-1, login))
+
+        id_otro = self.session.query(Elemento).filter(Elemento.nombre == otro.nombre).one().id
+        self.assertEqual("Ya existe un elemento con este nombre", guardar(id_otro, login))
+        self.assertEqual("", guardar(id_otro, otro))
+
+        self.assertEqual("Debe tener asignado una clave favorita",
+            self.logica.guardar_login(-1, "nuevo", login.email, login.usuario, "no existe", login.url, login.nota))
+        self.assertEqual("El email no tiene el formato correcto",
+            self.logica.guardar_login(-1, "nuevo", "email", login.usuario, self.clave.nombre, login.url, login.nota))
+
+        elementos = self.session.query(Elemento).order_by(Elemento.nombre).all()
+        self.assertEqual(2, len(elementos))
+        self.assertEsperado(self.test_data[1][0], elementos[0])
+        self.assertEsperado(self.test_data[1][1], elementos[1])
+
+    # Prueba para verificar que dentro de un lote el nombre repetido deshace todo el lote
+    def test_guardar_login_en_lote(self):
+        (login, otro) = self.test_data[0][:2]
+        guardar = lambda l: self.logica.guardar_login(-1, l.nombre, l.email, l.usuario, self.clave.nombre, l.url, l.nota)
+
+        with self.assertRaisesRegex(ValueError, "Ya existe un elemento con este nombre"):
+            with self.logica.lote():
+                guardar(login)
+                guardar(otro)
+                guardar(login)
+
+        self.assertEqual([], self.logica.dar_elementos())
+
     # Prueba para verificar que no hay error al cambiar un login sin cambiar el nombre
     def test_editar_login_sin_cambiar_nombre(self):
         self.session.add(self.test_data[0][0])
@@ -257,3 +368,57 @@ class LoginTestCase(unittest.TestCase):
         self.assertEqual(len(piezas), len(elementos))
         for i, j in enumerate(piezas):
             self.assertEsperado(self.test_data[1][j], elementos[i])
+
+    # Prueba para verificar que se puede buscar un elemento por su id en la base de datos
+    def test_buscar_por_id_db(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+        self.asignar_ids()
+
+        for (elemento, esperado) in zip(*self.test_data):
+            self.assertEqual(esperado, self.logica.dar_elemento_por_id(elemento.id))
+
+    # Prueba para verificar que no hay error al cambiar un login por su id en la base de datos sin cambiar el nombre
+    def test_editar_login_por_id_sin_cambiar_nombre(self):
+        self.session.add(self.test_data[0][0])
+        self.session.commit()
+
+        login = self.test_data[0][1]
+        error = self.logica.validar_crear_editar_login_por_id(self.test_data[0][0].id,
+            self.test_data[0][0].nombre, login.email, login.usuario,
+            login.clave.nombre, login.url, login.nota)
+        self.assertEqual("", error)
+
+    # Prueba para verificar que al editar un login por su id en la base de datos el cambio se refleja en el base de datos
+    def test_editar_login_por_id_db(self):
+        self.session.add(self.test_data[0][0])
+        self.session.commit()
+
+        login = self.test_data[0][1]
+        self.logica.editar_login_por_id(self.test_data[0][0].id, login.nombre, login.email, login.usuario,
+                              login.clave.nombre, login.url, login.nota)
+
+        # Descarta los datos cargados en la sesión de la prueba para leer los cambios de la lógica
+        self.session.expire_all()
+        elementos = self.session.query(Elemento).all()
+        self.assertEqual(1, len(elementos))
+        self.assertEsperado(self.test_data[1][1], elementos[0])
+
+    # Prueba para verificar que al borrar un login por su id en la base de datos se ha borrado en el base de datos también
+    def test_borrar_login_por_id_db(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+
+        id_borrar = self.fake.random.randrange(len(self.order))
+
+        self.logica.eliminar_elemento_por_id(self.test_data[0][id_borrar].id)
+
+        piezas = list(range(len(self.order)))
+        piezas.remove(id_borrar)
+
+        elementos = sorted(self.session.query(Elemento).all(), key=lambda x:x.nombre)
+        self.assertEqual(len(piezas), len(elementos))
+        for i, j in enumerate(piezas):
+            self.assertEsperado(self.test_data[1][j], elementos[i])
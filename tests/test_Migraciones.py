@@ -0,0 +1,131 @@
+#
+# Pruebas unitarias para las migraciones del esquema de la base de datos
+#
+
+import unittest
+import os
+
+# Usa base de datos en memoria para las pruebas
+os.environ['CAJA_DB'] = 'sqlite://' # noqa
+
+
+from sqlalchemy import create_engine, inspect
+from src.modelo.declarative_base import Base
+from src.modelo import migraciones, Caja, VersionEsquema
+
+class MigracionesTestCase(unittest.TestCase):
+    def setUp(self):
+        # Base de datos independiente con el esquema anterior a las migraciones: sin índices ni versión
+        self.engine = create_engine('sqlite://')
+        Base.metadata.create_all(self.engine)
+        with self.engine.begin() as conexion:
+            for tabla in Base.metadata.sorted_tables:
+                for indice in tabla.indexes:
+                    indice.drop(conexion)
+            VersionEsquema.__table__.drop(conexion)
+            conexion.execute(Caja.__table__.insert().values(id=1, clave_maestra="clave"))
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def dar_indices(self):
+        inspector = inspect(self.engine)
+        return {x["name"] for tabla in Base.metadata.sorted_tables for x in inspector.get_indexes(tabla.name)}
+
+    # Prueba para verificar que migrar crea los índices faltantes y guarda la versión
+    def test_migrar_base_existente(self):
+        self.assertNotIn("ix_elemento_caja_nombre", self.dar_indices())
+
+        version = migraciones.migrar(self.engine)
+
+        self.assertEqual(migraciones.MIGRACIONES[-1][0], version)
+        self.assertEqual(version, migraciones.dar_version(self.engine))
+        indices = self.dar_indices()
+        for nombre in ["ix_elemento_caja_nombre", "ix_elemento_tipo", "ix_login_clave_id", "ix_tarjeta_clave_id",
+                "ix_secreto_clave_id", "ix_tarjeta_vencimiento", "ix_identificacion_vencimiento",
+                "ix_clavefavorita_caja_nombre"]:
+            self.assertIn(nombre, indices)
+        self.assertEqual("clave", self.engine.execute(Caja.__table__.select()).first().clave_maestra)
+
+    # Prueba para verificar que la migración 1 crea exactamente sus índices, sin depender de los declarados en los modelos
+    def test_migracion_1_fija(self):
+        with self.engine.begin() as conexion:
+            migraciones.crear_indices_version_1(conexion)
+
+        self.assertEqual({x[0] for x in migraciones.INDICES_VERSION_1}, self.dar_indices())
+
+    # Prueba para verificar que una base de datos nueva y una migrada desde el esquema anterior tienen los mismos índices
+    def test_base_nueva_igual_a_migrada(self):
+        nueva = create_engine('sqlite://')
+        migraciones.migrar(nueva)
+        inspector = inspect(nueva)
+        indices_nueva = {x["name"] for tabla in Base.metadata.sorted_tables for x in inspector.get_indexes(tabla.name)}
+        nueva.dispose()
+
+        migraciones.migrar(self.engine)
+        self.assertEqual(indices_nueva, self.dar_indices())
+
+    # Prueba para verificar que migrar una base de datos ya migrada no la modifica
+    def test_migrar_dos_veces(self):
+        version = migraciones.migrar(self.engine)
+        indices = self.dar_indices()
+
+        self.assertEqual(version, migraciones.migrar(self.engine))
+        self.assertEqual(indices, self.dar_indices())
+
+    # Prueba para verificar que la migración 2 reemplaza los índices por caja_id creados por la migración 1
+    def test_migrar_desde_version_1(self):
+        with self.engine.begin() as conexion:
+            conexion.execute("CREATE INDEX ix_elemento_caja_id ON elemento (caja_id)")
+            VersionEsquema.__table__.create(conexion)
+            conexion.execute(VersionEsquema.__table__.insert().values(id=1, version=1))
+
+        migraciones.migrar(self.engine)
+
+        indices = self.dar_indices()
+        self.assertNotIn("ix_elemento_caja_id", indices)
+        self.assertIn("ix_elemento_caja_nombre", indices)
+
+    # Prueba para verificar que la migración 4 agrega las columnas de dominio a login y las llena para los logins existentes
+    def test_migrar_rellena_dominios(self):
+        with self.engine.begin() as conexion:
+            conexion.execute("DROP TABLE login")
+            conexion.execute("CREATE TABLE login (id INTEGER PRIMARY KEY, email VARCHAR, usuario VARCHAR, url VARCHAR, clave_id INTEGER)")
+            conexion.execute("INSERT INTO login (id, url) VALUES (1, 'https://mail.google.com/x'), (2, NULL), (3, 'www.uniandes.edu.co'), (4, '')")
+
+        migraciones.migrar(self.engine)
+
+        filas = self.engine.execute("SELECT id, dominio, host_invertido FROM login ORDER BY id").fetchall()
+        self.assertEqual([(1, "google.com", "com.google.mail"), (2, None, None), (3, "uniandes.edu.co", "co.edu.uniandes.www"),
+                          (4, None, None)], [tuple(x) for x in filas])
+        self.assertIn("ix_login_host_invertido", self.dar_indices())
+        with self.engine.begin() as conexion:
+            self.assertEqual(0, migraciones.rellenar_dominios(conexion))
+
+    # Prueba para verificar que con las estadísticas de la migración 6 SQLite busca los logins por el índice de host_invertido
+    # y no recorre toda la caja por el índice de caja_id y nombre, aunque la base de datos esté vacía
+    def test_migrar_crea_estadisticas(self):
+        migraciones.migrar(self.engine)
+
+        indices = {x for (x,) in self.engine.execute("SELECT idx FROM sqlite_stat1")}
+        self.assertTrue({x for (_, x) in migraciones.INDICES_CAJA_NOMBRE} <= indices)
+        plan = " ".join(x[-1] for x in self.engine.execute("EXPLAIN QUERY PLAN SELECT listado_elemento.id FROM listado_elemento "
+            "JOIN login ON login.id = listado_elemento.id WHERE login.host_invertido = 'com.google' AND "
+            "listado_elemento.caja_id = 1 ORDER BY listado_elemento.nombre"))
+        self.assertIn("ix_login_host_invertido", plan)
+        self.assertNotIn("ix_listado_elemento_caja_nombre", plan)
+
+    # Prueba para verificar que la migración 5 recalcula con la lista de sufijos públicos los dominios ya guardados
+    def test_migrar_recalcula_dominios(self):
+        with self.engine.begin() as conexion:
+            VersionEsquema.__table__.create(conexion)
+            conexion.execute(VersionEsquema.__table__.insert().values(id=1, version=4))
+            conexion.execute("INSERT INTO login (id, url, dominio, host_invertido) VALUES "
+                "(1, 'https://victima.github.io', 'github.io', 'io.github.victima'), (2, 'co.uk', 'co.uk', 'uk.co'), "
+                "(3, 'www.bbc.co.uk', 'bbc.co.uk', 'uk.co.bbc.www'), (4, NULL, NULL, NULL)")
+
+        migraciones.migrar(self.engine)
+
+        filas = self.engine.execute("SELECT id, dominio, host_invertido FROM login ORDER BY id").fetchall()
+        self.assertEqual([(1, "victima.github.io", "io.github.victima"), (2, None, "uk.co"), (3, "bbc.co.uk", "uk.co.bbc.www"),
+                          (4, None, None)], [tuple(x) for x in filas])
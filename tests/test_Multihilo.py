@@ -0,0 +1,115 @@
+#
+# Pruebas unitarias para el uso de la lógica desde varios hilos
+#
+
+import unittest
+import os
+import tempfile
+import threading
+import time
+
+# Usa base de datos en memoria para las pruebas
+os.environ['CAJA_DB'] = 'sqlite://' # noqa
+
+
+from src.modelo.declarative_base import FabricaSesiones
+from src.logica.LogicaCaja import LogicaCaja
+from src.logica.CerrojoLecturaEscritura import CerrojoLecturaEscritura
+
+def ejecutar_en_hilos(funciones):
+    errores = []
+    def ejecutar(funcion):
+        try:
+            funcion()
+        except Exception as error: # pragma: no cover
+            errores.append(error)
+
+    hilos = [threading.Thread(target=ejecutar, args=(funcion,)) for funcion in funciones]
+    [hilo.start() for hilo in hilos]
+    [hilo.join() for hilo in hilos]
+    return errores
+
+class CerrojoTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cerrojo = CerrojoLecturaEscritura()
+        self.dentro = []
+        self.maximo_lectores = 0
+
+    def leer(self):
+        with self.cerrojo.lectura():
+            self.dentro.append("lectura")
+            self.maximo_lectores = max(self.maximo_lectores, self.dentro.count("lectura"))
+            time.sleep(0.05)
+            self.dentro.remove("lectura")
+
+    def escribir(self):
+        with self.cerrojo.escritura():
+            self.assertEqual([], self.dentro)
+            self.dentro.append("escritura")
+            time.sleep(0.01)
+            self.dentro.remove("escritura")
+
+    # Prueba para verificar que varias lecturas pueden tener el cerrojo al mismo tiempo
+    def test_lecturas_concurrentes(self):
+        self.assertEqual([], ejecutar_en_hilos([self.leer] * 4))
+        self.assertGreater(self.maximo_lectores, 1)
+
+    # Prueba para verificar que una escritura tiene el cerrojo sola
+    def test_escrituras_exclusivas(self):
+        self.assertEqual([], ejecutar_en_hilos([self.leer, self.escribir] * 4))
+
+    # Prueba para verificar que un hilo que escribe puede volver a tomar el cerrojo para leer o escribir
+    def test_reentrante(self):
+        with self.cerrojo.escritura():
+            with self.cerrojo.lectura():
+                with self.cerrojo.escritura():
+                    pass
+        with self.cerrojo.lectura():
+            with self.cerrojo.lectura():
+                with self.assertRaises(RuntimeError):
+                    with self.cerrojo.escritura():
+                        pass
+
+class LogicaMultihiloTestCase(unittest.TestCase):
+    def setUp(self):
+        # Cada hilo usa su propia conexión, así que se necesita una base de datos en archivo
+        self.directorio = tempfile.TemporaryDirectory()
+        self.fabrica = FabricaSesiones("sqlite:///" + os.path.join(self.directorio.name, "caja.sqlite"))
+        self.logica = LogicaCaja(self.fabrica, multihilo=True)
+
+    def tearDown(self):
+        self.logica.cerrar_sesion()
+        self.fabrica.cerrar()
+        self.directorio.cleanup()
+
+    # Prueba para verificar que escrituras y lecturas desde varios hilos dejan la caja consistente
+    def test_escrituras_y_lecturas_concurrentes(self):
+        def crear_claves(hilo):
+            def crear():
+                for i in range(5):
+                    self.logica.crear_clave("clave %d-%d" % (hilo, i), "Clave123!", "pista")
+                self.logica.cerrar_sesion()
+            return crear
+
+        def leer():
+            for _ in range(10):
+                self.logica.dar_claves_favoritas()
+                self.logica.dar_reporte_seguridad()
+            self.logica.cerrar_sesion()
+
+        errores = ejecutar_en_hilos([crear_claves(hilo) for hilo in range(4)] + [leer] * 4)
+
+        self.assertEqual([], errores)
+        self.assertEqual(20, len(self.logica.dar_claves_favoritas()))
+        self.assertTrue(self.logica.verificar_resumen_reporte(reparar=False))
+
+    # Prueba para verificar que cada hilo usa su propia sesión
+    def test_sesion_por_hilo(self):
+        sesiones = []
+        def guardar_sesion():
+            sesiones.append(self.logica.session)
+            self.logica.cerrar_sesion()
+
+        ejecutar_en_hilos([guardar_sesion] * 2)
+        self.assertEqual(2, len(set(map(id, sesiones))))
+        self.assertNotIn(self.logica.session, sesiones)
@@ -0,0 +1,87 @@
+#
+# Pruebas unitarias para los perfiles de almacenamiento de SQLite
+#
+
+import unittest
+import os
+import tempfile
+
+# Usa base de datos en memoria para las pruebas
+os.environ['CAJA_DB'] = 'sqlite://' # noqa
+
+
+from sqlalchemy.pool import QueuePool
+
+from src.modelo.declarative_base import FabricaSesiones, engine, fabrica_por_defecto, usar_perfil
+from src.modelo.perfiles import PERFIL_POR_DEFECTO, PERFILES
+
+class PerfilesTestCase(unittest.TestCase):
+    def tearDown(self):
+        usar_perfil(PERFIL_POR_DEFECTO)
+
+    def dar_pragma(self, pragma):
+        return engine.execute("PRAGMA %s" % pragma).scalar()
+
+    # Prueba para verificar que la conexión usa el perfil por defecto
+    def test_perfil_por_defecto(self):
+        self.assertEqual(PERFIL_POR_DEFECTO, fabrica_por_defecto().perfil)
+        self.assertEqual(2, self.dar_pragma("synchronous"))
+        self.assertEqual(PERFILES[PERFIL_POR_DEFECTO]["busy_timeout"], self.dar_pragma("busy_timeout"))
+
+    # Prueba para verificar que cambiar de perfil aplica sus PRAGMA a la conexión
+    def test_usar_perfil(self):
+        usar_perfil("balanced")
+        self.assertEqual("balanced", fabrica_por_defecto().perfil)
+        self.assertEqual(1, self.dar_pragma("synchronous"))
+        self.assertEqual(PERFILES["balanced"]["cache_size"], self.dar_pragma("cache_size"))
+        self.assertEqual(2, self.dar_pragma("temp_store"))
+
+        usar_perfil("fast")
+        self.assertEqual(0, self.dar_pragma("synchronous"))
+
+    # Prueba para verificar que no se puede usar un perfil que no existe
+    def test_perfil_desconocido(self):
+        with self.assertRaises(ValueError):
+            usar_perfil("rapidisimo")
+        self.assertEqual(PERFIL_POR_DEFECTO, fabrica_por_defecto().perfil)
+
+    # Prueba para verificar que una fábrica de sesiones aplica su propio perfil sin afectar a la fábrica por defecto
+    def test_perfil_de_fabrica(self):
+        fabrica = FabricaSesiones("sqlite://", perfil="fast")
+        self.assertEqual(0, fabrica.engine.execute("PRAGMA synchronous").scalar())
+        self.assertEqual(2, self.dar_pragma("synchronous"))
+        fabrica.cerrar()
+
+class PerfilesArchivoTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.archivo = os.path.join(self.directorio.name, "caja.sqlite")
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    # Prueba para verificar que el perfil por defecto no cambia el diario del archivo a WAL
+    def test_perfil_por_defecto_sin_wal(self):
+        fabrica = FabricaSesiones("sqlite:///" + self.archivo)
+        fabrica.engine.execute("CREATE TABLE t (x INTEGER)")
+        self.assertEqual("delete", fabrica.engine.execute("PRAGMA journal_mode").scalar())
+        self.assertFalse(os.path.exists(self.archivo + "-wal"))
+        fabrica.cerrar()
+
+    # Prueba para verificar que cambiar de perfil lo aplica a todas las conexiones del pool y puede dejar WAL
+    def test_usar_perfil_todas_las_conexiones(self):
+        fabrica = FabricaSesiones("sqlite:///" + self.archivo, perfil="durable", poolclass=QueuePool, pool_size=2)
+        def pragmas():
+            # Dos conexiones a la vez, para que el pool tenga que usar ambas
+            conexiones = [fabrica.engine.connect() for _ in range(2)]
+            valores = [(x.execute("PRAGMA journal_mode").scalar(), x.execute("PRAGMA synchronous").scalar()) for x in conexiones]
+            [x.close() for x in conexiones]
+            return valores
+
+        self.assertEqual([("wal", 2)] * 2, pragmas())
+        fabrica.usar_perfil("fast")
+        self.assertEqual([("memory", 0)] * 2, pragmas())
+        fabrica.usar_perfil("rollback")
+        self.assertEqual([("delete", 2)] * 2, pragmas())
+        self.assertFalse(os.path.exists(self.archivo + "-wal"))
+        fabrica.cerrar()
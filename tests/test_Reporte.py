@@ -3,6 +3,7 @@
 #
 
 import unittest
+import gc
 import os
 from datetime import datetime, timedelta
 from faker import Faker
@@ -10,9 +11,10 @@ from faker import Faker
 # Usa base de datos en memoria para las pruebas
 os.environ['CAJA_DB'] = 'sqlite://' # noqa
 
-from src.modelo.declarative_base import Session
-from src.modelo import Elemento, ClaveFavorita
+from src.modelo.declarative_base import FabricaSesiones, Session
+from src.modelo import Elemento, ClaveFavorita, ResumenConteo
 from src.logica.LogicaCaja import LogicaCaja
+from src.logica import ResumenReporte
 from src.logica.typing import TipoReporte
 
 from test_ClaveFavorita import gen_clave
@@ -20,6 +22,7 @@ from test_Login import gen_login
 from test_Identificacion import gen_id
 from test_Tarjeta import gen_tarjeta
 from test_Secreto import gen_secreto
+from test_Caja import contar_consultas
 
 class ReporteTestCase(unittest.TestCase):
     def setUp(self):
@@ -34,6 +37,17 @@ class ReporteTestCase(unittest.TestCase):
         self.session.commit()
         self.session.close()
 
+    # Agrega claves favoritas con elementos de cada tipo al base de datos
+    def agregar_datos(self, cantidad):
+        for _ in range(cantidad):
+            (clave, _) = gen_clave(self.fake)
+            self.session.add(clave)
+            self.session.add(gen_login(self.fake, clave)[0])
+            self.session.add(gen_tarjeta(self.fake, clave)[0])
+            self.session.add(gen_secreto(self.fake, clave)[0])
+            self.session.add(gen_id(self.fake)[0])
+        self.session.commit()
+
     # Prueba para verificar que cantidad de logins en el reporte es correcto
     def test_cantidad_logins(self):
         (clave1, _) = gen_clave(self.fake)
@@ -328,3 +342,133 @@ class ReporteTestCase(unittest.TestCase):
 
         reporte = self.logica.dar_reporte_seguridad()
         self.assertAlmostEqual(0.5 + 0.5 * 2/5, reporte["nivel"])
+
+    # Prueba para verificar que la cantidad de consultas del reporte no depende del tamaño de la caja
+    def test_cantidad_consultas_constante(self):
+        self.agregar_datos(1)
+        consultas_caja_pequena = contar_consultas(self.logica.dar_reporte_seguridad)
+
+        self.agregar_datos(20)
+        consultas_caja_grande = contar_consultas(self.logica.dar_reporte_seguridad)
+
+        self.assertEqual(consultas_caja_pequena, consultas_caja_grande)
+        self.assertLessEqual(consultas_caja_grande, 2)
+
+        reporte = self.logica.dar_reporte_seguridad()
+        self.assertEqual(21, reporte["logins"])
+        self.assertEqual(21, reporte["ids"])
+        self.assertEqual(21, reporte["tarjetas"])
+        self.assertEqual(21, reporte["secretos"])
+        self.assertEqual(21, reporte["masdeuna"])
+
+    # Prueba para verificar que el resumen del reporte se mantiene consistente al crear, editar y eliminar con la lógica
+    def test_resumen_consistente(self):
+        (clave1, _) = gen_clave(self.fake)
+        (clave2, _) = gen_clave(self.fake, longitud_min=0, longitud_max=7)
+        self.logica.crear_clave(clave1.nombre, clave1.clave, clave1.pista)
+        self.logica.crear_clave(clave2.nombre, clave2.clave, clave2.pista)
+
+        (login, _) = gen_login(self.fake, clave1)
+        self.logica.crear_login(login.nombre, login.email, login.usuario, clave1.nombre, login.url, login.nota)
+        (tarjeta, _) = gen_tarjeta(self.fake, clave1, vencimiento=self.fake.date_between('now','+3M'))
+        self.logica.crear_tarjeta(tarjeta.nombre, tarjeta.numero, tarjeta.titular, tarjeta.vencimiento.isoformat(),
+            tarjeta.codigo_seguridad, clave1.nombre, tarjeta.direccion, tarjeta.telefono, tarjeta.nota)
+        (secreto, _) = gen_secreto(self.fake, clave1)
+        self.logica.crear_secreto(secreto.nombre, secreto.secreto, clave1.nombre, secreto.nota)
+        (id1, _) = gen_id(self.fake)
+        self.logica.crear_id(id1.nombre, id1.numero, id1.nombre_completo, id1.nacimiento.isoformat(),
+            id1.expedicion.isoformat(), id1.vencimiento.isoformat(), id1.nota)
+        self.assertTrue(self.logica.verificar_resumen_reporte(reparar=False))
+
+        id_tarjeta = self.session.query(Elemento).filter(Elemento.nombre == tarjeta.nombre).first().id
+        self.logica.editar_tarjeta_por_id(id_tarjeta, tarjeta.nombre, tarjeta.numero, tarjeta.titular,
+            self.fake.date_between('+1y','+2y').isoformat(), tarjeta.codigo_seguridad, clave2.nombre,
+            tarjeta.direccion, tarjeta.telefono, tarjeta.nota)
+        id_clave1 = self.session.query(ClaveFavorita).filter(ClaveFavorita.nombre == clave1.nombre).first().id
+        self.logica.editar_clave_por_id(id_clave1, clave1.nombre, "corta", clave1.pista)
+        self.assertTrue(self.logica.verificar_resumen_reporte(reparar=False))
+
+        reporte = self.logica.dar_reporte_seguridad()
+        self.assertEqual(0, reporte["avencer"])
+        self.assertEqual(1, reporte["masdeuna"])
+        self.assertEqual(2, reporte["inseguras"])
+
+        for x in self.session.query(Elemento).all():
+            self.logica.eliminar_elemento_por_id(x.id)
+        self.logica.eliminar_clave_por_id(id_clave1)
+        self.assertTrue(self.logica.verificar_resumen_reporte(reparar=False))
+        self.assertEqual(0, self.logica.dar_reporte_seguridad()["logins"])
+
+    # Prueba para verificar que la verificación reconstruye un resumen inconsistente a partir de las tablas base
+    def test_resumen_reconstruido(self):
+        self.agregar_datos(2)
+        esperado = self.logica.dar_reporte_seguridad()
+
+        self.session.query(ResumenConteo).update({ResumenConteo.valor: 99})
+        self.session.commit()
+        self.assertNotEqual(esperado, self.logica.dar_reporte_seguridad())
+
+        self.assertFalse(self.logica.verificar_resumen_reporte())
+        self.assertEqual(esperado, self.logica.dar_reporte_seguridad())
+        self.assertTrue(self.logica.verificar_resumen_reporte())
+
+    # Prueba para verificar que cada fábrica de sesiones nueva mantiene el resumen, aunque reutilice el id()
+    # de una fábrica ya liberada
+    def test_registrar_fabricas_nuevas(self):
+        for _ in range(100):
+            fabrica = FabricaSesiones("sqlite://")
+            ResumenReporte.registrar(fabrica.Session)
+            sesion = fabrica()
+            self.assertIn(ResumenReporte.antes_de_flush, list(sesion.dispatch.before_flush))
+            sesion.close()
+            del (fabrica, sesion)
+            gc.collect()
+
+class VencimientosTestCase(unittest.TestCase):
+    def setUp(self):
+        self.fabrica = FabricaSesiones("sqlite://")
+        self.logica = LogicaCaja(self.fabrica)
+        self.hoy = datetime.today().date()
+        self.logica.crear_clave("clave", "Clave123!", "pista")
+        for (nombre, dias) in [("Visa", 10), ("Master", 45), ("Amex", -5)]:
+            self.logica.crear_tarjeta(nombre, "4111", "TITULAR", (self.hoy + timedelta(days=dias)).isoformat(), "123",
+                                      "clave", "dirección", "3000000000", "notas")
+        for (nombre, dias) in [("Cédula", 89), ("Pasaporte", 400), ("Licencia", 10)]:
+            self.logica.crear_id(nombre, "1234", "Nombre", "1990-01-01", "2010-01-01",
+                                 (self.hoy + timedelta(days=dias)).isoformat(), "notas")
+        self.logica.crear_secreto("Secreto", "secreto", "clave", "notas")
+
+    def tearDown(self):
+        self.logica.cerrar_sesion()
+        self.fabrica.cerrar()
+
+    def por_vencer(self, desde=None, hasta=None):
+        return [x["nombre_elemento"] for x in self.logica.dar_elementos_por_vencer(desde, hasta)]
+
+    # Prueba para verificar que se retornan las tarjetas e identificaciones del rango, por vencimiento y nombre
+    def test_elementos_por_vencer(self):
+        self.assertEqual(["Amex", "Licencia", "Visa", "Master", "Cédula"], self.por_vencer(hasta=self.hoy + timedelta(days=90)))
+        self.assertEqual(["Licencia", "Visa"], self.por_vencer(self.hoy, self.hoy + timedelta(days=45)))
+        self.assertEqual(["Master", "Cédula", "Pasaporte"], self.por_vencer(desde=self.hoy + timedelta(days=11)))
+        self.assertEqual(6, len(self.por_vencer()))
+        self.assertEqual((self.hoy + timedelta(days=10)).isoformat(), self.logica.dar_elementos_por_vencer(self.hoy)[0]["fecha_venc"])
+
+    # Prueba para verificar que el histograma cuenta los elementos de cada horizonte y coincide con el reporte
+    def test_histograma_vencimientos(self):
+        self.assertEqual({30: 3, 60: 4, 90: 5, 365: 5}, self.logica.dar_histograma_vencimientos())
+        self.assertEqual({11: 3, 500: 6}, self.logica.dar_histograma_vencimientos([500, 11, 11]))
+        self.assertEqual({}, self.logica.dar_histograma_vencimientos([]))
+        for dias in (30, 90):
+            self.assertEqual(self.logica.dar_histograma_vencimientos([dias])[dias],
+                             self.logica.dar_reporte_seguridad(dias)["avencer"])
+        self.assertEqual(5, self.logica.dar_reporte_seguridad()["avencer"])
+
+    # Prueba para verificar que los vencimientos se actualizan al editar y eliminar elementos
+    def test_vencimientos_despues_de_escribir(self):
+        id_visa = [x for x in self.logica.dar_elementos() if x["nombre_elemento"] == "Visa"][0]["id"]
+        self.logica.editar_tarjeta_por_id(id_visa, "Visa", "4111", "TITULAR", (self.hoy + timedelta(days=200)).isoformat(),
+                                          "123", "clave", "dirección", "3000000000", "notas")
+        self.assertEqual({30: 2, 365: 5}, self.logica.dar_histograma_vencimientos([30, 365]))
+        self.logica.eliminar_elemento_por_id(id_visa)
+        self.assertEqual({30: 2, 365: 4}, self.logica.dar_histograma_vencimientos([30, 365]))
+        self.assertNotIn("Visa", self.por_vencer())
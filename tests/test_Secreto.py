@@ -66,10 +66,16 @@ class SecretoTestCase(unittest.TestCase):
         self.session.commit()
         self.session.close()
 
+    # Agrega a los datos esperados el id asignado por la base de datos
+    def asignar_ids(self):
+        for (c, e) in zip(*self.test_data):
+            e["id"] = c.id
+
     # Prueba para verificar que la logica retorna los elementos de secreto del base de datos
     def test_listar_secreto(self):
         self.session.add(self.test_data[0][0])
         self.session.commit()
+        self.asignar_ids()
 
         elementos = self.logica.dar_elementos()
         self.assertEqual([self.test_data[1][0]], elementos)
@@ -79,6 +85,7 @@ class SecretoTestCase(unittest.TestCase):
         for idx in self.order:
             self.session.add(self.test_data[0][idx])
         self.session.commit()
+        self.asignar_ids()
 
         self.assertEqual(self.test_data[1], self.logica.dar_elementos())
 
@@ -87,6 +94,7 @@ class SecretoTestCase(unittest.TestCase):
         for idx in self.order:
             self.session.add(self.test_data[0][idx])
         self.session.commit()
+        self.asignar_ids()
 
         for (idx, esperado) in enumerate(self.test_data[1]):
             self.assertEqual(esperado, self.logica.dar_elemento(idx))
@@ -178,6 +186,24 @@ class SecretoTestCase(unittest.TestCase):
         self.assertEqual(1, len(elementos))
         self.assertEsperado(self.test_data[1][0], elementos[0])
 
+
+    # Prueba para verificar que guardar_secreto crea y edita secretos y detecta el nombre repetido al escribir
+    def test_guardar_secreto_db(self):
+        (secreto, otro) = self.test_data[0][:2]
+        guardar = lambda id, s: self.logica.guardar_secreto(id, s.nombre, s.secreto, self.clave.nombre, s.nota)
+
+        self.assertEqual("", guardar(-1, secreto))
+        self.assertEqual("Ya existe un elemento con este nombre", guardar(-1, secreto))
+        self.assertEqual("Debe tener asignado una clave favorita",
+            self.logica.guardar_secreto(-1, otro.nombre, otro.secreto, "no existe", otro.nota))
+
+        id_secreto = self.session.query(Elemento).one().id
+        self.assertEqual("", guardar(id_secreto, otro))
+
+        elementos = self.session.query(Elemento).all()
+        self.assertEqual(1, len(elementos))
+        self.assertEsperado(self.test_data[1][1], elementos[0])
+
     # Prueba para verificar que no hay error al cambiar un secreto sin cambiar el nombre
     def test_editar_secreto_sin_cambiar_nombre(self):
         self.session.add(self.test_data[0][0])
@@ -226,3 +252,55 @@ class SecretoTestCase(unittest.TestCase):
         self.assertEqual(len(piezas), len(elementos))
         for i, j in enumerate(piezas):
             self.assertEsperado(self.test_data[1][j], elementos[i])
+
+    # Prueba para verificar que se puede buscar un elemento por su id en la base de datos
+    def test_buscar_por_id_db(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+        self.asignar_ids()
+
+        for (elemento, esperado) in zip(*self.test_data):
+            self.assertEqual(esperado, self.logica.dar_elemento_por_id(elemento.id))
+
+    # Prueba para verificar que no hay error al cambiar un secreto por su id en la base de datos sin cambiar el nombre
+    def test_editar_secreto_por_id_sin_cambiar_nombre(self):
+        self.session.add(self.test_data[0][0])
+        self.session.commit()
+
+        secreto = self.test_data[0][1]
+        error = self.logica.validar_crear_editar_secreto_por_id(self.test_data[0][0].id,
+            self.test_data[0][0].nombre, secreto.secreto, secreto.clave.nombre, secreto.nota)
+        self.assertEqual("", error)
+
+    # Prueba para verificar que al editar un secreto por su id en la base de datos el cambio se refleja en el base de datos
+    def test_editar_secreto_por_id_db(self):
+        self.session.add(self.test_data[0][0])
+        self.session.commit()
+
+        secreto = self.test_data[0][1]
+        self.logica.editar_secreto_por_id(self.test_data[0][0].id, secreto.nombre, secreto.secreto, secreto.clave.nombre, secreto.nota)
+
+        # Descarta los datos cargados en la sesión de la prueba para leer los cambios de la lógica
+        self.session.expire_all()
+        elementos = self.session.query(Elemento).all()
+        self.assertEqual(1, len(elementos))
+        self.assertEsperado(self.test_data[1][1], elementos[0])
+
+    # Prueba para verificar que al borrar un secreto por su id en la base de datos se ha borrado en el base de datos también
+    def test_borrar_secreto_por_id_db(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+
+        id_borrar = self.fake.random.randrange(len(self.order))
+
+        self.logica.eliminar_elemento_por_id(self.test_data[0][id_borrar].id)
+
+        piezas = list(range(len(self.order)))
+        piezas.remove(id_borrar)
+
+        elementos = sorted(self.session.query(Elemento).all(), key=lambda x:x.nombre)
+        self.assertEqual(len(piezas), len(elementos))
+        for i, j in enumerate(piezas):
+            self.assertEsperado(self.test_data[1][j], elementos[i])
@@ -0,0 +1,125 @@
+#
+# Pruebas unitarias para la búsqueda de nombres parecidos con los índices de trigramas
+#
+
+import unittest
+import os
+import random
+
+# Usa base de datos en memoria para las pruebas
+os.environ['CAJA_DB'] = 'sqlite://' # noqa
+
+
+from src.modelo.declarative_base import FabricaSesiones
+from src.logica.LogicaCaja import LogicaCaja
+from src.logica.IndiceTrigramas import IndiceTrigramas, trigramas
+
+class IndiceTrigramasTestCase(unittest.TestCase):
+
+    # Prueba para verificar los trigramas de cada palabra, sin mayúsculas ni tildes
+    def test_trigramas(self):
+        self.assertEqual({"  a", " ab", "ab ", "  c", " c "}, trigramas("Ab c"))
+        self.assertEqual(trigramas("cedula"), trigramas("Cédula"))
+        self.assertEqual(frozenset(), trigramas(" -- "))
+
+    # Prueba para verificar que la búsqueda (que deja de recorrer los trigramas comunes) coincide con comparar el
+    # coeficiente de Jaccard contra todos los nombres
+    def test_buscar_igual_a_recorrido(self):
+        azar = random.Random(2021)
+        palabras = ["correo", "correos", "visa", "banco", "casa", "wifi", "pasaporte", "cedula", "clave", "oro"]
+        nombres = {i: " ".join(azar.sample(palabras, azar.randint(1, 3))) for i in range(300)}
+        indice = IndiceTrigramas()
+        indice.cargar(nombres.items())
+        for texto in ["coreo", "visa", "pasaprte", "wifi casa", "banco correo oro", "xyz"]:
+            consulta = trigramas(texto)
+            puntajes = [(i, x, len(consulta & trigramas(x)) / len(consulta | trigramas(x))) for (i, x) in nombres.items()]
+            for (limite, minimo) in [(1, 0.0), (5, 0.0), (10, 0.3), (400, 0.5)]:
+                esperado = sorted([x for x in puntajes if x[2] > 0 and x[2] >= minimo], key=lambda x: (-x[2], x[1]))[:limite]
+                self.assertEqual(esperado, indice.buscar(texto, limite, minimo))
+
+    # Prueba para verificar que los cambios sólo se aplican a un índice construido
+    def test_aplicar(self):
+        indice = IndiceTrigramas()
+        indice.aplicar([(1, "Correo")])
+        self.assertEqual(0, len(indice))
+
+        indice.cargar([(1, "Correo"), (2, "Pasaporte")])
+        indice.aplicar([(1, None), (2, "Cédula"), (3, "Correo")])
+        self.assertEqual([(3, "Correo", 1.0)], indice.buscar("correo", 1))
+        self.assertEqual([(2, "Cédula", 1.0)], indice.buscar("cedula", 1))
+        self.assertEqual([], indice.buscar("pasaporte"))
+        self.assertEqual(2, len(indice))
+
+class SimilaresTestCase(unittest.TestCase):
+    def setUp(self):
+        self.fabrica = FabricaSesiones("sqlite://")
+        self.logica = LogicaCaja(self.fabrica)
+
+        self.logica.crear_clave("La de siempre", "Clave123!", "pista")
+        self.logica.crear_clave("Muy segura", "Clave123!", "pista")
+        self.logica.crear_login("Correo uniandes", "ana@mail.co", "ana", "La de siempre", "https://mail.co", "notas")
+        self.logica.crear_secreto("Números de pólizas", "1234", "Muy segura", "notas")
+
+    def tearDown(self):
+        self.logica.cerrar_sesion()
+        self.fabrica.cerrar()
+
+    def elementos(self, texto):
+        return [x["nombre_elemento"] for x in self.logica.dar_elementos_similares(texto)]
+
+    # Prueba para verificar que se encuentran nombres con errores de escritura
+    def test_similares(self):
+        self.assertEqual(["Correo uniandes"], self.elementos("corre uniandez"))
+        self.assertEqual([], self.logica.dar_elementos_similares("polisas"))
+        self.assertEqual("Números de pólizas", self.logica.dar_elementos_similares("polisas", 1, minimo=0)[0]["nombre_elemento"])
+        self.assertEqual(["Muy segura"], [x["nombre"] for x in self.logica.dar_claves_similares("muy segra", 1)])
+        self.assertEqual(1.0, self.logica.dar_claves_similares("la DE siempre")[0]["similitud"])
+
+    # Prueba para verificar que el índice se actualiza al crear, editar y eliminar
+    def test_similares_despues_de_escribir(self):
+        self.elementos("correo")
+        id_login = self.logica.dar_elementos()[0]["id"]
+        self.logica.editar_login_por_id(id_login, "Banco", "ana@mail.co", "ana", "La de siempre", "https://mail.co", "notas")
+        self.logica.crear_secreto("Correo personal", "1234", "Muy segura", "notas")
+        self.assertEqual(["Correo personal"], self.elementos("correo"))
+
+        self.logica.eliminar_elemento_por_id(id_login)
+        self.assertEqual([], self.elementos("banco"))
+
+        id_clave = self.logica.dar_claves_favoritas()[0]["id"]
+        self.logica.editar_clave_por_id(id_clave, "Otra", "Clave123!", "pista")
+        self.assertEqual(["Otra"], [x["nombre"] for x in self.logica.dar_claves_similares("otra", 1)])
+
+    # Prueba para verificar que los lotes actualizan el índice sólo si se confirman
+    def test_similares_lote(self):
+        self.elementos("correo")
+        secreto = {"tipo": "Secreto", "secreto": "1234", "clave": "Nueva", "notas": "notas"}
+        self.logica.crear_elementos_lote([dict(secreto, nombre_elemento="Wifi casa")],
+                                         [{"nombre": "Nueva", "clave": "Clave123!", "pista": "pista"}])
+        self.assertEqual(["Wifi casa"], [x for x in self.elementos("wifi") if "wifi" in x.lower()])
+        self.assertEqual(["Nueva"], [x["nombre"] for x in self.logica.dar_claves_similares("nueva", 1)])
+
+        with self.assertRaises(ValueError):
+            with self.logica.lote():
+                self.logica.crear_secreto("Wifi oficina", "1234", "Nueva", "notas")
+                self.logica.crear_elementos_lote([dict(secreto, nombre_elemento="Wifi finca")])
+                raise ValueError("error")
+        self.assertEqual(["Wifi casa"], [x for x in self.elementos("wifi") if "wifi" in x.lower()])
+
+        # Un nombre repetido hace rollback y tampoco cambia el índice
+        self.assertEqual("Ya existe un elemento con este nombre", self.logica.guardar_secreto(-1, "Wifi casa", "1234", "Nueva", "notas"))
+        self.assertEqual(1, len([x for x in self.elementos("wifi casa") if x == "Wifi casa"]))
+
+    # Prueba para verificar que reconstruir los índices incluye las escrituras hechas por otra lógica
+    def test_reconstruir_indices(self):
+        self.elementos("correo")
+        otra = LogicaCaja(self.fabrica)
+        otra.crear_secreto("Alarma", "1234", "Muy segura", "notas")
+        otra.cerrar_sesion()
+        self.assertNotIn("Alarma", self.elementos("alarma"))
+
+        self.logica.reconstruir_indices_trigramas()
+        self.assertEqual("Alarma", self.elementos("alarma")[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -79,10 +79,16 @@ class TarjetaTestCase(unittest.TestCase):
         self.session.commit()
         self.session.close()
 
+    # Agrega a los datos esperados el id asignado por la base de datos
+    def asignar_ids(self):
+        for (c, e) in zip(*self.test_data):
+            e["id"] = c.id
+
     # Prueba para verificar que la logica retorna los elementos de tarjeta del base de datos
     def test_listar_tarjeta(self):
         self.session.add(self.test_data[0][0])
         self.session.commit()
+        self.asignar_ids()
 
         elementos = self.logica.dar_elementos()
         self.assertEqual([self.test_data[1][0]], elementos)
@@ -92,6 +98,7 @@ class TarjetaTestCase(unittest.TestCase):
         for idx in self.order:
             self.session.add(self.test_data[0][idx])
         self.session.commit()
+        self.asignar_ids()
 
         self.assertEqual(self.test_data[1], self.logica.dar_elementos())
 
@@ -100,6 +107,7 @@ class TarjetaTestCase(unittest.TestCase):
         for idx in self.order:
             self.session.add(self.test_data[0][idx])
         self.session.commit()
+        self.asignar_ids()
 
         for (idx, esperado) in enumerate(self.test_data[1]):
             self.assertEqual(esperado, self.logica.dar_elemento(idx))
@@ -291,6 +299,30 @@ class TarjetaTestCase(unittest.TestCase):
         self.assertEqual(1, len(elementos))
         self.assertEsperado(self.test_data[1][0], elementos[0])
 
+
+    # Prueba para verificar que guardar_tarjeta crea tarjetas y detecta el nombre repetido al escribir
+    def test_guardar_tarjeta_db(self):
+        tarjeta = self.test_data[0][0]
+        guardar = lambda: self.logica.guardar_tarjeta(
+            -1, tarjeta.nombre, tarjeta.numero, tarjeta.titular, tarjeta.vencimiento.isoformat(),
+            tarjeta.codigo_seguridad, tarjeta.clave.nombre, tarjeta.direccion, tarjeta.telefono, tarjeta.nota)
+
+        self.assertEqual("", guardar())
+        self.assertEqual("Ya existe un elemento con este nombre", guardar())
+
+        elementos = self.session.query(Elemento).all()
+        self.assertEqual(1, len(elementos))
+        self.assertEsperado(self.test_data[1][0], elementos[0])
+
+        # Editar un id que no existe o que es de otro tipo de elemento retorna un error
+        id_tarjeta = elementos[0].id
+        self.assertEqual("No existe un elemento de este tipo con este id",
+            self.logica.guardar_login(id_tarjeta, "login", "a@b.co", "usuario", tarjeta.clave.nombre, "https://b.co", "notas"))
+        self.assertEqual("No existe un elemento de este tipo con este id", self.logica.guardar_tarjeta(
+            id_tarjeta + 1, "otra", tarjeta.numero, tarjeta.titular, tarjeta.vencimiento.isoformat(),
+            tarjeta.codigo_seguridad, tarjeta.clave.nombre, tarjeta.direccion, tarjeta.telefono, tarjeta.nota))
+        self.assertEqual(1, self.session.query(Elemento).count())
+
     # Prueba para verificar que no hay error al cambiar una tarjeta sin cambiar el nombre
     def test_editar_tarjeta_sin_cambiar_nombre(self):
         self.session.add(self.test_data[0][0])
@@ -340,3 +372,58 @@ class TarjetaTestCase(unittest.TestCase):
         self.assertEqual(len(piezas), len(elementos))
         for i, j in enumerate(piezas):
             self.assertEsperado(self.test_data[1][j], elementos[i])
+
+    # Prueba para verificar que se puede buscar un elemento por su id en la base de datos
+    def test_buscar_por_id_db(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+        self.asignar_ids()
+
+        for (elemento, esperado) in zip(*self.test_data):
+            self.assertEqual(esperado, self.logica.dar_elemento_por_id(elemento.id))
+
+    # Prueba para verificar que no hay error al cambiar una tarjeta por su id en la base de datos sin cambiar el nombre
+    def test_editar_tarjeta_por_id_sin_cambiar_nombre(self):
+        self.session.add(self.test_data[0][0])
+        self.session.commit()
+
+        tarjeta = self.test_data[0][1]
+        error = self.logica.validar_crear_editar_tarjeta_por_id(self.test_data[0][0].id,
+            self.test_data[0][0].nombre, tarjeta.numero, tarjeta.titular, tarjeta.vencimiento.isoformat(),
+            tarjeta.codigo_seguridad, tarjeta.clave.nombre, tarjeta.direccion, tarjeta.telefono, tarjeta.nota)
+        self.assertEqual("", error)
+
+    # Prueba para verificar que al editar una tarjeta por su id en la base de datos el cambio se refleja en el base de datos
+    def test_editar_tarjeta_por_id_db(self):
+        self.session.add(self.test_data[0][0])
+        self.session.commit()
+
+        tarjeta = self.test_data[0][1]
+        self.logica.editar_tarjeta_por_id(self.test_data[0][0].id,
+            tarjeta.nombre, tarjeta.numero, tarjeta.titular, tarjeta.vencimiento.isoformat(),
+            tarjeta.codigo_seguridad, tarjeta.clave.nombre, tarjeta.direccion, tarjeta.telefono, tarjeta.nota)
+
+        # Descarta los datos cargados en la sesión de la prueba para leer los cambios de la lógica
+        self.session.expire_all()
+        elementos = self.session.query(Elemento).all()
+        self.assertEqual(1, len(elementos))
+        self.assertEsperado(self.test_data[1][1], elementos[0])
+
+    # Prueba para verificar que al borrar un tarjeta por su id en la base de datos se ha borrado en el base de datos también
+    def test_borrar_tarjeta_por_id_db(self):
+        for idx in self.order:
+            self.session.add(self.test_data[0][idx])
+        self.session.commit()
+
+        id_borrar = self.fake.random.randrange(len(self.order))
+
+        self.logica.eliminar_elemento_por_id(self.test_data[0][id_borrar].id)
+
+        piezas = list(range(len(self.order)))
+        piezas.remove(id_borrar)
+
+        elementos = sorted(self.session.query(Elemento).all(), key=lambda x:x.nombre)
+        self.assertEqual(len(piezas), len(elementos))
+        for i, j in enumerate(piezas):
+            self.assertEsperado(self.test_data[1][j], elementos[i])
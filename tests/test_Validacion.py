@@ -0,0 +1,98 @@
+#
+# Pruebas unitarias para las especificaciones de validación de los campos
+#
+
+import unittest
+import itertools
+import random
+import re
+import time
+
+from src.logica import Validacion
+
+LOGIN = {"tipo": "Login", "nombre_elemento": "Correo", "email": "ana@mail.co", "usuario": "ana",
+         "clave": "Correo", "url": "https://mail.co", "notas": "cuenta principal"}
+TARJETA = {"tipo": "Tarjeta", "nombre_elemento": "Visa", "numero": "4111111111111111", "titular": "ANA PÉREZ",
+           "fecha_venc": "2030-01-31", "ccv": 123, "clave": "Correo", "direccion": "Calle 1", "telefono": "+57 (606) 7422736",
+           "notas": "tarjeta de crédito"}
+IDENTIFICACION = {"tipo": "Identificación", "nombre_elemento": "Cédula", "numero": "1010", "nombre": "Ana Pérez",
+                  "fecha_nacimiento": "1990-01-01", "fecha_exp": "2010-01-01", "fecha_venc": "2030-01-01", "notas": "original"}
+SECRETO = {"tipo": "Secreto", "nombre_elemento": "Alarma", "secreto": "1234", "clave": "Correo", "notas": "código"}
+
+class ValidacionTestCase(unittest.TestCase):
+
+    # Prueba para verificar que los registros válidos de cada tipo no tienen errores
+    def test_registros_validos(self):
+        self.assertEqual([[], [], [], []], Validacion.validar_lote([LOGIN, TARJETA, IDENTIFICACION, SECRETO]))
+        self.assertEqual("", Validacion.validar(Validacion.CLAVE_FAVORITA, {"nombre": "a", "clave": "abc", "pista": "abc"}))
+
+    # Prueba para verificar que se retorna el primer error de cada campo, en el orden de las reglas
+    def test_todos_los_errores(self):
+        tarjeta = dict(TARJETA, nombre_elemento="", titular="ana", ccv="12345", telefono=None)
+        self.assertEqual(["El nombre no debe tener menos de 1 caracter",
+                          "El titular debe contener solo mayúsculas y espacios",
+                          "El CCV no debe tener más de 4 dígitos",
+                          "El teléfono no debe tener menos de 3 caracteres"], Validacion.validar_lote([tarjeta])[0])
+        self.assertEqual("El nombre no debe tener menos de 1 caracter", Validacion.validar(Validacion.TARJETA, tarjeta))
+
+    # Prueba para verificar que los mensajes de las reglas compartidas dependen del tipo
+    def test_mensajes_por_tipo(self):
+        self.assertEqual("El nombre no debe tener menos de 1 caracteres", Validacion.validar(Validacion.LOGIN, dict(LOGIN, nombre_elemento="")))
+        self.assertEqual("El número no debe tener más de 20 dígitos", Validacion.validar(Validacion.IDENTIFICACION, dict(IDENTIFICACION, numero="1" * 21)))
+        self.assertEqual("La fecha de expedición debe tener el formato YYYY-MM-DD, por ejemplo 2023-01-28",
+                         Validacion.validar(Validacion.IDENTIFICACION, dict(IDENTIFICACION, fecha_exp="01/01/2010")))
+
+    # Prueba para verificar que un tipo desconocido genera un error
+    def test_tipo_desconocido(self):
+        self.assertEqual([[Validacion.ERROR_TIPO], [Validacion.ERROR_TIPO]], Validacion.validar_lote([{"tipo": "Otro"}, {}]))
+
+# Expresiones regulares que reemplazan los escáneres de Validacion; sirven de referencia en las pruebas
+EXPRESIONES = {
+    Validacion.es_email: r"^[a-zA-Z0-9+_.-]+@[a-zA-Z0-9.-]+$",
+    Validacion.es_fecha: r"^\d{4}-([0]\d|1[0-2])-([0-2]\d|3[01])$",
+    Validacion.es_url: r"^(https?:\/\/(?:www\.|(?!www))[a-zA-Z0-9][a-zA-Z0-9-]+[a-zA-Z0-9]\.[^\s]{2,}|www\.[a-zA-Z0-9][a-zA-Z0-9-]+[a-zA-Z0-9]\.[^\s]{2,}|https?:\/\/(?:www\.|(?!www))[a-zA-Z0-9]+\.[^\s]{2,}|www\.[a-zA-Z0-9]+\.[^\s]{2,})$",
+    Validacion.es_telefono: r"^(\(\+?\d+\)|\+?[\d A-Z]*)[\d A-Z]*(\([\d A-Z]+\))*[\d A-Z]*$",
+}
+
+# Fragmentos con los que se arman valores al azar para cada formato
+FRAGMENTOS = {
+    Validacion.es_email: ["a", "Z9", "+", "_", ".", "-", "@", " ", "\n", "ñ", "mail.co"],
+    Validacion.es_url: ["http://", "https://", "www.", "www", "a", "Z9", "-", ".", "co", " ", "\n", "é", "/x"],
+    Validacion.es_telefono: ["(", ")", "+", "57", "606", " ", "A", "a", "٣", "\n", "-"],
+}
+
+class EscaneresTestCase(unittest.TestCase):
+
+    def assertIgualExpresion(self, funcion, valor):
+        regla = Validacion.formato("campo", funcion, "error")
+        esperado = re.match(EXPRESIONES[funcion], valor) is not None
+        self.assertEqual(esperado, regla.cumple(valor), "%s(%r)" % (funcion.__name__, valor))
+
+    # Prueba para verificar que los escáneres aceptan los ejemplos de siempre y rechazan los inválidos
+    def test_ejemplos(self):
+        for valor in ["ana@mail.co", "2023-01-28", "https://mail.co", "www.mail.co", "http://www.a-b.co/x?y=1",
+                      "+57 (606) 7422736", "(+57) 3001234567", "", "a@", "2023-13-01", "https://-a.co", "ftp://a.co",
+                      "http://wwwa.co", "+57 (606", "(57)(1)2", "2023-01-28\n", "ana@mail.co\n\n"]:
+            for funcion in EXPRESIONES:
+                self.assertIgualExpresion(funcion, valor)
+
+    # Prueba para verificar que los escáneres aceptan exactamente los mismos valores que las expresiones regulares
+    def test_igual_a_expresiones(self):
+        azar = random.Random(2021)
+        for (funcion, fragmentos) in FRAGMENTOS.items():
+            for _ in range(5000):
+                valor = "".join(azar.choice(fragmentos) for _ in range(azar.randint(0, 8)))
+                self.assertIgualExpresion(funcion, valor)
+
+        # Las fechas se recorren todas: año, mes y día con dígitos de distintos alfabetos y un final opcional
+        caracteres = "0123٣x"
+        for (anio, mes1, mes2, dia1, dia2, final) in itertools.product(["2023", "٢٠٢٣", "202"], caracteres, caracteres, caracteres, caracteres, ["", "\n", "\n\n"]):
+            self.assertIgualExpresion(Validacion.es_fecha, "%s-%s%s-%s%s%s" % (anio, mes1, mes2, dia1, dia2, final))
+
+    # Prueba para verificar que un valor malicioso largo se valida en poco tiempo
+    def test_tiempo_lineal(self):
+        for valor in ["1" * 10000 + "!", "(" + "1" * 10000, "http://" + "a-" * 5000 + " ", "a" * 10000 + "@" + "." * 10000 + " "]:
+            inicio = time.perf_counter()
+            for funcion in EXPRESIONES:
+                funcion(valor)
+            self.assertLess(time.perf_counter() - inicio, 0.5)